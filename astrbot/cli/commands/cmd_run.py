@@ -19,6 +19,10 @@ async def run_astrbot(astrbot_root: Path):
 
     log_broker = LogBroker()
     LogManager.set_queue_handler(logger, log_broker)
+    LogManager.set_file_handler(
+        logger,
+        str(astrbot_root / "data" / "logs" / "astrbot.log"),
+    )
     db = db_helper
 
     core_lifecycle = InitialLoader(db, log_broker)
@@ -0,0 +1,287 @@
+"""Token-budgeted context window management.
+
+The budgeter measures the conversation history with a local tokenizer and drops
+(or summarizes) the oldest turns until the request fits the provider's context
+window, leaving room for the system prompt, the tool definitions and the reply.
+"""
+
+import abc
+import json
+import math
+import unicodedata
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+TOKEN_COUNT_KEY = "_token_count"
+"""Key used to cache the token count of a message inside the stored history.
+
+The value is a ``[tokenizer_name, count]`` pair, so that switching tokenizers
+invalidates the cached counts. Providers strip this key before sending requests.
+"""
+
+MESSAGE_OVERHEAD_TOKENS = 4
+"""Per-message overhead (role, separators) added by chat templates."""
+
+IMAGE_TOKENS = 765
+"""Rough cost of an image part (OpenAI high-detail 512px tile estimate)."""
+
+
+class Tokenizer(abc.ABC):
+    """A local tokenizer used to estimate prompt size."""
+
+    name: str = "base"
+
+    @abc.abstractmethod
+    def count(self, text: str) -> int:
+        """Count the tokens of a piece of text."""
+        raise NotImplementedError
+
+
+class HeuristicTokenizer(Tokenizer):
+    """A dependency-free estimator.
+
+    CJK characters are counted as one token each, other text as one token per
+    four characters, which is close to BPE tokenizers on mixed Chinese/English text.
+    """
+
+    name = "heuristic"
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        wide = 0
+        for ch in text:
+            if ord(ch) > 0x2E7F and unicodedata.east_asian_width(ch) in ("W", "F"):
+                wide += 1
+        return wide + math.ceil((len(text) - wide) / 4)
+
+
+class TiktokenTokenizer(Tokenizer):
+    """A tiktoken-compatible tokenizer. Requires the optional ``tiktoken`` package."""
+
+    def __init__(self, encoding: str = "cl100k_base") -> None:
+        import tiktoken
+
+        self._enc = tiktoken.get_encoding(encoding)
+        self.name = f"tiktoken:{encoding}"
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        return len(self._enc.encode(text, disallowed_special=()))
+
+
+_tokenizer_factories: dict[str, Callable[[], Tokenizer]] = {
+    "heuristic": HeuristicTokenizer,
+    "tiktoken": TiktokenTokenizer,
+}
+_tokenizer_instances: dict[str, Tokenizer] = {}
+
+
+def register_tokenizer(name: str, factory: Callable[[], Tokenizer]) -> None:
+    """Register a custom tokenizer factory, e.g. for a model-specific vocabulary."""
+    _tokenizer_factories[name] = factory
+    _tokenizer_instances.pop(name, None)
+
+
+def get_tokenizer(name: str = "auto") -> Tokenizer:
+    """Get a tokenizer by name.
+
+    ``auto`` prefers tiktoken when it is installed and falls back to the heuristic
+    estimator otherwise. Unknown or unavailable tokenizers also fall back.
+    """
+    if name in _tokenizer_instances:
+        return _tokenizer_instances[name]
+    candidates = ["tiktoken", "heuristic"] if name == "auto" else [name, "heuristic"]
+    tokenizer: Tokenizer | None = None
+    for candidate in candidates:
+        factory = _tokenizer_factories.get(candidate)
+        if not factory:
+            continue
+        try:
+            tokenizer = factory()
+            break
+        except Exception:
+            continue
+    if tokenizer is None:
+        tokenizer = HeuristicTokenizer()
+    _tokenizer_instances[name] = tokenizer
+    return tokenizer
+
+
+def strip_token_cache(messages: list[dict]) -> list[dict]:
+    """Remove cached token counts from messages in place."""
+    for message in messages:
+        if isinstance(message, dict):
+            message.pop(TOKEN_COUNT_KEY, None)
+    return messages
+
+
+@dataclass
+class BudgetResult:
+    contexts: list[dict]
+    """The kept messages, in their original order."""
+    dropped: list[dict] = field(default_factory=list)
+    """The dropped messages, in their original order."""
+    context_tokens: int = 0
+    """Tokens of the kept messages."""
+    budget: int = 0
+    """Tokens available for the history after reservations."""
+
+
+class ContextBudgeter:
+    """Fit a conversation history into a token budget.
+
+    Messages are grouped into turns that start at a ``user`` message, so an
+    assistant ``tool_calls`` message is never separated from its ``tool`` results.
+    Whole turns are dropped from the oldest side; the latest turn is always kept.
+    """
+
+    def __init__(self, tokenizer: Tokenizer | None = None) -> None:
+        self.tokenizer = tokenizer or get_tokenizer()
+
+    def count_text(self, text: str | None) -> int:
+        return self.tokenizer.count(text or "")
+
+    def count_tools(self, tool_schema: Any) -> int:
+        """Count the tokens of a serialized tool definition list."""
+        if not tool_schema:
+            return 0
+        return self.tokenizer.count(
+            json.dumps(tool_schema, ensure_ascii=False, sort_keys=True)
+        )
+
+    def _count_content(self, content: Any) -> int:
+        if content is None:
+            return 0
+        if isinstance(content, str):
+            return self.tokenizer.count(content)
+        if isinstance(content, list):
+            total = 0
+            for part in content:
+                if isinstance(part, dict):
+                    part_type = part.get("type")
+                    if part_type == "text":
+                        total += self.tokenizer.count(part.get("text", ""))
+                    elif part_type in ("image_url", "image"):
+                        total += IMAGE_TOKENS
+                    else:
+                        total += self.tokenizer.count(
+                            json.dumps(part, ensure_ascii=False)
+                        )
+                elif isinstance(part, str):
+                    total += self.tokenizer.count(part)
+            return total
+        return self.tokenizer.count(json.dumps(content, ensure_ascii=False))
+
+    def count_message(self, message: dict) -> int:
+        """Count the tokens of a message, using and refreshing its cached count."""
+        cached = message.get(TOKEN_COUNT_KEY)
+        if (
+            isinstance(cached, list)
+            and len(cached) == 2
+            and cached[0] == self.tokenizer.name
+            and isinstance(cached[1], int)
+        ):
+            return cached[1]
+        total = MESSAGE_OVERHEAD_TOKENS + self._count_content(message.get("content"))
+        if message.get("tool_calls"):
+            total += self.tokenizer.count(
+                json.dumps(message["tool_calls"], ensure_ascii=False)
+            )
+        if message.get("tool_call_id"):
+            total += self.tokenizer.count(str(message["tool_call_id"]))
+        message[TOKEN_COUNT_KEY] = [self.tokenizer.name, total]
+        return total
+
+    @staticmethod
+    def group_turns(messages: list[dict]) -> list[list[dict]]:
+        """Split messages into turns, each starting at a ``user`` message.
+
+        Leading non-user messages (left over from earlier truncation) form their
+        own group and are dropped first.
+        """
+        turns: list[list[dict]] = []
+        for message in messages:
+            if message.get("role") == "user" or not turns:
+                turns.append([message])
+            else:
+                turns[-1].append(message)
+        return turns
+
+    def fit(
+        self,
+        messages: list[dict],
+        max_tokens: int,
+        reserved_tokens: int = 0,
+    ) -> BudgetResult:
+        """Drop the oldest turns until the messages fit ``max_tokens - reserved_tokens``.
+
+        Args:
+            messages: OpenAI-format history, oldest first.
+            max_tokens: The context window of the model.
+            reserved_tokens: Tokens reserved for the system prompt, tools, the
+                current user input and the reply.
+
+        """
+        budget = max(0, max_tokens - reserved_tokens)
+        turns = self.group_turns(messages)
+        turn_tokens = [sum(self.count_message(m) for m in turn) for turn in turns]
+
+        kept_from = len(turns)
+        used = 0
+        for idx in range(len(turns) - 1, -1, -1):
+            if used + turn_tokens[idx] > budget and kept_from < len(turns):
+                break
+            used += turn_tokens[idx]
+            kept_from = idx
+
+        # a history must not start with an orphan assistant/tool message
+        while kept_from < len(turns) and turns[kept_from][0].get("role") != "user":
+            used -= turn_tokens[kept_from]
+            kept_from += 1
+
+        kept = [m for turn in turns[kept_from:] for m in turn]
+        dropped = [m for turn in turns[:kept_from] for m in turn]
+        return BudgetResult(
+            contexts=kept,
+            dropped=dropped,
+            context_tokens=used,
+            budget=budget,
+        )
+
+    async def summarize(
+        self,
+        dropped: list[dict],
+        summarizer: Callable[[str], Awaitable[str]],
+        max_input_tokens: int = 8000,
+    ) -> str:
+        """Summarize dropped messages with the given LLM callable.
+
+        Only the most recent ``max_input_tokens`` worth of dropped text is sent.
+        """
+        lines: list[str] = []
+        used = 0
+        for message in reversed(dropped):
+            role = message.get("role")
+            if role not in ("user", "assistant"):
+                continue
+            content = message.get("content")
+            if isinstance(content, list):
+                content = " ".join(
+                    p.get("text", "")
+                    for p in content
+                    if isinstance(p, dict) and p.get("type") == "text"
+                )
+            if not content or not isinstance(content, str):
+                continue
+            line = f"{role.capitalize()}: {content}"
+            cost = self.tokenizer.count(line)
+            if used + cost > max_input_tokens:
+                break
+            used += cost
+            lines.append(line)
+        if not lines:
+            return ""
+        return await summarizer("\n".join(reversed(lines)))
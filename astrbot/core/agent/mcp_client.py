@@ -1,5 +1,6 @@
 import asyncio
 import logging
+import time
 from contextlib import AsyncExitStack
 from datetime import timedelta
 from typing import Generic
@@ -36,6 +37,24 @@ except (ModuleNotFoundError, ImportError):
     )
 
 
+DEFAULT_CONNECT_TIMEOUT = 30
+"""Seconds allowed for connecting to a server and listing its tools"""
+
+DEFAULT_MAX_CONCURRENT_CALLS = 8
+"""Max in-flight tool calls per server"""
+
+DEFAULT_HEALTH_CHECK_INTERVAL = 60
+"""Seconds between pings on an idle connection, 0 disables health checks"""
+
+PING_TIMEOUT = 10
+
+CONNECTION_CLOSED = -32000
+"""JSON-RPC error code used by the MCP SDK when the connection closes mid-request"""
+
+RECONNECT_BACKOFF_MIN = 1
+RECONNECT_BACKOFF_MAX = 300
+
+
 def _prepare_config(config: dict) -> dict:
     """Prepare configuration, handle nested format"""
     if config.get("mcpServers"):
@@ -112,7 +131,6 @@ class MCPClient:
         # Initialize session and client objects
         self.session: mcp.ClientSession | None = None
         self.exit_stack = AsyncExitStack()
-        self._old_exit_stacks: list[AsyncExitStack] = []  # Track old stacks for cleanup
 
         self.name: str | None = None
         self.active: bool = True
@@ -120,11 +138,17 @@ class MCPClient:
         self.server_errlogs: list[str] = []
         self.running_event = asyncio.Event()
 
-        # Store connection config for reconnection
-        self._mcp_server_config: dict | None = None
-        self._server_name: str | None = None
-        self._reconnect_lock = asyncio.Lock()  # Lock for thread-safe reconnection
-        self._reconnecting: bool = False  # For logging and debugging
+        self.max_concurrent_calls = DEFAULT_MAX_CONCURRENT_CALLS
+        self.health_check_interval: float = DEFAULT_HEALTH_CHECK_INTERVAL
+        self._call_semaphore = asyncio.Semaphore(self.max_concurrent_calls)
+        self._tools_result: mcp.ListToolsResult | None = None
+        """Cached list_tools result, dropped when the server sends tools/list_changed"""
+        self.tools_changed = asyncio.Event()
+        self._connected = asyncio.Event()
+        self._lost = asyncio.Event()
+        self._active_calls = 0
+        self._last_activity = time.monotonic()
+        """Time of the last traffic on the connection, used to skip health checks"""
 
     async def connect_to_server(self, mcp_server_config: dict, name: str):
         """Connect to MCP server
@@ -138,12 +162,18 @@ class MCPClient:
             mcp_server_config (dict): Configuration for the MCP server. See https://modelcontextprotocol.io/quickstart/server
 
         """
-        # Store config for reconnection
-        self._mcp_server_config = mcp_server_config
-        self._server_name = name
-
         cfg = _prepare_config(mcp_server_config.copy())
 
+        max_calls = max(
+            1, int(cfg.get("max_concurrent_calls", DEFAULT_MAX_CONCURRENT_CALLS))
+        )
+        if max_calls != self.max_concurrent_calls:
+            self.max_concurrent_calls = max_calls
+            self._call_semaphore = asyncio.Semaphore(max_calls)
+        self.health_check_interval = cfg.get(
+            "health_check_interval", DEFAULT_HEALTH_CHECK_INTERVAL
+        )
+
         def logging_callback(msg: str):
             # Handle MCP service error logs
             print(f"MCP Server {name} Error: {msg}")
@@ -180,6 +210,7 @@ class MCPClient:
                         *streams,
                         read_timeout_seconds=read_timeout,
                         logging_callback=logging_callback,  # type: ignore
+                        message_handler=self._handle_message,
                     ),
                 )
             else:
@@ -206,6 +237,7 @@ class MCPClient:
                         write_stream=write_s,
                         read_timeout_seconds=read_timeout,
                         logging_callback=logging_callback,  # type: ignore
+                        message_handler=self._handle_message,
                     ),
                 )
 
@@ -232,67 +264,163 @@ class MCPClient:
 
             # Create a new client session
             self.session = await self.exit_stack.enter_async_context(
-                mcp.ClientSession(*stdio_transport),
+                mcp.ClientSession(
+                    *stdio_transport,
+                    message_handler=self._handle_message,
+                ),
             )
         await self.session.initialize()
+        self._tools_result = None
+        self._lost.clear()
+        self._connected.set()
 
-    async def list_tools_and_save(self) -> mcp.ListToolsResult:
-        """List all tools from the server and save them to self.tools"""
+    async def connect(
+        self,
+        mcp_server_config: dict,
+        name: str,
+        connect_timeout: float | None = None,
+    ) -> mcp.ListToolsResult:
+        """Connect to the server and list its tools, giving up after `connect_timeout` seconds.
+
+        The anyio contexts entered while connecting must be exited by the same task,
+        so the timeout cancels the current task instead of using asyncio.wait_for.
+        On failure the partially opened connection is closed before raising.
+        """
+        if connect_timeout is None:
+            connect_timeout = _prepare_config(mcp_server_config.copy()).get(
+                "connect_timeout", DEFAULT_CONNECT_TIMEOUT
+            )
+        task = asyncio.current_task()
+        assert task is not None
+        timed_out = False
+
+        def _on_timeout():
+            nonlocal timed_out
+            timed_out = True
+            task.cancel()
+
+        handle = asyncio.get_running_loop().call_later(connect_timeout, _on_timeout)
+        try:
+            await self.connect_to_server(mcp_server_config, name)
+            return await self.list_tools_and_save(refresh=True)
+        except asyncio.CancelledError:
+            await self.close_session()
+            if not timed_out:
+                raise
+            if hasattr(task, "uncancel"):
+                task.uncancel()
+            raise TimeoutError(
+                f"Connecting to MCP server {name} timed out after {connect_timeout}s"
+            )
+        except BaseException:
+            await self.close_session()
+            raise
+        finally:
+            handle.cancel()
+
+    async def _handle_message(self, message) -> None:
+        """Invalidate the cached tool list when the server reports a change"""
+        self._last_activity = time.monotonic()
+        if isinstance(message, mcp.types.ServerNotification) and isinstance(
+            message.root, mcp.types.ToolListChangedNotification
+        ):
+            self._tools_result = None
+            self.tools_changed.set()
+
+    async def list_tools_and_save(self, refresh: bool = False) -> mcp.ListToolsResult:
+        """List all tools from the server and save them to self.tools.
+
+        The result is cached until the server sends a tools/list_changed notification
+        or `refresh` is True.
+        """
         if not self.session:
             raise Exception("MCP Client is not initialized")
+        if self._tools_result is not None and not refresh:
+            return self._tools_result
+        self.tools_changed.clear()
         response = await self.session.list_tools()
+        self._last_activity = time.monotonic()
+        self._tools_result = response
         self.tools = response.tools
         return response
 
-    async def _reconnect(self) -> None:
-        """Reconnect to the MCP server using the stored configuration.
+    @property
+    def connected(self) -> bool:
+        return self._connected.is_set()
 
-        Uses asyncio.Lock to ensure thread-safe reconnection in concurrent environments.
+    def mark_lost(self) -> None:
+        """Mark the connection as broken, the owning task will reconnect"""
+        if self._connected.is_set():
+            self._connected.clear()
+            self._lost.set()
 
-        Raises:
-            Exception: raised when reconnection fails
-        """
-        async with self._reconnect_lock:
-            # Check if already reconnecting (useful for logging)
-            if self._reconnecting:
-                logger.debug(
-                    f"MCP Client {self._server_name} is already reconnecting, skipping"
-                )
-                return
-
-            if not self._mcp_server_config or not self._server_name:
-                raise Exception("Cannot reconnect: missing connection configuration")
-
-            self._reconnecting = True
-            try:
-                logger.info(
-                    f"Attempting to reconnect to MCP server {self._server_name}..."
-                )
-
-                # Save old exit_stack for later cleanup (don't close it now to avoid cancel scope issues)
-                if self.exit_stack:
-                    self._old_exit_stacks.append(self.exit_stack)
+    async def wait_connected(self, max_wait: float) -> bool:
+        if self._connected.is_set():
+            return True
+        try:
+            await asyncio.wait_for(self._connected.wait(), max_wait)
+        except asyncio.TimeoutError:
+            return False
+        return True
 
-                # Mark old session as invalid
-                self.session = None
+    async def ping(self) -> bool:
+        if not self.session:
+            return False
+        try:
+            await asyncio.wait_for(self.session.send_ping(), PING_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"MCP server {self.name} health check failed: {e!r}")
+            return False
+        return True
 
-                # Create new exit stack for new connection
-                self.exit_stack = AsyncExitStack()
+    async def watch(self, stop_event: asyncio.Event) -> str:
+        """Wait until stopped, disconnected or the server's tool list changes.
 
-                # Reconnect using stored config
-                await self.connect_to_server(self._mcp_server_config, self._server_name)
-                await self.list_tools_and_save()
+        Connections are pinged after `health_check_interval` seconds without
+        traffic. No ping is sent while tool calls are in flight.
 
-                logger.info(
-                    f"Successfully reconnected to MCP server {self._server_name}"
-                )
-            except Exception as e:
-                logger.error(
-                    f"Failed to reconnect to MCP server {self._server_name}: {e}"
+        Returns:
+            "stop", "lost" or "tools_changed"
+        """
+        waiters = {
+            asyncio.ensure_future(stop_event.wait()): "stop",
+            asyncio.ensure_future(self._lost.wait()): "lost",
+            asyncio.ensure_future(self.tools_changed.wait()): "tools_changed",
+        }
+        interval = self.health_check_interval or None
+        wait = interval
+        try:
+            while True:
+                done, _ = await asyncio.wait(
+                    waiters, timeout=wait, return_when=asyncio.FIRST_COMPLETED
                 )
-                raise
-            finally:
-                self._reconnecting = False
+                for fut, reason in waiters.items():
+                    if fut in done:
+                        return reason
+                assert interval is not None
+                idle = time.monotonic() - self._last_activity
+                if self._active_calls or idle < interval:
+                    # Recent traffic shows the connection works, check again later
+                    wait = interval if self._active_calls else interval - idle
+                    continue
+                if not await self.ping():
+                    self.mark_lost()
+                    return "lost"
+                self._last_activity = time.monotonic()
+                wait = interval
+        finally:
+            for fut in waiters:
+                fut.cancel()
+
+    async def close_session(self) -> None:
+        """Close the current connection. Must be called from the task that opened it."""
+        self._connected.clear()
+        self.session = None
+        exit_stack, self.exit_stack = self.exit_stack, AsyncExitStack()
+        try:
+            await exit_stack.aclose()
+        except Exception as e:
+            logger.debug(f"Error closing MCP client exit stack: {e}")
 
     async def call_tool_with_reconnect(
         self,
@@ -300,7 +428,10 @@ class MCPClient:
         arguments: dict,
         read_timeout_seconds: timedelta,
     ) -> mcp.types.CallToolResult:
-        """Call MCP tool with automatic reconnection on failure, max 2 retries.
+        """Call MCP tool, waiting for the background reconnection on failure, max 2 retries.
+
+        At most `max_concurrent_calls` calls are in flight per server. While the
+        connection is being re-established, calls wait up to `read_timeout_seconds`.
 
         Args:
             tool_name: tool name
@@ -323,41 +454,46 @@ class MCPClient:
             reraise=True,
         )
         async def _call_with_retry():
-            if not self.session:
+            connected = await self.wait_connected(read_timeout_seconds.total_seconds())
+            if not connected or not self.session:
                 raise ValueError("MCP session is not available for MCP function tools.")
 
-            try:
-                return await self.session.call_tool(
-                    name=tool_name,
-                    arguments=arguments,
-                    read_timeout_seconds=read_timeout_seconds,
-                )
-            except anyio.ClosedResourceError:
-                logger.warning(
-                    f"MCP tool {tool_name} call failed (ClosedResourceError), attempting to reconnect..."
-                )
-                # Attempt to reconnect
-                await self._reconnect()
-                # Reraise the exception to trigger tenacity retry
-                raise
+            async with self._call_semaphore:
+                session = self.session
+                if not session:
+                    raise anyio.ClosedResourceError
+                self._active_calls += 1
+                try:
+                    result = await session.call_tool(
+                        name=tool_name,
+                        arguments=arguments,
+                        read_timeout_seconds=read_timeout_seconds,
+                    )
+                    self._last_activity = time.monotonic()
+                    return result
+                except anyio.ClosedResourceError:
+                    logger.warning(
+                        f"MCP tool {tool_name} call failed (ClosedResourceError), waiting for reconnection..."
+                    )
+                    self.mark_lost()
+                    # Reraise the exception to trigger tenacity retry
+                    raise
+                except mcp.McpError as e:
+                    # The connection dropped while the call was in flight. The
+                    # tool may already have run, so reconnect but do not retry.
+                    if e.error.code == CONNECTION_CLOSED:
+                        self.mark_lost()
+                    raise
+                finally:
+                    self._active_calls -= 1
 
         return await _call_with_retry()
 
     async def cleanup(self):
-        """Clean up resources including old exit stacks from reconnections"""
+        """Clean up resources"""
         # Set running_event first to unblock any waiting tasks
         self.running_event.set()
-
-        # Close current exit stack
-        try:
-            await self.exit_stack.aclose()
-        except Exception as e:
-            logger.debug(f"Error closing current exit stack: {e}")
-
-        # Don't close old exit stacks as they may be in different task contexts
-        # They will be garbage collected naturally
-        # Just clear the list to release references
-        self._old_exit_stacks.clear()
+        await self.close_session()
 
 
 class MCPTool(FunctionTool, Generic[TContext]):
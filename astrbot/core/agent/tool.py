@@ -1,4 +1,4 @@
-from collections.abc import Awaitable, Callable
+from collections.abc import Awaitable, Callable, Iterable
 from typing import Any, Generic
 
 import jsonschema
@@ -63,39 +63,152 @@ class FunctionTool(ToolSchema, Generic[TContext]):
         )
 
 
+def _tool_fingerprint(tool: "FunctionTool") -> tuple:
+    return (tool.name, tool.description, id(tool.parameters))
+
+
+def _cached_tool_schema(
+    tool: "FunctionTool",
+    fmt: str,
+    builder: Callable[["FunctionTool"], Any],
+) -> Any:
+    """Get a per-tool schema from the tool's own cache, building it on miss.
+
+    The cache lives on the tool object, so it is shared by every ToolSet that
+    contains the tool, and is invalidated when the name, description or the
+    parameters object of the tool changes.
+    """
+    cache: dict[str, tuple[tuple, Any]] | None = getattr(tool, "_schema_cache", None)
+    if cache is None:
+        cache = {}
+        object.__setattr__(tool, "_schema_cache", cache)
+    fingerprint = _tool_fingerprint(tool)
+    hit = cache.get(fmt)
+    if hit is not None and hit[0] == fingerprint:
+        return hit[1]
+    schema = builder(tool)
+    cache[fmt] = (fingerprint, schema)
+    return schema
+
+
 @dataclass
 class ToolSet:
     """A set of function tools that can be used in function calling.
 
     This class provides methods to add, remove, and retrieve tools, as well as
     convert the tools to different API formats (OpenAI, Anthropic, Google GenAI).
+
+    Provider-format schemas are memoized per tool and per set. The set keeps a
+    version counter that is bumped on every change made through its methods;
+    call `invalidate()` after mutating `tools` directly. Schemas are emitted in
+    tool-name order so the serialized request prefix stays byte-stable.
+
+    A set may be shared between requests (see
+    `FunctionToolManager.get_active_tool_set()`). Use `with_changes()` to get a
+    set with tools added or removed without modifying the shared one.
     """
 
     tools: list[FunctionTool] = Field(default_factory=list)
 
+    def __post_init__(self):
+        self._version = 0
+        self._index: dict[str, FunctionTool] = {}
+        self._index_key: tuple | None = None
+        self._schema_cache: dict[str, tuple[tuple, Any]] = {}
+
+    @property
+    def version(self) -> int:
+        """A counter bumped whenever the tool set changes."""
+        return self._version
+
+    def invalidate(self):
+        """Drop cached lookups and schemas, e.g. after mutating `tools` directly."""
+        self._version += 1
+
+    def _state_key(self) -> tuple:
+        return (self._version, id(self.tools), len(self.tools))
+
+    def _name_index(self) -> dict[str, FunctionTool]:
+        key = self._state_key()
+        if self._index_key != key:
+            self._index = {tool.name: tool for tool in self.tools}
+            self._index_key = key
+        return self._index
+
+    def _sorted_tools(self) -> list[FunctionTool]:
+        return sorted(self.tools, key=lambda tool: tool.name)
+
+    def _memoized(self, fmt: str, build: Callable[[], Any]) -> Any:
+        key = self._state_key()
+        hit = self._schema_cache.get(fmt)
+        if hit is not None and hit[0] == key:
+            return hit[1]
+        schema = build()
+        self._schema_cache[fmt] = (key, schema)
+        return schema
+
     def empty(self) -> bool:
         """Check if the tool set is empty."""
         return len(self.tools) == 0
 
+    def copy(self) -> "ToolSet":
+        """Return a copy that can be changed independently. Cached schemas are kept."""
+        new = ToolSet(self.tools.copy())
+        key, new_key = self._state_key(), new._state_key()
+        new._schema_cache = {
+            fmt: (new_key, schema)
+            for fmt, (cached_key, schema) in self._schema_cache.items()
+            if cached_key == key
+        }
+        return new
+
+    def with_changes(
+        self,
+        add: Iterable[FunctionTool] = (),
+        remove: Iterable[str] = (),
+    ) -> "ToolSet":
+        """Return a set with the tools in `remove` removed and the tools in `add` added.
+
+        Returns this set itself when nothing would change, so its cached schemas
+        are reused. Otherwise a copy is changed and this set is left untouched.
+        """
+        index = self._name_index()
+        add = [tool for tool in add if index.get(tool.name) is not tool]
+        remove = [name for name in remove if name in index]
+        if not add and not remove:
+            return self
+        new = self.copy()
+        for name in remove:
+            new.remove_tool(name)
+        for tool in add:
+            new.add_tool(tool)
+        return new
+
     def add_tool(self, tool: FunctionTool):
         """Add a tool to the set."""
         # 检查是否已存在同名工具
-        for i, existing_tool in enumerate(self.tools):
-            if existing_tool.name == tool.name:
-                self.tools[i] = tool
-                return
-        self.tools.append(tool)
+        existing_tool = self._name_index().get(tool.name)
+        if existing_tool is tool:
+            return
+        if existing_tool is not None:
+            for i, t in enumerate(self.tools):
+                if t is existing_tool:
+                    self.tools[i] = tool
+                    break
+        else:
+            self.tools.append(tool)
+        self._version += 1
 
     def remove_tool(self, name: str):
         """Remove a tool by its name."""
+        if name not in self._name_index():
+            return
         self.tools = [tool for tool in self.tools if tool.name != name]
+        self._version += 1
 
     def get_tool(self, name: str) -> FunctionTool | None:
         """Get a tool by its name."""
-        for tool in self.tools:
-            if tool.name == name:
-                return tool
-        return None
+        return self._name_index().get(name)
 
     @deprecated(reason="Use add_tool() instead", version="4.0.0")
     def add_func(
@@ -140,8 +253,8 @@ class ToolSet:
 
     def openai_schema(self, omit_empty_parameter_field: bool = False) -> list[dict]:
         """Convert tools to OpenAI API function calling schema format."""
-        result = []
-        for tool in self.tools:
+
+        def build_one(tool: FunctionTool) -> dict:
             func_def = {
                 "type": "function",
                 "function": {
@@ -154,25 +267,42 @@ class ToolSet:
                 tool.parameters and tool.parameters.get("properties")
             ) or not omit_empty_parameter_field:
                 func_def["function"]["parameters"] = tool.parameters
-
-            result.append(func_def)
-        return result
+            return func_def
+
+        fmt = "openai_omit_empty" if omit_empty_parameter_field else "openai"
+        return list(
+            self._memoized(
+                fmt,
+                lambda: [
+                    _cached_tool_schema(tool, fmt, build_one)
+                    for tool in self._sorted_tools()
+                ],
+            )
+        )
 
     def anthropic_schema(self) -> list[dict]:
         """Convert tools to Anthropic API format."""
-        result = []
-        for tool in self.tools:
+
+        def build_one(tool: FunctionTool) -> dict:
             input_schema = {"type": "object"}
             if tool.parameters:
                 input_schema["properties"] = tool.parameters.get("properties", {})
                 input_schema["required"] = tool.parameters.get("required", [])
-            tool_def = {
+            return {
                 "name": tool.name,
                 "description": tool.description,
                 "input_schema": input_schema,
             }
-            result.append(tool_def)
-        return result
+
+        return list(
+            self._memoized(
+                "anthropic",
+                lambda: [
+                    _cached_tool_schema(tool, "anthropic", build_one)
+                    for tool in self._sorted_tools()
+                ],
+            )
+        )
 
     def google_schema(self) -> dict:
         """Convert tools to Google GenAI API format."""
@@ -238,20 +368,26 @@ class ToolSet:
 
             return result
 
-        tools = []
-        for tool in self.tools:
+        def build_one(tool: FunctionTool) -> dict:
             d: dict[str, Any] = {
                 "name": tool.name,
                 "description": tool.description,
             }
             if tool.parameters:
                 d["parameters"] = convert_schema(tool.parameters)
-            tools.append(d)
-
-        declarations = {}
-        if tools:
-            declarations["function_declarations"] = tools
-        return declarations
+            return d
+
+        def build() -> dict:
+            tools = [
+                _cached_tool_schema(tool, "google", build_one)
+                for tool in self._sorted_tools()
+            ]
+            declarations = {}
+            if tools:
+                declarations["function_declarations"] = tools
+            return declarations
+
+        return dict(self._memoized("google", build))
 
     @deprecated(reason="Use openai_schema() instead", version="4.0.0")
     def get_func_desc_openai_style(self, omit_empty_parameter_field: bool = False):
@@ -66,6 +66,8 @@ DEFAULT_CONFIG = {
         "prompt_prefix": "{{prompt}}",
         "max_context_length": -1,
         "dequeue_context_length": 1,
+        "context_tokenizer": "auto",
+        "context_overflow_strategy": "truncate",
         "streaming_response": False,
         "show_tool_use_status": False,
         "unsupported_streaming_strategy": "realtime_segmenting",
@@ -75,12 +77,18 @@ DEFAULT_CONFIG = {
     "provider_stt_settings": {
         "enable": False,
         "provider_id": "",
+        "max_concurrency": 3,
+        "cache_enable": True,
     },
     "provider_tts_settings": {
         "enable": False,
         "provider_id": "",
         "dual_output": False,
         "use_file_service": False,
+        "max_concurrency": 3,
+        "cache_enable": True,
+        "cache_max_size_mb": 200,
+        "send_first_segment_early": False,
     },
     "provider_ltm_settings": {
         "group_icl_enable": False,
@@ -132,6 +140,8 @@ DEFAULT_CONFIG = {
     "persona": [],  # deprecated
     "timezone": "Asia/Shanghai",
     "callback_api_base": "",
+    "temp_dir_max_size_mb": 1024,
+    "group_message_archive_days": 30,
     "default_kb_collection": "",  # 默认知识库名称, 已经过时
     "plugin_set": ["*"],  # "*" 表示使用所有可用的插件, 空列表表示不使用任何插件
     "kb_names": [],  # 默认知识库名称列表
@@ -792,6 +802,7 @@ CONFIG_METADATA_2 = {
                             "temperature": 0.2,
                         },
                         "modalities": ["text", "image", "tool_use"],
+                        "prompt_cache": True,
                     },
                     "Ollama": {
                         "hint": "启用前请确保已正确安装并运行 Ollama 服务端，Ollama默认不带鉴权，无需修改key",
@@ -1356,6 +1367,16 @@ CONFIG_METADATA_2 = {
                         "render_type": "checkbox",
                         "hint": "模型支持的模态。如所填写的模型不支持图像，请取消勾选图像。",
                     },
+                    "prompt_cache": {
+                        "description": "启用提示词缓存",
+                        "type": "bool",
+                        "hint": "自动在工具定义、系统提示词和对话前缀上设置缓存断点，降低长人格、知识库与工具列表的首字延迟和费用。",
+                    },
+                    "max_context_tokens": {
+                        "description": "上下文窗口 Token 数",
+                        "type": "int",
+                        "hint": "模型的上下文窗口大小。设置后会按 Token 预算裁剪对话历史，并为系统提示词、工具定义和回复预留空间。0 表示不启用。",
+                    },
                     "custom_headers": {
                         "description": "自定义添加请求头",
                         "type": "dict",
@@ -2005,6 +2026,12 @@ CONFIG_METADATA_2 = {
                     "dequeue_context_length": {
                         "type": "int",
                     },
+                    "context_tokenizer": {
+                        "type": "string",
+                    },
+                    "context_overflow_strategy": {
+                        "type": "string",
+                    },
                     "streaming_response": {
                         "type": "bool",
                     },
@@ -2033,6 +2060,12 @@ CONFIG_METADATA_2 = {
                     "provider_id": {
                         "type": "string",
                     },
+                    "max_concurrency": {
+                        "type": "int",
+                    },
+                    "cache_enable": {
+                        "type": "bool",
+                    },
                 },
             },
             "provider_tts_settings": {
@@ -2050,6 +2083,18 @@ CONFIG_METADATA_2 = {
                     "use_file_service": {
                         "type": "bool",
                     },
+                    "max_concurrency": {
+                        "type": "int",
+                    },
+                    "cache_enable": {
+                        "type": "bool",
+                    },
+                    "cache_max_size_mb": {
+                        "type": "int",
+                    },
+                    "send_first_segment_early": {
+                        "type": "bool",
+                    },
                 },
             },
             "provider_ltm_settings": {
@@ -2121,6 +2166,12 @@ CONFIG_METADATA_2 = {
             "callback_api_base": {
                 "type": "string",
             },
+            "temp_dir_max_size_mb": {
+                "type": "int",
+            },
+            "group_message_archive_days": {
+                "type": "int",
+            },
             "log_level": {
                 "type": "string",
                 "options": ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
@@ -2191,6 +2242,22 @@ CONFIG_METADATA_3 = {
                             "provider_stt_settings.enable": True,
                         },
                     },
+                    "provider_stt_settings.max_concurrency": {
+                        "description": "语音转文本并发数",
+                        "type": "int",
+                        "hint": "一条消息包含多段语音时，同一个 STT 提供商同时识别的数量上限。",
+                        "condition": {
+                            "provider_stt_settings.enable": True,
+                        },
+                    },
+                    "provider_stt_settings.cache_enable": {
+                        "description": "缓存语音识别结果",
+                        "type": "bool",
+                        "hint": "按音频内容缓存识别结果，转发的同一段语音不会重复识别。",
+                        "condition": {
+                            "provider_stt_settings.enable": True,
+                        },
+                    },
                     "provider_tts_settings.enable": {
                         "description": "启用文本转语音",
                         "type": "bool",
@@ -2343,6 +2410,19 @@ CONFIG_METADATA_3 = {
                         "type": "int",
                         "hint": "超出最多携带对话轮数时, 一次丢弃的聊天轮数。",
                     },
+                    "provider_settings.context_overflow_strategy": {
+                        "description": "超出上下文 Token 预算时的处理方式",
+                        "type": "string",
+                        "options": ["truncate", "summarize"],
+                        "labels": ["丢弃最旧的对话", "总结最旧的对话"],
+                        "hint": "仅在提供商设置了「上下文窗口 Token 数」时生效。总结会额外进行一次 LLM 请求。",
+                    },
+                    "provider_settings.context_tokenizer": {
+                        "description": "上下文 Token 计数器",
+                        "type": "string",
+                        "options": ["auto", "tiktoken", "heuristic"],
+                        "hint": "auto 在安装了 tiktoken 时使用 tiktoken，否则使用本地估算。",
+                    },
                     "provider_settings.wake_prefix": {
                         "description": "LLM 聊天额外唤醒前缀 ",
                         "type": "string",
@@ -2357,6 +2437,29 @@ CONFIG_METADATA_3 = {
                         "description": "开启 TTS 时同时输出语音和文字内容",
                         "type": "bool",
                     },
+                    "provider_tts_settings.max_concurrency": {
+                        "description": "TTS 并发合成数",
+                        "type": "int",
+                        "hint": "分段回复时，同一个 TTS 提供商同时合成的消息段数量上限。",
+                    },
+                    "provider_tts_settings.cache_enable": {
+                        "description": "缓存 TTS 音频",
+                        "type": "bool",
+                        "hint": "相同提供商、音色和文本的语音只合成一次，适合问候语、错误提示等固定文本。",
+                    },
+                    "provider_tts_settings.cache_max_size_mb": {
+                        "description": "TTS 缓存大小上限(MB)",
+                        "type": "int",
+                        "hint": "超出后优先淘汰最久未使用的音频。",
+                        "condition": {
+                            "provider_tts_settings.cache_enable": True,
+                        },
+                    },
+                    "provider_tts_settings.send_first_segment_early": {
+                        "description": "优先发送第一段语音",
+                        "type": "bool",
+                        "hint": "分段回复时，第一段语音合成完成后立即发送，其余消息段继续合成。第一段不会附加 @ 和引用回复。",
+                    },
                 },
             },
         },
@@ -2742,6 +2845,16 @@ CONFIG_METADATA_3_SYSTEM = {
                         "type": "string",
                         "hint": "外部服务可能会通过 AstrBot 生成的回调链接（如文件下载链接）访问 AstrBot 后端。由于 AstrBot 无法自动判断部署环境中对外可达的主机地址（host），因此需要通过此配置项显式指定 “外部服务如何访问 AstrBot” 的地址。如 http://localhost:6185，https://example.com 等。",
                     },
+                    "temp_dir_max_size_mb": {
+                        "description": "临时文件目录大小上限(MB)",
+                        "type": "int",
+                        "hint": "data/temp 目录中临时文件的总大小上限。超出时会提前清理最早过期的临时文件。",
+                    },
+                    "group_message_archive_days": {
+                        "description": "群消息归档保留天数",
+                        "type": "int",
+                        "hint": "AstrBot 会在本地归档 QQ 群消息(OneBot)，包括机器人自己发出的消息，供群聊分析等插件读取。超过保留天数的消息会被自动清理。设为 0 时不归档。",
+                    },
                     "timezone": {
                         "description": "时区",
                         "type": "string",
@@ -249,6 +249,56 @@ class ConversationManager:
             convs_res.append(conv_res)
         return convs_res, cnt
 
+    async def get_conversation_list(
+        self,
+        page_size: int = 20,
+        cursor: str | None = None,
+        page: int | None = None,
+        platform_ids: list[str] | None = None,
+        search_query: str = "",
+        **kwargs,
+    ) -> tuple[list[Conversation], int, str | None]:
+        """获取用于列表展示的对话, 不包含对话内容(history 为空字符串).
+
+        Args:
+            page_size (int): 每页大小, 默认为 20
+            cursor (str): 上一页返回的游标, 可选。提供时忽略 page
+            page (int): 页码, 可选
+            platform_ids (list[str]): 平台 ID 列表, 可选
+            search_query (str): 搜索查询字符串, 可选
+        Returns:
+            conversations (list[Conversation]): 对话对象列表
+            total (int): 符合条件的对话总数, 可能有短暂的缓存
+            next_cursor (str | None): 下一页的游标, 没有更多数据时为 None
+
+        """
+        rows, next_cursor = await self.db.get_conversation_list(
+            page_size=page_size,
+            cursor=cursor,
+            page=page,
+            platform_ids=platform_ids,
+            search_query=search_query,
+            **kwargs,
+        )
+        total = await self.db.count_filtered_conversations(
+            platform_ids=platform_ids,
+            search_query=search_query,
+            **kwargs,
+        )
+        convs = [
+            Conversation(
+                platform_id=row.platform_id,
+                user_id=row.user_id,
+                cid=row.conversation_id,
+                title=row.title,
+                persona_id=row.persona_id,
+                created_at=int(row.created_at.timestamp()),
+                updated_at=int(row.updated_at.timestamp()),
+            )
+            for row in rows
+        ]
+        return convs, total, next_cursor
+
     async def update_conversation(
         self,
         unified_msg_origin: str,
@@ -23,17 +23,26 @@ from astrbot.core.conversation_mgr import ConversationManager
 from astrbot.core.db import BaseDatabase
 from astrbot.core.db.migration.migra_45_to_46 import migrate_45_to_46
 from astrbot.core.db.migration.migra_webchat_session import migrate_webchat_session
+from astrbot.core.group_message_archive import group_message_archive
+from astrbot.core.job_runner import job_runner
 from astrbot.core.knowledge_base.kb_mgr import KnowledgeBaseManager
 from astrbot.core.persona_mgr import PersonaManager
 from astrbot.core.pipeline.scheduler import PipelineContext, PipelineScheduler
 from astrbot.core.platform.manager import PlatformManager
 from astrbot.core.platform_message_history_mgr import PlatformMessageHistoryManager
+from astrbot.core.plugin_kv import plugin_kv
 from astrbot.core.provider.manager import ProviderManager
+from astrbot.core.provider.stt_service import local_model_runner
 from astrbot.core.star import PluginManager
 from astrbot.core.star.context import Context
 from astrbot.core.star.star_handler import EventType, star_handlers_registry, star_map
 from astrbot.core.umop_config_router import UmopConfigRouter
 from astrbot.core.updator import AstrBotUpdator
+from astrbot.core.utils.audio_converter import audio_converter
+from astrbot.core.utils.metrics import metric_aggregator
+from astrbot.core.utils.runtime_sampler import runtime_sampler
+from astrbot.core.utils.startup_graph import StartupGraph
+from astrbot.core.utils.temp_manager import temp_file_manager
 
 from . import astrbot_config, html_renderer
 from .event_bus import EventBus
@@ -85,7 +94,12 @@ class AstrBotCoreLifecycle:
 
         await self.db.initialize()
 
-        await html_renderer.initialize()
+        temp_file_manager.configure(
+            quota_mb=self.astrbot_config.get("temp_dir_max_size_mb"),
+        )
+        group_message_archive.configure(
+            retention_days=self.astrbot_config.get("group_message_archive_days"),
+        )
 
         # 初始化 UMOP 配置路由器
         self.umop_config_router = UmopConfigRouter(sp=sp)
@@ -97,26 +111,11 @@ class AstrBotCoreLifecycle:
             sp=sp,
         )
 
-        # 4.5 to 4.6 migration for umop_config_router
-        try:
-            await migrate_45_to_46(self.astrbot_config_mgr, self.umop_config_router)
-        except Exception as e:
-            logger.error(f"Migration from version 4.5 to 4.6 failed: {e!s}")
-            logger.error(traceback.format_exc())
-
-        # migration for webchat session
-        try:
-            await migrate_webchat_session(self.db)
-        except Exception as e:
-            logger.error(f"Migration for webchat session failed: {e!s}")
-            logger.error(traceback.format_exc())
-
         # 初始化事件队列
         self.event_queue = Queue()
 
         # 初始化人格管理器
         self.persona_mgr = PersonaManager(self.db, self.astrbot_config_mgr)
-        await self.persona_mgr.initialize()
 
         # 初始化供应商管理器
         self.provider_manager = ProviderManager(
@@ -154,16 +153,29 @@ class AstrBotCoreLifecycle:
         # 初始化插件管理器
         self.plugin_manager = PluginManager(self.star_context, self.astrbot_config)
 
-        # 扫描、注册插件、实例化插件类
-        await self.plugin_manager.reload()
-
-        # 根据配置实例化各个 Provider
-        await self.provider_manager.initialize()
-
-        await self.kb_manager.initialize()
-
-        # 初始化消息事件流水线调度器
-        self.pipeline_scheduler_mapping = await self.load_pipeline_scheduler()
+        # 互不依赖的启动步骤并发执行:
+        # - 插件先于供应商加载 (插件可能注册供应商适配器), 平台适配器在两者之后加载
+        # - 知识库只读取元数据, 向量索引在首次使用时加载
+        graph = StartupGraph()
+        graph.add("html_renderer", html_renderer.initialize)
+        graph.add("migrations", self._run_migrations)
+        graph.add("persona", self.persona_mgr.initialize, deps=["migrations"])
+        graph.add("plugins", self.plugin_manager.reload, deps=["persona"])
+        graph.add("providers", self.provider_manager.initialize, deps=["plugins"])
+        graph.add("knowledge_base", self.kb_manager.initialize)
+        graph.add(
+            "pipeline",
+            self._init_pipeline_scheduler,
+            deps=["plugins", "providers"],
+        )
+        graph.add(
+            "platforms",
+            self.platform_manager.initialize,
+            deps=["plugins", "providers"],
+        )
+        await graph.run()
+        self.startup_timings = graph.report()
+        graph.log_report()
 
         # 初始化更新器
         self.astrbot_updator = AstrBotUpdator()
@@ -181,12 +193,28 @@ class AstrBotCoreLifecycle:
         # 初始化当前任务列表
         self.curr_tasks: list[asyncio.Task] = []
 
-        # 根据配置实例化各个平台适配器
-        await self.platform_manager.initialize()
-
         # 初始化关闭控制面板的事件
         self.dashboard_shutdown_event = asyncio.Event()
 
+    async def _run_migrations(self) -> None:
+        # 4.5 to 4.6 migration for umop_config_router
+        try:
+            await migrate_45_to_46(self.astrbot_config_mgr, self.umop_config_router)
+        except Exception as e:
+            logger.error(f"Migration from version 4.5 to 4.6 failed: {e!s}")
+            logger.error(traceback.format_exc())
+
+        # migration for webchat session
+        try:
+            await migrate_webchat_session(self.db)
+        except Exception as e:
+            logger.error(f"Migration for webchat session failed: {e!s}")
+            logger.error(traceback.format_exc())
+
+    async def _init_pipeline_scheduler(self) -> None:
+        # 初始化消息事件流水线调度器
+        self.pipeline_scheduler_mapping = await self.load_pipeline_scheduler()
+
     def _load(self) -> None:
         """加载事件总线和任务并初始化."""
         # 创建一个异步任务来执行事件总线的 dispatch() 方法
@@ -201,7 +229,45 @@ class AstrBotCoreLifecycle:
         for task in self.star_context._register_tasks:
             extra_tasks.append(asyncio.create_task(task, name=task.__name__))
 
-        tasks_ = [event_bus_task, *extra_tasks]
+        # 后台采样运行时指标，供控制面板读取
+        sampler_task = asyncio.create_task(
+            runtime_sampler.run(),
+            name="runtime_sampler",
+        )
+
+        # 批量写入消息统计与上传遥测
+        metrics_task = asyncio.create_task(
+            metric_aggregator.run(),
+            name="metric_aggregator",
+        )
+
+        # 定期清理临时文件
+        temp_janitor_task = asyncio.create_task(
+            temp_file_manager.run(),
+            name="temp_file_janitor",
+        )
+
+        # 批量写入群消息归档
+        group_archive_task = asyncio.create_task(
+            group_message_archive.run(),
+            name="group_message_archive",
+        )
+
+        # 定期写入插件计数器
+        plugin_kv_task = asyncio.create_task(
+            plugin_kv.run(),
+            name="plugin_kv",
+        )
+
+        tasks_ = [
+            event_bus_task,
+            sampler_task,
+            metrics_task,
+            temp_janitor_task,
+            group_archive_task,
+            plugin_kv_task,
+            *extra_tasks,
+        ]
         for task in tasks_:
             self.curr_tasks.append(
                 asyncio.create_task(self._task_wrapper(task), name=task.get_name()),
@@ -269,6 +335,12 @@ class AstrBotCoreLifecycle:
         await self.provider_manager.terminate()
         await self.platform_manager.terminate()
         await self.kb_manager.terminate()
+        await metric_aggregator.shutdown()
+        await group_message_archive.shutdown()
+        await plugin_kv.shutdown()
+        job_runner.shutdown()
+        audio_converter.shutdown()
+        local_model_runner.shutdown()
         self.dashboard_shutdown_event.set()
 
         # 再次遍历curr_tasks等待每个任务真正结束
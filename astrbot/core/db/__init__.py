@@ -11,11 +11,13 @@ from sqlalchemy.orm import sessionmaker
 from astrbot.core.db.po import (
     Attachment,
     ConversationV2,
+    GroupMessage,
     Persona,
     PlatformMessageHistory,
     PlatformSession,
     PlatformStat,
     Preference,
+    Reminder,
     Stats,
 )
 
@@ -81,6 +83,22 @@ class BaseDatabase(abc.ABC):
         """Insert a new platform statistic record."""
         ...
 
+    async def insert_platform_stats_batch(
+        self,
+        rows: list[tuple[str, str, int, datetime.datetime | None]],
+    ) -> None:
+        """Insert multiple platform statistic records.
+
+        Each row is (platform_id, platform_type, count, timestamp).
+        """
+        for platform_id, platform_type, count, timestamp in rows:
+            await self.insert_platform_stats(
+                platform_id=platform_id,
+                platform_type=platform_type,
+                count=count,
+                timestamp=timestamp,
+            )
+
     @abc.abstractmethod
     async def count_platform_stats(self) -> int:
         """Count the number of platform statistics records."""
@@ -91,6 +109,27 @@ class BaseDatabase(abc.ABC):
         """Get platform statistics within the specified offset in seconds and group by platform_id."""
         ...
 
+    @abc.abstractmethod
+    async def get_message_count_by_hour(
+        self,
+        offset_sec: int = 86400,
+    ) -> list[tuple[datetime.datetime, int]]:
+        """Get the total message count of each hour within the offset, ordered by time."""
+        ...
+
+    @abc.abstractmethod
+    async def get_message_count_by_platform(
+        self,
+        offset_sec: int = 86400,
+    ) -> list[tuple[str, int]]:
+        """Get the message count of each platform within the offset."""
+        ...
+
+    @abc.abstractmethod
+    async def get_total_message_count_async(self) -> int:
+        """Get the total message count, from the pre-aggregated daily counters."""
+        ...
+
     @abc.abstractmethod
     async def get_conversations(
         self,
@@ -129,6 +168,33 @@ class BaseDatabase(abc.ABC):
         """Get conversations filtered by platform IDs and search query."""
         ...
 
+    @abc.abstractmethod
+    async def count_filtered_conversations(
+        self,
+        platform_ids: list[str] | None = None,
+        search_query: str = "",
+        **kwargs,
+    ) -> int:
+        """Count conversations matching the filters. The result may be cached briefly."""
+        ...
+
+    @abc.abstractmethod
+    async def get_conversation_list(
+        self,
+        page_size: int = 20,
+        cursor: str | None = None,
+        page: int | None = None,
+        platform_ids: list[str] | None = None,
+        search_query: str = "",
+        **kwargs,
+    ) -> tuple[list[T.Any], str | None]:
+        """List conversations for list views, newest first, without the content.
+
+        Returns rows with the conversation columns except `content`, and the
+        cursor of the next page, or None.
+        """
+        ...
+
     @abc.abstractmethod
     async def create_conversation(
         self,
@@ -177,6 +243,24 @@ class BaseDatabase(abc.ABC):
         """Insert a new platform message history record."""
         ...
 
+    async def insert_platform_message_histories(
+        self,
+        platform_id: str,
+        user_id: str,
+        contents: list[dict],
+        sender_id: str | None = None,
+        sender_name: str | None = None,
+    ) -> None:
+        """Insert multiple platform message history records, in order."""
+        for content in contents:
+            await self.insert_platform_message_history(
+                platform_id=platform_id,
+                user_id=user_id,
+                content=content,
+                sender_id=sender_id,
+                sender_name=sender_name,
+            )
+
     @abc.abstractmethod
     async def delete_platform_message_offset(
         self,
@@ -194,10 +278,100 @@ class BaseDatabase(abc.ABC):
         user_id: str,
         page: int = 1,
         page_size: int = 20,
+        cursor: str | None = None,
     ) -> list[PlatformMessageHistory]:
         """Get platform message history for a specific user."""
         ...
 
+    @abc.abstractmethod
+    async def get_platform_message_history_page(
+        self,
+        platform_id: str,
+        user_id: str,
+        page_size: int = 20,
+        cursor: str | None = None,
+    ) -> tuple[list[PlatformMessageHistory], str | None]:
+        """Get one keyset page of platform message history, newest first.
+
+        Returns the records and the cursor of the next (older) page, or None.
+        """
+        ...
+
+    @abc.abstractmethod
+    async def insert_group_messages(self, rows: list[dict]) -> None:
+        """Archive group messages, ignoring ones that are already stored.
+
+        Each row has the GroupMessage fields (platform_id, group_id, message_id,
+        user_id, time, sender, message).
+        """
+        ...
+
+    @abc.abstractmethod
+    async def get_group_messages(
+        self,
+        group_id: str,
+        platform_id: str | None = None,
+        start_time: int | None = None,
+        end_time: int | None = None,
+        user_id: str | None = None,
+        after: tuple[int, int] | None = None,
+        limit: int = 500,
+        newest_first: bool = False,
+    ) -> list[GroupMessage]:
+        """Get archived group messages ordered by (time, id).
+
+        `after` is the (time, id) of the last row of the previous page.
+        """
+        ...
+
+    @abc.abstractmethod
+    async def get_latest_group_message_time(
+        self,
+        platform_id: str,
+        group_id: str,
+        before: int | None = None,
+    ) -> int | None:
+        """Get the time of the newest archived message, optionally before a timestamp."""
+        ...
+
+    @abc.abstractmethod
+    async def delete_group_messages_before(self, timestamp: int) -> None:
+        """Delete archived group messages older than the timestamp."""
+        ...
+
+    @abc.abstractmethod
+    async def insert_reminders(self, rows: list[dict]) -> None:
+        """Insert reminders. Each row has the Reminder fields."""
+        ...
+
+    @abc.abstractmethod
+    async def get_reminders(self, umo: str) -> list[Reminder]:
+        """Get the pending reminders of a session, ordered by creation."""
+        ...
+
+    @abc.abstractmethod
+    async def get_due_reminders(
+        self,
+        before: int,
+        limit: int = 1000,
+    ) -> list[Reminder]:
+        """Get reminders whose next run is before the timestamp, ordered by next run."""
+        ...
+
+    @abc.abstractmethod
+    async def update_reminder_next_run(
+        self,
+        reminder_id: str,
+        next_run_at: int | None,
+    ) -> bool:
+        """Set the next run of a reminder. Returns False if the reminder no longer exists."""
+        ...
+
+    @abc.abstractmethod
+    async def delete_reminders(self, reminder_ids: list[str]) -> None:
+        """Delete reminders by their reminder IDs."""
+        ...
+
     @abc.abstractmethod
     async def insert_attachment(
         self,
@@ -286,6 +460,22 @@ class BaseDatabase(abc.ABC):
         """Clear all preferences for a specific scope ID."""
         ...
 
+    @abc.abstractmethod
+    async def apply_preference_changes(
+        self,
+        scope: str,
+        scope_id: str,
+        puts: dict[str, dict] | None = None,
+        removes: T.Iterable[str] = (),
+        increments: dict[str, int | float] | None = None,
+    ) -> dict[str, int | float]:
+        """Apply puts, removals and counter increments for one scope ID in a single transaction.
+
+        Values in `puts` are stored as-is; counters are stored as {"val": number}.
+        Returns the counter values after the increments.
+        """
+        ...
+
     # @abc.abstractmethod
     # async def insert_llm_message(
     #     self,
@@ -30,6 +30,27 @@ class PlatformStat(SQLModel, table=True):
     )
 
 
+class PlatformStatDaily(SQLModel, table=True):
+    """Daily message counters, maintained together with `platform_stats` on write."""
+
+    __tablename__ = "platform_stats_daily"  # type: ignore
+
+    id: int = Field(primary_key=True, sa_column_kwargs={"autoincrement": True})
+    day: str = Field(nullable=False)  # YYYY-MM-DD, local time
+    platform_id: str = Field(nullable=False)
+    platform_type: str = Field(nullable=False)
+    count: int = Field(default=0, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "day",
+            "platform_id",
+            "platform_type",
+            name="uix_platform_stats_daily",
+        ),
+    )
+
+
 class ConversationV2(SQLModel, table=True):
     __tablename__ = "conversations"  # type: ignore
 
@@ -155,6 +176,71 @@ class PlatformMessageHistory(SQLModel, table=True):
     )
 
 
+class GroupMessage(SQLModel, table=True):
+    """Append-only archive of group chat messages, stored in OneBot v11 format.
+
+    Fed from inbound platform events and backfilled from the platform's
+    message history API. Used by plugins that analyse group chats.
+    """
+
+    __tablename__ = "group_messages"  # type: ignore
+
+    id: int | None = Field(
+        primary_key=True,
+        sa_column_kwargs={"autoincrement": True},
+        default=None,
+    )
+    platform_id: str = Field(nullable=False)
+    group_id: str = Field(nullable=False)
+    message_id: str = Field(nullable=False)
+    user_id: str = Field(nullable=False)
+    time: int = Field(nullable=False)  # unix timestamp
+    sender: dict = Field(sa_type=JSON, nullable=False)
+    message: list = Field(sa_type=JSON, nullable=False)  # OneBot message segments
+
+    __table_args__ = (
+        UniqueConstraint(
+            "platform_id",
+            "group_id",
+            "message_id",
+            name="uix_group_message",
+        ),
+    )
+
+
+class Reminder(SQLModel, table=True):
+    """Reminders created by the reminder plugin.
+
+    `next_run_at` is the unix timestamp of the next occurrence. For cron
+    reminders it is recomputed after each run, so only the next occurrence
+    is ever stored.
+    """
+
+    __tablename__ = "reminders"  # type: ignore
+
+    id: int | None = Field(
+        primary_key=True,
+        sa_column_kwargs={"autoincrement": True},
+        default=None,
+    )
+    reminder_id: str = Field(
+        max_length=36,
+        nullable=False,
+        unique=True,
+        default_factory=lambda: str(uuid.uuid4()),
+    )
+    umo: str = Field(nullable=False)
+    """Unified message origin the reminder is sent to."""
+    text: str = Field(nullable=False)
+    run_at: str | None = Field(default=None)
+    """Datetime of a one-off reminder, formatted as %Y-%m-%d %H:%M."""
+    cron: str | None = Field(default=None)
+    cron_h: str | None = Field(default=None)
+    """Human readable description of the cron expression."""
+    next_run_at: int | None = Field(default=None)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
 class PlatformSession(SQLModel, table=True):
     """Platform session table for managing user sessions across different platforms.
 
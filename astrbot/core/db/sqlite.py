@@ -1,8 +1,11 @@
 import asyncio
+import base64
 import threading
+import time
 import typing as T
 from datetime import datetime, timedelta, timezone
 
+from sqlalchemy import literal, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import col, delete, desc, func, or_, select, text, update
 
@@ -10,11 +13,14 @@ from astrbot.core.db import BaseDatabase
 from astrbot.core.db.po import (
     Attachment,
     ConversationV2,
+    GroupMessage,
     Persona,
     PlatformMessageHistory,
     PlatformSession,
     PlatformStat,
+    PlatformStatDaily,
     Preference,
+    Reminder,
     SQLModel,
 )
 from astrbot.core.db.po import (
@@ -26,12 +32,44 @@ from astrbot.core.db.po import (
 
 NOT_GIVEN = T.TypeVar("NOT_GIVEN")
 
+COUNT_CACHE_TTL = 30
+"""Seconds a conversation list total stays cached"""
+
+CONVERSATION_LIST_COLUMNS = (
+    ConversationV2.inner_conversation_id,
+    ConversationV2.conversation_id,
+    ConversationV2.platform_id,
+    ConversationV2.user_id,
+    ConversationV2.title,
+    ConversationV2.persona_id,
+    ConversationV2.created_at,
+    ConversationV2.updated_at,
+)
+"""Columns selected for list views; the content JSON is left out"""
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Raises ValueError on malformed cursors."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, row_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
 
 class SQLiteDatabase(BaseDatabase):
     def __init__(self, db_path: str) -> None:
         self.db_path = db_path
         self.DATABASE_URL = f"sqlite+aiosqlite:///{db_path}"
         self.inited = False
+        self._conversation_count_cache: dict[tuple, tuple[int, float]] = {}
+        """filters -> (count, expire time) for the conversation list totals"""
         super().__init__()
 
     async def initialize(self) -> None:
@@ -43,9 +81,83 @@ class SQLiteDatabase(BaseDatabase):
             await conn.execute(text("PRAGMA cache_size=20000"))
             await conn.execute(text("PRAGMA temp_store=MEMORY"))
             await conn.execute(text("PRAGMA mmap_size=134217728"))
+            # covering index for the dashboard statistics queries
+            await conn.execute(
+                text(
+                    "CREATE INDEX IF NOT EXISTS idx_platform_stats_ts_covering "
+                    "ON platform_stats (timestamp, platform_id, count)",
+                ),
+            )
+            # covering indexes for the conversation / history list queries
+            await conn.execute(
+                text(
+                    "CREATE INDEX IF NOT EXISTS idx_conversations_platform_user_updated "
+                    "ON conversations (platform_id, user_id, updated_at)",
+                ),
+            )
+            await conn.execute(
+                text(
+                    "CREATE INDEX IF NOT EXISTS idx_conversations_created "
+                    "ON conversations (created_at, inner_conversation_id)",
+                ),
+            )
+            await conn.execute(
+                text(
+                    "CREATE INDEX IF NOT EXISTS idx_platform_message_history_platform_user_created "
+                    "ON platform_message_history (platform_id, user_id, created_at, id)",
+                ),
+            )
+            await conn.execute(
+                text(
+                    "CREATE INDEX IF NOT EXISTS idx_group_messages_group_time "
+                    "ON group_messages (group_id, time, id)",
+                ),
+            )
+            await conn.execute(
+                text(
+                    "CREATE INDEX IF NOT EXISTS idx_group_messages_group_user_time "
+                    "ON group_messages (group_id, user_id, time, id)",
+                ),
+            )
+            await conn.execute(
+                text(
+                    "CREATE INDEX IF NOT EXISTS idx_group_messages_time "
+                    "ON group_messages (time)",
+                ),
+            )
+            await conn.execute(
+                text(
+                    "CREATE INDEX IF NOT EXISTS idx_reminders_next_run "
+                    "ON reminders (next_run_at)",
+                ),
+            )
+            await conn.execute(
+                text(
+                    "CREATE INDEX IF NOT EXISTS idx_reminders_umo "
+                    "ON reminders (umo, id)",
+                ),
+            )
+            await self._backfill_daily_stats(conn)
             await conn.execute(text("PRAGMA optimize"))
             await conn.commit()
 
+    @staticmethod
+    async def _backfill_daily_stats(conn) -> None:
+        """Build the daily counters from the hourly stats once, after upgrading."""
+        has_daily = await conn.execute(
+            text("SELECT 1 FROM platform_stats_daily LIMIT 1"),
+        )
+        if has_daily.first() is not None:
+            return
+        await conn.execute(
+            text("""
+            INSERT INTO platform_stats_daily (day, platform_id, platform_type, count)
+            SELECT substr(timestamp, 1, 10), platform_id, platform_type, SUM(count)
+            FROM platform_stats
+            GROUP BY substr(timestamp, 1, 10), platform_id, platform_type
+            """),
+        )
+
     # ====
     # Platform Statistics
     # ====
@@ -58,16 +170,31 @@ class SQLiteDatabase(BaseDatabase):
         timestamp=None,
     ) -> None:
         """Insert a new platform statistic record."""
+        await self.insert_platform_stats_batch(
+            [(platform_id, platform_type, count, timestamp)],
+        )
+
+    async def insert_platform_stats_batch(self, rows) -> None:
+        """Insert aggregated platform statistics in one transaction."""
+        if not rows:
+            return
+        params = []
+        for platform_id, platform_type, count, timestamp in rows:
+            if timestamp is None:
+                timestamp = datetime.now()
+            current_hour = timestamp.replace(minute=0, second=0, microsecond=0)
+            params.append(
+                {
+                    "timestamp": current_hour,
+                    "day": current_hour.strftime("%Y-%m-%d"),
+                    "platform_id": platform_id,
+                    "platform_type": platform_type,
+                    "count": count,
+                },
+            )
         async with self.get_db() as session:
             session: AsyncSession
             async with session.begin():
-                if timestamp is None:
-                    timestamp = datetime.now().replace(
-                        minute=0,
-                        second=0,
-                        microsecond=0,
-                    )
-                current_hour = timestamp
                 await session.execute(
                     text("""
                     INSERT INTO platform_stats (timestamp, platform_id, platform_type, count)
@@ -75,12 +202,17 @@ class SQLiteDatabase(BaseDatabase):
                     ON CONFLICT(timestamp, platform_id, platform_type) DO UPDATE SET
                         count = platform_stats.count + EXCLUDED.count
                     """),
-                    {
-                        "timestamp": current_hour,
-                        "platform_id": platform_id,
-                        "platform_type": platform_type,
-                        "count": count,
-                    },
+                    params,
+                )
+                # pre-aggregated daily counters
+                await session.execute(
+                    text("""
+                    INSERT INTO platform_stats_daily (day, platform_id, platform_type, count)
+                    VALUES (:day, :platform_id, :platform_type, :count)
+                    ON CONFLICT(day, platform_id, platform_type) DO UPDATE SET
+                        count = platform_stats_daily.count + EXCLUDED.count
+                    """),
+                    params,
                 )
 
     async def count_platform_stats(self) -> int:
@@ -112,6 +244,41 @@ class SQLiteDatabase(BaseDatabase):
             )
             return list(result.scalars().all())
 
+    async def get_message_count_by_hour(self, offset_sec=86400):
+        """Get the total message count of each hour within the offset, ordered by time."""
+        async with self.get_db() as session:
+            session: AsyncSession
+            start_time = datetime.now() - timedelta(seconds=offset_sec)
+            result = await session.execute(
+                select(PlatformStat.timestamp, func.sum(PlatformStat.count))
+                .where(PlatformStat.timestamp >= start_time)
+                .group_by(PlatformStat.timestamp)
+                .order_by(PlatformStat.timestamp),
+            )
+            return [(ts, int(cnt or 0)) for ts, cnt in result.all()]
+
+    async def get_message_count_by_platform(self, offset_sec=86400):
+        """Get the message count of each platform within the offset."""
+        async with self.get_db() as session:
+            session: AsyncSession
+            start_time = datetime.now() - timedelta(seconds=offset_sec)
+            result = await session.execute(
+                select(PlatformStat.platform_id, func.sum(PlatformStat.count))
+                .where(PlatformStat.timestamp >= start_time)
+                .group_by(PlatformStat.platform_id),
+            )
+            return [(pid, int(cnt or 0)) for pid, cnt in result.all()]
+
+    async def get_total_message_count_async(self):
+        """Get the total message count, from the pre-aggregated daily counters."""
+        async with self.get_db() as session:
+            session: AsyncSession
+            result = await session.execute(
+                select(func.sum(PlatformStatDaily.count)),
+            )
+            total = result.scalar_one_or_none()
+            return int(total or 0)
+
     # ====
     # Conversation Management
     # ====
@@ -150,6 +317,38 @@ class SQLiteDatabase(BaseDatabase):
             )
             return result.scalars().all()
 
+    @staticmethod
+    def _apply_conversation_filters(
+        query,
+        platform_ids=None,
+        search_query="",
+        **kwargs,
+    ):
+        if platform_ids:
+            query = query.where(
+                col(ConversationV2.platform_id).in_(platform_ids),
+            )
+        if search_query:
+            search_query = search_query.encode("unicode_escape").decode("utf-8")
+            query = query.where(
+                or_(
+                    col(ConversationV2.title).ilike(f"%{search_query}%"),
+                    col(ConversationV2.content).ilike(f"%{search_query}%"),
+                    col(ConversationV2.user_id).ilike(f"%{search_query}%"),
+                    col(ConversationV2.conversation_id).ilike(f"%{search_query}%"),
+                ),
+            )
+        if "message_types" in kwargs and len(kwargs["message_types"]) > 0:
+            for msg_type in kwargs["message_types"]:
+                query = query.where(
+                    col(ConversationV2.user_id).ilike(f"%:{msg_type}:%"),
+                )
+        if "platforms" in kwargs and len(kwargs["platforms"]) > 0:
+            query = query.where(
+                col(ConversationV2.platform_id).in_(kwargs["platforms"]),
+            )
+        return query
+
     async def get_filtered_conversations(
         self,
         page=1,
@@ -161,36 +360,19 @@ class SQLiteDatabase(BaseDatabase):
         async with self.get_db() as session:
             session: AsyncSession
             # Build the base query with filters
-            base_query = select(ConversationV2)
-
-            if platform_ids:
-                base_query = base_query.where(
-                    col(ConversationV2.platform_id).in_(platform_ids),
-                )
-            if search_query:
-                search_query = search_query.encode("unicode_escape").decode("utf-8")
-                base_query = base_query.where(
-                    or_(
-                        col(ConversationV2.title).ilike(f"%{search_query}%"),
-                        col(ConversationV2.content).ilike(f"%{search_query}%"),
-                        col(ConversationV2.user_id).ilike(f"%{search_query}%"),
-                        col(ConversationV2.conversation_id).ilike(f"%{search_query}%"),
-                    ),
-                )
-            if "message_types" in kwargs and len(kwargs["message_types"]) > 0:
-                for msg_type in kwargs["message_types"]:
-                    base_query = base_query.where(
-                        col(ConversationV2.user_id).ilike(f"%:{msg_type}:%"),
-                    )
-            if "platforms" in kwargs and len(kwargs["platforms"]) > 0:
-                base_query = base_query.where(
-                    col(ConversationV2.platform_id).in_(kwargs["platforms"]),
-                )
+            base_query = self._apply_conversation_filters(
+                select(ConversationV2),
+                platform_ids,
+                search_query,
+                **kwargs,
+            )
 
             # Get total count matching the filters
-            count_query = select(func.count()).select_from(base_query.subquery())
-            total_count = await session.execute(count_query)
-            total = total_count.scalar_one()
+            total = await self.count_filtered_conversations(
+                platform_ids,
+                search_query,
+                **kwargs,
+            )
 
             # Get paginated results
             offset = (page - 1) * page_size
@@ -204,6 +386,87 @@ class SQLiteDatabase(BaseDatabase):
 
             return conversations, total
 
+    async def count_filtered_conversations(
+        self,
+        platform_ids=None,
+        search_query="",
+        **kwargs,
+    ):
+        """Count conversations matching the filters. Results are cached briefly."""
+        key = (
+            tuple(sorted(platform_ids or [])),
+            search_query or "",
+            tuple(sorted(kwargs.get("message_types") or [])),
+            tuple(sorted(kwargs.get("platforms") or [])),
+        )
+        cached = self._conversation_count_cache.get(key)
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+        async with self.get_db() as session:
+            session: AsyncSession
+            query = self._apply_conversation_filters(
+                select(func.count(col(ConversationV2.inner_conversation_id))),
+                platform_ids,
+                search_query,
+                **kwargs,
+            )
+            total = (await session.execute(query)).scalar_one()
+        if len(self._conversation_count_cache) > 256:
+            self._conversation_count_cache.clear()
+        self._conversation_count_cache[key] = (
+            total,
+            time.monotonic() + COUNT_CACHE_TTL,
+        )
+        return total
+
+    async def get_conversation_list(
+        self,
+        page_size=20,
+        cursor=None,
+        page=None,
+        platform_ids=None,
+        search_query="",
+        **kwargs,
+    ):
+        """List conversations without their content, newest first.
+
+        Pages with the keyset cursor when given; `page` is kept for clients
+        that jump to arbitrary pages.
+        """
+        async with self.get_db() as session:
+            session: AsyncSession
+            query = self._apply_conversation_filters(
+                select(*CONVERSATION_LIST_COLUMNS),
+                platform_ids,
+                search_query,
+                **kwargs,
+            ).order_by(
+                desc(ConversationV2.created_at),
+                desc(ConversationV2.inner_conversation_id),
+            )
+            if cursor:
+                created_at, inner_id = decode_cursor(cursor)
+                query = query.where(
+                    tuple_(
+                        col(ConversationV2.created_at),
+                        col(ConversationV2.inner_conversation_id),
+                    )
+                    < tuple_(literal(created_at), literal(inner_id)),
+                )
+            elif page and page > 1:
+                query = query.offset((page - 1) * page_size)
+            result = await session.execute(query.limit(page_size + 1))
+            rows = result.all()
+            next_cursor = None
+            if len(rows) > page_size:
+                rows = rows[:page_size]
+                last = rows[-1]
+                next_cursor = encode_cursor(
+                    last.created_at,
+                    last.inner_conversation_id,
+                )
+            return rows, next_cursor
+
     async def create_conversation(
         self,
         user_id,
@@ -215,6 +478,7 @@ class SQLiteDatabase(BaseDatabase):
         created_at=None,
         updated_at=None,
     ):
+        self._conversation_count_cache.clear()
         kwargs = {}
         if cid:
             kwargs["conversation_id"] = cid
@@ -254,9 +518,15 @@ class SQLiteDatabase(BaseDatabase):
                     return None
                 query = query.values(**values)
                 await session.execute(query)
+        if title is not None or content is not None:
+            # title and content are only matched by the search filter; other
+            # cached totals stay valid until their TTL expires
+            for key in [k for k in self._conversation_count_cache if k[1]]:
+                del self._conversation_count_cache[key]
         return await self.get_conversation_by_id(cid)
 
     async def delete_conversation(self, cid):
+        self._conversation_count_cache.clear()
         async with self.get_db() as session:
             session: AsyncSession
             async with session.begin():
@@ -267,6 +537,7 @@ class SQLiteDatabase(BaseDatabase):
                 )
 
     async def delete_conversations_by_user_id(self, user_id: str) -> None:
+        self._conversation_count_cache.clear()
         async with self.get_db() as session:
             session: AsyncSession
             async with session.begin():
@@ -407,6 +678,33 @@ class SQLiteDatabase(BaseDatabase):
                 session.add(new_history)
                 return new_history
 
+    async def insert_platform_message_histories(
+        self,
+        platform_id,
+        user_id,
+        contents,
+        sender_id=None,
+        sender_name=None,
+    ):
+        """Insert multiple platform message history records in one transaction."""
+        if not contents:
+            return
+        async with self.get_db() as session:
+            session: AsyncSession
+            async with session.begin():
+                session.add_all(
+                    [
+                        PlatformMessageHistory(
+                            platform_id=platform_id,
+                            user_id=user_id,
+                            content=content,
+                            sender_id=sender_id,
+                            sender_name=sender_name,
+                        )
+                        for content in contents
+                    ],
+                )
+
     async def delete_platform_message_offset(
         self,
         platform_id,
@@ -433,22 +731,185 @@ class SQLiteDatabase(BaseDatabase):
         user_id,
         page=1,
         page_size=20,
+        cursor=None,
     ):
-        """Get platform message history records."""
+        """Get platform message history records, newest first.
+
+        With a cursor (see `get_platform_message_history_page`), records older
+        than the cursor are returned instead of using the page offset.
+        """
         async with self.get_db() as session:
             session: AsyncSession
-            offset = (page - 1) * page_size
             query = (
                 select(PlatformMessageHistory)
                 .where(
                     PlatformMessageHistory.platform_id == platform_id,
                     PlatformMessageHistory.user_id == user_id,
                 )
-                .order_by(desc(PlatformMessageHistory.created_at))
+                .order_by(
+                    desc(PlatformMessageHistory.created_at),
+                    desc(PlatformMessageHistory.id),
+                )
             )
-            result = await session.execute(query.offset(offset).limit(page_size))
+            if cursor:
+                created_at, history_id = decode_cursor(cursor)
+                query = query.where(
+                    tuple_(
+                        col(PlatformMessageHistory.created_at),
+                        col(PlatformMessageHistory.id),
+                    )
+                    < tuple_(literal(created_at), literal(history_id)),
+                )
+            else:
+                query = query.offset((page - 1) * page_size)
+            result = await session.execute(query.limit(page_size))
             return result.scalars().all()
 
+    async def get_platform_message_history_page(
+        self,
+        platform_id,
+        user_id,
+        page_size=20,
+        cursor=None,
+    ):
+        """Get one keyset page of platform message history, newest first."""
+        history = await self.get_platform_message_history(
+            platform_id,
+            user_id,
+            page_size=page_size + 1,
+            cursor=cursor,
+        )
+        next_cursor = None
+        if len(history) > page_size:
+            history = history[:page_size]
+            next_cursor = encode_cursor(history[-1].created_at, history[-1].id)
+        return history, next_cursor
+
+    # ====
+    # Group Message Archive
+    # ====
+
+    async def insert_group_messages(self, rows: list[dict]) -> None:
+        if not rows:
+            return
+        async with self.get_db() as session:
+            session: AsyncSession
+            async with session.begin():
+                await session.execute(
+                    GroupMessage.__table__.insert().prefix_with("OR IGNORE"),  # type: ignore
+                    rows,
+                )
+
+    async def get_group_messages(
+        self,
+        group_id,
+        platform_id=None,
+        start_time=None,
+        end_time=None,
+        user_id=None,
+        after=None,
+        limit=500,
+        newest_first=False,
+    ):
+        async with self.get_db() as session:
+            session: AsyncSession
+            query = select(GroupMessage).where(GroupMessage.group_id == group_id)
+            if platform_id:
+                query = query.where(GroupMessage.platform_id == platform_id)
+            if user_id:
+                query = query.where(GroupMessage.user_id == user_id)
+            if start_time is not None:
+                query = query.where(GroupMessage.time >= start_time)
+            if end_time is not None:
+                query = query.where(GroupMessage.time <= end_time)
+            key = tuple_(col(GroupMessage.time), col(GroupMessage.id))
+            if after is not None:
+                bound = tuple_(literal(after[0]), literal(after[1]))
+                query = query.where(key < bound if newest_first else key > bound)
+            if newest_first:
+                query = query.order_by(desc(GroupMessage.time), desc(GroupMessage.id))
+            else:
+                query = query.order_by(GroupMessage.time, GroupMessage.id)
+            result = await session.execute(query.limit(limit))
+            return list(result.scalars().all())
+
+    async def get_latest_group_message_time(self, platform_id, group_id, before=None):
+        async with self.get_db() as session:
+            session: AsyncSession
+            query = select(func.max(GroupMessage.time)).where(
+                GroupMessage.group_id == group_id,
+                GroupMessage.platform_id == platform_id,
+            )
+            if before is not None:
+                query = query.where(GroupMessage.time < before)
+            result = await session.execute(query)
+            return result.scalar_one_or_none()
+
+    async def delete_group_messages_before(self, timestamp):
+        async with self.get_db() as session:
+            session: AsyncSession
+            async with session.begin():
+                await session.execute(
+                    delete(GroupMessage).where(col(GroupMessage.time) < timestamp),
+                )
+
+    async def insert_reminders(self, rows):
+        if not rows:
+            return
+        async with self.get_db() as session:
+            session: AsyncSession
+            async with session.begin():
+                session.add_all([Reminder(**row) for row in rows])
+
+    async def get_reminders(self, umo):
+        async with self.get_db() as session:
+            session: AsyncSession
+            query = (
+                select(Reminder)
+                .where(
+                    Reminder.umo == umo,
+                    col(Reminder.next_run_at).is_not(None),
+                )
+                .order_by(col(Reminder.id))
+            )
+            result = await session.execute(query)
+            return list(result.scalars().all())
+
+    async def get_due_reminders(self, before, limit=1000):
+        async with self.get_db() as session:
+            session: AsyncSession
+            query = (
+                select(Reminder)
+                .where(col(Reminder.next_run_at) < before)
+                .order_by(col(Reminder.next_run_at))
+                .limit(limit)
+            )
+            result = await session.execute(query)
+            return list(result.scalars().all())
+
+    async def update_reminder_next_run(self, reminder_id, next_run_at):
+        async with self.get_db() as session:
+            session: AsyncSession
+            async with session.begin():
+                result = await session.execute(
+                    update(Reminder)
+                    .where(col(Reminder.reminder_id) == reminder_id)
+                    .values(next_run_at=next_run_at),
+                )
+                return result.rowcount > 0
+
+    async def delete_reminders(self, reminder_ids):
+        if not reminder_ids:
+            return
+        async with self.get_db() as session:
+            session: AsyncSession
+            async with session.begin():
+                await session.execute(
+                    delete(Reminder).where(
+                        col(Reminder.reminder_id).in_(reminder_ids),
+                    ),
+                )
+
     async def insert_attachment(self, path, type, mime_type):
         """Insert a new attachment record."""
         async with self.get_db() as session:
@@ -615,6 +1076,66 @@ class SQLiteDatabase(BaseDatabase):
                 )
             await session.commit()
 
+    async def apply_preference_changes(
+        self,
+        scope,
+        scope_id,
+        puts=None,
+        removes=(),
+        increments=None,
+    ):
+        puts = puts or {}
+        increments = increments or {}
+        removes = [k for k in removes if k not in puts and k not in increments]
+        counters: dict[str, int | float] = {}
+        async with self.get_db() as session:
+            session: AsyncSession
+            async with session.begin():
+                if removes:
+                    await session.execute(
+                        delete(Preference).where(
+                            col(Preference.scope) == scope,
+                            col(Preference.scope_id) == scope_id,
+                            col(Preference.key).in_(removes),
+                        ),
+                    )
+                keys = set(puts) | set(increments)
+                if not keys:
+                    return counters
+                result = await session.execute(
+                    select(Preference).where(
+                        col(Preference.scope) == scope,
+                        col(Preference.scope_id) == scope_id,
+                        col(Preference.key).in_(keys),
+                    ),
+                )
+                existing = {p.key: p for p in result.scalars().all()}
+                for key in keys:
+                    value = puts.get(key)
+                    if key in increments:
+                        base = (
+                            value
+                            if value is not None
+                            else (existing[key].value if key in existing else None)
+                        )
+                        current = (base or {}).get("val")
+                        if not isinstance(current, (int, float)):
+                            current = 0
+                        counters[key] = current + increments[key]
+                        value = {"val": counters[key]}
+                    if key in existing:
+                        existing[key].value = value
+                    else:
+                        session.add(
+                            Preference(
+                                scope=scope,
+                                scope_id=scope_id,
+                                key=key,
+                                value=value,
+                            ),
+                        )
+        return counters
+
     # ====
     # Deprecated Methods
     # ====
@@ -1,19 +1,27 @@
-try:
-    import faiss
-except ModuleNotFoundError:
-    raise ImportError(
-        "faiss 未安装。请使用 'pip install faiss-cpu' 或 'pip install faiss-gpu' 安装。",
-    )
 import os
+from functools import cache
 
 import numpy as np
 
 
+@cache
+def _faiss():
+    """首次使用时再导入 faiss, 避免拖慢启动"""
+    try:
+        import faiss
+    except ModuleNotFoundError:
+        raise ImportError(
+            "faiss 未安装。请使用 'pip install faiss-cpu' 或 'pip install faiss-gpu' 安装。",
+        )
+    return faiss
+
+
 class EmbeddingStorage:
     def __init__(self, dimension: int, path: str | None = None):
         self.dimension = dimension
         self.path = path
         self.index = None
+        faiss = _faiss()
         if path and os.path.exists(path):
             self.index = faiss.read_index(path)
         else:
@@ -67,7 +75,7 @@ class EmbeddingStorage:
 
         """
         assert self.index is not None, "FAISS index is not initialized."
-        faiss.normalize_L2(vector)
+        _faiss().normalize_L2(vector)
         distances, indices = self.index.search(vector, k)
         return distances, indices
 
@@ -90,4 +98,4 @@ class EmbeddingStorage:
             path (str): 保存索引的路径
 
         """
-        faiss.write_index(self.index, self.path)
+        _faiss().write_index(self.index, self.path)
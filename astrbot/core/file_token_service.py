@@ -1,32 +1,73 @@
-import asyncio
+import heapq
+import logging
 import os
 import platform
 import time
 import uuid
 from urllib.parse import unquote, urlparse
 
+logger = logging.getLogger("astrbot")
 
-class FileTokenService:
-    """维护一个简单的基于令牌的文件下载服务，支持超时和懒清除。"""
 
-    def __init__(self, default_timeout: float = 300):
-        self.lock = asyncio.Lock()
-        self.staged_files = {}  # token: (file_path, expire_time)
+class FileTokenService:
+    """维护一个简单的基于令牌的文件下载服务，支持超时和懒清除。
+
+    过期时间保存在最小堆中，每次注册或查询时只清理已到期的令牌。
+    所有操作都在事件循环中同步完成，不需要加锁。
+    """
+
+    def __init__(
+        self,
+        default_timeout: float = 300,
+        max_tokens: int = 10000,
+        max_range_requests: int = 32,
+        range_window: float = 60,
+    ):
+        self.staged_files: dict[str, tuple[str, float]] = {}
+        """token: (file_path, expire_time)"""
         self.default_timeout = default_timeout
-
-    async def _cleanup_expired_tokens(self):
-        """清理过期的令牌"""
+        self.max_tokens = max_tokens
+        self.max_range_requests = max_range_requests
+        """单个令牌最多允许的分段(Range)请求次数"""
+        self.range_window = range_window
+        """首次分段请求后，令牌最多再保留的时间(秒)"""
+        self._range_uses: dict[str, int] = {}
+        self._expiry_heap: list[tuple[float, str]] = []
+        self.evicted = 0
+        """因超出令牌数量上限被提前移除的令牌数"""
+
+    def _cleanup_expired_tokens(self):
+        """清理已到期的令牌"""
         now = time.time()
-        expired_tokens = [
-            token for token, (_, expire) in self.staged_files.items() if expire < now
-        ]
-        for token in expired_tokens:
-            self.staged_files.pop(token, None)
+        heap = self._expiry_heap
+        while heap and heap[0][0] < now:
+            _, token = heapq.heappop(heap)
+            self._remove(token)
+
+    def _remove(self, token: str) -> bool:
+        self._range_uses.pop(token, None)
+        return self.staged_files.pop(token, None) is not None
+
+    def _enforce_cap(self):
+        """令牌数量达到上限时，移除最早过期的令牌"""
+        heap = self._expiry_heap
+        while len(self.staged_files) >= self.max_tokens and heap:
+            _, token = heapq.heappop(heap)
+            if self._remove(token):
+                self.evicted += 1
+                if self.evicted == 1 or self.evicted % 1000 == 0:
+                    logger.warning(
+                        f"文件令牌数量达到上限 {self.max_tokens}，已提前移除 {self.evicted} 个令牌。",
+                    )
+
+    def _lookup(self, file_token: str) -> str | None:
+        entry = self.staged_files.get(file_token)
+        if entry is None or entry[1] < time.time():
+            return None
+        return entry[0]
 
     async def check_token_expired(self, file_token: str) -> bool:
-        async with self.lock:
-            await self._cleanup_expired_tokens()
-            return file_token not in self.staged_files
+        return self._lookup(file_token) is None
 
     async def register_file(self, file_path: str, timeout: float | None = None) -> str:
         """向令牌服务注册一个文件。
@@ -56,27 +97,32 @@ class FileTokenService:
             # 解析失败时，按原路径处理
             local_path = file_path
 
-        async with self.lock:
-            await self._cleanup_expired_tokens()
+        if not os.path.exists(local_path):
+            raise FileNotFoundError(
+                f"文件不存在: {local_path} (原始输入: {file_path})",
+            )
 
-            if not os.path.exists(local_path):
-                raise FileNotFoundError(
-                    f"文件不存在: {local_path} (原始输入: {file_path})",
-                )
+        self._cleanup_expired_tokens()
+        self._enforce_cap()
 
-            file_token = str(uuid.uuid4())
-            expire_time = time.time() + (
-                timeout if timeout is not None else self.default_timeout
-            )
-            # 存储转换后的真实路径
-            self.staged_files[file_token] = (local_path, expire_time)
-            return file_token
+        file_token = str(uuid.uuid4())
+        expire_time = time.time() + (
+            timeout if timeout is not None else self.default_timeout
+        )
+        # 存储转换后的真实路径
+        self.staged_files[file_token] = (local_path, expire_time)
+        heapq.heappush(self._expiry_heap, (expire_time, file_token))
+        return file_token
 
-    async def handle_file(self, file_token: str) -> str:
+    async def handle_file(self, file_token: str, ranged: bool = False) -> str:
         """根据令牌获取文件路径，使用后令牌失效。
 
+        分段(Range)下载时客户端会多次请求同一令牌，因此分段请求不会立即使令牌失效，
+        但次数不超过 max_range_requests，且首次分段请求后令牌最多再保留 range_window 秒。
+
         Args:
             file_token(str): 注册时返回的令牌
+            ranged(bool): 是否为分段请求
 
         Returns:
             str: 文件路径
@@ -86,13 +132,24 @@ class FileTokenService:
             FileNotFoundError: 当文件本身已被删除时抛出
 
         """
-        async with self.lock:
-            await self._cleanup_expired_tokens()
-
-            if file_token not in self.staged_files:
-                raise KeyError(f"无效或过期的文件 token: {file_token}")
-
-            file_path, _ = self.staged_files.pop(file_token)
-            if not os.path.exists(file_path):
-                raise FileNotFoundError(f"文件不存在: {file_path}")
-            return file_path
+        self._cleanup_expired_tokens()
+        file_path = self._lookup(file_token)
+        if file_path is None:
+            raise KeyError(f"无效或过期的文件 token: {file_token}")
+        # 过期堆中的条目会在到期时被惰性移除
+        if not ranged:
+            self._remove(file_token)
+        else:
+            uses = self._range_uses.get(file_token, 0) + 1
+            if uses >= self.max_range_requests:
+                self._remove(file_token)
+            else:
+                self._range_uses[file_token] = uses
+                expire_time = self.staged_files[file_token][1]
+                window_end = time.time() + self.range_window
+                if window_end < expire_time:
+                    self.staged_files[file_token] = (file_path, window_end)
+                    heapq.heappush(self._expiry_heap, (window_end, file_token))
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"文件不存在: {file_path}")
+        return file_path
@@ -0,0 +1,338 @@
+"""群消息归档。
+
+分析类插件过去每次运行都要通过 get_group_msg_history 反复向前翻页下载同样的消息。
+这里把群消息追加写入本地数据库：
+
+- 平台适配器收到的群消息先进入内存缓冲区，由后台任务批量写入。
+- 机器人自己发出的群消息在发送成功后(或协议端上报 message_sent 事件时)同样写入归档。
+- 查询时如果本地记录存在缺口(例如 AstrBot 停机期间)，会先通过 get_group_msg_history 补齐。
+- 按 (group_id, time) 和 (group_id, user_id) 建立索引，插件以流的方式按批读取。
+
+返回的消息保持 OneBot v11 群消息事件的格式(message_id、time、group_id、user_id、sender、message)，
+原来解析 get_group_msg_history 结果的代码可以直接复用。
+"""
+
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from contextlib import aclosing
+from typing import Any
+
+from astrbot.core import db_helper, logger
+from astrbot.core.db.po import GroupMessage
+
+
+class GroupMessageArchive:
+    def __init__(
+        self,
+        retention_days: int = 30,
+        flush_interval: float = 2.0,
+        max_buffer: int = 5000,
+        backfill_max_messages: int = 5000,
+    ) -> None:
+        """
+        Args:
+            retention_days: 消息保留天数，小于等于 0 时不归档
+            flush_interval: 写入数据库的间隔(秒)
+            max_buffer: 缓冲区上限，超出时丢弃新消息
+            backfill_max_messages: 单次补齐最多获取的消息数，查询的 limit 更大时以 limit 为准
+
+        """
+        self.retention_days = retention_days
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.backfill_max_messages = backfill_max_messages
+        self._buffer: list[dict] = []
+        self._flush_lock = asyncio.Lock()
+        self._backfill_locks: dict[tuple[str, str], asyncio.Lock] = {}
+        self._live_since: dict[tuple[str, str], int] = {}
+        """(platform_id, group_id) -> 本次运行收到的第一条消息的时间"""
+        self._covered_since: dict[tuple[str, str], int] = {}
+        """(platform_id, group_id) -> 本次运行中已确认本地记录完整的起始时间"""
+        self._self_ids: dict[str, str] = {}
+        """platform_id -> 机器人自身的 QQ 号，从收到的事件中获取"""
+        self.dropped = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.retention_days > 0
+
+    def configure(
+        self,
+        retention_days: int | None = None,
+        backfill_max_messages: int | None = None,
+    ):
+        if retention_days is not None:
+            self.retention_days = retention_days
+        if backfill_max_messages is not None and backfill_max_messages > 0:
+            self.backfill_max_messages = backfill_max_messages
+
+    @staticmethod
+    def _to_row(platform_id: str, event: dict) -> dict | None:
+        group_id = event.get("group_id")
+        message_id = event.get("message_id")
+        if not group_id or message_id is None:
+            return None
+        sender = event.get("sender") or {}
+        return {
+            "platform_id": platform_id,
+            "group_id": str(group_id),
+            "message_id": str(message_id),
+            "user_id": str(event.get("user_id") or sender.get("user_id", "")),
+            "time": int(event.get("time") or time.time()),
+            "sender": dict(sender),
+            "message": list(event.get("message") or []),
+        }
+
+    @staticmethod
+    def _to_onebot(row: GroupMessage) -> dict:
+        return {
+            "post_type": "message",
+            "message_type": "group",
+            "message_id": int(row.message_id)
+            if row.message_id.lstrip("-").isdigit()
+            else row.message_id,
+            "time": row.time,
+            "group_id": int(row.group_id) if row.group_id.isdigit() else row.group_id,
+            "user_id": int(row.user_id) if row.user_id.isdigit() else row.user_id,
+            "sender": row.sender,
+            "message": row.message,
+        }
+
+    def record(self, platform_id: str, event: dict):
+        """记录一条群消息事件(OneBot v11，包括 message_sent)，不会阻塞"""
+        if event.get("self_id"):
+            self._self_ids[platform_id] = str(event["self_id"])
+        if not self.enabled:
+            return
+        if event.get("post_type") not in ("message", "message_sent"):
+            return
+        if event.get("message_type") != "group":
+            return
+        row = self._to_row(platform_id, event)
+        if row is None:
+            return
+        key = (platform_id, row["group_id"])
+        self._live_since.setdefault(key, row["time"])
+        if len(self._buffer) >= self.max_buffer:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logger.warning(f"群消息归档缓冲区已满，已丢弃 {self.dropped} 条消息。")
+            return
+        self._buffer.append(row)
+
+    def record_sent(
+        self,
+        platform_id: str,
+        group_id: str | int,
+        message_id: str | int,
+        message: list[dict],
+    ):
+        """记录机器人发出的一条群消息。协议端同时上报 message_sent 时按 message_id 去重。"""
+        self_id = self._self_ids.get(platform_id)
+        if not self_id:
+            # 尚未收到过该平台的任何事件，无法确定发送者
+            return
+        self.record(
+            platform_id,
+            {
+                "post_type": "message_sent",
+                "message_type": "group",
+                "group_id": group_id,
+                "message_id": message_id,
+                "user_id": self_id,
+                "time": int(time.time()),
+                "sender": {"user_id": self_id},
+                "message": message,
+            },
+        )
+
+    def is_covered(self, platform_id: str, group_id: str | int, since: int) -> bool:
+        """本次运行中是否已确认 since 之后的本地记录完整"""
+        if not self.enabled or since < time.time() - self.retention_days * 86400:
+            return False
+        key = (platform_id, str(group_id))
+        live_since = self._live_since.get(key)
+        if live_since is not None and live_since <= since:
+            return True
+        return self._covered_since.get(key, time.time() + 1) <= since
+
+    async def flush(self):
+        async with self._flush_lock:
+            if not self._buffer:
+                return
+            rows, self._buffer = self._buffer, []
+            try:
+                await db_helper.insert_group_messages(rows)
+            except Exception as e:
+                logger.error(f"写入群消息归档失败: {e}")
+
+    async def backfill(
+        self,
+        bot: Any,
+        platform_id: str,
+        group_id: str | int,
+        since: int,
+        per_page: int = 100,
+        max_messages: int | None = None,
+    ) -> int:
+        """通过 get_group_msg_history 补齐 since 之后本地缺失的消息，返回获取的消息数。
+
+        只补齐最近一次缺口：从最新的消息向前翻页，直到与本地已有的记录衔接或早于 since。
+        最多获取 max_messages 条(默认为 backfill_max_messages)。
+        """
+        if max_messages is None:
+            max_messages = self.backfill_max_messages
+        group_id = str(group_id)
+        key = (platform_id, group_id)
+        lock = self._backfill_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            if self._covered_since.get(key, time.time() + 1) <= since:
+                return 0
+            live_since = self._live_since.get(key)
+            if live_since is not None and live_since <= since:
+                # 本次运行期间的消息都已实时记录
+                self._covered_since[key] = since
+                return 0
+            latest = await db_helper.get_latest_group_message_time(
+                platform_id,
+                group_id,
+                before=live_since,
+            )
+            stop_time = max(since, latest or 0)
+
+            fetched = 0
+            message_seq = 0
+            oldest = int(time.time())
+            while True:
+                if fetched >= max_messages:
+                    logger.warning(
+                        f"群 {group_id} 的消息记录补齐达到上限 {max_messages} 条，{oldest} 之前的消息可能不完整。",
+                    )
+                    break
+                result = await bot.call_action(
+                    "get_group_msg_history",
+                    group_id=int(group_id),
+                    message_seq=message_seq,
+                    count=per_page,
+                    reverseOrder=True,
+                )
+                messages = (result or {}).get("messages") or []
+                if not messages:
+                    oldest = stop_time
+                    break
+                rows = [
+                    row
+                    for m in messages
+                    if (row := self._to_row(platform_id, {"group_id": group_id, **m}))
+                ]
+                await db_helper.insert_group_messages(rows)
+                fetched += len(rows)
+                oldest = min(r["time"] for r in rows) if rows else stop_time
+                next_seq = messages[0].get("message_id")
+                if oldest <= stop_time or next_seq in (None, message_seq):
+                    break
+                message_seq = next_seq
+
+            self._covered_since[key] = max(since, oldest)
+            if fetched:
+                logger.debug(f"群 {group_id} 补齐了 {fetched} 条历史消息")
+            return fetched
+
+    async def stream(
+        self,
+        group_id: str | int,
+        since: int | None = None,
+        until: int | None = None,
+        user_id: str | int | None = None,
+        platform_id: str | None = None,
+        bot: Any = None,
+        batch_size: int = 500,
+        newest_first: bool = False,
+        backfill_max: int | None = None,
+    ) -> AsyncIterator[dict]:
+        """按时间顺序逐条读取归档的群消息。
+
+        Args:
+            group_id: 群号
+            since: 起始时间(Unix 时间戳)
+            until: 结束时间(Unix 时间戳)
+            user_id: 只读取某个成员的消息
+            platform_id: 平台 ID，同时传入 bot 时会先补齐缺失的消息
+            bot: OneBot 客户端(如 event.bot)，用于补齐缺失的消息
+            batch_size: 每次从数据库读取的条数
+            newest_first: 是否从新到旧读取
+            backfill_max: 补齐时最多获取的消息数
+
+        """
+        if not self.enabled:
+            return
+        group_id = str(group_id)
+        if bot is not None and platform_id and since is not None:
+            try:
+                await self.backfill(
+                    bot,
+                    platform_id,
+                    group_id,
+                    since,
+                    max_messages=backfill_max,
+                )
+            except Exception as e:
+                logger.warning(f"群 {group_id} 补齐历史消息失败: {e}")
+        await self.flush()
+
+        after = None
+        while True:
+            rows = await db_helper.get_group_messages(
+                group_id,
+                platform_id=platform_id,
+                start_time=since,
+                end_time=until,
+                user_id=str(user_id) if user_id is not None else None,
+                after=after,
+                limit=batch_size,
+                newest_first=newest_first,
+            )
+            for row in rows:
+                yield self._to_onebot(row)
+            if len(rows) < batch_size:
+                return
+            after = (rows[-1].time, rows[-1].id)
+
+    async def query(
+        self,
+        group_id: str | int,
+        limit: int = 1000,
+        **kwargs,
+    ) -> list[dict]:
+        """读取最多 limit 条消息，参数同 stream"""
+        kwargs.setdefault("backfill_max", max(limit, self.backfill_max_messages))
+        messages = []
+        async with aclosing(self.stream(group_id, **kwargs)) as stream:
+            async for msg in stream:
+                messages.append(msg)
+                if len(messages) >= limit:
+                    break
+        return messages
+
+    async def run(self):
+        """后台写入循环，每小时清理一次过期消息"""
+        last_purge = 0.0
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+            now = time.time()
+            if self.enabled and now - last_purge >= 3600:
+                last_purge = now
+                try:
+                    await db_helper.delete_group_messages_before(
+                        int(now - self.retention_days * 86400),
+                    )
+                except Exception as e:
+                    logger.error(f"清理过期群消息归档失败: {e}")
+
+    async def shutdown(self):
+        await self.flush()
+
+
+group_message_archive = GroupMessageArchive()
@@ -0,0 +1,287 @@
+"""群成员名单缓存。
+
+OneBot 的 get_group_member_list 在大群中是一个几百 KB 的响应，插件每次调用都重新获取会给协议端带来很大压力。
+这里按群维护一张成员表：
+
+- 首次使用或超过 TTL 时全量同步，同一个群的并发同步请求只会发出一次。
+- 平台适配器收到入群、退群、群名片、管理员变动通知以及群消息时增量更新。
+- 按 user_id 和群名片/昵称建立索引。
+
+成员信息保持 OneBot 的原始字段(user_id、nickname、card、role、level、join_time、last_sent_time 等)，
+返回的是缓存中的字典，调用方不应修改。
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any
+
+
+class GroupRoster:
+    """单个群的成员表"""
+
+    def __init__(self, group_id: str) -> None:
+        self.group_id = group_id
+        self.members: dict[str, dict] = {}
+        """user_id -> 成员信息"""
+        self.fetched_at: dict[str, float] = {}
+        """user_id -> 单个成员信息的获取时间"""
+        self.stale: set[str] = set()
+        """只有部分字段(如刚入群)，需要重新获取的成员"""
+        self.name_index: dict[str, set[str]] = {}
+        """群名片/昵称 -> user_id"""
+        self.synced_at = 0.0
+        """上次全量同步的时间，0 表示只缓存了部分成员"""
+
+    def _index(self, user_id: str, member: dict):
+        for name in {member.get("card"), member.get("nickname")}:
+            if name:
+                self.name_index.setdefault(name, set()).add(user_id)
+
+    def _unindex(self, user_id: str, member: dict):
+        for name in {member.get("card"), member.get("nickname")}:
+            if not name:
+                continue
+            ids = self.name_index.get(name)
+            if ids is not None:
+                ids.discard(user_id)
+                if not ids:
+                    del self.name_index[name]
+
+    def put(self, member: dict, stale: bool = False):
+        user_id = str(member.get("user_id", ""))
+        if not user_id:
+            return
+        old = self.members.get(user_id)
+        if old is not None:
+            self._unindex(user_id, old)
+        self.members[user_id] = member
+        self.fetched_at[user_id] = time.time()
+        self._index(user_id, member)
+        if stale:
+            self.stale.add(user_id)
+        else:
+            self.stale.discard(user_id)
+
+    def update(self, user_id: str, **fields):
+        """更新已缓存成员的部分字段"""
+        member = self.members.get(user_id)
+        if member is None:
+            return
+        self._unindex(user_id, member)
+        member.update(fields)
+        self._index(user_id, member)
+
+    def remove(self, user_id: str):
+        member = self.members.pop(user_id, None)
+        self.fetched_at.pop(user_id, None)
+        self.stale.discard(user_id)
+        if member is not None:
+            self._unindex(user_id, member)
+
+    def replace_all(self, members: list[dict]):
+        self.members.clear()
+        self.fetched_at.clear()
+        self.stale.clear()
+        self.name_index.clear()
+        for member in members:
+            self.put(member)
+        self.synced_at = time.time()
+
+
+class GroupRosterCache:
+    def __init__(self, ttl: float = 6 * 3600, max_groups: int = 1000) -> None:
+        """
+        Args:
+            ttl: 全量同步和单个成员信息的有效期(秒)
+            max_groups: 最多缓存的群数量，超出时淘汰最久未使用的群
+
+        """
+        self.ttl = ttl
+        self.max_groups = max_groups
+        self._groups: OrderedDict[str, GroupRoster] = OrderedDict()
+        self._syncing: dict[str, asyncio.Future] = {}
+        self.stats = {"hits": 0, "misses": 0, "full_syncs": 0}
+
+    def _roster(self, group_id: str, create: bool = True) -> GroupRoster | None:
+        roster = self._groups.get(group_id)
+        if roster is not None:
+            self._groups.move_to_end(group_id)
+            return roster
+        if not create:
+            return None
+        roster = self._groups[group_id] = GroupRoster(group_id)
+        while len(self._groups) > self.max_groups:
+            self._groups.popitem(last=False)
+        return roster
+
+    def _is_synced(self, roster: GroupRoster) -> bool:
+        return roster.synced_at > 0 and time.time() - roster.synced_at < self.ttl
+
+    async def _sync(self, bot: Any, group_id: str) -> GroupRoster:
+        """全量同步一个群。并发调用共享同一次请求。"""
+        fut = self._syncing.get(group_id)
+        if fut is not None:
+            return await asyncio.shield(fut)
+        fut = asyncio.get_running_loop().create_future()
+        self._syncing[group_id] = fut
+        try:
+            members = await bot.call_action(
+                "get_group_member_list",
+                group_id=int(group_id),
+            )
+            roster = self._roster(group_id)
+            assert roster is not None
+            roster.replace_all(members or [])
+            self.stats["full_syncs"] += 1
+            fut.set_result(roster)
+            return roster
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        except BaseException as e:
+            fut.set_exception(e)
+            # 没有其他等待者时避免 "exception was never retrieved" 警告
+            fut.exception()
+            raise
+        finally:
+            self._syncing.pop(group_id, None)
+
+    async def get_member_list(
+        self,
+        bot: Any,
+        group_id: str | int,
+        refresh: bool = False,
+    ) -> list[dict]:
+        """获取群成员列表。
+
+        Args:
+            bot: OneBot 客户端(aiocqhttp 的 CQHttp 实例，如 event.bot)
+            group_id: 群号
+            refresh: 是否忽略缓存强制全量同步。依赖实时数据(如按最后发言时间清理群成员)时使用
+
+        """
+        group_id = str(group_id)
+        roster = self._roster(group_id, create=False)
+        if refresh or roster is None or not self._is_synced(roster):
+            self.stats["misses"] += 1
+            roster = await self._sync(bot, group_id)
+        else:
+            self.stats["hits"] += 1
+        return list(roster.members.values())
+
+    async def get_member(
+        self,
+        bot: Any,
+        group_id: str | int,
+        user_id: str | int,
+    ) -> dict | None:
+        """获取单个群成员的信息。未缓存时调用 get_group_member_info，而不是同步整个群。"""
+        group_id, user_id = str(group_id), str(user_id)
+        roster = self._roster(group_id)
+        assert roster is not None
+        member = roster.members.get(user_id)
+        if (
+            member is not None
+            and user_id not in roster.stale
+            and time.time() - roster.fetched_at.get(user_id, 0) < self.ttl
+        ):
+            self.stats["hits"] += 1
+            return member
+        self.stats["misses"] += 1
+        member = await bot.call_action(
+            "get_group_member_info",
+            group_id=int(group_id),
+            user_id=int(user_id),
+            no_cache=False,
+        )
+        if member:
+            roster.put(member)
+        return member
+
+    async def get_display_name(
+        self,
+        bot: Any,
+        group_id: str | int,
+        user_id: str | int,
+    ) -> str:
+        """群名片，没有时返回昵称"""
+        member = await self.get_member(bot, group_id, user_id) or {}
+        return member.get("card") or member.get("nickname") or ""
+
+    async def find_by_name(
+        self,
+        bot: Any,
+        group_id: str | int,
+        name: str,
+    ) -> list[dict]:
+        """按群名片或昵称精确查找成员"""
+        group_id = str(group_id)
+        roster = self._roster(group_id, create=False)
+        if roster is None or not self._is_synced(roster):
+            roster = await self._sync(bot, group_id)
+        return [roster.members[uid] for uid in roster.name_index.get(name, ())]
+
+    def invalidate(self, group_id: str | int | None = None):
+        """丢弃一个群(或全部群)的缓存"""
+        if group_id is None:
+            self._groups.clear()
+        else:
+            self._groups.pop(str(group_id), None)
+
+    def handle_onebot_event(self, event: dict):
+        """根据 OneBot v11 的通知和群消息增量更新成员表。只更新已缓存的群。"""
+        group_id = event.get("group_id")
+        if not group_id:
+            return
+        roster = self._roster(str(group_id), create=False)
+        if roster is None:
+            return
+        user_id = str(event.get("user_id", ""))
+        post_type = event.get("post_type")
+
+        if post_type == "message":
+            sender = event.get("sender") or {}
+            if user_id in roster.members:
+                fields = {
+                    k: sender[k] for k in ("card", "nickname", "role") if k in sender
+                }
+                fields["last_sent_time"] = event.get("time", int(time.time()))
+                roster.update(user_id, **fields)
+            return
+
+        if post_type != "notice":
+            return
+        notice_type = event.get("notice_type")
+        if notice_type == "group_increase":
+            roster.put(
+                {
+                    "group_id": int(group_id),
+                    "user_id": int(user_id),
+                    "nickname": "",
+                    "card": "",
+                    "role": "member",
+                    "join_time": event.get("time", int(time.time())),
+                },
+                stale=True,
+            )
+        elif notice_type == "group_decrease":
+            if user_id == str(event.get("self_id")):
+                self.invalidate(group_id)
+            else:
+                roster.remove(user_id)
+        elif notice_type == "group_card":
+            roster.update(user_id, card=event.get("card_new", ""))
+        elif notice_type == "group_admin":
+            role = "admin" if event.get("sub_type") == "set" else "member"
+            roster.update(user_id, role=role)
+
+    def usage(self) -> dict:
+        return {
+            "groups": len(self._groups),
+            "members": sum(len(r.members) for r in self._groups.values()),
+            **self.stats,
+        }
+
+
+group_roster = GroupRosterCache()
@@ -0,0 +1,250 @@
+"""插件后台任务执行器。
+
+定时分析这类任务通常要对很多群分别执行，并且每个任务都会调用 LLM、渲染图片或访问网络。
+一次性并发启动全部任务会同时触发供应商的速率限制，这里提供：
+
+- 按资源类别划分的并发上限(llm / render / network)，插件在调用对应资源时用 `limit()` 申请名额。
+- 批量任务：随机错开启动时间，单个任务超时与重试，整批任务的并发上限。
+- 批量任务的进度持久化：进程在执行中途退出时，重启后只执行剩余的任务。
+- 在子进程中执行 CPU 密集型函数。
+"""
+
+import asyncio
+import multiprocessing
+import random
+import sys
+import time
+import types
+from collections.abc import Awaitable, Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, TypeVar
+
+from astrbot.core import logger, sp
+
+T = TypeVar("T")
+
+DEFAULT_POOLS = {"llm": 4, "render": 2, "network": 8}
+"""各资源类别的默认并发上限"""
+
+STATE_KEY_PREFIX = "job_runner:"
+
+
+@contextmanager
+def _hide_main_module():
+    """spawn 启动的子进程会重新执行主进程的 __main__ 模块(main.py 或 CLI 入口)，
+    进而导入 astrbot.core，在每个子进程中升级配置、启动日志线程、创建数据库连接。
+    创建子进程期间换成空的 __main__ 模块，子进程只导入任务函数所在的模块。
+    """
+    main_module = sys.modules.get("__main__")
+    sys.modules["__main__"] = types.ModuleType("__main__")
+    try:
+        yield
+    finally:
+        if main_module is not None:
+            sys.modules["__main__"] = main_module
+
+
+class JobRunner:
+    def __init__(
+        self,
+        pools: dict[str, int] | None = None,
+        process_workers: int = 2,
+    ) -> None:
+        self._pool_sizes = dict(pools or DEFAULT_POOLS)
+        self._pools: dict[str, asyncio.Semaphore] = {}
+        self._process_workers = process_workers
+        self._executor: ProcessPoolExecutor | None = None
+
+    def configure_pool(self, name: str, size: int):
+        """设置资源类别的并发上限。只对之后申请的名额生效。"""
+        size = max(1, int(size))
+        self._pool_sizes[name] = size
+        self._pools[name] = asyncio.Semaphore(size)
+
+    def _pool(self, name: str) -> asyncio.Semaphore:
+        sem = self._pools.get(name)
+        if sem is None:
+            sem = self._pools[name] = asyncio.Semaphore(
+                self._pool_sizes.get(name, 4),
+            )
+        return sem
+
+    @asynccontextmanager
+    async def limit(self, pool: str):
+        """申请一个资源名额，例如:
+
+        ```py
+        async with job_runner.limit("llm"):
+            resp = await provider.text_chat(...)
+        ```
+        """
+        async with self._pool(pool):
+            yield
+
+    async def submit(
+        self,
+        func: Callable[[], Awaitable[T]],
+        *,
+        pool: str | None = None,
+        timeout: float | None = None,
+        retries: int = 0,
+        backoff: float = 5.0,
+        jitter: float = 0,
+        name: str = "",
+    ) -> T:
+        """执行一个任务。
+
+        Args:
+            func: 返回协程的函数，每次重试都会重新调用
+            pool: 执行期间占用的资源类别，为空时不占用
+            timeout: 单次执行的超时时间(秒)
+            retries: 失败后的重试次数
+            backoff: 重试等待时间(秒)，按重试次数线性增加
+            jitter: 启动前随机等待 0~jitter 秒，用于错开大量同时提交的任务
+            name: 任务名，用于日志
+
+        """
+        if jitter > 0:
+            await asyncio.sleep(random.uniform(0, jitter))
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                if pool:
+                    async with self._pool(pool):
+                        return await asyncio.wait_for(func(), timeout)
+                return await asyncio.wait_for(func(), timeout)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if attempt > retries:
+                    raise
+                reason = "超时" if isinstance(e, asyncio.TimeoutError) else str(e)
+                logger.warning(
+                    f"任务 {name} 第 {attempt} 次执行失败({reason})，{backoff * attempt:.0f} 秒后重试。",
+                )
+                await asyncio.sleep(backoff * attempt)
+
+    async def run_batch(
+        self,
+        items: Iterable[str],
+        func: Callable[[str], Awaitable[Any]],
+        *,
+        state_key: str | None = None,
+        run_id: str = "",
+        concurrency: int = 4,
+        pool: str | None = None,
+        timeout: float | None = None,
+        retries: int = 0,
+        backoff: float = 5.0,
+        jitter: float = 0,
+    ) -> dict[str, Any]:
+        """对每个条目执行一次任务，返回 {条目: 结果或异常}。
+
+        Args:
+            items: 条目列表(如群号)
+            func: 接受一个条目，返回协程
+            state_key: 持久化进度使用的键。进程在执行中途退出后，以相同的 state_key 和 run_id
+                再次调用时只会执行尚未完成的条目
+            run_id: 本批次的标识(如日期)，与保存的进度不一致时重新开始
+            concurrency: 同时执行的条目数
+            其余参数同 `submit`
+
+        """
+        items = list(dict.fromkeys(str(i) for i in items))
+        pending = set(items)
+        if state_key:
+            state = await sp.global_get(STATE_KEY_PREFIX + state_key, None) or {}
+            if state.get("run_id") == run_id and "pending" in state:
+                pending &= set(state["pending"])
+                skipped = len(items) - len(pending)
+                if skipped:
+                    logger.info(
+                        f"任务 {state_key} 继续执行上次未完成的批次，跳过 {skipped} 个已完成的条目。",
+                    )
+            await self._save_state(state_key, run_id, pending)
+
+        sem = asyncio.Semaphore(max(1, concurrency))
+        results: dict[str, Any] = {}
+
+        async def run_one(item: str):
+            async with sem:
+                try:
+                    results[item] = await self.submit(
+                        lambda: func(item),
+                        pool=pool,
+                        timeout=timeout,
+                        retries=retries,
+                        backoff=backoff,
+                        jitter=jitter,
+                        name=f"{state_key or 'batch'}:{item}",
+                    )
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    results[item] = e
+            # 失败的条目也视为已处理，重启后不再重复执行
+            pending.discard(item)
+            if state_key:
+                await self._save_state(state_key, run_id, pending)
+
+        await asyncio.gather(*(run_one(i) for i in items if i in pending))
+        if state_key:
+            await sp.global_put(
+                STATE_KEY_PREFIX + state_key,
+                {"run_id": run_id, "finished_at": int(time.time())},
+            )
+        return results
+
+    @staticmethod
+    async def _save_state(state_key: str, run_id: str, pending: set[str]):
+        await sp.global_put(
+            STATE_KEY_PREFIX + state_key,
+            {"run_id": run_id, "pending": sorted(pending)},
+        )
+
+    async def get_state(self, state_key: str) -> dict:
+        """批次的进度。完成后为 {"run_id", "finished_at"}，执行中为 {"run_id", "pending"}"""
+        return await sp.global_get(STATE_KEY_PREFIX + state_key, None) or {}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # fork 会复制事件循环和日志线程的锁，使用 spawn 启动干净的子进程
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._process_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def run_in_process(
+        self,
+        func: Callable[..., T],
+        *args,
+        pool: str = "render",
+        timeout: float | None = None,
+    ) -> T:
+        """在子进程中执行 CPU 密集型函数(如绘图、生成 PDF)。
+
+        func 和参数必须可以被 pickle。子进程不会导入 AstrBot，func 所在的模块也不应导入 astrbot。
+        """
+        async with self._pool(pool):
+            loop = asyncio.get_running_loop()
+            try:
+                # 进程池在 submit 时按需创建子进程
+                with _hide_main_module():
+                    fut = loop.run_in_executor(self._get_executor(), func, *args)
+                return await asyncio.wait_for(fut, timeout)
+            except BrokenProcessPool:
+                # 子进程异常退出后进程池不可再用，下次调用时重建
+                self._executor = None
+                raise
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+job_runner = JobRunner()
@@ -130,9 +130,20 @@ class KBHelper:
         self.kb_medias_dir.mkdir(parents=True, exist_ok=True)
         self.kb_files_dir.mkdir(parents=True, exist_ok=True)
 
+        self.vec_db = None  # type: ignore
+        self._init_lock = asyncio.Lock()
+
     async def initialize(self):
         await self._ensure_vec_db()
 
+    async def ensure_initialized(self):
+        """首次使用时加载向量索引"""
+        if self.vec_db is not None:
+            return
+        async with self._init_lock:
+            if self.vec_db is None:
+                await self._ensure_vec_db()
+
     async def get_ep(self) -> EmbeddingProvider:
         if not self.kb.embedding_provider_id:
             raise ValueError(f"知识库 {self.kb.kb_name} 未配置 Embedding Provider")
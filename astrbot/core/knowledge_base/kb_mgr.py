@@ -50,6 +50,8 @@ class KnowledgeBaseManager:
                 kb_db=self.kb_db,
             )
             await self.load_kbs()
+            if self.kb_insts:
+                sparse_retriever.warm_up()
 
         except ImportError as e:
             logger.error(f"知识库模块导入失败: {e}")
@@ -65,7 +67,7 @@ class KnowledgeBaseManager:
         logger.info(f"KnowledgeBase database initialized: {DB_PATH}")
 
     async def load_kbs(self):
-        """加载所有知识库实例"""
+        """加载所有知识库实例。向量索引在首次使用知识库时才加载(见 get_kb)。"""
         kb_records = await self.kb_db.list_kbs()
         for record in kb_records:
             kb_helper = KBHelper(
@@ -75,7 +77,6 @@ class KnowledgeBaseManager:
                 kb_root_dir=FILES_PATH,
                 chunker=CHUNKER,
             )
-            await kb_helper.initialize()
             self.kb_insts[record.kb_id] = kb_helper
 
     async def create_kb(
@@ -123,18 +124,22 @@ class KnowledgeBaseManager:
     async def get_kb(self, kb_id: str) -> KBHelper | None:
         """获取知识库实例"""
         if kb_id in self.kb_insts:
-            return self.kb_insts[kb_id]
+            kb_helper = self.kb_insts[kb_id]
+            await kb_helper.ensure_initialized()
+            return kb_helper
 
     async def get_kb_by_name(self, kb_name: str) -> KBHelper | None:
         """通过名称获取知识库实例"""
         for kb_helper in self.kb_insts.values():
             if kb_helper.kb.kb_name == kb_name:
+                await kb_helper.ensure_initialized()
                 return kb_helper
         return None
 
     async def delete_kb(self, kb_id: str) -> bool:
         """删除知识库实例"""
-        kb_helper = await self.get_kb(kb_id)
+        # 删除时不需要加载向量索引
+        kb_helper = self.kb_insts.get(kb_id)
         if not kb_helper:
             return False
 
@@ -3,11 +3,11 @@
 使用 BM25 算法进行基于关键词的文档检索
 """
 
+import asyncio
 import json
 import os
 from dataclasses import dataclass
 
-import jieba
 from rank_bm25 import BM25Okapi
 
 from astrbot.core.db.vec_db.faiss_impl import FaissVecDB
@@ -43,6 +43,7 @@ class SparseRetriever:
         """
         self.kb_db = kb_db
         self._index_cache = {}  # 缓存 BM25 索引
+        self._tokenizer_task: asyncio.Task | None = None
 
         with open(
             os.path.join(os.path.dirname(__file__), "hit_stopwords.txt"),
@@ -52,6 +53,34 @@ class SparseRetriever:
                 word.strip() for word in set(f.read().splitlines()) if word.strip()
             }
 
+    @staticmethod
+    def _load_tokenizer():
+        import jieba
+
+        jieba.initialize()
+        return jieba
+
+    def warm_up(self):
+        """在线程中预先加载分词词典，避免首次检索时阻塞事件循环"""
+        if self._tokenizer_task is None:
+            self._tokenizer_task = asyncio.create_task(
+                asyncio.to_thread(self._load_tokenizer),
+            )
+            # 加载失败时由首次检索抛出异常
+            self._tokenizer_task.add_done_callback(
+                lambda t: t.cancelled() or t.exception(),
+            )
+
+    async def _get_tokenizer(self):
+        self.warm_up()
+        return await asyncio.shield(self._tokenizer_task)
+
+    def _tokenize(self, jieba, texts: list[str]) -> list[list[str]]:
+        return [
+            [word for word in jieba.cut(text) if word not in self.hit_stopwords]
+            for text in texts
+        ]
+
     async def retrieve(
         self,
         query: str,
@@ -100,20 +129,18 @@ class SparseRetriever:
 
         # 2. 准备文档和索引
         corpus = [chunk["text"] for chunk in chunks]
-        tokenized_corpus = [list(jieba.cut(doc)) for doc in corpus]
-        tokenized_corpus = [
-            [word for word in doc if word not in self.hit_stopwords]
-            for doc in tokenized_corpus
-        ]
+        jieba = await self._get_tokenizer()
+        tokenized_corpus = await asyncio.to_thread(
+            self._tokenize,
+            jieba,
+            [*corpus, query],
+        )
+        tokenized_query = tokenized_corpus.pop()
 
         # 3. 构建 BM25 索引
         bm25 = BM25Okapi(tokenized_corpus)
 
         # 4. 执行检索
-        tokenized_query = list(jieba.cut(query))
-        tokenized_query = [
-            word for word in tokenized_query if word not in self.hit_stopwords
-        ]
         scores = bm25.get_scores(tokenized_query)
 
         # 5. 排序并返回 Top-K
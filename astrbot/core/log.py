@@ -2,11 +2,17 @@
 
 const:
     CACHED_SIZE: 日志缓存大小, 用于限制缓存的日志数量
+    RECORD_QUEUE_SIZE: 待处理日志记录队列的大小, 队列满时新日志会被丢弃并计数
+    DROP_WARNING_INTERVAL: 日志被丢弃时, 两次警告之间的最短间隔
     log_color_config: 日志颜色配置, 定义了不同日志级别的颜色
 
 class:
     LogBroker: 日志代理类, 用于缓存和分发日志消息
+    LogSubscriber: 日志订阅者, 有界缓冲区, 满时丢弃最旧的日志
     LogQueueHandler: 日志处理器, 用于将日志消息发送到 LogBroker
+    RecordQueueHandler: 调用方一侧的处理器, 只把日志记录放入队列
+    RecordQueueListener: 后台线程, 负责格式化并写入控制台、文件和 LogBroker
+    SamplingFilter: 日志采样过滤器, 对高频日志限速
     LogManager: 日志管理器, 用于创建和配置日志记录器
 
 function:
@@ -14,23 +20,34 @@ function:
     get_short_level_name: 将日志级别名称转换为四个字母的缩写
 
 工作流程:
-1. 通过 LogManager.GetLogger() 获取日志器, 配置了控制台输出和多个格式化过滤器
-2. 通过 set_queue_handler() 设置日志处理器, 将日志消息发送到 LogBroker
-3. logBroker 维护一个订阅者列表, 负责将日志分发给所有订阅者
-4. 订阅者可以使用 register() 方法注册到 LogBroker, 订阅日志流
+1. 通过 LogManager.GetLogger() 获取日志器. 日志器上只有一个 RecordQueueHandler,
+   调用方只把日志记录放入有界队列, 不做格式化和 I/O
+2. RecordQueueListener 在后台线程中补充插件标签等字段, 再交给控制台、文件等处理器
+3. 通过 set_queue_handler() 设置日志处理器, 将日志消息发送到 LogBroker
+4. 通过 set_file_handler() 设置按大小轮转的日志文件
+5. logBroker 维护一个订阅者列表, 负责将日志分发给所有订阅者
+6. 订阅者可以使用 register() 方法注册到 LogBroker, 订阅日志流
 """
 
 import asyncio
+import atexit
 import logging
 import os
+import queue
 import sys
-from asyncio import Queue
+import threading
+import time
 from collections import deque
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
 import colorlog
 
 # 日志缓存大小
 CACHED_SIZE = 200
+# 待处理日志记录队列大小
+RECORD_QUEUE_SIZE = 10000
+# 日志被丢弃时, 两次警告之间的最短间隔(秒)
+DROP_WARNING_INTERVAL = 60
 # 日志颜色配置
 log_color_config = {
     "DEBUG": "green",
@@ -80,56 +97,115 @@ def get_short_level_name(level_name):
     return level_map.get(level_name, level_name[:4].upper())
 
 
+class LogSubscriber:
+    """日志订阅者
+
+    有界缓冲区, 满时丢弃最旧的日志并计数. 日志由后台线程写入,
+    通过 call_soon_threadsafe 唤醒事件循环中的读取方.
+    """
+
+    def __init__(self, maxsize: int, loop: asyncio.AbstractEventLoop):
+        self.buffer: deque[dict] = deque(maxlen=maxsize)
+        self.dropped = 0
+        """因读取过慢被丢弃的日志数"""
+        self._loop = loop
+        self._event = asyncio.Event()
+        self._notified = False
+
+    def put(self, log_entry: dict):
+        """写入日志, 可在任意线程调用"""
+        if len(self.buffer) == self.buffer.maxlen:
+            self.dropped += 1
+        self.buffer.append(log_entry)
+        if not self._notified:
+            self._notified = True
+            try:
+                self._loop.call_soon_threadsafe(self._event.set)
+            except RuntimeError:
+                # 事件循环已关闭
+                pass
+
+    async def get(self) -> dict:
+        """获取下一条日志"""
+        while True:
+            try:
+                return self.buffer.popleft()
+            except IndexError:
+                pass
+            self._event.clear()
+            self._notified = False
+            # 重置通知标记后再检查一次, 避免与写入方竞争而错过唤醒
+            if self.buffer:
+                continue
+            await self._event.wait()
+
+
 class LogBroker:
     """日志代理类, 用于缓存和分发日志消息
 
-    发布-订阅模式
+    发布-订阅模式. publish() 在日志后台线程中调用, 是线程安全的.
     """
 
     def __init__(self):
         self.log_cache = deque(maxlen=CACHED_SIZE)  # 环形缓冲区, 保存最近的日志
-        self.subscribers: list[Queue] = []  # 订阅者列表
+        self.subscribers: list[LogSubscriber] = []  # 订阅者列表
+        self._lock = threading.Lock()
+        self._unregistered_dropped = 0
 
-    def register(self) -> Queue:
-        """注册新的订阅者, 并给每个订阅者返回一个带有日志缓存的队列
+    def register(self) -> LogSubscriber:
+        """注册新的订阅者, 需要在事件循环中调用
 
         Returns:
-            Queue: 订阅者的队列, 可用于接收日志消息
+            LogSubscriber: 订阅者, 可用于接收日志消息
 
         """
-        q = Queue(maxsize=CACHED_SIZE + 10)
-        self.subscribers.append(q)
+        q = LogSubscriber(CACHED_SIZE + 10, asyncio.get_running_loop())
+        with self._lock:
+            self.subscribers = [*self.subscribers, q]
         return q
 
-    def unregister(self, q: Queue):
+    def unregister(self, q: LogSubscriber):
         """取消订阅
 
         Args:
-            q (Queue): 需要取消订阅的队列
+            q (LogSubscriber): 需要取消订阅的订阅者
 
         """
-        self.subscribers.remove(q)
+        with self._lock:
+            if any(s is q for s in self.subscribers):
+                self._unregistered_dropped += q.dropped
+            self.subscribers = [s for s in self.subscribers if s is not q]
+
+    @property
+    def dropped(self) -> int:
+        """订阅者因读取过慢而丢弃的日志总数"""
+        with self._lock:
+            return self._unregistered_dropped + sum(q.dropped for q in self.subscribers)
+
+    def history(self) -> list[dict]:
+        """最近的日志"""
+        with self._lock:
+            return list(self.log_cache)
 
     def publish(self, log_entry: dict):
-        """发布新日志到所有订阅者, 使用非阻塞方式投递, 避免一个订阅者阻塞整个系统
+        """发布新日志到所有订阅者, 使用非阻塞方式投递, 读取过慢的订阅者会丢弃最旧的日志
 
         Args:
             log_entry (dict): 日志消息, 包含日志级别和日志内容.
                 example: {"level": "INFO", "data": "This is a log message.", "time": "2023-10-01 12:00:00"}
 
         """
-        self.log_cache.append(log_entry)
-        for q in self.subscribers:
-            try:
-                q.put_nowait(log_entry)
-            except asyncio.QueueFull:
-                pass
+        with self._lock:
+            self.log_cache.append(log_entry)
+            subscribers = self.subscribers
+        for q in subscribers:
+            q.put(log_entry)
 
 
 class LogQueueHandler(logging.Handler):
     """日志处理器, 用于将日志消息发送到 LogBroker
 
-    继承自 logging.Handler
+    继承自 logging.Handler, 在 RecordQueueListener 的后台线程中执行
     """
 
     def __init__(self, log_broker: LogBroker):
@@ -154,12 +230,145 @@ class LogQueueHandler(logging.Handler):
         )
 
 
+class RecordQueueHandler(QueueHandler):
+    """调用方一侧的日志处理器, 只把日志记录放入有界队列
+
+    队列已满时丢弃日志并计数, 调用方永远不会等待.
+    """
+
+    def __init__(self, record_queue: queue.Queue):
+        super().__init__(record_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # 只合并消息参数, 避免参数对象在后台线程格式化前被修改;
+        # 异常堆栈等的格式化交给后台线程
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class RecordQueueListener(QueueListener):
+    """在后台线程中处理日志记录, 负责补充字段、格式化和 I/O"""
+
+    def __init__(self, record_queue: queue.Queue, *handlers: logging.Handler):
+        super().__init__(record_queue, *handlers, respect_handler_level=True)
+        self.queue_handler: RecordQueueHandler | None = None
+        """写入该队列的处理器, 用于报告被丢弃的日志数"""
+        self._reported_dropped = 0
+        self._last_drop_warning = 0.0
+
+    def add_handler(self, handler: logging.Handler):
+        self.handlers = (*self.handlers, handler)
+
+    def prepare(self, record):
+        record.plugin_tag = "[Plug]" if is_plugin_path(record.pathname) else "[Core]"
+        # 文件名格式: <folder>.<file>, 去除 .py
+        dirname = os.path.dirname(record.pathname)
+        record.filename = (
+            os.path.basename(dirname)
+            + "."
+            + os.path.basename(record.pathname).replace(".py", "")
+        )
+        record.short_levelname = get_short_level_name(record.levelname)
+        return record
+
+    def handle(self, record):
+        super().handle(record)
+        self._report_dropped()
+
+    def _report_dropped(self):
+        """队列满时丢弃了日志, 则限速输出一条警告. 警告直接交给处理器, 不经过队列"""
+        if self.queue_handler is None:
+            return
+        dropped = self.queue_handler.dropped
+        if dropped == self._reported_dropped:
+            return
+        now = time.monotonic()
+        if now - self._last_drop_warning < DROP_WARNING_INTERVAL:
+            return
+        self._last_drop_warning = now
+        count = dropped - self._reported_dropped
+        self._reported_dropped = dropped
+        record = logging.LogRecord(
+            self.queue_handler.name or "astrbot",
+            logging.WARNING,
+            __file__,
+            0,
+            f"日志队列已满, 丢弃了 {count} 条日志 (累计 {dropped} 条)",
+            None,
+            None,
+        )
+        super().handle(record)
+
+    def enqueue_sentinel(self):
+        # 停止时等待队列中已有的日志处理完毕
+        self.queue.put(self._sentinel)
+
+    def stop(self):
+        if self._thread is not None:
+            super().stop()
+
+
+class SamplingFilter(logging.Filter):
+    """日志采样过滤器, 对带有 sample 字段的高频日志按令牌桶限速
+
+    用法: logger.info("...", extra={"sample": "event_dispatch"})
+    被省略的日志数量会附加在下一条通过的同类日志后.
+    """
+
+    def __init__(self, rate: float = 10.0, burst: int = 50):
+        """
+        Args:
+            rate: 每个采样键每秒允许通过的日志数
+            burst: 每个采样键允许的突发日志数
+
+        """
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self._buckets: dict[str, list[float]] = {}
+        """sample key -> [tokens, last refill time, suppressed count]"""
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        key = getattr(record, "sample", None)
+        if key is None:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(self.burst), now, 0]
+            tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if tokens < 1:
+                bucket[0] = tokens
+                bucket[2] += 1
+                return False
+            bucket[0] = tokens - 1
+            suppressed, bucket[2] = bucket[2], 0
+        if suppressed:
+            record.msg = f"{record.getMessage()} (已省略 {suppressed} 条同类日志)"
+            record.args = None
+        return True
+
+
 class LogManager:
     """日志管理器, 用于创建和配置日志记录器
 
     提供了获取默认日志记录器logger和设置队列处理器的方法
     """
 
+    _listeners: dict[str, RecordQueueListener] = {}
+    """logger name -> 后台日志线程"""
+
     @classmethod
     def GetLogger(cls, log_name: str = "default"):
         """获取指定名称的日志记录器logger
@@ -189,48 +398,37 @@ class LogManager:
             datefmt="%H:%M:%S",
             log_colors=log_color_config,
         )
-
-        class PluginFilter(logging.Filter):
-            """插件过滤器类, 用于标记日志来源是插件还是核心组件"""
-
-            def filter(self, record):
-                record.plugin_tag = (
-                    "[Plug]" if is_plugin_path(record.pathname) else "[Core]"
-                )
-                return True
-
-        class FileNameFilter(logging.Filter):
-            """文件名过滤器类, 用于修改日志记录的文件名格式
-            例如: 将文件路径 /path/to/file.py 转换为 file.<file> 格式
-            """
-
-            # 获取这个文件和父文件夹的名字：<folder>.<file> 并且去除 .py
-            def filter(self, record):
-                dirname = os.path.dirname(record.pathname)
-                record.filename = (
-                    os.path.basename(dirname)
-                    + "."
-                    + os.path.basename(record.pathname).replace(".py", "")
-                )
-                return True
-
-        class LevelNameFilter(logging.Filter):
-            """短日志级别名称过滤器类, 用于将日志级别名称转换为四个字母的缩写"""
-
-            # 添加短日志级别名称
-            def filter(self, record):
-                record.short_levelname = get_short_level_name(record.levelname)
-                return True
-
         console_handler.setFormatter(console_formatter)  # 设置处理器的格式化器
-        logger.addFilter(PluginFilter())  # 添加插件过滤器
-        logger.addFilter(FileNameFilter())  # 添加文件名过滤器
-        logger.addFilter(LevelNameFilter())  # 添加级别名称过滤器
+
+        # 控制台输出等处理器在后台线程中执行, logger 上只保留入队的处理器
+        record_queue = queue.Queue(maxsize=RECORD_QUEUE_SIZE)
+        listener = RecordQueueListener(record_queue, console_handler)
+        queue_handler = RecordQueueHandler(record_queue)
+        queue_handler.set_name(log_name)
+        listener.queue_handler = queue_handler
+        listener.start()
+        atexit.register(listener.stop)
+        cls._listeners[log_name] = listener
+
+        logger.addFilter(SamplingFilter())  # 高频日志限速
         logger.setLevel(logging.DEBUG)  # 设置日志级别为DEBUG
-        logger.addHandler(console_handler)  # 添加处理器到logger
+        logger.addHandler(queue_handler)
 
         return logger
 
+    @classmethod
+    def dropped_records(cls) -> int:
+        """各日志器因队列已满而丢弃的日志总数"""
+        return sum(
+            listener.queue_handler.dropped
+            for listener in cls._listeners.values()
+            if listener.queue_handler is not None
+        )
+
+    @classmethod
+    def _get_listener(cls, logger: logging.Logger) -> RecordQueueListener | None:
+        return cls._listeners.get(logger.name)
+
     @classmethod
     def set_queue_handler(cls, logger: logging.Logger, log_broker: LogBroker):
         """设置队列处理器, 用于将日志消息发送到 LogBroker
@@ -242,8 +440,9 @@ class LogManager:
         """
         handler = LogQueueHandler(log_broker)
         handler.setLevel(logging.DEBUG)
-        if logger.handlers:
-            handler.setFormatter(logger.handlers[0].formatter)
+        listener = cls._get_listener(logger)
+        if listener and listener.handlers:
+            handler.setFormatter(listener.handlers[0].formatter)
         else:
             # 为队列处理器设置相同格式的formatter
             handler.setFormatter(
@@ -251,4 +450,45 @@ class LogManager:
                     "[%(asctime)s] [%(short_levelname)s] %(plugin_tag)s[%(filename)s:%(lineno)d]: %(message)s",
                 ),
             )
-        logger.addHandler(handler)
+        if listener:
+            listener.add_handler(handler)
+        else:
+            logger.addHandler(handler)
+
+    @classmethod
+    def set_file_handler(
+        cls,
+        logger: logging.Logger,
+        path: str,
+        max_bytes: int = 10 * 1024 * 1024,
+        backup_count: int = 3,
+    ):
+        """设置按大小轮转的日志文件
+
+        Args:
+            logger (logging.Logger): 日志记录器
+            path (str): 日志文件路径
+            max_bytes (int): 单个日志文件的最大字节数
+            backup_count (int): 保留的历史日志文件数量
+
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        handler = RotatingFileHandler(
+            path,
+            maxBytes=max_bytes,
+            backupCount=backup_count,
+            encoding="utf-8",
+            delay=True,
+        )
+        handler.setLevel(logging.DEBUG)
+        handler.setFormatter(
+            logging.Formatter(
+                "[%(asctime)s] %(plugin_tag)s [%(short_levelname)-4s] [%(filename)s:%(lineno)d]: %(message)s",
+                datefmt="%Y-%m-%d %H:%M:%S",
+            ),
+        )
+        listener = cls._get_listener(logger)
+        if listener:
+            listener.add_handler(handler)
+        else:
+            logger.addHandler(handler)
@@ -25,14 +25,19 @@ import asyncio
 import base64
 import json
 import os
-import uuid
 from enum import Enum
 
 from pydantic.v1 import BaseModel
 
 from astrbot.core import astrbot_config, file_token_service, logger
-from astrbot.core.utils.astrbot_path import get_astrbot_data_path
+from astrbot.core.utils.audio_converter import audio_converter
 from astrbot.core.utils.io import download_file, download_image_by_url, file_to_base64
+from astrbot.core.utils.temp_manager import temp_file_manager
+
+
+def _write_bytes(path: str, data: bytes):
+    with open(path, "wb") as f:
+        f.write(data)
 
 
 class ComponentType(str, Enum):
@@ -153,11 +158,9 @@ class Record(BaseMessageComponent):
         if self.file.startswith("base64://"):
             bs64_data = self.file.removeprefix("base64://")
             image_bytes = base64.b64decode(bs64_data)
-            temp_dir = os.path.join(get_astrbot_data_path(), "temp")
-            file_path = os.path.join(temp_dir, f"{uuid.uuid4()}.jpg")
-            with open(file_path, "wb") as f:
-                f.write(image_bytes)
-            return os.path.abspath(file_path)
+            file_path = temp_file_manager.new_path(suffix=".jpg", category="record")
+            await asyncio.to_thread(_write_bytes, file_path, image_bytes)
+            return file_path
         if os.path.exists(self.file):
             return os.path.abspath(self.file)
         raise Exception(f"not a valid file: {self.file}")
@@ -186,6 +189,31 @@ class Record(BaseMessageComponent):
         bs64_data = bs64_data.removeprefix("base64://")
         return bs64_data
 
+    async def convert_to_format(self, fmt: str) -> str:
+        """将语音转换为指定格式(wav / silk / amr / mp3)，返回本地路径。
+
+        转换在音频转码服务中进行，结果按内容缓存，同一段语音发往多个平台时只转码一次。
+        返回的文件由转码服务管理，请勿修改或删除。
+
+        Returns:
+            str: 转换后语音的本地路径，以绝对路径表示。
+
+        """
+        file_path = await self.convert_to_file_path()
+        result = await audio_converter.convert(file_path, fmt)
+        return result.path
+
+    async def convert_to_tencent_silk(self) -> tuple[str, float]:
+        """将语音转换为 Tencent SILK 格式。
+
+        Returns:
+            tuple[str, float]: SILK 文件的本地路径与音频时长(秒)。
+
+        """
+        file_path = await self.convert_to_file_path()
+        result = await audio_converter.convert(file_path, "silk")
+        return result.path, result.duration
+
     async def register_to_file_service(self) -> str:
         """将语音注册到文件服务。
 
@@ -242,8 +270,7 @@ class Video(BaseMessageComponent):
         if url and url.startswith("file:///"):
             return url[8:]
         if url and url.startswith("http"):
-            download_dir = os.path.join(get_astrbot_data_path(), "temp")
-            video_file_path = os.path.join(download_dir, f"{uuid.uuid4().hex}")
+            video_file_path = temp_file_manager.new_path(category="download")
             await download_file(url, video_file_path)
             if os.path.exists(video_file_path):
                 return os.path.abspath(video_file_path)
@@ -442,11 +469,12 @@ class Image(BaseMessageComponent):
         if url.startswith("base64://"):
             bs64_data = url.removeprefix("base64://")
             image_bytes = base64.b64decode(bs64_data)
-            temp_dir = os.path.join(get_astrbot_data_path(), "temp")
-            image_file_path = os.path.join(temp_dir, f"{uuid.uuid4()}.jpg")
-            with open(image_file_path, "wb") as f:
-                f.write(image_bytes)
-            return os.path.abspath(image_file_path)
+            image_file_path = temp_file_manager.new_path(
+                suffix=".jpg",
+                category="image",
+            )
+            await asyncio.to_thread(_write_bytes, image_file_path, image_bytes)
+            return image_file_path
         if os.path.exists(url):
             return os.path.abspath(url)
         raise Exception(f"not a valid file: {url}")
@@ -720,9 +748,7 @@ class File(BaseMessageComponent):
 
     async def _download_file(self):
         """下载文件"""
-        download_dir = os.path.join(get_astrbot_data_path(), "temp")
-        os.makedirs(download_dir, exist_ok=True)
-        file_path = os.path.join(download_dir, f"{uuid.uuid4().hex}")
+        file_path = temp_file_manager.new_path(category="download")
         await download_file(self.url, file_path)
         self.file_ = os.path.abspath(file_path)
 
@@ -1,4 +1,3 @@
-import asyncio
 import random
 import traceback
 from collections.abc import AsyncGenerator
@@ -6,6 +5,7 @@ from collections.abc import AsyncGenerator
 from astrbot.core import logger
 from astrbot.core.message.components import Image, Plain, Record
 from astrbot.core.platform.astr_message_event import AstrMessageEvent
+from astrbot.core.provider.stt_service import stt_service
 
 from ..context import PipelineContext
 from ..stage import Stage, register_stage
@@ -21,6 +21,17 @@ class PreProcessStage(Stage):
         self.stt_settings: dict = self.config.get("provider_stt_settings", {})
         self.platform_settings: dict = self.config.get("platform_settings", {})
 
+        # 预先解析路径映射
+        self.path_mappings: list[tuple[str, str]] = []
+        for mapping in self.platform_settings.get("path_mapping", []):
+            from_, sep, to_ = mapping.partition(":")
+            if not sep:
+                logger.warning(f"路径映射配置格式错误，已忽略: {mapping}")
+                continue
+            self.path_mappings.append(
+                (from_.removesuffix("/"), to_.removesuffix("/")),
+            )
+
     async def process(
         self,
         event: AstrMessageEvent,
@@ -47,17 +58,13 @@ class PreProcessStage(Stage):
                 logger.warning(f"{platform} 预回应表情发送失败: {e}")
 
         # 路径映射
-        if mappings := self.platform_settings.get("path_mapping", []):
+        if self.path_mappings:
             # 支持 Record，Image 消息段的路径映射。
             message_chain = event.get_messages()
 
             for idx, component in enumerate(message_chain):
                 if isinstance(component, (Record, Image)) and component.url:
-                    for mapping in mappings:
-                        from_, to_ = mapping.split(":")
-                        from_ = from_.removesuffix("/")
-                        to_ = to_.removesuffix("/")
-
+                    for from_, to_ in self.path_mappings:
                         url = component.url.removeprefix("file://")
                         if url.startswith(from_):
                             component.url = url.replace(from_, to_, 1)
@@ -75,26 +82,28 @@ class PreProcessStage(Stage):
                 )
                 return
             message_chain = event.get_messages()
-            for idx, component in enumerate(message_chain):
-                if isinstance(component, Record) and component.url:
-                    path = component.url.removeprefix("file://")
-                    retry = 5
-                    for i in range(retry):
-                        try:
-                            result = await stt_provider.get_text(audio_url=path)
-                            if result:
-                                logger.info("语音转文本结果: " + result)
-                                message_chain[idx] = Plain(result)
-                                event.message_str += result
-                                event.message_obj.message_str += result
-                            break
-                        except FileNotFoundError as e:
-                            # napcat workaround
-                            logger.warning(e)
-                            logger.warning(f"重试中: {i + 1}/{retry}")
-                            await asyncio.sleep(0.5)
-                            continue
-                        except BaseException as e:
-                            logger.error(traceback.format_exc())
-                            logger.error(f"语音转文本失败: {e}")
-                            break
+            indexes = [
+                idx
+                for idx, component in enumerate(message_chain)
+                if isinstance(component, Record) and component.url
+            ]
+            if not indexes:
+                return
+            results = await stt_service.transcribe_many(
+                stt_provider,
+                [message_chain[idx].url.removeprefix("file://") for idx in indexes],
+                max_concurrency=int(self.stt_settings.get("max_concurrency", 3)),
+                use_cache=self.stt_settings.get("cache_enable", True),
+            )
+            for idx, result in zip(indexes, results):
+                if isinstance(result, BaseException):
+                    logger.error(
+                        "".join(traceback.format_exception(result)),
+                    )
+                    logger.error(f"语音转文本失败: {result}")
+                    continue
+                if result:
+                    logger.info("语音转文本结果: " + result)
+                    message_chain[idx] = Plain(result)
+                    event.message_str += result
+                    event.message_obj.message_str += result
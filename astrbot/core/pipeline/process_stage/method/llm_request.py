@@ -6,6 +6,12 @@ import json
 from collections.abc import AsyncGenerator
 
 from astrbot.core import logger
+from astrbot.core.agent.context_budget import (
+    IMAGE_TOKENS,
+    ContextBudgeter,
+    get_tokenizer,
+    strip_token_cache,
+)
 from astrbot.core.agent.tool import ToolSet
 from astrbot.core.astr_agent_context import AstrAgentContext
 from astrbot.core.conversation_mgr import Conversation
@@ -58,6 +64,12 @@ class LLMRequestSubStage(Stage):
         self.show_tool_use: bool = settings.get("show_tool_use_status", True)
         self.show_reasoning = settings.get("display_reasoning_text", False)
         self.kb_agentic_mode: bool = conf.get("kb_agentic_mode", False)
+        self.context_overflow_strategy: str = settings.get(
+            "context_overflow_strategy", "truncate"
+        )
+        self.context_budgeter = ContextBudgeter(
+            get_tokenizer(settings.get("context_tokenizer", "auto")),
+        )
 
         for bwp in self.bot_wake_prefixs:
             if self.provider_wake_prefix.startswith(bwp):
@@ -122,7 +134,7 @@ class LLMRequestSubStage(Stage):
         else:
             if req.func_tool is None:
                 req.func_tool = ToolSet()
-            req.func_tool.add_tool(KNOWLEDGE_BASE_QUERY_TOOL)
+            req.func_tool = req.func_tool.with_changes(add=[KNOWLEDGE_BASE_QUERY_TOOL])
 
     def _truncate_contexts(
         self,
@@ -152,6 +164,69 @@ class LLMRequestSubStage(Stage):
 
         return truncated_contexts
 
+    async def _apply_token_budget(
+        self,
+        provider: Provider,
+        req: ProviderRequest,
+    ):
+        """按提供商的上下文窗口 Token 预算裁剪上下文，为系统提示词、工具与回复预留空间"""
+        max_context_tokens = provider.provider_config.get("max_context_tokens", 0)
+        if not max_context_tokens or max_context_tokens <= 0 or not req.contexts:
+            return
+
+        budgeter = self.context_budgeter
+        model_config = provider.provider_config.get("model_config", {})
+        reserved = budgeter.count_text(req.system_prompt)
+        reserved += budgeter.count_text(req.prompt)
+        reserved += len(req.image_urls or []) * IMAGE_TOKENS
+        reserved += model_config.get("max_tokens") or 1024
+        if req.func_tool:
+            reserved += budgeter.count_tools(req.func_tool.openai_schema())
+
+        result = budgeter.fit(req.contexts, max_context_tokens, reserved)
+        if not result.dropped:
+            return
+        logger.debug(
+            f"上下文超出 Token 预算({result.budget})，丢弃 {len(result.dropped)} 条最早的记录，"
+            f"保留 {len(result.contexts)} 条 ({result.context_tokens} tokens)。",
+        )
+        req.contexts = result.contexts
+
+        if self.context_overflow_strategy != "summarize":
+            return
+
+        async def _summarize(text: str) -> str:
+            llm_resp = await provider.text_chat(
+                system_prompt="You are expert in summarizing conversations.",
+                prompt=(
+                    "Summarize the key facts, user preferences and unresolved tasks "
+                    "in the following conversation within 200 words. "
+                    "You must use the same language as the conversation.\n\n"
+                    f"{text}"
+                ),
+            )
+            return (llm_resp.completion_text or "").strip() if llm_resp else ""
+
+        try:
+            summary = await budgeter.summarize(
+                result.dropped,
+                _summarize,
+                max_input_tokens=max(1024, result.budget // 2),
+            )
+        except Exception as e:
+            logger.warning(f"总结被裁剪的上下文失败，仅执行截断: {e}")
+            return
+        if summary:
+            # 以一对消息的形式保留摘要，使其随对话历史一起持久化
+            req.contexts = [
+                {
+                    "role": "user",
+                    "content": f"[Summary of earlier conversation]\n{summary}",
+                },
+                {"role": "assistant", "content": "OK."},
+                *req.contexts,
+            ]
+
     def _modalities_fix(
         self,
         provider: Provider,
@@ -400,8 +475,14 @@ class LLMRequestSubStage(Stage):
                 self.unsupported_streaming_strategy == "turn_off"
                 and not event.platform_meta.support_streaming_message
             )
-            # 备份 req.contexts
+            # fit contexts into the provider's token budget
+            await self._apply_token_budget(provider, req)
+
+            # 备份 req.contexts（包含缓存的 token 计数，随历史记录一起保存）
             backup_contexts = copy.deepcopy(req.contexts)
+            # 发送给提供商的上下文不带 token 计数
+            if req.contexts:
+                strip_token_cache(req.contexts)
 
             # run agent
             agent_runner = AgentRunner()
@@ -5,9 +5,11 @@ from collections.abc import AsyncGenerator
 
 from astrbot.core import file_token_service, html_renderer, logger
 from astrbot.core.message.components import At, File, Image, Node, Plain, Record, Reply
-from astrbot.core.message.message_event_result import ResultContentType
+from astrbot.core.message.message_event_result import MessageChain, ResultContentType
 from astrbot.core.platform.astr_message_event import AstrMessageEvent
 from astrbot.core.platform.message_type import MessageType
+from astrbot.core.provider.provider import TTSProvider
+from astrbot.core.provider.tts_service import tts_service
 from astrbot.core.star.session_llm_manager import SessionServiceManager
 from astrbot.core.star.star import star_map
 from astrbot.core.star.star_handler import EventType, star_handlers_registry
@@ -69,6 +71,87 @@ class ResultDecorateStage(Stage):
                     self.content_safe_check_stage = stage_cls()
                     await self.content_safe_check_stage.initialize(ctx)
 
+    async def _tts_chain(
+        self,
+        event: AstrMessageEvent,
+        tts_provider: TTSProvider,
+        chain: list,
+    ) -> list:
+        """将消息链中的文本段转为语音。
+
+        各文本段并发合成(受每个提供商的并发上限约束)，结果按原顺序拼回消息链。
+        开启 `send_first_segment_early` 时，第一段语音合成完毕后立即发送，
+        不必等待后续消息段。
+        """
+        tts_settings = self.ctx.astrbot_config["provider_tts_settings"]
+        use_file_service = tts_settings["use_file_service"]
+        callback_api_base = self.ctx.astrbot_config["callback_api_base"]
+        dual_output = tts_settings["dual_output"]
+        tts_service.cache.max_bytes = (
+            int(tts_settings.get("cache_max_size_mb", 200)) * 1024 * 1024
+        )
+
+        targets = [
+            idx
+            for idx, comp in enumerate(chain)
+            if isinstance(comp, Plain) and len(comp.text) > 1
+        ]
+        tasks = tts_service.synthesize_many(
+            tts_provider,
+            [chain[idx].text for idx in targets],
+            use_cache=tts_settings.get("cache_enable", True),
+            max_concurrency=int(tts_settings.get("max_concurrency", 3)),
+        )
+        send_early = tts_settings.get("send_first_segment_early", False) and (
+            len(targets) > 1
+        )
+
+        new_chain = []
+        last = 0
+        try:
+            for n, (idx, task) in enumerate(zip(targets, tasks)):
+                new_chain.extend(chain[last:idx])
+                last = idx + 1
+                comp = chain[idx]
+                try:
+                    audio_path = await task
+                    if not audio_path:
+                        logger.error(
+                            f"由于 TTS 音频文件未找到，消息段转语音失败: {comp.text}",
+                        )
+                        new_chain.append(comp)
+                        continue
+
+                    url = None
+                    if use_file_service and callback_api_base:
+                        token = await file_token_service.register_file(audio_path)
+                        url = f"{callback_api_base}/api/file/{token}"
+                        logger.debug(f"已注册：{url}")
+
+                    new_chain.append(
+                        Record(
+                            file=url or audio_path,
+                            url=url or audio_path,
+                        ),
+                    )
+                    if dual_output:
+                        new_chain.append(comp)
+                except Exception:
+                    logger.error(traceback.format_exc())
+                    logger.error("TTS 失败，使用文本发送。")
+                    new_chain.append(comp)
+                finally:
+                    if n == 0 and send_early and new_chain:
+                        # 先发送第一段，后续消息段仍在合成
+                        await event.send(MessageChain(chain=new_chain))
+                        new_chain = []
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+        new_chain.extend(chain[last:])
+        return new_chain
+
     async def process(
         self,
         event: AstrMessageEvent,
@@ -194,53 +277,11 @@ class ResultDecorateStage(Stage):
                         f"会话 {event.unified_msg_origin} 未配置文本转语音模型。",
                     )
                 else:
-                    new_chain = []
-                    for comp in result.chain:
-                        if isinstance(comp, Plain) and len(comp.text) > 1:
-                            try:
-                                logger.info(f"TTS 请求: {comp.text}")
-                                audio_path = await tts_provider.get_audio(comp.text)
-                                logger.info(f"TTS 结果: {audio_path}")
-                                if not audio_path:
-                                    logger.error(
-                                        f"由于 TTS 音频文件未找到，消息段转语音失败: {comp.text}",
-                                    )
-                                    new_chain.append(comp)
-                                    continue
-
-                                use_file_service = self.ctx.astrbot_config[
-                                    "provider_tts_settings"
-                                ]["use_file_service"]
-                                callback_api_base = self.ctx.astrbot_config[
-                                    "callback_api_base"
-                                ]
-                                dual_output = self.ctx.astrbot_config[
-                                    "provider_tts_settings"
-                                ]["dual_output"]
-
-                                url = None
-                                if use_file_service and callback_api_base:
-                                    token = await file_token_service.register_file(
-                                        audio_path,
-                                    )
-                                    url = f"{callback_api_base}/api/file/{token}"
-                                    logger.debug(f"已注册：{url}")
-
-                                new_chain.append(
-                                    Record(
-                                        file=url or audio_path,
-                                        url=url or audio_path,
-                                    ),
-                                )
-                                if dual_output:
-                                    new_chain.append(comp)
-                            except Exception:
-                                logger.error(traceback.format_exc())
-                                logger.error("TTS 失败，使用文本发送。")
-                                new_chain.append(comp)
-                        else:
-                            new_chain.append(comp)
-                    result.chain = new_chain
+                    result.chain = await self._tts_chain(
+                        event,
+                        tts_provider,
+                        result.chain,
+                    )
 
             # 文本转图片
             elif (
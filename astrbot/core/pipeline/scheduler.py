@@ -81,4 +81,4 @@ class PipelineScheduler:
         if event.get_platform_name() in ["webchat", "wecom_ai_bot"]:
             await event.send(None)
 
-        logger.debug("pipeline 执行完毕。")
+        logger.debug("pipeline 执行完毕。", extra={"sample": "pipeline_done"})
@@ -16,6 +16,7 @@ from astrbot.api.message_components import (
     Video,
 )
 from astrbot.api.platform import Group, MessageMember
+from astrbot.core.group_message_archive import group_message_archive
 
 
 class AiocqhttpMessageEvent(AstrMessageEvent):
@@ -72,12 +73,20 @@ class AiocqhttpMessageEvent(AstrMessageEvent):
         is_group: bool,
         session_id: str,
         messages: list[dict],
+        platform_id: str | None = None,
     ):
         # session_id 必须是纯数字字符串
         session_id = int(session_id) if session_id.isdigit() else None
 
         if is_group and isinstance(session_id, int):
-            await bot.send_group_msg(group_id=session_id, message=messages)
+            ret = await bot.send_group_msg(group_id=session_id, message=messages)
+            if platform_id and isinstance(ret, dict) and ret.get("message_id"):
+                group_message_archive.record_sent(
+                    platform_id,
+                    session_id,
+                    ret["message_id"],
+                    messages,
+                )
         elif not is_group and isinstance(session_id, int):
             await bot.send_private_msg(user_id=session_id, message=messages)
         elif isinstance(event, Event):  # 最后兜底
@@ -95,6 +104,7 @@ class AiocqhttpMessageEvent(AstrMessageEvent):
         event: Event | None = None,
         is_group: bool = False,
         session_id: str | None = None,
+        platform_id: str | None = None,
     ):
         """发送消息至 QQ 协议端（aiocqhttp）。
 
@@ -104,6 +114,7 @@ class AiocqhttpMessageEvent(AstrMessageEvent):
             event (Event | None, optional): aiocqhttp 事件对象.
             is_group (bool, optional): 是否为群消息.
             session_id (str | None, optional): 会话 ID（群号或 QQ 号
+            platform_id (str | None, optional): 平台 ID，提供时发出的群消息会写入群消息归档
 
         """
         # 转发消息、文件消息不能和普通消息混在一起发送
@@ -114,7 +125,7 @@ class AiocqhttpMessageEvent(AstrMessageEvent):
             ret = await cls._parse_onebot_json(message_chain)
             if not ret:
                 return
-            await cls._dispatch_send(bot, event, is_group, session_id, ret)
+            await cls._dispatch_send(bot, event, is_group, session_id, ret, platform_id)
             return
         for seg in message_chain.chain:
             if isinstance(seg, (Node, Nodes)):
@@ -133,12 +144,26 @@ class AiocqhttpMessageEvent(AstrMessageEvent):
                     await bot.call_action("send_private_forward_msg", **payload)
             elif isinstance(seg, File):
                 d = await cls._from_segment_to_dict(seg)
-                await cls._dispatch_send(bot, event, is_group, session_id, [d])
+                await cls._dispatch_send(
+                    bot,
+                    event,
+                    is_group,
+                    session_id,
+                    [d],
+                    platform_id,
+                )
             else:
                 messages = await cls._parse_onebot_json(MessageChain([seg]))
                 if not messages:
                     continue
-                await cls._dispatch_send(bot, event, is_group, session_id, messages)
+                await cls._dispatch_send(
+                    bot,
+                    event,
+                    is_group,
+                    session_id,
+                    messages,
+                    platform_id,
+                )
                 await asyncio.sleep(0.5)
 
     async def send(self, message: MessageChain):
@@ -154,6 +179,7 @@ class AiocqhttpMessageEvent(AstrMessageEvent):
             event=event,  # 不强制要求一定是 Event
             is_group=is_group,
             session_id=session_id,
+            platform_id=self.get_platform_id(),
         )
         await super().send(message)
 
@@ -19,6 +19,8 @@ from astrbot.api.platform import (
     Platform,
     PlatformMetadata,
 )
+from astrbot.core.group_message_archive import group_message_archive
+from astrbot.core.group_roster import group_roster
 from astrbot.core.platform.astr_message_event import MessageSesion
 
 from ...register import register_platform_adapter
@@ -86,6 +88,11 @@ class AiocqhttpAdapter(Platform):
             if abm:
                 await self.handle_msg(abm)
 
+        @self.bot.on("message_sent")
+        async def message_sent(event: Event):
+            # 协议端上报的机器人自身消息只写入归档，不进入消息处理流程
+            group_message_archive.record(self.metadata.id, event)
+
         @self.bot.on_websocket_connection
         def on_websocket_connection(_):
             logger.info("aiocqhttp(OneBot v11) 适配器已连接。")
@@ -106,12 +113,17 @@ class AiocqhttpAdapter(Platform):
             event=None,  # 这里不需要 event，因为是通过 session 发送的
             is_group=is_group,
             session_id=session_id,
+            platform_id=self.metadata.id,
         )
         await super().send_by_session(session, message_chain)
 
     async def convert_message(self, event: Event) -> AstrBotMessage | None:
         logger.debug(f"[aiocqhttp] RawMessage {event}")
 
+        # 增量更新群成员缓存, 并归档群消息
+        group_roster.handle_onebot_event(event)
+        group_message_archive.record(self.metadata.id, event)
+
         if event["post_type"] == "message":
             abm = await self._convert_handle_message_event(event)
             if abm.sender.user_id == "2854196310":
@@ -326,11 +338,10 @@ class AiocqhttpAdapter(Platform):
                             abm.message.append(At(qq="all", name="全体成员"))
                             continue
 
-                        at_info = await self.bot.call_action(
-                            action="get_group_member_info",
-                            group_id=event.group_id,
-                            user_id=int(m["data"]["qq"]),
-                            no_cache=False,
+                        at_info = await group_roster.get_member(
+                            self.bot,
+                            event.group_id,
+                            m["data"]["qq"],
                         )
                         if at_info:
                             nickname = at_info.get("card", "")
@@ -2,7 +2,6 @@ import asyncio
 import base64
 import os
 import random
-import uuid
 
 import aiofiles
 import botpy
@@ -18,9 +17,7 @@ from astrbot.api import logger
 from astrbot.api.event import AstrMessageEvent, MessageChain
 from astrbot.api.message_components import Image, Plain, Record
 from astrbot.api.platform import AstrBotMessage, PlatformMetadata
-from astrbot.core.utils.astrbot_path import get_astrbot_data_path
 from astrbot.core.utils.io import download_image_by_url, file_to_base64
-from astrbot.core.utils.tencent_record_helper import wav_to_tencent_silk
 
 
 class QQOfficialMessageEvent(AstrMessageEvent):
@@ -305,17 +302,11 @@ class QQOfficialMessageEvent(AstrMessageEvent):
                 image_base64 = image_base64.removeprefix("base64://")
             elif isinstance(i, Record):
                 if i.file:
-                    record_wav_path = await i.convert_to_file_path()  # wav 路径
-                    temp_dir = os.path.join(get_astrbot_data_path(), "temp")
-                    record_tecent_silk_path = os.path.join(
-                        temp_dir,
-                        f"{uuid.uuid4()}.silk",
-                    )
                     try:
-                        duration = await wav_to_tencent_silk(
-                            record_wav_path,
+                        (
                             record_tecent_silk_path,
-                        )
+                            duration,
+                        ) = await i.convert_to_tencent_silk()
                         if duration > 0:
                             record_file_path = record_tecent_silk_path
                         else:
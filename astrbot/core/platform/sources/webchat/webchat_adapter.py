@@ -20,21 +20,37 @@ from astrbot.core.utils.astrbot_path import get_astrbot_data_path
 
 from ...register import register_platform_adapter
 from .webchat_event import WebChatMessageEvent
-from .webchat_queue_mgr import WebChatQueueMgr, webchat_queue_mgr
+from .webchat_queue_mgr import (
+    INPUT_QUEUE_IDLE_TIMEOUT,
+    WebChatQueueMgr,
+    webchat_queue_mgr,
+)
 
 
 class QueueListener:
     def __init__(self, webchat_queue_mgr: WebChatQueueMgr, callback: Callable) -> None:
         self.webchat_queue_mgr = webchat_queue_mgr
         self.callback = callback
-        self.running_tasks = set()
+        self.running_tasks: dict[str, asyncio.Task] = {}
 
     async def listen_to_queue(self, conversation_id: str):
         """Listen to a specific conversation queue"""
         queue = self.webchat_queue_mgr.get_or_create_queue(conversation_id)
         while True:
             try:
-                data = await queue.get()
+                try:
+                    data = await asyncio.wait_for(
+                        queue.get(),
+                        timeout=INPUT_QUEUE_IDLE_TIMEOUT,
+                    )
+                except asyncio.TimeoutError:
+                    # 会话空闲，移除队列并结束监听，下次请求时重新创建
+                    if self.webchat_queue_mgr.remove_queues_if_idle(conversation_id):
+                        logger.debug(
+                            f"Stopped idle listener for conversation: {conversation_id}",
+                        )
+                        break
+                    continue
                 await self.callback(data)
             except Exception as e:
                 logger.error(
@@ -42,28 +58,43 @@ class QueueListener:
                 )
                 break
 
-    async def run(self):
-        """Monitor for new conversation queues and start listeners"""
-        monitored_conversations = set()
+    def _on_queue_created(self, conversation_id: str):
+        if conversation_id in self.running_tasks:
+            return
+        task = asyncio.create_task(self.listen_to_queue(conversation_id))
+        self.running_tasks[conversation_id] = task
+        task.add_done_callback(
+            lambda t, cid=conversation_id: (
+                self.running_tasks.get(cid) is t and self.running_tasks.pop(cid, None)
+            ),
+        )
+        logger.debug(f"Started listener for conversation: {conversation_id}")
 
-        while True:
-            # Check for new conversations
-            current_conversations = set(self.webchat_queue_mgr.queues.keys())
-            new_conversations = current_conversations - monitored_conversations
-
-            # Start listeners for new conversations
-            for conversation_id in new_conversations:
-                task = asyncio.create_task(self.listen_to_queue(conversation_id))
-                self.running_tasks.add(task)
-                task.add_done_callback(self.running_tasks.discard)
-                monitored_conversations.add(conversation_id)
-                logger.debug(f"Started listener for conversation: {conversation_id}")
-
-            # Clean up monitored conversations that no longer exist
-            removed_conversations = monitored_conversations - current_conversations
-            monitored_conversations -= removed_conversations
-
-            await asyncio.sleep(1)  # Check for new conversations every second
+    def _on_queue_removed(self, conversation_id: str):
+        task = self.running_tasks.pop(conversation_id, None)
+        if task and task is not asyncio.current_task():
+            task.cancel()
+
+    async def run(self):
+        """Start listeners as soon as conversation queues are created.
+
+        The queue manager notifies this listener on queue creation and removal,
+        so no polling is needed.
+        """
+        self.webchat_queue_mgr.add_queue_listener(
+            self._on_queue_created,
+            self._on_queue_removed,
+        )
+        try:
+            await asyncio.Event().wait()
+        finally:
+            self.webchat_queue_mgr.remove_queue_listener(
+                self._on_queue_created,
+                self._on_queue_removed,
+            )
+            for task in list(self.running_tasks.values()):
+                task.cancel()
+            self.running_tasks.clear()
 
 
 @register_platform_adapter("webchat", "webchat")
@@ -21,9 +21,9 @@ class WebChatMessageEvent(AstrMessageEvent):
     @staticmethod
     async def _send(message: MessageChain, session_id: str, streaming: bool = False):
         cid = session_id.split("!")[-1]
-        web_chat_back_queue = webchat_queue_mgr.get_or_create_back_queue(cid)
         if not message:
-            await web_chat_back_queue.put(
+            await webchat_queue_mgr.put_back(
+                cid,
                 {
                     "type": "end",
                     "data": "",
@@ -36,7 +36,8 @@ class WebChatMessageEvent(AstrMessageEvent):
         for comp in message.chain:
             if isinstance(comp, Plain):
                 data = comp.text
-                await web_chat_back_queue.put(
+                await webchat_queue_mgr.put_back(
+                    cid,
                     {
                         "type": "plain",
                         "cid": cid,
@@ -66,7 +67,8 @@ class WebChatMessageEvent(AstrMessageEvent):
                         with open(comp.file, "rb") as f2:
                             f.write(f2.read())
                 data = f"[IMAGE]{filename}"
-                await web_chat_back_queue.put(
+                await webchat_queue_mgr.put_back(
+                    cid,
                     {
                         "type": "image",
                         "cid": cid,
@@ -90,7 +92,8 @@ class WebChatMessageEvent(AstrMessageEvent):
                         with open(comp.file, "rb") as f2:
                             f.write(f2.read())
                 data = f"[RECORD]{filename}"
-                await web_chat_back_queue.put(
+                await webchat_queue_mgr.put_back(
+                    cid,
                     {
                         "type": "record",
                         "cid": cid,
@@ -111,11 +114,11 @@ class WebChatMessageEvent(AstrMessageEvent):
         final_data = ""
         reasoning_content = ""
         cid = self.session_id.split("!")[-1]
-        web_chat_back_queue = webchat_queue_mgr.get_or_create_back_queue(cid)
         async for chain in generator:
             if chain.type == "break" and final_data:
                 # 分割符
-                await web_chat_back_queue.put(
+                await webchat_queue_mgr.put_back(
+                    cid,
                     {
                         "type": "break",  # break means a segment end
                         "data": final_data,
@@ -136,7 +139,8 @@ class WebChatMessageEvent(AstrMessageEvent):
             else:
                 final_data += r
 
-        await web_chat_back_queue.put(
+        await webchat_queue_mgr.put_back(
+            cid,
             {
                 "type": "complete",  # complete means we return the final result
                 "data": final_data,
@@ -1,35 +1,167 @@
 import asyncio
+from collections import deque
+from collections.abc import Callable
+
+INPUT_QUEUE_MAXSIZE = 32
+"""Max pending user requests per conversation"""
+BACK_QUEUE_MAXSIZE = 1024
+"""Max pending response chunks per conversation before producers are throttled"""
+INPUT_QUEUE_IDLE_TIMEOUT = 600
+"""Seconds without requests after which a conversation's listener is stopped"""
+PENDING_MAXSIZE = 64
+"""Max response items kept for a conversation with no reading stream (e.g.
+proactive messages); they are delivered to the next stream"""
 
 
 class WebChatQueueMgr:
-    def __init__(self) -> None:
-        self.queues = {}
+    def __init__(
+        self,
+        queue_maxsize: int = INPUT_QUEUE_MAXSIZE,
+        back_queue_maxsize: int = BACK_QUEUE_MAXSIZE,
+        pending_maxsize: int = PENDING_MAXSIZE,
+    ) -> None:
+        self.queues: dict[str, asyncio.Queue] = {}
         """Conversation ID to asyncio.Queue mapping"""
-        self.back_queues = {}
+        self.back_queues: dict[str, asyncio.Queue] = {}
         """Conversation ID to asyncio.Queue mapping for responses"""
+        self.queue_maxsize = queue_maxsize
+        self.back_queue_maxsize = back_queue_maxsize
+        self.pending_maxsize = pending_maxsize
+        self._pending: dict[str, deque[dict]] = {}
+        """Response items put while no stream was reading, oldest dropped first"""
+        self._back_queue_refs: dict[str, int] = {}
+        """Number of active response streams reading each back queue"""
+        self._on_queue_created: list[Callable[[str], None]] = []
+        self._on_queue_removed: list[Callable[[str], None]] = []
+
+    def add_queue_listener(
+        self,
+        on_created: Callable[[str], None],
+        on_removed: Callable[[str], None] | None = None,
+    ):
+        """Register callbacks fired when a conversation queue is created or removed.
+
+        Existing queues are reported to `on_created` immediately.
+        """
+        self._on_queue_created.append(on_created)
+        if on_removed:
+            self._on_queue_removed.append(on_removed)
+        for conversation_id in list(self.queues):
+            on_created(conversation_id)
+
+    def remove_queue_listener(
+        self,
+        on_created: Callable[[str], None],
+        on_removed: Callable[[str], None] | None = None,
+    ):
+        if on_created in self._on_queue_created:
+            self._on_queue_created.remove(on_created)
+        if on_removed and on_removed in self._on_queue_removed:
+            self._on_queue_removed.remove(on_removed)
 
     def get_or_create_queue(self, conversation_id: str) -> asyncio.Queue:
         """Get or create a queue for the given conversation ID"""
         if conversation_id not in self.queues:
-            self.queues[conversation_id] = asyncio.Queue()
+            self.queues[conversation_id] = asyncio.Queue(maxsize=self.queue_maxsize)
+            for cb in list(self._on_queue_created):
+                cb(conversation_id)
         return self.queues[conversation_id]
 
     def get_or_create_back_queue(self, conversation_id: str) -> asyncio.Queue:
         """Get or create a back queue for the given conversation ID"""
         if conversation_id not in self.back_queues:
-            self.back_queues[conversation_id] = asyncio.Queue()
+            self.back_queues[conversation_id] = asyncio.Queue(
+                maxsize=self.back_queue_maxsize,
+            )
         return self.back_queues[conversation_id]
 
+    def acquire_back_queue(self, conversation_id: str) -> asyncio.Queue:
+        """Get the back queue for a response stream that is going to read it.
+
+        Must be paired with `release_back_queue` when the stream ends.
+        """
+        queue = self.get_or_create_back_queue(conversation_id)
+        for item in self._pending.pop(conversation_id, ()):
+            try:
+                queue.put_nowait(item)
+            except asyncio.QueueFull:
+                break
+        self._back_queue_refs[conversation_id] = (
+            self._back_queue_refs.get(conversation_id, 0) + 1
+        )
+        return queue
+
+    def release_back_queue(self, conversation_id: str):
+        """Release a back queue. The last reader removes and drains it,
+        so producers blocked on a full queue are released."""
+        refs = self._back_queue_refs.get(conversation_id, 0) - 1
+        if refs > 0:
+            self._back_queue_refs[conversation_id] = refs
+            return
+        self._back_queue_refs.pop(conversation_id, None)
+        queue = self.back_queues.pop(conversation_id, None)
+        if queue:
+            self._drain(queue)
+
+    async def put_back(self, conversation_id: str, item: dict) -> bool:
+        """Put a response item into the back queue of an active stream.
+
+        Waits while the queue is full. Items for conversations without a reading
+        stream (e.g. proactive messages) are kept, up to `pending_maxsize`, for
+        the next stream of the conversation, and False is returned.
+        """
+        queue = self.back_queues.get(conversation_id)
+        if queue is None:
+            if item.get("type") != "end":
+                pending = self._pending.get(conversation_id)
+                if pending is None:
+                    pending = self._pending[conversation_id] = deque(
+                        maxlen=self.pending_maxsize,
+                    )
+                pending.append(item)
+            return False
+        await queue.put(item)
+        return True
+
     def remove_queues(self, conversation_id: str):
-        """Remove queues for the given conversation ID"""
+        """Remove queues and pending response items for the given conversation ID"""
+        self._pending.pop(conversation_id, None)
+        self._remove_queues(conversation_id)
+
+    def _remove_queues(self, conversation_id: str):
         if conversation_id in self.queues:
             del self.queues[conversation_id]
+            for cb in list(self._on_queue_removed):
+                cb(conversation_id)
+        self._back_queue_refs.pop(conversation_id, None)
         if conversation_id in self.back_queues:
-            del self.back_queues[conversation_id]
+            self._drain(self.back_queues.pop(conversation_id))
+
+    def remove_queues_if_idle(self, conversation_id: str) -> bool:
+        """Remove the queues of a conversation with no pending request and no
+        reading response stream. Returns whether they were removed.
+
+        Response items kept for the next stream are not removed.
+        """
+        if self._back_queue_refs.get(conversation_id, 0) > 0:
+            return False
+        queue = self.queues.get(conversation_id)
+        if queue is not None and not queue.empty():
+            return False
+        self._remove_queues(conversation_id)
+        return True
 
     def has_queue(self, conversation_id: str) -> bool:
         """Check if a queue exists for the given conversation ID"""
         return conversation_id in self.queues
 
+    @staticmethod
+    def _drain(queue: asyncio.Queue):
+        while True:
+            try:
+                queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+
 
 webchat_queue_mgr = WebChatQueueMgr()
@@ -24,6 +24,7 @@ from astrbot.api.platform import (
 from astrbot.core import logger
 from astrbot.core.platform.astr_message_event import MessageSesion
 from astrbot.core.utils.astrbot_path import get_astrbot_data_path
+from astrbot.core.utils.audio_converter import audio_converter
 
 from .wecom_event import WecomPlatformEvent
 from .wecom_kf import WeChatKF
@@ -278,11 +279,8 @@ class WecomPlatformAdapter(Platform):
                 f.write(resp.content)
 
             try:
-                from pydub import AudioSegment
-
                 path_wav = os.path.join(temp_dir, f"wecom_{msg.media_id}.wav")
-                audio = AudioSegment.from_file(path)
-                audio.export(path_wav, format="wav")
+                await audio_converter.convert_to_path(path, "wav", path_wav)
             except Exception as e:
                 logger.error(f"转换音频失败: {e}。如果没有安装 ffmpeg 请先安装。")
                 path_wav = path
@@ -348,11 +346,8 @@ class WecomPlatformAdapter(Platform):
                 f.write(resp.content)
 
             try:
-                from pydub import AudioSegment
-
                 path_wav = os.path.join(temp_dir, f"weixinkefu_{media_id}.wav")
-                audio = AudioSegment.from_file(path)
-                audio.export(path_wav, format="wav")
+                await audio_converter.convert_to_path(path, "wav", path_wav)
             except Exception as e:
                 logger.error(f"转换音频失败: {e}。如果没有安装 ffmpeg 请先安装。")
                 path_wav = path
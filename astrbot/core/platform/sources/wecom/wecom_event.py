@@ -1,6 +1,4 @@
 import asyncio
-import os
-import uuid
 
 from wechatpy.enterprise import WeChatClient
 
@@ -8,17 +6,9 @@ from astrbot.api import logger
 from astrbot.api.event import AstrMessageEvent, MessageChain
 from astrbot.api.message_components import Image, Plain, Record
 from astrbot.api.platform import AstrBotMessage, PlatformMetadata
-from astrbot.core.utils.astrbot_path import get_astrbot_data_path
 
 from .wecom_kf_message import WeChatKFMessage
 
-try:
-    import pydub
-except Exception:
-    logger.warning(
-        "检测到 pydub 库未安装，企业微信将无法语音收发。如需使用语音，请前往管理面板 -> 控制台 -> 安装 Pip 库安装 pydub。",
-    )
-
 
 class WecomPlatformEvent(AstrMessageEvent):
     def __init__(
@@ -124,14 +114,8 @@ class WecomPlatformEvent(AstrMessageEvent):
                             response["media_id"],
                         )
                 elif isinstance(comp, Record):
-                    record_path = await comp.convert_to_file_path()
                     # 转成amr
-                    temp_dir = os.path.join(get_astrbot_data_path(), "temp")
-                    record_path_amr = os.path.join(temp_dir, f"{uuid.uuid4()}.amr")
-                    pydub.AudioSegment.from_wav(record_path).export(
-                        record_path_amr,
-                        format="amr",
-                    )
+                    record_path_amr = await comp.convert_to_format("amr")
 
                     with open(record_path_amr, "rb") as f:
                         try:
@@ -182,14 +166,8 @@ class WecomPlatformEvent(AstrMessageEvent):
                             response["media_id"],
                         )
                 elif isinstance(comp, Record):
-                    record_path = await comp.convert_to_file_path()
                     # 转成amr
-                    temp_dir = os.path.join(get_astrbot_data_path(), "temp")
-                    record_path_amr = os.path.join(temp_dir, f"{uuid.uuid4()}.amr")
-                    pydub.AudioSegment.from_wav(record_path).export(
-                        record_path_amr,
-                        format="amr",
-                    )
+                    record_path_amr = await comp.convert_to_format("amr")
 
                     with open(record_path_amr, "rb") as f:
                         try:
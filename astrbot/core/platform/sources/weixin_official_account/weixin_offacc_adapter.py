@@ -22,6 +22,7 @@ from astrbot.api.platform import (
 )
 from astrbot.core import logger
 from astrbot.core.platform.astr_message_event import MessageSesion
+from astrbot.core.utils.audio_converter import audio_converter
 
 from .weixin_offacc_event import WeixinOfficialAccountPlatformEvent
 
@@ -248,14 +249,11 @@ class WeixinOfficialAccountPlatformAdapter(Platform):
                 f.write(resp.content)
 
             try:
-                from pydub import AudioSegment
-
                 path_wav = f"data/temp/wecom_{msg.media_id}.wav"
-                audio = AudioSegment.from_file(path)
-                audio.export(path_wav, format="wav")
+                await audio_converter.convert_to_path(path, "wav", path_wav)
             except Exception as e:
                 logger.error(
-                    f"转换音频失败: {e}。如果没有安装 pydub 和 ffmpeg 请先安装。",
+                    f"转换音频失败: {e}。如果没有安装 ffmpeg 请先安装。",
                 )
                 path_wav = path
                 return
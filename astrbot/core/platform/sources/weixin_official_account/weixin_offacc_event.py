@@ -1,5 +1,4 @@
 import asyncio
-import uuid
 
 from wechatpy import WeChatClient
 from wechatpy.replies import ImageReply, TextReply, VoiceReply
@@ -9,13 +8,6 @@ from astrbot.api.event import AstrMessageEvent, MessageChain
 from astrbot.api.message_components import Image, Plain, Record
 from astrbot.api.platform import AstrBotMessage, PlatformMetadata
 
-try:
-    import pydub
-except Exception:
-    logger.warning(
-        "检测到 pydub 库未安装，微信公众平台将无法语音收发。如需使用语音，请前往管理面板 -> 控制台 -> 安装 Pip 库安装 pydub。",
-    )
-
 
 class WeixinOfficialAccountPlatformEvent(AstrMessageEvent):
     def __init__(
@@ -133,13 +125,8 @@ class WeixinOfficialAccountPlatformEvent(AstrMessageEvent):
                         future.set_result(xml)
 
             elif isinstance(comp, Record):
-                record_path = await comp.convert_to_file_path()
                 # 转成amr
-                record_path_amr = f"data/temp/{uuid.uuid4()}.amr"
-                pydub.AudioSegment.from_wav(record_path).export(
-                    record_path_amr,
-                    format="amr",
-                )
+                record_path_amr = await comp.convert_to_format("amr")
 
                 with open(record_path_amr, "rb") as f:
                     try:
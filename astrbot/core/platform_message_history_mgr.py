@@ -23,6 +23,23 @@ class PlatformMessageHistoryManager:
             sender_name=sender_name,
         )
 
+    async def insert_many(
+        self,
+        platform_id: str,
+        user_id: str,
+        contents: list[dict],
+        sender_id: str | None = None,
+        sender_name: str | None = None,
+    ):
+        """Insert multiple platform message history records in one transaction."""
+        await self.db.insert_platform_message_histories(
+            platform_id=platform_id,
+            user_id=user_id,
+            contents=contents,
+            sender_id=sender_id,
+            sender_name=sender_name,
+        )
+
     async def get(
         self,
         platform_id: str,
@@ -40,6 +57,26 @@ class PlatformMessageHistoryManager:
         history.reverse()
         return history
 
+    async def get_page(
+        self,
+        platform_id: str,
+        user_id: str,
+        page_size: int = 200,
+        cursor: str | None = None,
+    ) -> tuple[list[PlatformMessageHistory], str | None]:
+        """Get one page of message history in chronological order.
+
+        Returns the records and a cursor for the previous (older) page, or None.
+        """
+        history, next_cursor = await self.db.get_platform_message_history_page(
+            platform_id=platform_id,
+            user_id=user_id,
+            page_size=page_size,
+            cursor=cursor,
+        )
+        history.reverse()
+        return history, next_cursor
+
     async def delete(self, platform_id: str, user_id: str, offset_sec: int = 86400):
         """Delete platform message history records older than the specified offset."""
         await self.db.delete_platform_message_offset(
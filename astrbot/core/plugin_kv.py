@@ -0,0 +1,187 @@
+"""插件 KV 存储。
+
+插件过去用 json.dump 整体重写自己的数据文件：每次小改动都要写入整个文件，且在事件循环中同步执行，
+写入中途进程退出会留下损坏的文件。这里把插件数据保存到 AstrBot 数据库的 preferences 表(scope 为 "plugin")：
+
+- 按键读写，每次只写入改动的键。
+- `transaction()` 中的多次写入在同一个数据库事务中提交，要么全部生效，要么全部不生效。
+- `incr()` 用于高频计数器：增量先累积在内存中，由后台任务定期合并写入。
+
+用法:
+
+```py
+kv = self.context.plugin_kv.namespace("astrbot_plugin_xxx")
+await kv.put("group:123", {"enabled": True})
+data = await kv.get("group:123", {})
+async with kv.transaction() as tx:
+    tx.put("a", 1)
+    tx.delete("b")
+kv.incr("stats:messages")
+```
+"""
+
+import asyncio
+import copy
+from contextlib import asynccontextmanager
+from typing import Any, TypeVar
+
+from astrbot.core import db_helper, logger
+
+_VT = TypeVar("_VT")
+
+SCOPE = "plugin"
+
+
+class KVTransaction:
+    """在一个数据库事务中提交的一组写入"""
+
+    def __init__(self) -> None:
+        self.puts: dict[str, Any] = {}
+        self.removes: set[str] = set()
+        self.increments: dict[str, int | float] = {}
+
+    def put(self, key: str, value: Any):
+        self.removes.discard(key)
+        self.increments.pop(key, None)
+        self.puts[key] = value
+
+    def delete(self, key: str):
+        self.puts.pop(key, None)
+        self.increments.pop(key, None)
+        self.removes.add(key)
+
+    def incr(self, key: str, delta: int | float = 1):
+        if key in self.removes:
+            self.removes.discard(key)
+            self.puts[key] = 0
+        self.increments[key] = self.increments.get(key, 0) + delta
+
+
+class PluginKV:
+    """单个插件的 KV 存储。值需要可以被 JSON 序列化。"""
+
+    def __init__(self, plugin_name: str) -> None:
+        self.plugin_name = plugin_name
+        self._pending_incr: dict[str, int | float] = {}
+        self._lock = asyncio.Lock()
+
+    async def get(self, key: str, default: _VT = None) -> Any | _VT:
+        pref = await db_helper.get_preference(SCOPE, self.plugin_name, key)
+        value = pref.value["val"] if pref else default
+        if key in self._pending_incr:
+            value = (value if isinstance(value, (int, float)) else 0) + (
+                self._pending_incr[key]
+            )
+        return value
+
+    async def items(self, prefix: str = "") -> dict[str, Any]:
+        """读取所有(或指定前缀的)键值"""
+        prefs = await db_helper.get_preferences(SCOPE, self.plugin_name)
+        result = {p.key: p.value["val"] for p in prefs if p.key.startswith(prefix)}
+        for key, delta in self._pending_incr.items():
+            if key.startswith(prefix):
+                current = result.get(key)
+                result[key] = (
+                    current if isinstance(current, (int, float)) else 0
+                ) + delta
+        return result
+
+    async def put(self, key: str, value: Any):
+        async with self.transaction() as tx:
+            tx.put(key, value)
+
+    async def delete(self, key: str):
+        async with self.transaction() as tx:
+            tx.delete(key)
+
+    def incr(self, key: str, delta: int | float = 1):
+        """计数器加 delta。不会立即写入数据库，由后台任务定期合并写入。"""
+        self._pending_incr[key] = self._pending_incr.get(key, 0) + delta
+
+    @asynccontextmanager
+    async def transaction(self):
+        """在退出时把所有写入放在一个数据库事务中提交，发生异常时丢弃全部写入"""
+        tx = KVTransaction()
+        yield tx
+        await self._commit(tx)
+
+    async def _commit(self, tx: KVTransaction):
+        if not (tx.puts or tx.removes or tx.increments):
+            return
+        async with self._lock:
+            # 被覆盖或删除的键上尚未合并的计数器增量作废，避免之后叠加到新值上。
+            # 只在提交成功后丢弃，提交期间新增的增量仍然保留
+            stale = {
+                key: delta
+                for key, delta in self._pending_incr.items()
+                if key in tx.puts or key in tx.removes
+            }
+            await db_helper.apply_preference_changes(
+                SCOPE,
+                self.plugin_name,
+                puts={k: {"val": copy.deepcopy(v)} for k, v in tx.puts.items()},
+                removes=tx.removes,
+                increments=tx.increments,
+            )
+            for key, delta in stale.items():
+                rest = self._pending_incr.get(key, 0) - delta
+                if rest:
+                    self._pending_incr[key] = rest
+                else:
+                    self._pending_incr.pop(key, None)
+
+    async def flush(self):
+        """写入累积的计数器增量"""
+        if not self._pending_incr:
+            return
+        async with self._lock:
+            pending, self._pending_incr = self._pending_incr, {}
+            try:
+                await db_helper.apply_preference_changes(
+                    SCOPE,
+                    self.plugin_name,
+                    increments=pending,
+                )
+            except Exception:
+                # 写入失败时放回，下次重试
+                for key, delta in pending.items():
+                    self._pending_incr[key] = self._pending_incr.get(key, 0) + delta
+                raise
+
+    async def clear(self):
+        """删除该插件的所有数据"""
+        async with self._lock:
+            self._pending_incr.clear()
+            await db_helper.clear_preferences(SCOPE, self.plugin_name)
+
+
+class PluginKVManager:
+    def __init__(self, flush_interval: float = 5.0) -> None:
+        self.flush_interval = flush_interval
+        self._stores: dict[str, PluginKV] = {}
+
+    def namespace(self, plugin_name: str) -> PluginKV:
+        """获取插件的 KV 存储。plugin_name 通常为插件的注册名。"""
+        store = self._stores.get(plugin_name)
+        if store is None:
+            store = self._stores[plugin_name] = PluginKV(plugin_name)
+        return store
+
+    async def flush(self):
+        for store in list(self._stores.values()):
+            try:
+                await store.flush()
+            except Exception as e:
+                logger.error(f"写入插件 {store.plugin_name} 的计数器失败: {e}")
+
+    async def run(self):
+        """后台任务，定期写入计数器增量"""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def shutdown(self):
+        await self.flush()
+
+
+plugin_kv = PluginKVManager()
@@ -91,7 +91,7 @@ class ProviderRequest:
     image_urls: list[str] = field(default_factory=list)
     """图片 URL 列表"""
     func_tool: ToolSet | None = None
-    """可用的函数工具"""
+    """可用的函数工具。可能与其他请求共享，增删工具请使用 `ToolSet.with_changes()`"""
     contexts: list[dict] = field(default_factory=list)
     """
     OpenAI 格式上下文列表。
@@ -199,6 +199,26 @@ class ProviderRequest:
         return ""
 
 
+@dataclass
+class TokenUsage:
+    input_tokens: int = 0
+    """Uncached input tokens."""
+    output_tokens: int = 0
+    """Output tokens."""
+    cache_creation_input_tokens: int = 0
+    """Input tokens written to the provider's prompt cache."""
+    cache_read_input_tokens: int = 0
+    """Input tokens served from the provider's prompt cache."""
+
+    @property
+    def total_input_tokens(self) -> int:
+        return (
+            self.input_tokens
+            + self.cache_creation_input_tokens
+            + self.cache_read_input_tokens
+        )
+
+
 @dataclass
 class LLMResponse:
     role: str
@@ -227,6 +247,9 @@ class LLMResponse:
     is_chunk: bool = False
     """Indicates if the response is a chunked response."""
 
+    usage: TokenUsage | None = None
+    """Token usage reported by the provider, including prompt cache hits."""
+
     def __init__(
         self,
         role: str,
@@ -241,6 +264,7 @@ class LLMResponse:
         | AnthropicMessage
         | None = None,
         is_chunk: bool = False,
+        usage: TokenUsage | None = None,
     ):
         """初始化 LLMResponse
 
@@ -251,6 +275,7 @@ class LLMResponse:
             tools_call_args (List[Dict[str, any]], optional): 工具调用参数. Defaults to None.
             tools_call_name (List[str], optional): 工具调用名称. Defaults to None.
             raw_completion (ChatCompletion, optional): 原始响应, OpenAI 格式. Defaults to None.
+            usage (TokenUsage, optional): Token 用量，包含提示词缓存命中情况. Defaults to None.
 
         """
         if tools_call_args is None:
@@ -271,6 +296,7 @@ class LLMResponse:
         self.tools_call_extra_content = tools_call_extra_content
         self.raw_completion = raw_completion
         self.is_chunk = is_chunk
+        self.usage = usage
 
     @property
     def completion_text(self):
@@ -11,7 +11,12 @@ import aiohttp
 
 from astrbot import logger
 from astrbot.core import sp
-from astrbot.core.agent.mcp_client import MCPClient, MCPTool
+from astrbot.core.agent.mcp_client import (
+    RECONNECT_BACKOFF_MAX,
+    RECONNECT_BACKOFF_MIN,
+    MCPClient,
+    MCPTool,
+)
 from astrbot.core.agent.tool import FunctionTool, ToolSet
 from astrbot.core.utils.astrbot_path import get_astrbot_data_path
 
@@ -109,6 +114,18 @@ class FunctionToolManager:
         self.mcp_client_dict: dict[str, MCPClient] = {}
         """MCP 服务列表"""
         self.mcp_client_event: dict[str, asyncio.Event] = {}
+        self._version = 0
+        """工具列表版本号，在添加、删除、激活、停用工具时递增"""
+        self._active_tool_set: ToolSet | None = None
+        self._active_tool_set_key: tuple | None = None
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def mark_tools_changed(self) -> None:
+        """标记工具列表已变更，使缓存的工具集与 schema 失效"""
+        self._version += 1
 
     def empty(self) -> bool:
         return len(self.func_list) == 0
@@ -160,6 +177,7 @@ class FunctionToolManager:
                 handler=handler,
             ),
         )
+        self.mark_tools_changed()
         logger.info(f"添加函数调用工具: {name}")
 
     def remove_func(self, name: str) -> None:
@@ -167,6 +185,7 @@ class FunctionToolManager:
         for i, f in enumerate(self.func_list):
             if f.name == name:
                 self.func_list.pop(i)
+                self.mark_tools_changed()
                 break
 
     def get_func(self, name) -> FuncTool | None:
@@ -179,6 +198,17 @@ class FunctionToolManager:
         tool_set = ToolSet(self.func_list.copy())
         return tool_set
 
+    def get_active_tool_set(self) -> ToolSet:
+        """获取**已经激活**的工具集。
+
+        结果按工具列表版本号缓存，调用方不应修改返回的工具集。
+        """
+        key = (self._version, id(self.func_list), len(self.func_list))
+        if self._active_tool_set is None or self._active_tool_set_key != key:
+            self._active_tool_set = ToolSet([f for f in self.func_list if f.active])
+            self._active_tool_set_key = key
+        return self._active_tool_set
+
     async def init_mcp_clients(self) -> None:
         """从项目根目录读取 mcp_server.json 文件，初始化 MCP 服务列表。文件格式如下：
         ```
@@ -212,15 +242,27 @@ class FunctionToolManager:
             open(mcp_json_file, encoding="utf-8"),
         )["mcpServers"]
 
+        # 各服务并发启动，单个服务的连接超时由 connect_timeout 控制，不会拖慢其他服务
+        ready_futures: dict[str, asyncio.Future] = {}
         for name in mcp_server_json_obj:
             cfg = mcp_server_json_obj[name]
             if cfg.get("active", True):
                 event = asyncio.Event()
+                ready_futures[name] = asyncio.get_running_loop().create_future()
                 asyncio.create_task(
-                    self._init_mcp_client_task_wrapper(name, cfg, event),
+                    self._init_mcp_client_task_wrapper(
+                        name, cfg, event, ready_futures[name]
+                    ),
                 )
                 self.mcp_client_event[name] = event
 
+        if ready_futures:
+            results = await asyncio.gather(
+                *ready_futures.values(), return_exceptions=True
+            )
+            ok = sum(1 for r in results if not isinstance(r, BaseException))
+            logger.info(f"MCP 服务启动完成: {ok}/{len(results)} 个服务已连接")
+
     async def _init_mcp_client_task_wrapper(
         self,
         name: str,
@@ -228,25 +270,12 @@ class FunctionToolManager:
         event: asyncio.Event,
         ready_future: asyncio.Future | None = None,
     ) -> None:
-        """初始化 MCP 客户端的包装函数，用于捕获异常"""
-        try:
-            await self._init_mcp_client(name, cfg)
-            tools = await self.mcp_client_dict[name].list_tools_and_save()
-            if ready_future and not ready_future.done():
-                # tell the caller we are ready
-                ready_future.set_result(tools)
-            await event.wait()
-            logger.info(f"收到 MCP 客户端 {name} 终止信号")
-        except Exception as e:
-            logger.error(f"初始化 MCP 客户端 {name} 失败", exc_info=True)
-            if ready_future and not ready_future.done():
-                ready_future.set_exception(e)
-        finally:
-            # 无论如何都能清理
-            await self._terminate_mcp_client(name)
+        """MCP 客户端的守护任务。
 
-    async def _init_mcp_client(self, name: str, config: dict) -> None:
-        """初始化单个MCP客户端"""
+        连接的建立与关闭都在这个任务中进行(MCP 的 anyio 上下文要求同一个任务进入和退出)。
+        连接成功后定期检查连接状态，连接断开时按指数退避在后台重连，收到工具列表变更通知时刷新工具。
+        首次连接失败时立即通过 ready_future 报告错误，之后同样按指数退避在后台重试。
+        """
         # 先清理之前的客户端，如果存在
         if name in self.mcp_client_dict:
             await self._terminate_mcp_client(name)
@@ -254,11 +283,67 @@ class FunctionToolManager:
         mcp_client = MCPClient()
         mcp_client.name = name
         self.mcp_client_dict[name] = mcp_client
-        await mcp_client.connect_to_server(config, name)
-        tools_res = await mcp_client.list_tools_and_save()
-        logger.debug(f"MCP server {name} list tools response: {tools_res}")
-        tool_names = [tool.name for tool in tools_res.tools]
+        backoff = RECONNECT_BACKOFF_MIN
+        try:
+            while not event.is_set():
+                try:
+                    tools_res = await mcp_client.connect(cfg, name)
+                except Exception as e:
+                    if ready_future is not None and not ready_future.done():
+                        # 首次连接失败
+                        logger.error(
+                            f"初始化 MCP 客户端 {name} 失败: {e!r}，{backoff} 秒后重试"
+                        )
+                        ready_future.set_exception(e)
+                    else:
+                        logger.error(
+                            f"重连 MCP 服务 {name} 失败: {e!r}，{backoff} 秒后重试"
+                        )
+                    try:
+                        await asyncio.wait_for(event.wait(), timeout=backoff)
+                    except asyncio.TimeoutError:
+                        pass
+                    backoff = min(backoff * 2, RECONNECT_BACKOFF_MAX)
+                    continue
+
+                backoff = RECONNECT_BACKOFF_MIN
+                logger.debug(f"MCP server {name} list tools response: {tools_res}")
+                self._register_mcp_tools(name, mcp_client)
+                if ready_future is not None and not ready_future.done():
+                    # tell the caller we are ready
+                    ready_future.set_result(tools_res)
+
+                while True:
+                    reason = await mcp_client.watch(event)
+                    if reason != "tools_changed":
+                        break
+                    try:
+                        await mcp_client.list_tools_and_save(refresh=True)
+                        self._register_mcp_tools(name, mcp_client)
+                    except Exception as e:
+                        logger.warning(f"刷新 MCP 服务 {name} 的工具列表失败: {e!r}")
+                        mcp_client.mark_lost()
+                        break
+
+                await mcp_client.close_session()
+                if not event.is_set():
+                    logger.warning(f"MCP 服务 {name} 连接已断开，正在后台重连")
+            logger.info(f"收到 MCP 客户端 {name} 终止信号")
+        except Exception as e:
+            logger.error(f"MCP 客户端 {name} 运行出错", exc_info=True)
+            if ready_future and not ready_future.done():
+                ready_future.set_exception(e)
+        finally:
+            if ready_future is not None and not ready_future.done():
+                ready_future.set_exception(Exception(f"MCP 客户端 {name} 已终止"))
+            # 无论如何都能清理
+            if self.mcp_client_dict.get(name) is mcp_client:
+                await self._terminate_mcp_client(name)
+            else:
+                await mcp_client.cleanup()
 
+    def _register_mcp_tools(self, name: str, mcp_client: MCPClient) -> None:
+        """用 MCP 服务当前的工具列表替换该服务之前注册的工具"""
         # 移除该MCP服务之前的工具（如有）
         self.func_list = [
             f
@@ -274,7 +359,9 @@ class FunctionToolManager:
                 mcp_server_name=name,
             )
             self.func_list.append(func_tool)
+        self.mark_tools_changed()
 
+        tool_names = [tool.name for tool in mcp_client.tools]
         logger.info(f"已连接 MCP 服务 {name}, Tools: {tool_names}")
 
     async def _terminate_mcp_client(self, name: str) -> None:
@@ -295,6 +382,7 @@ class FunctionToolManager:
                     for f in self.func_list
                     if not (isinstance(f, MCPTool) and f.mcp_server_name == name)
                 ]
+                self.mark_tools_changed()
                 logger.info(f"已关闭 MCP 服务 {name}")
 
     @staticmethod
@@ -340,7 +428,7 @@ class FunctionToolManager:
         if not event:
             event = asyncio.Event()
         if not ready_future:
-            ready_future = asyncio.Future()
+            ready_future = asyncio.get_running_loop().create_future()
         if name in self.mcp_client_dict:
             return
         asyncio.create_task(
@@ -385,6 +473,7 @@ class FunctionToolManager:
                     for f in self.func_list
                     if not (isinstance(f, MCPTool) and f.mcp_server_name == name)
                 ]
+                self.mark_tools_changed()
         else:
             running_events = [
                 client.running_event.wait() for client in self.mcp_client_dict.values()
@@ -400,26 +489,21 @@ class FunctionToolManager:
                 self.func_list = [
                     f for f in self.func_list if not isinstance(f, MCPTool)
                 ]
+                self.mark_tools_changed()
 
     def get_func_desc_openai_style(self, omit_empty_parameter_field=False) -> list:
         """获得 OpenAI API 风格的**已经激活**的工具描述"""
-        tools = [f for f in self.func_list if f.active]
-        toolset = ToolSet(tools)
-        return toolset.openai_schema(
+        return self.get_active_tool_set().openai_schema(
             omit_empty_parameter_field=omit_empty_parameter_field,
         )
 
     def get_func_desc_anthropic_style(self) -> list:
         """获得 Anthropic API 风格的**已经激活**的工具描述"""
-        tools = [f for f in self.func_list if f.active]
-        toolset = ToolSet(tools)
-        return toolset.anthropic_schema()
+        return self.get_active_tool_set().anthropic_schema()
 
     def get_func_desc_google_genai_style(self) -> dict:
         """获得 Google GenAI API 风格的**已经激活**的工具描述"""
-        tools = [f for f in self.func_list if f.active]
-        toolset = ToolSet(tools)
-        return toolset.google_schema()
+        return self.get_active_tool_set().google_schema()
 
     def deactivate_llm_tool(self, name: str) -> bool:
         """停用一个已经注册的函数调用工具。
@@ -431,6 +515,7 @@ class FunctionToolManager:
         func_tool = self.get_func(name)
         if func_tool is not None:
             func_tool.active = False
+            self.mark_tools_changed()
 
             inactivated_llm_tools: list = sp.get(
                 "inactivated_llm_tools",
@@ -461,6 +546,7 @@ class FunctionToolManager:
                     )
 
             func_tool.active = True
+            self.mark_tools_changed()
 
             inactivated_llm_tools: list = sp.get(
                 "inactivated_llm_tools",
@@ -0,0 +1,384 @@
+"""API Key 池。
+
+为同一提供商的多个 API Key 维护独立的客户端、并发计数、冷却时间与健康指标。
+请求通过 `APIKeyPool.acquire()` 租用一个 Key，而不是修改共享客户端的 api_key，
+因此并发请求之间不会互相串用 Key。
+"""
+
+import asyncio
+import email.utils
+import enum
+import inspect
+import re
+import time
+from collections.abc import AsyncIterator, Callable, Iterable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, Generic, TypeVar
+
+from astrbot import logger
+
+TClient = TypeVar("TClient")
+
+
+class KeyErrorKind(enum.Enum):
+    """API 错误的分类，决定是否换 Key 以及冷却多久"""
+
+    RATE_LIMITED = "rate_limited"
+    """请求过于频繁 (429)"""
+    QUOTA_EXHAUSTED = "quota_exhausted"
+    """额度耗尽"""
+    AUTH = "auth"
+    """Key 无效或无权限 (401/403)"""
+    SERVER = "server"
+    """服务端错误 (5xx)"""
+    NETWORK = "network"
+    """连接错误或超时"""
+    REQUEST = "request"
+    """请求本身的问题，与 Key 无关"""
+
+    @property
+    def should_rotate(self) -> bool:
+        """该错误是否应当换一个 Key 重试"""
+        return self in (
+            KeyErrorKind.RATE_LIMITED,
+            KeyErrorKind.QUOTA_EXHAUSTED,
+            KeyErrorKind.AUTH,
+            KeyErrorKind.SERVER,
+        )
+
+
+DEFAULT_COOLDOWNS: dict[KeyErrorKind, float] = {
+    KeyErrorKind.RATE_LIMITED: 10,
+    KeyErrorKind.QUOTA_EXHAUSTED: 600,
+    KeyErrorKind.AUTH: 1800,
+    KeyErrorKind.SERVER: 5,
+    KeyErrorKind.NETWORK: 0,
+    KeyErrorKind.REQUEST: 0,
+}
+MAX_COOLDOWN = 3600
+
+_QUOTA_CODES = {"insufficient_quota", "billing_hard_limit_reached", "quota_exceeded"}
+_AUTH_REASONS = {"API_KEY_INVALID", "API_KEY_EXPIRED", "PERMISSION_DENIED"}
+_NETWORK_ERROR_NAMES = {
+    "APIConnectionError",
+    "APITimeoutError",
+    "TransportError",
+    "TimeoutException",
+    "ClientConnectionError",
+    "ServerTimeoutError",
+}
+
+
+def _parse_duration(value: Any) -> float | None:
+    """解析 Retry-After 头(秒或 HTTP 日期)或 google.rpc.RetryInfo 的 `37s` 格式"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    value = str(value).strip()
+    if m := re.fullmatch(r"(\d+(?:\.\d+)?)s?", value):
+        return float(m.group(1))
+    try:
+        dt = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if dt is None:
+        return None
+    return max(0.0, dt.timestamp() - time.time())
+
+
+def _iter_error_details(details: Any) -> Iterable[dict]:
+    """遍历 google.rpc 风格的 error details"""
+    if isinstance(details, dict):
+        yield details
+        for value in details.values():
+            yield from _iter_error_details(value)
+    elif isinstance(details, list):
+        for item in details:
+            yield from _iter_error_details(item)
+
+
+def classify_api_error(e: BaseException) -> tuple[KeyErrorKind, float | None]:
+    """根据 SDK 异常的结构化字段(HTTP 状态码、错误码、响应头)对错误进行分类。
+
+    兼容 openai / anthropic 的 `APIStatusError` (status_code, code, response)
+    与 google-genai 的 `APIError` (code, status, details, response)。
+
+    Returns:
+        (错误分类, 服务端建议的重试等待秒数)
+
+    """
+    status = getattr(e, "status_code", None)
+    if not isinstance(status, int):
+        code = getattr(e, "code", None)
+        status = code if isinstance(code, int) else None
+
+    error_code = getattr(e, "code", None)
+    error_code = error_code.lower() if isinstance(error_code, str) else ""
+    rpc_status = getattr(e, "status", None)
+    rpc_status = rpc_status if isinstance(rpc_status, str) else ""
+
+    retry_after = None
+    response = getattr(e, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers is not None:
+        try:
+            if ms := headers.get("retry-after-ms"):
+                retry_after = float(ms) / 1000
+            else:
+                retry_after = _parse_duration(headers.get("retry-after"))
+        except (TypeError, ValueError):
+            retry_after = None
+
+    reasons: set[str] = set()
+    for detail in _iter_error_details(getattr(e, "details", None)):
+        if reason := detail.get("reason"):
+            reasons.add(str(reason))
+        if retry_after is None and "retryDelay" in detail:
+            retry_after = _parse_duration(detail["retryDelay"])
+        if isinstance(detail.get("type"), str):
+            # anthropic / openai error body: {"error": {"type": "...", "code": "..."}}
+            error_code = error_code or detail["type"].lower()
+        if isinstance(detail.get("code"), str):
+            error_code = error_code or detail["code"].lower()
+
+    body = getattr(e, "body", None)
+    if isinstance(body, dict):
+        for detail in _iter_error_details(body):
+            for k in ("code", "type"):
+                if isinstance(detail.get(k), str):
+                    error_code = error_code or detail[k].lower()
+
+    if reasons & _AUTH_REASONS or status in (401, 403):
+        return KeyErrorKind.AUTH, retry_after
+    if error_code in _QUOTA_CODES:
+        return KeyErrorKind.QUOTA_EXHAUSTED, retry_after
+    if status == 429 or rpc_status == "RESOURCE_EXHAUSTED":
+        return KeyErrorKind.RATE_LIMITED, retry_after
+    if error_code in ("rate_limit_exceeded", "rate_limit_error"):
+        return KeyErrorKind.RATE_LIMITED, retry_after
+    if status == 529 or error_code == "overloaded_error":
+        return KeyErrorKind.SERVER, retry_after
+    if isinstance(status, int) and status >= 500:
+        return KeyErrorKind.SERVER, retry_after
+    if isinstance(e, (asyncio.TimeoutError, TimeoutError, ConnectionError)) or any(
+        cls.__name__ in _NETWORK_ERROR_NAMES for cls in type(e).__mro__
+    ):
+        return KeyErrorKind.NETWORK, retry_after
+    return KeyErrorKind.REQUEST, retry_after
+
+
+@dataclass
+class KeyStats:
+    """单个 Key 的健康指标"""
+
+    key: str
+    in_flight: int = 0
+    requests: int = 0
+    successes: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    latency_ewma: float = 0.0
+    cooldown_until: float = 0.0
+    last_error: str = ""
+    errors_by_kind: dict[str, int] = field(default_factory=dict)
+
+    def cooling_down(self, now: float | None = None) -> bool:
+        return (now or time.monotonic()) < self.cooldown_until
+
+    def to_dict(self) -> dict:
+        now = time.monotonic()
+        return {
+            "key": f"{self.key[:8]}..." if len(self.key) > 8 else "***",
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "successes": self.successes,
+            "failures": self.failures,
+            "latency_ms": round(self.latency_ewma * 1000, 1),
+            "cooldown_remaining": round(max(0.0, self.cooldown_until - now), 1),
+            "last_error": self.last_error,
+            "errors_by_kind": dict(self.errors_by_kind),
+        }
+
+
+@dataclass
+class KeyLease(Generic[TClient]):
+    key: str
+    client: TClient
+
+
+class APIKeyPool(Generic[TClient]):
+    """并发安全的 API Key 池。
+
+    - 每个 Key 拥有独立的客户端(由 `client_factory` 惰性创建)，请求之间不共享可变状态。
+    - 选择当前未冷却、并发数最少的 Key；并发相同时优先选择近期失败少、延迟低的 Key。
+    - 失败时按错误分类与 `Retry-After` 设置冷却时间，连续失败时指数退避。
+    - `pin()` 指定优先使用的 Key(例如 `/key` 指令)，该 Key 冷却时仍会换用其他 Key。
+    """
+
+    LATENCY_ALPHA = 0.2
+    SLOW_LATENCY_RATIO = 2.0
+    """平均延迟超过最快 Key 的多少倍时视为慢 Key，在并发与失败数相同时排在后面"""
+
+    def __init__(
+        self,
+        keys: list[str],
+        client_factory: Callable[[str], TClient],
+        name: str = "",
+    ) -> None:
+        self.name = name
+        self._client_factory = client_factory
+        self._clients: dict[str, TClient] = {}
+        self._stats: dict[str, KeyStats] = {}
+        self._rr = 0
+        self._pinned: str | None = None
+        self.set_keys(keys)
+
+    def set_keys(self, keys: list[str]) -> None:
+        """更新 Key 列表，保留仍然存在的 Key 的客户端与指标，关闭被移除的 Key 的客户端"""
+        keys = list(dict.fromkeys(keys)) or [""]
+        self._stats = {k: self._stats.get(k) or KeyStats(key=k) for k in keys}
+        removed = [c for k, c in self._clients.items() if k not in self._stats]
+        self._clients = {k: c for k, c in self._clients.items() if k in self._stats}
+        if self._pinned not in self._stats:
+            self._pinned = None
+        for client in removed:
+            self._close_client(client)
+
+    @staticmethod
+    def _close_client(client: Any) -> None:
+        """关闭客户端(openai/anthropic 的 close()，google-genai 的 aclose())"""
+        close = getattr(client, "aclose", None) or getattr(client, "close", None)
+        if not callable(close):
+            return
+        try:
+            ret = close()
+        except Exception as e:
+            logger.debug(f"关闭 API 客户端失败: {e}")
+            return
+        if inspect.isawaitable(ret):
+            try:
+                asyncio.get_running_loop().create_task(ret)  # type: ignore
+            except RuntimeError:
+                # 没有运行中的事件循环，无法异步关闭
+                if inspect.iscoroutine(ret):
+                    ret.close()
+
+    def pin(self, key: str | None) -> None:
+        """优先使用指定的 Key，传入 None 取消"""
+        if key is not None and key not in self._stats:
+            raise ValueError(f"Key {key[:8]}... 不在 Key 池中")
+        self._pinned = key
+
+    @property
+    def keys(self) -> list[str]:
+        return list(self._stats)
+
+    def __len__(self) -> int:
+        return len(self._stats)
+
+    def client(self, key: str) -> TClient:
+        """获取某个 Key 对应的客户端"""
+        if key not in self._clients:
+            self._clients[key] = self._client_factory(key)
+        return self._clients[key]
+
+    def select(self, exclude: Iterable[str] = ()) -> str:
+        """选择一个 Key。所有候选都在冷却中时，返回最早结束冷却的那个。"""
+        exclude = set(exclude)
+        candidates = [s for k, s in self._stats.items() if k not in exclude]
+        if not candidates:
+            candidates = list(self._stats.values())
+        now = time.monotonic()
+        ready = [s for s in candidates if not s.cooling_down(now)]
+        if not ready:
+            return min(candidates, key=lambda s: s.cooldown_until).key
+        if self._pinned is not None and any(s.key == self._pinned for s in ready):
+            return self._pinned
+        self._rr += 1
+        n = len(ready)
+        # 延迟只区分明显偏慢的 Key，其余 Key 之间仍然轮询，避免请求全部集中到最快的 Key
+        fastest = min((s.latency_ewma for s in ready if s.latency_ewma > 0), default=0)
+        slow_above = fastest * self.SLOW_LATENCY_RATIO
+        best = min(
+            range(n),
+            key=lambda i: (
+                ready[i].in_flight,
+                ready[i].consecutive_failures,
+                fastest > 0 and ready[i].latency_ewma > slow_above,
+                (i - self._rr) % n,
+            ),
+        )
+        return ready[best].key
+
+    def has_available(self, exclude: Iterable[str] = ()) -> bool:
+        """是否还有未被排除且不在冷却中的 Key"""
+        exclude = set(exclude)
+        now = time.monotonic()
+        return any(
+            k not in exclude and not s.cooling_down(now) for k, s in self._stats.items()
+        )
+
+    @asynccontextmanager
+    async def acquire(
+        self,
+        exclude: Iterable[str] = (),
+    ) -> AsyncIterator[KeyLease[TClient]]:
+        """租用一个 Key，退出时自动记录成功/失败与耗时"""
+        key = self.select(exclude)
+        stats = self._stats[key]
+        stats.in_flight += 1
+        stats.requests += 1
+        start = time.monotonic()
+        try:
+            yield KeyLease(key=key, client=self.client(key))
+        except Exception as e:
+            self.report_failure(key, e)
+            raise
+        else:
+            self.report_success(key, time.monotonic() - start)
+        finally:
+            stats.in_flight -= 1
+
+    def report_success(self, key: str, latency: float) -> None:
+        stats = self._stats.get(key)
+        if not stats:
+            return
+        stats.successes += 1
+        stats.consecutive_failures = 0
+        if stats.latency_ewma == 0:
+            stats.latency_ewma = latency
+        else:
+            stats.latency_ewma += self.LATENCY_ALPHA * (latency - stats.latency_ewma)
+
+    def report_failure(self, key: str, error: BaseException) -> KeyErrorKind:
+        """记录失败并按错误分类设置冷却，返回错误分类"""
+        kind, retry_after = classify_api_error(error)
+        stats = self._stats.get(key)
+        if not stats:
+            return kind
+        stats.failures += 1
+        stats.last_error = f"{type(error).__name__}: {str(error)[:200]}"
+        stats.errors_by_kind[kind.value] = stats.errors_by_kind.get(kind.value, 0) + 1
+        if not kind.should_rotate:
+            return kind
+        stats.consecutive_failures += 1
+        cooldown = retry_after
+        if cooldown is None:
+            base = DEFAULT_COOLDOWNS[kind]
+            cooldown = base * (2 ** min(stats.consecutive_failures - 1, 6))
+        cooldown = min(cooldown, MAX_COOLDOWN)
+        if cooldown > 0:
+            stats.cooldown_until = max(
+                stats.cooldown_until,
+                time.monotonic() + cooldown,
+            )
+            logger.warning(
+                f"{self.name} API Key {key[:12]} 出现 {kind.value} 错误，冷却 {cooldown:.1f} 秒。",
+            )
+        return kind
+
+    def stats(self) -> list[dict]:
+        """每个 Key 的成功率、延迟、错误与冷却状态"""
+        return [s.to_dict() for s in self._stats.values()]
@@ -182,13 +182,30 @@ class ProviderManager:
         return provider
 
     async def initialize(self):
-        # 逐个初始化提供商
-        for provider_config in self.providers_config:
-            try:
-                await self.load_provider(provider_config)
-            except Exception as e:
-                logger.error(traceback.format_exc())
-                logger.error(e)
+        # 并发初始化提供商, 单个提供商的网络请求或模型加载不再阻塞其他提供商
+        results = await asyncio.gather(
+            *(self.load_provider(c) for c in self.providers_config),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error("".join(traceback.format_exception(result)))
+                logger.error(result)
+
+        # 加载完成的顺序不确定, 按配置顺序排列, 保证默认提供商的选择与之前一致
+        order = {c.get("id"): i for i, c in enumerate(self.providers_config)}
+
+        def _by_config_order(inst) -> int:
+            return order.get(inst.provider_config.get("id"), len(order))
+
+        for insts in (
+            self.provider_insts,
+            self.stt_provider_insts,
+            self.tts_provider_insts,
+            self.embedding_provider_insts,
+            self.rerank_provider_insts,
+        ):
+            insts.sort(key=_by_config_order)
 
         # 设置默认提供商
         selected_provider_id = sp.get(
@@ -9,8 +9,10 @@ from anthropic.types import Message
 
 from astrbot import logger
 from astrbot.api.provider import Provider
-from astrbot.core.provider.entities import LLMResponse
+from astrbot.core.agent.context_budget import TOKEN_COUNT_KEY
+from astrbot.core.provider.entities import LLMResponse, TokenUsage
 from astrbot.core.provider.func_tool_manager import ToolSet
+from astrbot.core.provider.key_pool import APIKeyPool, classify_api_error
 from astrbot.core.utils.io import download_image_by_url
 
 from ..register import register_provider_adapter
@@ -21,6 +23,9 @@ from ..register import register_provider_adapter
     "Anthropic Claude API 提供商适配器",
 )
 class ProviderAnthropic(Provider):
+    MAX_CACHE_BREAKPOINTS = 4
+    CACHE_CONTROL = {"type": "ephemeral"}
+
     def __init__(
         self,
         provider_config,
@@ -39,13 +44,20 @@ class ProviderAnthropic(Provider):
         if isinstance(self.timeout, str):
             self.timeout = int(self.timeout)
 
-        self.client = AsyncAnthropic(
-            api_key=self.chosen_api_key,
-            timeout=self.timeout,
-            base_url=self.base_url,
+        # 每个 Key 使用独立的客户端，避免并发请求间修改共享的 api_key
+        self.key_pool: APIKeyPool[AsyncAnthropic] = APIKeyPool(
+            self.api_keys,
+            lambda key: AsyncAnthropic(
+                api_key=key,
+                timeout=self.timeout,
+                base_url=self.base_url,
+            ),
+            name=provider_config.get("id", "anthropic"),
         )
+        self.client = self.key_pool.client(self.api_keys[0])
 
         self.set_model(provider_config["model_config"]["model"])
+        self.prompt_cache: bool = provider_config.get("prompt_cache", True)
 
     def _prepare_payload(self, messages: list[dict]):
         """准备 Anthropic API 的请求 payload
@@ -107,12 +119,92 @@ class ProviderAnthropic(Provider):
 
         return system_prompt, new_messages
 
-    async def _query(self, payloads: dict, tools: ToolSet | None) -> LLMResponse:
+    def _apply_cache_breakpoints(self, payloads: dict) -> None:
+        """为请求添加提示词缓存断点(cache_control)。
+
+        依次标记工具列表、系统提示词、倒数第二条与最后一条 user 消息，
+        使工具定义、人格以及已有的对话前缀可以跨轮次、跨工具调用步骤命中缓存。
+        不超过 Anthropic 单次请求最多 4 个断点的限制。
+        不会修改传入的 tools/messages 中的原对象(它们可能被缓存或属于对话历史)。
+        """
+        if not self.prompt_cache:
+            return
+        remaining = self.MAX_CACHE_BREAKPOINTS
+
+        if tools := payloads.get("tools"):
+            payloads["tools"] = [
+                *tools[:-1],
+                {**tools[-1], "cache_control": self.CACHE_CONTROL},
+            ]
+            remaining -= 1
+
+        system = payloads.get("system")
+        if isinstance(system, str) and system.strip():
+            payloads["system"] = [
+                {"type": "text", "text": system, "cache_control": self.CACHE_CONTROL},
+            ]
+            remaining -= 1
+
+        messages: list[dict] = payloads.get("messages", [])
+        user_indexes = [i for i, m in enumerate(messages) if m.get("role") == "user"]
+        # 最后一条 user 消息写入本轮缓存；倒数第二条 user 消息命中上一轮写入的缓存
+        for idx in reversed(user_indexes[-2:]):
+            if remaining <= 0:
+                break
+            marked = self._mark_message_cache(messages[idx])
+            if marked is not None:
+                messages[idx] = marked
+                remaining -= 1
+
+    def _mark_message_cache(self, message: dict) -> dict | None:
+        """返回在最后一个内容块上带有 cache_control 的消息副本"""
+        content = message.get("content")
+        if isinstance(content, str):
+            if not content.strip():
+                return None
+            blocks = [{"type": "text", "text": content}]
+        elif isinstance(content, list) and content:
+            blocks = list(content)
+        else:
+            return None
+        last = blocks[-1]
+        if not isinstance(last, dict):
+            return None
+        if last.get("type") == "text" and not str(last.get("text", "")).strip():
+            return None
+        blocks[-1] = {**last, "cache_control": self.CACHE_CONTROL}
+        return {**message, "content": blocks}
+
+    @staticmethod
+    def _parse_usage(usage) -> TokenUsage | None:
+        if usage is None:
+            return None
+        return TokenUsage(
+            input_tokens=getattr(usage, "input_tokens", 0) or 0,
+            output_tokens=getattr(usage, "output_tokens", 0) or 0,
+            cache_creation_input_tokens=getattr(
+                usage,
+                "cache_creation_input_tokens",
+                0,
+            )
+            or 0,
+            cache_read_input_tokens=getattr(usage, "cache_read_input_tokens", 0) or 0,
+        )
+
+    async def _query(
+        self,
+        payloads: dict,
+        tools: ToolSet | None,
+        client: AsyncAnthropic | None = None,
+    ) -> LLMResponse:
+        client = client or self.client
         if tools:
             if tool_list := tools.get_func_desc_anthropic_style():
                 payloads["tools"] = tool_list
 
-        completion = await self.client.messages.create(**payloads, stream=False)
+        self._apply_cache_breakpoints(payloads)
+
+        completion = await client.messages.create(**payloads, stream=False)
 
         assert isinstance(completion, Message)
         logger.debug(f"completion: {completion}")
@@ -121,6 +213,8 @@ class ProviderAnthropic(Provider):
             raise Exception("API 返回的 completion 为空。")
 
         llm_response = LLMResponse(role="assistant")
+        llm_response.raw_completion = completion
+        llm_response.usage = self._parse_usage(completion.usage)
 
         for content_block in completion.content:
             if content_block.type == "text":
@@ -141,21 +235,31 @@ class ProviderAnthropic(Provider):
         self,
         payloads: dict,
         tools: ToolSet | None,
+        client: AsyncAnthropic | None = None,
     ) -> AsyncGenerator[LLMResponse, None]:
+        client = client or self.client
         if tools:
             if tool_list := tools.get_func_desc_anthropic_style():
                 payloads["tools"] = tool_list
 
+        self._apply_cache_breakpoints(payloads)
+
         # 用于累积工具调用信息
         tool_use_buffer = {}
         # 用于累积最终结果
         final_text = ""
         final_tool_calls = []
+        usage: TokenUsage | None = None
 
-        async with self.client.messages.stream(**payloads) as stream:
+        async with client.messages.stream(**payloads) as stream:
             assert isinstance(stream, anthropic.AsyncMessageStream)
             async for event in stream:
-                if event.type == "content_block_start":
+                if event.type == "message_start":
+                    usage = self._parse_usage(event.message.usage)
+                elif event.type == "message_delta":
+                    if usage is not None and event.usage is not None:
+                        usage.output_tokens = event.usage.output_tokens or 0
+                elif event.type == "content_block_start":
                     if event.content_block.type == "text":
                         # 文本块开始
                         yield LLMResponse(
@@ -228,7 +332,13 @@ class ProviderAnthropic(Provider):
             role="assistant",
             completion_text=final_text,
             is_chunk=False,
+            usage=usage,
         )
+        if usage is not None:
+            logger.debug(
+                f"Anthropic prompt cache: read {usage.cache_read_input_tokens}, "
+                f"write {usage.cache_creation_input_tokens}, uncached {usage.input_tokens}",
+            )
 
         if final_tool_calls:
             final_response.tools_call_args = [
@@ -266,6 +376,7 @@ class ProviderAnthropic(Provider):
         for part in context_query:
             if "_no_save" in part:
                 del part["_no_save"]
+            part.pop(TOKEN_COUNT_KEY, None)
 
         # tool calls result
         if tool_calls_result:
@@ -286,14 +397,18 @@ class ProviderAnthropic(Provider):
         if system_prompt:
             payloads["system"] = system_prompt
 
-        llm_response = None
-        try:
-            llm_response = await self._query(payloads, func_tool)
-        except Exception as e:
-            logger.error(f"发生了错误。Provider 配置如下: {model_config}")
-            raise e
-
-        return llm_response
+        tried_keys: set[str] = set()
+        while True:
+            chosen_key = ""
+            try:
+                async with self.key_pool.acquire(exclude=tried_keys) as lease:
+                    chosen_key = lease.key
+                    return await self._query(payloads, func_tool, lease.client)
+            except Exception as e:
+                if self._should_retry_with_other_key(e, chosen_key, tried_keys):
+                    continue
+                logger.error(f"发生了错误。Provider 配置如下: {model_config}")
+                raise e
 
     async def text_chat_stream(
         self,
@@ -321,6 +436,7 @@ class ProviderAnthropic(Provider):
         for part in context_query:
             if "_no_save" in part:
                 del part["_no_save"]
+            part.pop(TOKEN_COUNT_KEY, None)
 
         # tool calls result
         if tool_calls_result:
@@ -341,8 +457,48 @@ class ProviderAnthropic(Provider):
         if system_prompt:
             payloads["system"] = system_prompt
 
-        async for llm_response in self._query_stream(payloads, func_tool):
-            yield llm_response
+        tried_keys: set[str] = set()
+        while True:
+            chosen_key = ""
+            yielded = False
+            try:
+                async with self.key_pool.acquire(exclude=tried_keys) as lease:
+                    chosen_key = lease.key
+                    async for llm_response in self._query_stream(
+                        payloads,
+                        func_tool,
+                        lease.client,
+                    ):
+                        yielded = True
+                        yield llm_response
+                return
+            except Exception as e:
+                # 已经输出了部分内容时不再重试，避免重复输出
+                if not yielded and self._should_retry_with_other_key(
+                    e,
+                    chosen_key,
+                    tried_keys,
+                ):
+                    continue
+                raise e
+
+    def _should_retry_with_other_key(
+        self,
+        e: Exception,
+        chosen_key: str,
+        tried_keys: set[str],
+    ) -> bool:
+        """Key 相关的错误在还有可用 Key 时换 Key 重试"""
+        kind, _ = classify_api_error(e)
+        if not kind.should_rotate:
+            return False
+        tried_keys.add(chosen_key)
+        if not self.key_pool.has_available(exclude=tried_keys):
+            return False
+        logger.warning(
+            f"API Key 出现 {kind.value} 错误，尝试使用其他 Key 重试。当前 Key: {chosen_key[:12]}",
+        )
+        return True
 
     async def assemble_context(self, text: str, image_urls: list[str] | None = None):
         """组装上下文，支持文本和图片"""
@@ -409,4 +565,10 @@ class ProviderAnthropic(Provider):
         return models_str
 
     def set_key(self, key: str):
+        self.key_pool.pin(key)
         self.chosen_api_key = key
+        self.client = self.key_pool.client(key)
+
+    def get_key_stats(self) -> list[dict]:
+        """各个 API Key 的健康指标"""
+        return self.key_pool.stats()
@@ -6,6 +6,7 @@ from dashscope import Application
 from dashscope.app.application_response import ApplicationResponse
 
 from astrbot.core import logger, sp
+from astrbot.core.agent.context_budget import TOKEN_COUNT_KEY
 from astrbot.core.message.message_event_result import MessageChain
 
 from .. import Provider
@@ -96,6 +97,7 @@ class ProviderDashscope(ProviderOpenAIOfficial):
             for part in context_query:
                 if "_no_save" in part:
                     del part["_no_save"]
+                part.pop(TOKEN_COUNT_KEY, None)
             # 调用阿里云百炼 API
             payload = {
                 "app_id": self.app_id,
@@ -1,12 +1,11 @@
-import asyncio
 import os
-import subprocess
 import uuid
 
 import edge_tts
 
 from astrbot.core import logger
 from astrbot.core.utils.astrbot_path import get_astrbot_data_path
+from astrbot.core.utils.audio_converter import audio_converter
 
 from ..entities import ProviderType
 from ..provider import TTSProvider
@@ -63,41 +62,8 @@ class ProviderEdgeTTS(TTSProvider):
             communicate = edge_tts.Communicate(proxy=self.proxy, **kwargs)
             await communicate.save(mp3_path)
 
-            try:
-                from pyffmpeg import FFmpeg
-
-                ff = FFmpeg()
-                ff.convert(input=mp3_path, output=wav_path)
-            except Exception as e:
-                logger.debug(f"pyffmpeg 转换失败: {e}, 尝试使用 ffmpeg 命令行进行转换")
-                # use ffmpeg command line
-
-                # 使用ffmpeg将MP3转换为标准WAV格式
-                p = await asyncio.create_subprocess_exec(
-                    "ffmpeg",
-                    "-y",  # 覆盖输出文件
-                    "-i",
-                    mp3_path,  # 输入文件
-                    "-acodec",
-                    "pcm_s16le",  # 16位PCM编码
-                    "-ar",
-                    "24000",  # 采样率24kHz (适合微信语音)
-                    "-ac",
-                    "1",  # 单声道
-                    "-af",
-                    "apad=pad_dur=2",  # 确保输出时长准确
-                    "-fflags",
-                    "+genpts",  # 强制生成时间戳
-                    "-hide_banner",  # 隐藏版本信息
-                    wav_path,  # 输出文件
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                )
-                # 等待进程完成并获取输出
-                stdout, stderr = await p.communicate()
-                logger.info(f"[EdgeTTS] FFmpeg 标准输出: {stdout.decode().strip()}")
-                logger.debug(f"FFmpeg错误输出: {stderr.decode().strip()}")
-                logger.info(f"[EdgeTTS] 返回值(0代表成功): {p.returncode}")
+            # 转换为标准 WAV 格式(24kHz 单声道 16 位 PCM)
+            await audio_converter.convert_to_path(mp3_path, "wav", wav_path)
 
             os.remove(mp3_path)
             if os.path.exists(wav_path) and os.path.getsize(wav_path) > 0:
@@ -105,17 +71,6 @@ class ProviderEdgeTTS(TTSProvider):
             logger.error("生成的WAV文件不存在或为空")
             raise RuntimeError("生成的WAV文件不存在或为空")
 
-        except subprocess.CalledProcessError as e:
-            logger.error(
-                f"FFmpeg 转换失败: {e.stderr.decode() if e.stderr else str(e)}",
-            )
-            try:
-                if os.path.exists(mp3_path):
-                    os.remove(mp3_path)
-            except Exception:
-                pass
-            raise RuntimeError(f"FFmpeg 转换失败: {e!s}")
-
         except Exception as e:
             logger.error(f"音频生成失败: {e!s}")
             try:
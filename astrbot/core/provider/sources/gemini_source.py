@@ -1,20 +1,25 @@
-import asyncio
 import base64
 import json
 import logging
-import random
 from collections.abc import AsyncGenerator
 
 from google import genai
 from google.genai import types
+from google.genai.client import AsyncClient
 from google.genai.errors import APIError
 
 import astrbot.core.message.components as Comp
 from astrbot import logger
 from astrbot.api.provider import Provider
+from astrbot.core.agent.context_budget import TOKEN_COUNT_KEY
 from astrbot.core.message.message_event_result import MessageChain
 from astrbot.core.provider.entities import LLMResponse
 from astrbot.core.provider.func_tool_manager import ToolSet
+from astrbot.core.provider.key_pool import (
+    APIKeyPool,
+    KeyErrorKind,
+    classify_api_error,
+)
 from astrbot.core.utils.io import download_image_by_url
 
 from ..register import register_provider_adapter
@@ -66,20 +71,29 @@ class ProviderGoogleGenAI(Provider):
         if self.api_base and self.api_base.endswith("/"):
             self.api_base = self.api_base[:-1]
 
+        # 每个 Key 使用独立的客户端，避免并发请求间切换共享客户端
+        self.key_pool: APIKeyPool[AsyncClient] = APIKeyPool(
+            self.api_keys,
+            self._create_client,
+            name=provider_config.get("id", "gemini"),
+        )
         self._init_client()
         self.set_model(provider_config["model_config"]["model"])
         self._init_safety_settings()
 
-    def _init_client(self) -> None:
-        """初始化Gemini客户端"""
-        self.client = genai.Client(
-            api_key=self.chosen_api_key,
+    def _create_client(self, api_key: str) -> AsyncClient:
+        return genai.Client(
+            api_key=api_key,
             http_options=types.HttpOptions(
                 base_url=self.api_base,
                 timeout=self.timeout * 1000,  # 毫秒
             ),
         ).aio
 
+    def _init_client(self) -> None:
+        """初始化Gemini客户端"""
+        self.client = self.key_pool.client(self.chosen_api_key)
+
     def _init_safety_settings(self) -> None:
         """初始化安全设置"""
         user_safety_config = self.provider_config.get("gm_safety_settings", {})
@@ -93,24 +107,32 @@ class ProviderGoogleGenAI(Provider):
             and threshold_str in self.THRESHOLD_MAPPING
         ]
 
-    async def _handle_api_error(self, e: APIError, keys: list[str]) -> bool:
-        """处理API错误，返回是否需要重试"""
+    async def _handle_api_error(
+        self,
+        e: APIError,
+        chosen_key: str,
+        tried_keys: set[str],
+    ) -> bool:
+        """处理API错误，返回是否需要换 Key 重试。Key 的冷却由 Key 池负责。"""
         if e.message is None:
             e.message = ""
 
-        if e.code == 429 or "API key not valid" in e.message:
-            keys.remove(self.chosen_api_key)
-            if len(keys) > 0:
-                self.set_key(random.choice(keys))
+        kind, _ = classify_api_error(e)
+        if kind.should_rotate:
+            tried_keys.add(chosen_key)
+            if self.key_pool.has_available(exclude=tried_keys):
                 logger.info(
-                    f"检测到 Key 异常({e.message})，正在尝试更换 API Key 重试... 当前 Key: {self.chosen_api_key[:12]}...",
+                    f"检测到 Key 异常({kind.value}: {e.message})，正在尝试更换 API Key 重试... 当前 Key: {chosen_key[:12]}...",
                 )
-                await asyncio.sleep(1)
                 return True
             logger.error(
-                f"检测到 Key 异常({e.message})，且已没有可用的 Key。 当前 Key: {self.chosen_api_key[:12]}...",
+                f"检测到 Key 异常({kind.value}: {e.message})，且已没有可用的 Key。 当前 Key: {chosen_key[:12]}...",
             )
-            raise Exception("达到了 Gemini 速率限制, 请稍后再试...")
+            if kind in (KeyErrorKind.RATE_LIMITED, KeyErrorKind.QUOTA_EXHAUSTED):
+                raise Exception("达到了 Gemini 速率限制, 请稍后再试...")
+            if kind == KeyErrorKind.AUTH:
+                raise Exception(f"Gemini API Key 无效或无权限: {e.message}")
+            raise Exception(f"Gemini 服务暂时不可用 (HTTP {e.code}), 请稍后再试...")
         logger.error(
             f"发生了错误(gemini_source)。Provider 配置如下: {self.provider_config}",
         )
@@ -422,8 +444,14 @@ class ProviderGoogleGenAI(Provider):
                 chain.append(Comp.Image.fromBytes(part.inline_data.data))
         return MessageChain(chain=chain)
 
-    async def _query(self, payloads: dict, tools: ToolSet | None) -> LLMResponse:
+    async def _query(
+        self,
+        payloads: dict,
+        tools: ToolSet | None,
+        client: AsyncClient | None = None,
+    ) -> LLMResponse:
         """非流式请求 Gemini API"""
+        client = client or self.client
         system_instruction = next(
             (msg["content"] for msg in payloads["messages"] if msg["role"] == "system"),
             None,
@@ -446,7 +474,7 @@ class ProviderGoogleGenAI(Provider):
                     modalities,
                     temperature,
                 )
-                result = await self.client.models.generate_content(
+                result = await client.models.generate_content(
                     model=self.get_model(),
                     contents=conversation,
                     config=config,
@@ -505,8 +533,10 @@ class ProviderGoogleGenAI(Provider):
         self,
         payloads: dict,
         tools: ToolSet | None,
+        client: AsyncClient | None = None,
     ) -> AsyncGenerator[LLMResponse, None]:
         """流式请求 Gemini API"""
+        client = client or self.client
         system_instruction = next(
             (msg["content"] for msg in payloads["messages"] if msg["role"] == "system"),
             None,
@@ -522,7 +552,7 @@ class ProviderGoogleGenAI(Provider):
                     tools,
                     system_instruction,
                 )
-                result = await self.client.models.generate_content_stream(
+                result = await client.models.generate_content_stream(
                     model=self.get_model(),
                     contents=conversation,
                     config=config,
@@ -641,6 +671,7 @@ class ProviderGoogleGenAI(Provider):
         for part in context_query:
             if "_no_save" in part:
                 del part["_no_save"]
+            part.pop(TOKEN_COUNT_KEY, None)
 
         # tool calls result
         if tool_calls_result:
@@ -656,13 +687,16 @@ class ProviderGoogleGenAI(Provider):
         payloads = {"messages": context_query, **model_config}
 
         retry = 10
-        keys = self.api_keys.copy()
+        tried_keys: set[str] = set()
 
         for _ in range(retry):
+            chosen_key = ""
             try:
-                return await self._query(payloads, func_tool)
+                async with self.key_pool.acquire(exclude=tried_keys) as lease:
+                    chosen_key = lease.key
+                    return await self._query(payloads, func_tool, lease.client)
             except APIError as e:
-                if await self._handle_api_error(e, keys):
+                if await self._handle_api_error(e, chosen_key, tried_keys):
                     continue
                 break
 
@@ -694,6 +728,7 @@ class ProviderGoogleGenAI(Provider):
         for part in context_query:
             if "_no_save" in part:
                 del part["_no_save"]
+            part.pop(TOKEN_COUNT_KEY, None)
 
         # tool calls result
         if tool_calls_result:
@@ -709,15 +744,22 @@ class ProviderGoogleGenAI(Provider):
         payloads = {"messages": context_query, **model_config}
 
         retry = 10
-        keys = self.api_keys.copy()
+        tried_keys: set[str] = set()
 
         for _ in range(retry):
+            chosen_key = ""
             try:
-                async for response in self._query_stream(payloads, func_tool):
-                    yield response
+                async with self.key_pool.acquire(exclude=tried_keys) as lease:
+                    chosen_key = lease.key
+                    async for response in self._query_stream(
+                        payloads,
+                        func_tool,
+                        lease.client,
+                    ):
+                        yield response
                 break
             except APIError as e:
-                if await self._handle_api_error(e, keys):
+                if await self._handle_api_error(e, chosen_key, tried_keys):
                     continue
                 break
 
@@ -741,9 +783,14 @@ class ProviderGoogleGenAI(Provider):
         return self.api_keys
 
     def set_key(self, key):
+        self.key_pool.pin(key)
         self.chosen_api_key = key
         self._init_client()
 
+    def get_key_stats(self) -> list[dict]:
+        """各个 API Key 的健康指标"""
+        return self.key_pool.stats()
+
     async def assemble_context(self, text: str, image_urls: list[str] | None = None):
         """组装上下文。"""
         if image_urls:
@@ -1,9 +1,7 @@
-import asyncio
 import base64
 import inspect
 import json
 import os
-import random
 import re
 from collections.abc import AsyncGenerator
 
@@ -16,10 +14,12 @@ from openai.types.chat.chat_completion_chunk import ChatCompletionChunk
 import astrbot.core.message.components as Comp
 from astrbot import logger
 from astrbot.api.provider import Provider
+from astrbot.core.agent.context_budget import TOKEN_COUNT_KEY
 from astrbot.core.agent.message import Message
 from astrbot.core.agent.tool import ToolSet
 from astrbot.core.message.message_event_result import MessageChain
 from astrbot.core.provider.entities import LLMResponse, ToolCallsResult
+from astrbot.core.provider.key_pool import APIKeyPool, classify_api_error
 from astrbot.core.utils.io import download_image_by_url
 
 from ..register import register_provider_adapter
@@ -46,23 +46,13 @@ class ProviderOpenAIOfficial(Provider):
             for key in self.custom_headers:
                 self.custom_headers[key] = str(self.custom_headers[key])
 
-        if "api_version" in provider_config:
-            # Using Azure OpenAI API
-            self.client = AsyncAzureOpenAI(
-                api_key=self.chosen_api_key,
-                api_version=provider_config.get("api_version", None),
-                default_headers=self.custom_headers,
-                base_url=provider_config.get("api_base", ""),
-                timeout=self.timeout,
-            )
-        else:
-            # Using OpenAI Official API
-            self.client = AsyncOpenAI(
-                api_key=self.chosen_api_key,
-                base_url=provider_config.get("api_base", None),
-                default_headers=self.custom_headers,
-                timeout=self.timeout,
-            )
+        # 每个 Key 使用独立的客户端，避免并发请求间修改共享的 api_key
+        self.key_pool: APIKeyPool[AsyncOpenAI] = APIKeyPool(
+            self.api_keys,
+            self._create_client,
+            name=provider_config.get("id", "openai"),
+        )
+        self.client = self.key_pool.client(self.api_keys[0])
 
         self.default_params = inspect.signature(
             self.client.chat.completions.create,
@@ -74,6 +64,24 @@ class ProviderOpenAIOfficial(Provider):
 
         self.reasoning_key = "reasoning_content"
 
+    def _create_client(self, api_key: str) -> AsyncOpenAI:
+        if "api_version" in self.provider_config:
+            # Using Azure OpenAI API
+            return AsyncAzureOpenAI(
+                api_key=api_key,
+                api_version=self.provider_config.get("api_version", None),
+                default_headers=self.custom_headers,
+                base_url=self.provider_config.get("api_base", ""),
+                timeout=self.timeout,
+            )
+        # Using OpenAI Official API
+        return AsyncOpenAI(
+            api_key=api_key,
+            base_url=self.provider_config.get("api_base", None),
+            default_headers=self.custom_headers,
+            timeout=self.timeout,
+        )
+
     def _maybe_inject_xai_search(self, payloads: dict, **kwargs):
         """当开启 xAI 原生搜索时，向请求体注入 Live Search 参数。
 
@@ -107,7 +115,13 @@ class ProviderOpenAIOfficial(Provider):
         except NotFoundError as e:
             raise Exception(f"获取模型列表失败：{e}")
 
-    async def _query(self, payloads: dict, tools: ToolSet | None) -> LLMResponse:
+    async def _query(
+        self,
+        payloads: dict,
+        tools: ToolSet | None,
+        client: AsyncOpenAI | None = None,
+    ) -> LLMResponse:
+        client = client or self.client
         if tools:
             model = payloads.get("model", "").lower()
             omit_empty_param_field = "gemini" in model
@@ -138,7 +152,7 @@ class ProviderOpenAIOfficial(Provider):
         if model == "deepseek-reasoner" and "tools" in payloads:
             del payloads["tools"]
 
-        completion = await self.client.chat.completions.create(
+        completion = await client.chat.completions.create(
             **payloads,
             stream=False,
             extra_body=extra_body,
@@ -159,8 +173,10 @@ class ProviderOpenAIOfficial(Provider):
         self,
         payloads: dict,
         tools: ToolSet | None,
+        client: AsyncOpenAI | None = None,
     ) -> AsyncGenerator[LLMResponse, None]:
         """流式查询API，逐步返回结果"""
+        client = client or self.client
         if tools:
             model = payloads.get("model", "").lower()
             omit_empty_param_field = "gemini" in model
@@ -186,7 +202,7 @@ class ProviderOpenAIOfficial(Provider):
         for key in to_del:
             del payloads[key]
 
-        stream = await self.client.chat.completions.create(
+        stream = await client.chat.completions.create(
             **payloads,
             stream=True,
             extra_body=extra_body,
@@ -345,6 +361,7 @@ class ProviderOpenAIOfficial(Provider):
         for part in context_query:
             if "_no_save" in part:
                 del part["_no_save"]
+            part.pop(TOKEN_COUNT_KEY, None)
 
         # tool calls result
         if tool_calls_result:
@@ -371,29 +388,23 @@ class ProviderOpenAIOfficial(Provider):
         context_query: list,
         func_tool: ToolSet | None,
         chosen_key: str,
-        available_api_keys: list[str],
+        tried_keys: set[str],
         retry_cnt: int,
         max_retries: int,
     ) -> tuple:
-        """处理API错误并尝试恢复"""
-        if "429" in str(e):
-            logger.warning(
-                f"API 调用过于频繁，尝试使用其他 Key 重试。当前 Key: {chosen_key[:12]}",
-            )
-            # 最后一次不等待
-            if retry_cnt < max_retries - 1:
-                await asyncio.sleep(1)
-            available_api_keys.remove(chosen_key)
-            if len(available_api_keys) > 0:
-                chosen_key = random.choice(available_api_keys)
-                return (
-                    False,
-                    chosen_key,
-                    available_api_keys,
-                    payloads,
-                    context_query,
-                    func_tool,
+        """处理API错误并尝试恢复
+
+        Key 相关的错误(限流、额度、鉴权、服务端错误)已由 Key 池记录并冷却，
+        这里只决定是否换 Key 重试。
+        """
+        kind, _ = classify_api_error(e)
+        if kind.should_rotate:
+            tried_keys.add(chosen_key)
+            if self.key_pool.has_available(exclude=tried_keys):
+                logger.warning(
+                    f"API Key 出现 {kind.value} 错误，尝试使用其他 Key 重试。当前 Key: {chosen_key[:12]}",
                 )
+                return False, payloads, context_query, func_tool
             raise e
         if "maximum context length" in str(e):
             logger.warning(
@@ -401,27 +412,13 @@ class ProviderOpenAIOfficial(Provider):
             )
             await self.pop_record(context_query)
             payloads["messages"] = context_query
-            return (
-                False,
-                chosen_key,
-                available_api_keys,
-                payloads,
-                context_query,
-                func_tool,
-            )
+            return False, payloads, context_query, func_tool
         if "The model is not a VLM" in str(e):  # siliconcloud
             # 尝试删除所有 image
             new_contexts = await self._remove_image_from_context(context_query)
             payloads["messages"] = new_contexts
             context_query = new_contexts
-            return (
-                False,
-                chosen_key,
-                available_api_keys,
-                payloads,
-                context_query,
-                func_tool,
-            )
+            return False, payloads, context_query, func_tool
         if (
             "Function calling is not enabled" in str(e)
             or ("tool" in str(e).lower() and "support" in str(e).lower())
@@ -432,7 +429,7 @@ class ProviderOpenAIOfficial(Provider):
                 f"{self.get_model()} 不支持函数工具调用，已自动去除，不影响使用。",
             )
             payloads.pop("tools", None)
-            return False, chosen_key, available_api_keys, payloads, context_query, None
+            return False, payloads, context_query, None
         logger.error(f"发生了错误。Provider 配置如下: {self.provider_config}")
 
         if "tool" in str(e).lower() and "support" in str(e).lower():
@@ -471,22 +468,25 @@ class ProviderOpenAIOfficial(Provider):
 
         llm_response = None
         max_retries = 10
-        available_api_keys = self.api_keys.copy()
-        chosen_key = random.choice(available_api_keys)
+        tried_keys: set[str] = set()
 
         last_exception = None
         retry_cnt = 0
         for retry_cnt in range(max_retries):
+            chosen_key = ""
             try:
-                self.client.api_key = chosen_key
-                llm_response = await self._query(payloads, func_tool)
+                async with self.key_pool.acquire(exclude=tried_keys) as lease:
+                    chosen_key = lease.key
+                    llm_response = await self._query(
+                        payloads,
+                        func_tool,
+                        lease.client,
+                    )
                 break
             except Exception as e:
                 last_exception = e
                 (
                     success,
-                    chosen_key,
-                    available_api_keys,
                     payloads,
                     context_query,
                     func_tool,
@@ -496,7 +496,7 @@ class ProviderOpenAIOfficial(Provider):
                     context_query,
                     func_tool,
                     chosen_key,
-                    available_api_keys,
+                    tried_keys,
                     retry_cnt,
                     max_retries,
                 )
@@ -534,23 +534,26 @@ class ProviderOpenAIOfficial(Provider):
         )
 
         max_retries = 10
-        available_api_keys = self.api_keys.copy()
-        chosen_key = random.choice(available_api_keys)
+        tried_keys: set[str] = set()
 
         last_exception = None
         retry_cnt = 0
         for retry_cnt in range(max_retries):
+            chosen_key = ""
             try:
-                self.client.api_key = chosen_key
-                async for response in self._query_stream(payloads, func_tool):
-                    yield response
+                async with self.key_pool.acquire(exclude=tried_keys) as lease:
+                    chosen_key = lease.key
+                    async for response in self._query_stream(
+                        payloads,
+                        func_tool,
+                        lease.client,
+                    ):
+                        yield response
                 break
             except Exception as e:
                 last_exception = e
                 (
                     success,
-                    chosen_key,
-                    available_api_keys,
                     payloads,
                     context_query,
                     func_tool,
@@ -560,7 +563,7 @@ class ProviderOpenAIOfficial(Provider):
                     context_query,
                     func_tool,
                     chosen_key,
-                    available_api_keys,
+                    tried_keys,
                     retry_cnt,
                     max_retries,
                 )
@@ -599,7 +602,13 @@ class ProviderOpenAIOfficial(Provider):
         return self.api_keys
 
     def set_key(self, key):
-        self.client.api_key = key
+        self.key_pool.pin(key)
+        self.chosen_api_key = key
+        self.client = self.key_pool.client(key)
+
+    def get_key_stats(self) -> list[dict]:
+        """各个 API Key 的健康指标"""
+        return self.key_pool.stats()
 
     async def assemble_context(
         self,
@@ -3,7 +3,6 @@ Date: 2025-02-24 18:04:18
 LastEditTime: 2025-02-25 14:06:30
 """
 
-import asyncio
 import os
 import re
 from datetime import datetime
@@ -18,6 +17,7 @@ from astrbot.core.utils.tencent_record_helper import tencent_silk_to_wav
 from ..entities import ProviderType
 from ..provider import STTProvider
 from ..register import register_provider_adapter
+from ..stt_service import local_model_runner
 
 
 @register_provider_adapter(
@@ -39,9 +39,10 @@ class ProviderSenseVoiceSTTSelfHost(STTProvider):
     async def initialize(self):
         logger.info("下载或者加载 SenseVoice 模型中，这可能需要一些时间 ...")
 
-        # 将模型加载放到线程池中执行
-        self.model = await asyncio.get_event_loop().run_in_executor(
-            None,
+        # 在共享的推理线程中加载模型，相同模型只加载一次
+        self.model = await local_model_runner.load(
+            "sensevoice",
+            self.model_name,
             lambda: SenseVoiceSmall(self.model_name, quantize=True, batch_size=16),
         )
 
@@ -82,11 +83,12 @@ class ProviderSenseVoiceSTTSelfHost(STTProvider):
                     await tencent_silk_to_wav(audio_url, output_path)
                     audio_url = output_path
 
-            # 使用 run_in_executor 来调用模型进行识别
-            loop = asyncio.get_event_loop()
-            res = await loop.run_in_executor(
-                None,  # 使用默认的线程池
-                lambda: self.model(audio_url, language="auto", use_itn=True),
+            if self.model is None:
+                await self.initialize()
+            # 在共享的推理线程中调用模型进行识别
+            model = self.model
+            res = await local_model_runner.run(
+                lambda: model(audio_url, language="auto", use_itn=True),
             )
 
             # res = self.model(audio_url, language="auto", use_itn=True)
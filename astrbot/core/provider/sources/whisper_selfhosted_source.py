@@ -1,4 +1,3 @@
-import asyncio
 import os
 import uuid
 
@@ -12,6 +11,7 @@ from astrbot.core.utils.tencent_record_helper import tencent_silk_to_wav
 from ..entities import ProviderType
 from ..provider import STTProvider
 from ..register import register_provider_adapter
+from ..stt_service import local_model_runner
 
 
 @register_provider_adapter(
@@ -30,12 +30,11 @@ class ProviderOpenAIWhisperSelfHost(STTProvider):
         self.model = None
 
     async def initialize(self):
-        loop = asyncio.get_event_loop()
         logger.info("下载或者加载 Whisper 模型中，这可能需要一些时间 ...")
-        self.model = await loop.run_in_executor(
-            None,
-            whisper.load_model,
+        self.model = await local_model_runner.load(
+            "whisper",
             self.model_name,
+            lambda: whisper.load_model(self.model_name),
         )
         logger.info("Whisper 模型加载完成。")
 
@@ -49,8 +48,6 @@ class ProviderOpenAIWhisperSelfHost(STTProvider):
         return False
 
     async def get_text(self, audio_url: str) -> str:
-        loop = asyncio.get_event_loop()
-
         is_tencent = False
 
         if audio_url.startswith("http"):
@@ -75,5 +72,7 @@ class ProviderOpenAIWhisperSelfHost(STTProvider):
                 await tencent_silk_to_wav(audio_url, output_path)
                 audio_url = output_path
 
-        result = await loop.run_in_executor(None, self.model.transcribe, audio_url)
+        if self.model is None:
+            await self.initialize()
+        result = await local_model_runner.run(self.model.transcribe, audio_url)
         return result["text"]
@@ -0,0 +1,204 @@
+"""STT 识别服务。
+
+- 按提供商限制并发，一条消息中的多段语音并行识别。
+- 失败时按指数退避加随机抖动重试，重试次数有上限。
+- 识别结果按 (提供商, 音频内容哈希) 缓存，转发的同一段语音不会重复识别。
+- 本地模型(Whisper / SenseVoice)共享一个常驻的推理线程，模型只加载一次。
+"""
+
+import asyncio
+import hashlib
+import random
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from astrbot.core import logger
+
+from .key_pool import KeyErrorKind, classify_api_error
+from .provider import STTProvider
+
+_RETRYABLE_KINDS = {
+    KeyErrorKind.NETWORK,
+    KeyErrorKind.SERVER,
+    KeyErrorKind.RATE_LIMITED,
+}
+
+
+def _audio_digest(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class STTService:
+    def __init__(
+        self,
+        max_cache_entries: int = 1024,
+        max_retries: int = 4,
+        backoff_base: float = 0.5,
+        backoff_max: float = 4.0,
+    ) -> None:
+        self.max_cache_entries = max_cache_entries
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._cache: OrderedDict[tuple[str, str], str] = OrderedDict()
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._inflight: dict[tuple[str, str], asyncio.Future] = {}
+
+    def _semaphore(self, provider_id: str, max_concurrency: int) -> asyncio.Semaphore:
+        key = f"{provider_id}:{max_concurrency}"
+        if key not in self._semaphores:
+            self._semaphores[key] = asyncio.Semaphore(max(1, max_concurrency))
+        return self._semaphores[key]
+
+    async def _cache_key(self, provider_id: str, audio_url: str) -> tuple[str, str]:
+        if audio_url.startswith("http"):
+            return provider_id, f"url:{audio_url}"
+        # 文件不存在时抛出 FileNotFoundError，交给重试逻辑处理
+        return provider_id, await asyncio.to_thread(_audio_digest, audio_url)
+
+    def _backoff(self, attempt: int) -> float:
+        """指数退避 + 等值抖动，保证至少等待上限的一半，给协议端留出写入文件的时间"""
+        half = min(self.backoff_max, self.backoff_base * 2**attempt) / 2
+        return half + random.uniform(0, half)
+
+    @staticmethod
+    def _should_retry(e: Exception) -> bool:
+        if isinstance(e, FileNotFoundError):
+            # napcat workaround: 语音文件可能尚未写入完成
+            return True
+        kind, _ = classify_api_error(e)
+        return kind in _RETRYABLE_KINDS
+
+    async def _transcribe(
+        self,
+        provider: STTProvider,
+        audio_url: str,
+        max_concurrency: int,
+        use_cache: bool,
+    ) -> str:
+        provider_id = provider.meta().id
+        key = await self._cache_key(provider_id, audio_url) if use_cache else None
+        if key is not None:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                logger.debug(f"语音转文本缓存命中: {audio_url}")
+                return self._cache[key]
+            if key in self._inflight:
+                return await asyncio.shield(self._inflight[key])
+
+        future = asyncio.get_running_loop().create_future()
+        if key is not None:
+            self._inflight[key] = future
+        try:
+            async with self._semaphore(provider_id, max_concurrency):
+                text = await provider.get_text(audio_url=audio_url)
+            if key is not None and text:
+                self._cache[key] = text
+                while len(self._cache) > self.max_cache_entries:
+                    self._cache.popitem(last=False)
+            future.set_result(text)
+            return text
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        finally:
+            if key is not None:
+                self._inflight.pop(key, None)
+
+    async def transcribe(
+        self,
+        provider: STTProvider,
+        audio_url: str,
+        max_concurrency: int = 3,
+        use_cache: bool = True,
+    ) -> str:
+        """识别一段语音。可重试的错误按指数退避重试，最终失败时抛出最后一次的异常。"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await self._transcribe(
+                    provider,
+                    audio_url,
+                    max_concurrency,
+                    use_cache,
+                )
+            except Exception as e:
+                if attempt >= self.max_retries or not self._should_retry(e):
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning(
+                    f"语音转文本失败: {e}，{delay:.2f} 秒后重试 ({attempt + 1}/{self.max_retries})",
+                )
+                await asyncio.sleep(delay)
+        raise RuntimeError("unreachable")
+
+    async def transcribe_many(
+        self,
+        provider: STTProvider,
+        audio_urls: list[str],
+        max_concurrency: int = 3,
+        use_cache: bool = True,
+    ) -> list[str | BaseException]:
+        """并发识别多段语音，结果与输入顺序一致；失败的项为对应的异常。"""
+        return await asyncio.gather(
+            *(
+                self.transcribe(provider, url, max_concurrency, use_cache)
+                for url in audio_urls
+            ),
+            return_exceptions=True,
+        )
+
+
+class LocalModelRunner:
+    """本地语音模型的共享推理线程。
+
+    模型在同一个常驻线程中加载与推理，每个 (类型, 模型名) 只加载一次，
+    并发请求排队执行，避免多线程争抢同一个模型以及重复加载。
+    """
+
+    def __init__(self, max_workers: int = 1) -> None:
+        self.max_workers = max_workers
+        self._executor: ThreadPoolExecutor | None = None
+        self._models: dict[tuple[str, str], asyncio.Future] = {}
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="astrbot-local-model",
+            )
+        return self._executor
+
+    async def load(self, kind: str, name: str, loader: Callable[[], Any]) -> Any:
+        """加载模型。同一模型的并发调用共享同一次加载。"""
+        key = (kind, name)
+        future = self._models.get(key)
+        if future is None or (future.done() and future.exception() is not None):
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._get_executor(), loader)
+            self._models[key] = future
+        return await asyncio.shield(future)
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """在推理线程中执行"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), func, *args)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._models.clear()
+
+
+stt_service = STTService()
+local_model_runner = LocalModelRunner()
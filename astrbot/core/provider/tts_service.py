@@ -0,0 +1,268 @@
+"""TTS 合成服务。
+
+- 按提供商限制并发，多个消息段并行合成，结果保持原有顺序。
+- 合成结果按 (提供商, 音色参数, 规范化文本) 缓存在磁盘上，按最近使用时间淘汰。
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+import unicodedata
+
+from astrbot.core import logger
+from astrbot.core.utils.astrbot_path import get_astrbot_data_path
+from astrbot.core.utils.temp_manager import temp_file_manager
+
+from .provider import TTSProvider
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# 与音色/音频结果无关的配置项，不参与缓存键
+_NON_VOICE_CONFIG_KEYS = {"id", "enable", "timeout", "proxy", "api_key", "key"}
+
+
+def normalize_tts_text(text: str) -> str:
+    """规范化待合成文本：Unicode NFKC、合并空白"""
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def voice_fingerprint(provider: TTSProvider) -> str:
+    """提供商的音色指纹。
+
+    不同提供商的音色字段名各不相同，因此直接对会影响合成结果的配置项取哈希，
+    修改音色、语速等参数后缓存自然失效。
+    """
+    config = {
+        k: v
+        for k, v in provider.provider_config.items()
+        if k not in _NON_VOICE_CONFIG_KEYS
+    }
+    raw = json.dumps(config, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+
+class TTSAudioCache:
+    """TTS 音频的磁盘 LRU 缓存。
+
+    文件名即缓存键的哈希，最近使用时间记录在文件的 mtime 上，重启后仍然有效。
+    文件读写都放在线程中执行，索引只在事件循环线程中修改。
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int) -> None:
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._index: dict[str, tuple[str, int]] | None = None
+        """key hash -> (file path, size)"""
+        self._load_lock: asyncio.Lock | None = None
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _scan(cache_dir: str) -> list[tuple[float, str, str, int]]:
+        os.makedirs(cache_dir, exist_ok=True)
+        entries = []
+        for name in os.listdir(cache_dir):
+            path = os.path.join(cache_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, os.path.splitext(name)[0], path, st.st_size))
+        entries.sort()
+        return entries
+
+    async def _load_index(self) -> dict[str, tuple[str, int]]:
+        if self._index is not None:
+            return self._index
+        if self._load_lock is None:
+            self._load_lock = asyncio.Lock()
+        async with self._load_lock:
+            if self._index is None:
+                entries = await asyncio.to_thread(self._scan, self.cache_dir)
+                self._index = {h: (path, size) for _, h, path, size in entries}
+                self._total_bytes = sum(size for _, _, _, size in entries)
+        return self._index
+
+    @staticmethod
+    def make_key(provider_id: str, voice: str, text: str) -> str:
+        raw = f"{provider_id}\0{voice}\0{normalize_tts_text(text)}"
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    @staticmethod
+    def _touch(path: str) -> bool:
+        """刷新文件的最近使用时间，文件不存在时返回 False"""
+        if not os.path.exists(path):
+            return False
+        try:
+            now = time.time()
+            os.utime(path, (now, now))
+        except OSError:
+            pass
+        return True
+
+    @staticmethod
+    def _copy_in(audio_path: str, path: str) -> int:
+        shutil.copyfile(audio_path, path)
+        return os.path.getsize(path)
+
+    @staticmethod
+    def _remove_files(paths: list[str]):
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    async def get(self, key: str) -> str | None:
+        """命中时返回缓存文件路径，并刷新其最近使用时间"""
+        index = await self._load_index()
+        entry = index.get(key)
+        if entry is None or not await asyncio.to_thread(self._touch, entry[0]):
+            if entry is not None and index.get(key) == entry:
+                del index[key]
+                self._total_bytes -= entry[1]
+            self.misses += 1
+            return None
+        if key in index:
+            index[key] = index.pop(key)  # move to end
+        self.hits += 1
+        return entry[0]
+
+    async def put(self, key: str, audio_path: str) -> str:
+        """将音频文件复制进缓存，返回缓存文件路径"""
+        index = await self._load_index()
+        ext = os.path.splitext(audio_path)[1] or ".wav"
+        path = os.path.join(self.cache_dir, f"{key}{ext}")
+        size = await asyncio.to_thread(self._copy_in, audio_path, path)
+        old = index.pop(key, None)
+        if old:
+            self._total_bytes -= old[1]
+        index[key] = (path, size)
+        self._total_bytes += size
+        await self._evict()
+        return path
+
+    async def _evict(self):
+        index = await self._load_index()
+        removed = []
+        while self._total_bytes > self.max_bytes and len(index) > 1:
+            oldest = next(iter(index))
+            path, size = index.pop(oldest)
+            self._total_bytes -= size
+            removed.append(path)
+        if removed:
+            await asyncio.to_thread(self._remove_files, removed)
+
+
+class TTSService:
+    def __init__(
+        self,
+        cache_dir: str | None = None,
+        cache_max_bytes: int = 200 * 1024 * 1024,
+    ) -> None:
+        self.cache = TTSAudioCache(
+            cache_dir or os.path.join(get_astrbot_data_path(), "tts_cache"),
+            cache_max_bytes,
+        )
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    def _semaphore(self, provider_id: str, max_concurrency: int) -> asyncio.Semaphore:
+        key = f"{provider_id}:{max_concurrency}"
+        if key not in self._semaphores:
+            self._semaphores[key] = asyncio.Semaphore(max(1, max_concurrency))
+        return self._semaphores[key]
+
+    @staticmethod
+    def _temp_copy(path: str) -> str:
+        """复制一份缓存文件给调用方。下游平台可能会删除或改写语音文件。"""
+        out = temp_file_manager.new_path(
+            suffix=os.path.splitext(path)[1],
+            category="tts",
+            prefix="tts_",
+        )
+        shutil.copyfile(path, out)
+        return out
+
+    async def _synthesize(
+        self,
+        provider: TTSProvider,
+        text: str,
+        max_concurrency: int,
+    ) -> str:
+        async with self._semaphore(provider.meta().id, max_concurrency):
+            logger.info(f"TTS 请求: {text}")
+            audio_path = await provider.get_audio(text)
+            logger.info(f"TTS 结果: {audio_path}")
+            return audio_path
+
+    async def synthesize(
+        self,
+        provider: TTSProvider,
+        text: str,
+        use_cache: bool = True,
+        max_concurrency: int = 3,
+    ) -> str | None:
+        """合成一段文本，返回音频文件路径。返回的文件归调用方所有。"""
+        if not use_cache:
+            return await self._synthesize(provider, text, max_concurrency)
+
+        provider_id = provider.meta().id
+        key = self.cache.make_key(provider_id, voice_fingerprint(provider), text)
+        cached = await self.cache.get(key)
+        if cached:
+            logger.debug(f"TTS 缓存命中: {text}")
+            return await asyncio.to_thread(self._temp_copy, cached)
+
+        if key in self._inflight:
+            cached = await asyncio.shield(self._inflight[key])
+            return await asyncio.to_thread(self._temp_copy, cached) if cached else None
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            audio_path = await self._synthesize(provider, text, max_concurrency)
+            cached = None
+            if audio_path and await asyncio.to_thread(os.path.exists, audio_path):
+                try:
+                    cached = await self.cache.put(key, audio_path)
+                except OSError as e:
+                    logger.warning(f"写入 TTS 缓存失败: {e}")
+            future.set_result(cached)
+            return audio_path
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def synthesize_many(
+        self,
+        provider: TTSProvider,
+        texts: list[str],
+        use_cache: bool = True,
+        max_concurrency: int = 3,
+    ) -> list[asyncio.Task]:
+        """并发合成多段文本。
+
+        立即返回与 texts 一一对应的任务列表，调用方可以按顺序等待，
+        在后续消息段仍在合成时先处理已完成的第一段。
+        """
+        return [
+            asyncio.create_task(
+                self.synthesize(provider, text, use_cache, max_concurrency),
+            )
+            for text in texts
+        ]
+
+
+tts_service = TTSService()
@@ -13,6 +13,12 @@ from astrbot.core.astrbot_config_mgr import AstrBotConfigManager
 from astrbot.core.config.astrbot_config import AstrBotConfig
 from astrbot.core.conversation_mgr import ConversationManager
 from astrbot.core.db import BaseDatabase
+from astrbot.core.group_message_archive import (
+    GroupMessageArchive,
+    group_message_archive,
+)
+from astrbot.core.group_roster import GroupRosterCache, group_roster
+from astrbot.core.job_runner import JobRunner, job_runner
 from astrbot.core.knowledge_base.kb_mgr import KnowledgeBaseManager
 from astrbot.core.message.message_event_result import MessageChain
 from astrbot.core.persona_mgr import PersonaManager
@@ -20,6 +26,7 @@ from astrbot.core.platform import Platform
 from astrbot.core.platform.astr_message_event import AstrMessageEvent, MessageSesion
 from astrbot.core.platform.manager import PlatformManager
 from astrbot.core.platform_message_history_mgr import PlatformMessageHistoryManager
+from astrbot.core.plugin_kv import PluginKVManager, plugin_kv
 from astrbot.core.provider.entities import LLMResponse, ProviderRequest, ProviderType
 from astrbot.core.provider.func_tool_manager import FunctionTool, FunctionToolManager
 from astrbot.core.provider.manager import ProviderManager
@@ -79,6 +86,14 @@ class Context:
         self.persona_manager = persona_manager
         self.astrbot_config_mgr = astrbot_config_mgr
         self.kb_manager = knowledge_base_manager
+        self.group_roster: GroupRosterCache = group_roster
+        """群成员名单缓存(OneBot)。插件应优先使用它获取群成员信息，而不是每次调用 get_group_member_list。"""
+        self.group_message_archive: GroupMessageArchive = group_message_archive
+        """本地群消息归档(OneBot)。分析群聊时应使用它读取消息，而不是反复翻页调用 get_group_msg_history。"""
+        self.job_runner: JobRunner = job_runner
+        """后台任务执行器。批量执行定时任务时用于限制并发、超时重试和持久化进度。"""
+        self.plugin_kv: PluginKVManager = plugin_kv
+        """插件 KV 存储。插件应使用 `plugin_kv.namespace(插件名)` 保存状态，而不是整体重写 JSON 文件。"""
 
     async def llm_generate(
         self,
@@ -391,6 +406,7 @@ class Context:
                 logger.warning("替换已存在的 LLM 工具: " + tool.name)
                 self.provider_manager.llm_tools.remove_func(tool.name)
             self.provider_manager.llm_tools.func_list.append(tool)
+            self.provider_manager.llm_tools.mark_tools_changed()
 
     def register_web_api(
         self,
@@ -507,6 +507,7 @@ def register_agent(
         handoff_tool = HandoffTool(agent=agent)
         handoff_tool.handler = awaitable
         llm_tools.func_list.append(handoff_tool)
+        llm_tools.mark_tools_changed()
         return RegisteringAgent(agent)
 
     return decorator
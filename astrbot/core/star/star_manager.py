@@ -513,6 +513,7 @@ class PluginManager:
                                 )
                             if ft.name in inactivated_llm_tools:
                                 ft.active = False
+                    llm_tools.mark_tools_changed()
 
                 else:
                     # v3.4.0 以前的方式注册插件
@@ -816,6 +817,8 @@ class PluginManager:
                 to_remove.append(func_tool)
         for func_tool in to_remove:
             llm_tools.func_list.remove(func_tool)
+        if to_remove:
+            llm_tools.mark_tools_changed()
 
         if plugin is None:
             return
@@ -871,6 +874,7 @@ class PluginManager:
                     func_tool.active = False
                     if func_tool.name not in inactivated_llm_tools:
                         inactivated_llm_tools.append(func_tool.name)
+            llm_tools.mark_tools_changed()
 
             await sp.global_put("inactivated_plugins", inactivated_plugins)
             await sp.global_put("inactivated_llm_tools", inactivated_llm_tools)
@@ -920,6 +924,7 @@ class PluginManager:
             ):
                 inactivated_llm_tools.remove(func_tool.name)
                 func_tool.active = True
+        llm_tools.mark_tools_changed()
         await sp.global_put("inactivated_llm_tools", inactivated_llm_tools)
 
         await self.reload(plugin_name)
@@ -0,0 +1,320 @@
+"""音频转码服务。
+
+统一负责 SILK / WAV / AMR / MP3 等格式之间的转换：
+
+- SILK 编解码是 CPU 密集型操作，放到进程池中执行，不阻塞事件循环。
+- ffmpeg 子进程的并发数由信号量限制。
+- 转换结果按 (源文件内容哈希, 目标格式) 缓存，同一段音频发往多个平台时只转码一次。
+
+缓存中的文件由本服务管理，调用方不应修改或删除返回的路径。
+"""
+
+import asyncio
+import hashlib
+import os
+import shutil
+import subprocess
+import time
+import wave
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from io import BytesIO
+
+from astrbot.core import logger
+from astrbot.core.utils.astrbot_path import get_astrbot_data_path
+
+SILK_HEADER = b"#!SILK_V3"
+WAV_SAMPLE_RATE = 24000
+
+FFMPEG_ARGS: dict[str, list[str]] = {
+    "wav": [
+        "-acodec",
+        "pcm_s16le",
+        "-ar",
+        str(WAV_SAMPLE_RATE),
+        "-ac",
+        "1",
+        "-af",
+        "apad=pad_dur=2",
+        "-fflags",
+        "+genpts",
+    ],
+    "amr": ["-ar", "8000", "-ac", "1", "-f", "amr"],
+    "mp3": ["-ac", "1", "-f", "mp3"],
+}
+"""ffmpeg 支持的目标格式及其编码参数"""
+
+HANDOUT_GRACE_SECONDS = 300
+"""缓存文件交给调用方后的保护时间(秒)，期间不会被 LRU 淘汰，避免删除正在发送的文件"""
+
+
+def _silk_decode(silk_path: str, output_path: str) -> str:
+    """在工作进程中将 Tencent SILK 解码为 WAV"""
+    import pysilk
+
+    with open(silk_path, "rb") as f:
+        input_data = f.read()
+    if input_data.startswith(b"\x02"):
+        input_data = input_data[1:]
+    output_io = BytesIO()
+    pysilk.decode(BytesIO(input_data), output_io, WAV_SAMPLE_RATE)
+    output_io.seek(0)
+    with wave.open(output_path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(WAV_SAMPLE_RATE)
+        wav.writeframes(output_io.read())
+    return output_path
+
+
+def _silk_encode(wav_path: str, output_path: str) -> float:
+    """在工作进程中将 WAV 编码为 Tencent SILK，返回时长(秒)"""
+    import pilk
+
+    with wave.open(wav_path, "rb") as wav:
+        rate = wav.getframerate()
+    return pilk.encode(wav_path, output_path, pcm_rate=rate, tencent=True)
+
+
+def _file_digest(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _is_non_empty_file(path: str) -> bool:
+    return os.path.exists(path) and os.path.getsize(path) > 0
+
+
+def is_silk_file(path: str) -> bool:
+    """根据文件头判断是否为 SILK 音频(兼容 Tencent 的 \\x02 前缀)"""
+    try:
+        with open(path, "rb") as f:
+            head = f.read(len(SILK_HEADER) + 1)
+    except OSError:
+        return False
+    return head.startswith(SILK_HEADER) or head[1:].startswith(SILK_HEADER)
+
+
+def is_pcm_wav(path: str) -> bool:
+    """是否为 wave 模块可以直接读取的 PCM WAV 文件"""
+    try:
+        with wave.open(path, "rb") as wav:
+            return wav.getsampwidth() == 2 and wav.getnframes() > 0
+    except (wave.Error, EOFError, OSError):
+        return False
+
+
+@dataclass
+class ConvertedAudio:
+    path: str
+    """转换结果的本地绝对路径，由转码服务管理"""
+    duration: float = 0
+    """音频时长(秒)。仅 SILK 编码时提供"""
+
+
+class AudioConverter:
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        max_ffmpeg_processes: int = 2,
+        max_cache_entries: int = 256,
+        cache_dir: str | None = None,
+    ) -> None:
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.max_ffmpeg_processes = max_ffmpeg_processes
+        self.max_cache_entries = max_cache_entries
+        self.cache_dir = os.path.abspath(
+            cache_dir or os.path.join(get_astrbot_data_path(), "temp", "audio_cache"),
+        )
+        self._pool: Executor | None = None
+        self._pool_broken = False
+        self._ffmpeg_sem: asyncio.Semaphore | None = None
+        self._cache: OrderedDict[tuple[str, str], ConvertedAudio] = OrderedDict()
+        self._inflight: dict[tuple[str, str], asyncio.Future] = {}
+        self._handed_out: dict[tuple[str, str], float] = {}
+        """缓存项最近一次交给调用方的时间"""
+        self.stats = {"hits": 0, "misses": 0, "ffmpeg_runs": 0, "codec_runs": 0}
+        self._cache_dir_ready = False
+        self._cache_dir_lock: asyncio.Lock | None = None
+
+    def _reset_cache_dir(self):
+        # 缓存索引仅保存在内存中，启动后清理上次运行残留的文件
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    async def _prepare_cache_dir(self):
+        if self._cache_dir_ready:
+            return
+        if self._cache_dir_lock is None:
+            self._cache_dir_lock = asyncio.Lock()
+        async with self._cache_dir_lock:
+            if not self._cache_dir_ready:
+                await asyncio.to_thread(self._reset_cache_dir)
+                self._cache_dir_ready = True
+
+    async def _run_codec(self, func, *args):
+        """在进程池中执行编解码函数。进程池不可用时退回到线程池。"""
+        loop = asyncio.get_running_loop()
+        self.stats["codec_runs"] += 1
+        if not self._pool_broken:
+            try:
+                if self._pool is None:
+                    self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+                return await loop.run_in_executor(self._pool, func, *args)
+            except (BrokenProcessPool, OSError, NotImplementedError) as e:
+                logger.warning(f"音频转码进程池不可用，将使用线程池: {e}")
+                self._pool_broken = True
+                self._shutdown_pool()
+        return await asyncio.to_thread(func, *args)
+
+    async def _run_ffmpeg(self, input_path: str, output_path: str, target: str):
+        if self._ffmpeg_sem is None:
+            self._ffmpeg_sem = asyncio.Semaphore(self.max_ffmpeg_processes)
+        async with self._ffmpeg_sem:
+            self.stats["ffmpeg_runs"] += 1
+            try:
+                p = await asyncio.create_subprocess_exec(
+                    "ffmpeg",
+                    "-y",
+                    "-i",
+                    input_path,
+                    *FFMPEG_ARGS[target],
+                    "-hide_banner",
+                    output_path,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                )
+                _, stderr = await p.communicate()
+                if p.returncode != 0:
+                    logger.debug(f"[FFmpeg] stderr: {stderr.decode().strip()}")
+                    raise RuntimeError(f"ffmpeg 返回值 {p.returncode}")
+            except (FileNotFoundError, RuntimeError) as e:
+                logger.debug(f"ffmpeg 命令行转换失败: {e}, 尝试使用 pyffmpeg 进行转换")
+                from pyffmpeg import FFmpeg
+
+                await asyncio.to_thread(
+                    FFmpeg().convert,
+                    input=input_path,
+                    output=output_path,
+                )
+        if not await asyncio.to_thread(_is_non_empty_file, output_path):
+            raise RuntimeError(f"生成的 {target} 文件不存在或为空")
+
+    async def _convert_uncached(
+        self,
+        source: str,
+        target: str,
+        output_path: str,
+    ) -> ConvertedAudio:
+        source_is_silk = await asyncio.to_thread(is_silk_file, source)
+        if target == "silk":
+            if source_is_silk:
+                await asyncio.to_thread(shutil.copyfile, source, output_path)
+                return ConvertedAudio(output_path)
+            wav_path = source
+            if not await asyncio.to_thread(is_pcm_wav, source):
+                wav_path = (await self.convert(source, "wav")).path
+            duration = await self._run_codec(_silk_encode, wav_path, output_path)
+            return ConvertedAudio(output_path, duration)
+
+        if source_is_silk:
+            if target == "wav":
+                await self._run_codec(_silk_decode, source, output_path)
+                return ConvertedAudio(output_path)
+            source = (await self.convert(source, "wav")).path
+        if target not in FFMPEG_ARGS:
+            raise ValueError(f"不支持的音频格式: {target}")
+        await self._run_ffmpeg(source, output_path, target)
+        return ConvertedAudio(output_path)
+
+    def _hand_out(self, key: tuple[str, str], result: ConvertedAudio):
+        self._handed_out[key] = time.monotonic()
+        return result
+
+    def _cache_put(self, key: tuple[str, str], result: ConvertedAudio):
+        self._cache[key] = result
+        self._cache.move_to_end(key)
+        if len(self._cache) <= self.max_cache_entries:
+            return
+        # 从最久未使用的开始淘汰，跳过刚交给调用方、可能仍在发送中的文件
+        now = time.monotonic()
+        for old_key in list(self._cache):
+            if len(self._cache) <= self.max_cache_entries:
+                break
+            if now - self._handed_out.get(old_key, 0) < HANDOUT_GRACE_SECONDS:
+                continue
+            evicted = self._cache.pop(old_key)
+            self._handed_out.pop(old_key, None)
+            try:
+                os.remove(evicted.path)
+            except OSError:
+                pass
+
+    async def convert(self, source: str, target: str) -> ConvertedAudio:
+        """将音频文件转换为目标格式(wav / silk / amr / mp3)。
+
+        结果按源文件内容缓存；同一内容的并发转换只会执行一次。
+        """
+        target = target.lower().lstrip(".")
+        digest = await asyncio.to_thread(_file_digest, source)
+        key = (digest, target)
+
+        cached = self._cache.get(key)
+        if cached and await asyncio.to_thread(os.path.exists, cached.path):
+            self._cache.move_to_end(key)
+            self.stats["hits"] += 1
+            return self._hand_out(key, cached)
+
+        if key in self._inflight:
+            self.stats["hits"] += 1
+            return self._hand_out(key, await asyncio.shield(self._inflight[key]))
+
+        self.stats["misses"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            await self._prepare_cache_dir()
+            output_path = os.path.join(self.cache_dir, f"{digest[:32]}.{target}")
+            result = await self._convert_uncached(source, target, output_path)
+            self._hand_out(key, result)
+            self._cache_put(key, result)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # 避免无人等待时出现 "exception was never retrieved"
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def convert_to_path(
+        self,
+        source: str,
+        target: str,
+        output_path: str,
+    ) -> ConvertedAudio:
+        """转换并复制到调用方指定的路径，该文件由调用方自行管理"""
+        result = await self.convert(source, target)
+        await asyncio.to_thread(shutil.copyfile, result.path, output_path)
+        return ConvertedAudio(output_path, result.duration)
+
+    def _shutdown_pool(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def shutdown(self):
+        """关闭进程池"""
+        self._shutdown_pool()
+
+
+audio_converter = AudioConverter()
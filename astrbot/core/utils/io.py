@@ -5,7 +5,6 @@ import shutil
 import socket
 import ssl
 import time
-import uuid
 import zipfile
 from pathlib import Path
 
@@ -15,6 +14,7 @@ import psutil
 from PIL import Image
 
 from .astrbot_path import get_astrbot_data_path
+from .temp_manager import temp_file_manager
 
 logger = logging.getLogger("astrbot")
 
@@ -50,21 +50,12 @@ def port_checker(port: int, host: str = "localhost"):
 
 
 def save_temp_img(img: Image.Image | str) -> str:
-    temp_dir = os.path.join(get_astrbot_data_path(), "temp")
-    # 获得文件创建时间，清除超过 12 小时的
-    try:
-        for f in os.listdir(temp_dir):
-            path = os.path.join(temp_dir, f)
-            if os.path.isfile(path):
-                ctime = os.path.getctime(path)
-                if time.time() - ctime > 3600 * 12:
-                    os.remove(path)
-    except Exception as e:
-        print(f"清除临时文件失败: {e}")
-
-    # 获得时间戳
-    timestamp = f"{int(time.time())}_{uuid.uuid4().hex[:8]}"
-    p = os.path.join(temp_dir, f"{timestamp}.jpg")
+    # 过期清理由 temp_file_manager 在后台统一进行
+    p = temp_file_manager.new_path(
+        suffix=".jpg",
+        category="image",
+        prefix=f"{int(time.time())}_",
+    )
 
     if isinstance(img, Image.Image):
         img.save(p)
@@ -1,16 +1,30 @@
+"""指标收集。
+
+消息路径上只把指标放入有界队列(满时丢弃并计数)，不等待数据库或网络：
+
+- 平台消息统计按 (平台 ID, 平台类型, 小时) 在内存中累加，定期在一个事务中批量写入数据库。
+- 遥测指标按相同维度合并 *_tick 计数，定期通过复用的 HTTP 会话发送。
+- 关闭时会把剩余的指标刷新到数据库。
+"""
+
+import asyncio
 import os
 import socket
 import sys
 import uuid
+from datetime import datetime
 
 import aiohttp
 
 from astrbot.core import db_helper, logger
 from astrbot.core.config import VERSION
 
+TICKSTATS_URL = "https://tickstats.soulter.top/api/metric/90a6c2a1"
+
 
 class Metric:
     _iid_cache = None
+    _hostname_cache = None
 
     @staticmethod
     def get_installation_id():
@@ -39,37 +53,164 @@ class Metric:
             Metric._iid_cache = "null"
             return "null"
 
+    @staticmethod
+    def get_hostname():
+        if Metric._hostname_cache is None:
+            try:
+                Metric._hostname_cache = socket.gethostname()
+            except Exception:
+                Metric._hostname_cache = ""
+        return Metric._hostname_cache
+
     @staticmethod
     async def upload(**kwargs):
         """上传相关非敏感的指标以更好地了解 AstrBot 的使用情况。上传的指标不会包含任何有关消息文本、用户信息等敏感信息。
 
+        指标先进入内存队列，由后台任务批量写入数据库和上传，本方法不会等待。
+
         Powered by TickStats.
         """
-        base_url = "https://tickstats.soulter.top/api/metric/90a6c2a1"
-        kwargs["v"] = VERSION
-        kwargs["os"] = sys.platform
-        payload = {"metrics_data": kwargs}
-        try:
-            kwargs["hn"] = socket.gethostname()
-        except Exception:
-            pass
+        metric_aggregator.record(kwargs)
+
+
+class MetricAggregator:
+    def __init__(
+        self,
+        flush_interval: float = 10.0,
+        max_queue_size: int = 10000,
+        max_telemetry_batch: int = 200,
+    ) -> None:
+        """
+        Args:
+            flush_interval: 刷新间隔(秒)
+            max_queue_size: 待处理指标队列的上限，超出的指标会被丢弃
+            max_telemetry_batch: 每次刷新最多上传的遥测条目数
+
+        """
+        self.flush_interval = flush_interval
+        self.max_telemetry_batch = max_telemetry_batch
+        self._queue: asyncio.Queue[tuple[datetime, dict]] = asyncio.Queue(
+            maxsize=max_queue_size,
+        )
+        self._platform_counts: dict[tuple[str, str, datetime], int] = {}
+        """(platform_id, platform_type, hour) -> count"""
+        self._telemetry: dict[tuple, dict] = {}
+        """合并后的遥测指标，键为除 *_tick 以外的字段"""
+        self._session: aiohttp.ClientSession | None = None
+        self._flush_lock = asyncio.Lock()
+        self.dropped = 0
+        """队列已满被丢弃的指标数"""
+        self.telemetry_dropped = 0
+        """单批次遥测条目超出上限被丢弃的数量"""
+
+    def record(self, metrics: dict):
+        """记录一条指标，永不阻塞"""
         try:
-            kwargs["iid"] = Metric.get_installation_id()
-        except Exception:
-            pass
+            self._queue.put_nowait((datetime.now(), metrics))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logger.warning(f"指标队列已满，已丢弃 {self.dropped} 条指标。")
+
+    def _drain(self):
+        while True:
+            try:
+                ts, metrics = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            self._aggregate(ts, metrics)
+
+    def _aggregate(self, ts: datetime, metrics: dict):
+        if "adapter_name" in metrics:
+            key = (
+                metrics["adapter_name"],
+                metrics.get("adapter_type", "unknown"),
+                ts.replace(minute=0, second=0, microsecond=0),
+            )
+            self._platform_counts[key] = self._platform_counts.get(key, 0) + 1
+
+        dims = tuple(
+            sorted((k, str(v)) for k, v in metrics.items() if not k.endswith("_tick")),
+        )
+        merged = self._telemetry.get(dims)
+        if merged is None:
+            if len(self._telemetry) >= self.max_telemetry_batch:
+                self.telemetry_dropped += 1
+                return
+            self._telemetry[dims] = dict(metrics)
+            return
+        for k, v in metrics.items():
+            if k.endswith("_tick") and isinstance(v, int):
+                merged[k] = merged.get(k, 0) + v
+
+    async def _flush_db(self):
+        if not self._platform_counts:
+            return
+        counts, self._platform_counts = self._platform_counts, {}
+        rows = [
+            (platform_id, platform_type, count, hour)
+            for (platform_id, platform_type, hour), count in counts.items()
+        ]
         try:
-            if "adapter_name" in kwargs:
-                await db_helper.insert_platform_stats(
-                    platform_id=kwargs["adapter_name"],
-                    platform_type=kwargs.get("adapter_type", "unknown"),
-                )
+            await db_helper.insert_platform_stats_batch(rows)
         except Exception as e:
             logger.error(f"保存指标到数据库失败: {e}")
 
-        try:
-            async with aiohttp.ClientSession(trust_env=True) as session:
-                async with session.post(base_url, json=payload, timeout=3) as response:
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                trust_env=True,
+                timeout=aiohttp.ClientTimeout(total=3),
+            )
+        return self._session
+
+    async def _flush_telemetry(self):
+        if not self._telemetry:
+            return
+        batch, self._telemetry = list(self._telemetry.values()), {}
+        session = self._get_session()
+        base = {
+            "v": VERSION,
+            "os": sys.platform,
+            "hn": Metric.get_hostname(),
+            "iid": Metric.get_installation_id(),
+        }
+        for metrics in batch:
+            payload = {"metrics_data": {**metrics, **base}}
+            try:
+                async with session.post(TICKSTATS_URL, json=payload) as response:
                     if response.status != 200:
                         pass
-        except Exception:
-            pass
+            except Exception:
+                # 网络不可用时放弃本批次剩余的遥测
+                break
+
+    async def flush(self, telemetry: bool = True):
+        """处理队列中的所有指标，并写入数据库/上传"""
+        async with self._flush_lock:
+            self._drain()
+            await self._flush_db()
+            if telemetry:
+                await self._flush_telemetry()
+
+    async def run(self):
+        """后台刷新循环"""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"刷新指标失败: {e}")
+
+    async def shutdown(self):
+        """将剩余指标写入数据库，并关闭 HTTP 会话。关闭时不再上传遥测。"""
+        try:
+            await self.flush(telemetry=False)
+        except Exception as e:
+            logger.error(f"刷新指标失败: {e}")
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+metric_aggregator = MetricAggregator()
@@ -0,0 +1,78 @@
+"""运行时指标采样器。
+
+在后台定期采样进程 CPU、内存、线程数以及事件循环延迟，保存在环形缓冲区中。
+控制面板读取最近的采样结果，而不是在请求中阻塞地测量 CPU 占用。
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+
+import psutil
+
+
+@dataclass
+class RuntimeSample:
+    timestamp: float
+    """采样时间(Unix 时间戳)"""
+    cpu_percent: float
+    """系统 CPU 占用率"""
+    process_cpu_percent: float
+    """AstrBot 进程 CPU 占用率(多核时可能超过 100)"""
+    memory_rss_mb: int
+    """进程常驻内存(MB)"""
+    thread_count: int
+    loop_lag_ms: float
+    """事件循环延迟：采样间隔内 sleep 实际超出预期的时间"""
+
+
+class RuntimeSampler:
+    def __init__(self, interval: float = 5.0, capacity: int = 720) -> None:
+        """
+        Args:
+            interval: 采样间隔(秒)
+            capacity: 环形缓冲区大小，默认保存最近 1 小时
+
+        """
+        self.interval = interval
+        self.samples: deque[RuntimeSample] = deque(maxlen=capacity)
+        self._process = psutil.Process()
+        # 第一次调用 cpu_percent(None) 只用于建立基准
+        psutil.cpu_percent(interval=None)
+        self._process.cpu_percent(interval=None)
+        self._last_lag_ms = 0.0
+
+    def _sample(self) -> RuntimeSample:
+        sample = RuntimeSample(
+            timestamp=time.time(),
+            cpu_percent=round(psutil.cpu_percent(interval=None), 1),
+            process_cpu_percent=round(self._process.cpu_percent(interval=None), 1),
+            memory_rss_mb=self._process.memory_info().rss >> 20,
+            thread_count=threading.active_count(),
+            loop_lag_ms=round(self._last_lag_ms, 2),
+        )
+        self.samples.append(sample)
+        return sample
+
+    def latest(self) -> RuntimeSample:
+        """最近一次采样结果。尚未采样时立即采样一次(非阻塞)"""
+        if not self.samples:
+            return self._sample()
+        return self.samples[-1]
+
+    def history(self, since: float = 0) -> list[dict]:
+        return [asdict(s) for s in self.samples if s.timestamp >= since]
+
+    async def run(self):
+        """采样循环，作为后台任务运行"""
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = time.perf_counter() - start - self.interval
+            self._last_lag_ms = max(0.0, lag * 1000)
+            self._sample()
+
+
+runtime_sampler = RuntimeSampler()
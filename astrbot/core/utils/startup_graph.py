@@ -0,0 +1,88 @@
+"""按依赖关系并发执行的启动步骤。
+
+每个步骤在其依赖全部完成后立即开始，互不依赖的步骤并发执行。
+执行结束后可以输出每个步骤的耗时报告。
+"""
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+from astrbot.core import logger
+
+
+@dataclass
+class StartupStep:
+    name: str
+    func: Callable[[], Awaitable[None]]
+    deps: tuple[str, ...] = ()
+    started_at: float = 0
+    finished_at: float = 0
+    waited: float = field(default=0)
+    """等待依赖完成的时间"""
+
+
+class StartupGraph:
+    def __init__(self) -> None:
+        self.steps: dict[str, StartupStep] = {}
+        self._t0 = 0.0
+        self._finished_at = 0.0
+
+    def add(
+        self,
+        name: str,
+        func: Callable[[], Awaitable[None]],
+        deps: tuple[str, ...] | list[str] = (),
+    ):
+        for dep in deps:
+            if dep not in self.steps:
+                raise ValueError(f"启动步骤 {name} 依赖未知的步骤 {dep}")
+        self.steps[name] = StartupStep(name, func, tuple(deps))
+
+    async def run(self):
+        """执行所有步骤。任一步骤失败时取消其余步骤并抛出异常。"""
+        self._t0 = time.perf_counter()
+        tasks: dict[str, asyncio.Task] = {}
+
+        async def run_step(step: StartupStep):
+            if step.deps:
+                await asyncio.gather(*(tasks[d] for d in step.deps))
+            step.started_at = time.perf_counter()
+            step.waited = step.started_at - self._t0
+            try:
+                await step.func()
+            finally:
+                step.finished_at = time.perf_counter()
+
+        # 依赖总是先于依赖方添加, 所以按添加顺序创建任务即可
+        for name, step in self.steps.items():
+            tasks[name] = asyncio.create_task(run_step(step), name=f"startup:{name}")
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+        finally:
+            self._finished_at = time.perf_counter()
+
+    def report(self) -> list[dict]:
+        return [
+            {
+                "name": step.name,
+                "start": round(step.waited, 3),
+                "duration": round(max(0.0, step.finished_at - step.started_at), 3),
+                "deps": list(step.deps),
+            }
+            for step in self.steps.values()
+        ]
+
+    def log_report(self):
+        total = self._finished_at - self._t0
+        lines = [f"启动耗时 {total:.2f}s:"]
+        for item in sorted(self.report(), key=lambda i: i["start"]):
+            lines.append(
+                f"  {item['name']:<16} +{item['start']:.2f}s  耗时 {item['duration']:.2f}s",
+            )
+        logger.info("\n".join(lines))
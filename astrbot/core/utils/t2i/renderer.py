@@ -1,6 +1,5 @@
 from astrbot.core.log import LogManager
 
-from .local_strategy import LocalRenderStrategy
 from .network_strategy import NetworkRenderStrategy
 
 logger = LogManager.GetLogger(log_name="astrbot")
@@ -9,7 +8,16 @@ logger = LogManager.GetLogger(log_name="astrbot")
 class HtmlRenderer:
     def __init__(self, endpoint_url: str | None = None):
         self.network_strategy = NetworkRenderStrategy(endpoint_url)
-        self.local_strategy = LocalRenderStrategy()
+        self._local_strategy = None
+
+    @property
+    def local_strategy(self):
+        """本地渲染策略, 首次使用时再加载"""
+        if self._local_strategy is None:
+            from .local_strategy import LocalRenderStrategy
+
+            self._local_strategy = LocalRenderStrategy()
+        return self._local_strategy
 
     async def initialize(self):
         await self.network_strategy.initialize()
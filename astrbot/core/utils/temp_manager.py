@@ -0,0 +1,270 @@
+"""临时文件管理。
+
+写入 data/temp 的文件在创建时登记类别与过期时间，由一个后台任务统一清理：
+
+- 过期时间保存在最小堆中，每次清理只处理已到期的文件，不需要遍历整个目录。
+- 文件大小在登记后首次清理时读取一次；临时目录总大小超过配额时，按过期时间从早到晚提前删除，
+  删除前重新读取候选文件的大小。
+- 未登记的文件(旧版本残留、尚未接入的代码路径)由低频的目录扫描发现，按修改时间计算过期时间。
+  同一次扫描也会校正已登记文件的大小，移除已被调用方删除的文件。
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+
+from .astrbot_path import get_astrbot_data_path
+
+logger = logging.getLogger("astrbot")
+
+DEFAULT_TTL = 12 * 3600
+CATEGORY_TTL = {
+    "image": 12 * 3600,
+    "download": 12 * 3600,
+    "tts": 6 * 3600,
+    "record": 6 * 3600,
+}
+"""各类别临时文件的默认保留时间(秒)"""
+
+
+@dataclass
+class TempFile:
+    category: str
+    expire_at: float
+    size: int | None = None
+    """文件大小，登记时文件可能尚未写入，清理时补充"""
+
+
+class TempFileManager:
+    def __init__(
+        self,
+        temp_dir: str | None = None,
+        quota_bytes: int = 1024 * 1024 * 1024,
+        sweep_interval: float = 300,
+        scan_interval: float = 3600,
+    ) -> None:
+        """
+        Args:
+            temp_dir: 临时目录，默认为 data/temp
+            quota_bytes: 临时文件总大小上限
+            sweep_interval: 清理间隔(秒)
+            scan_interval: 扫描未登记文件的间隔(秒)
+
+        """
+        self.temp_dir = temp_dir or os.path.join(get_astrbot_data_path(), "temp")
+        self.quota_bytes = quota_bytes
+        self.sweep_interval = sweep_interval
+        self.scan_interval = scan_interval
+        self._files: dict[str, TempFile] = {}
+        self._unsized: set[str] = set()
+        """大小未知(登记时尚未写入)的文件"""
+        self._heap: list[tuple[float, int, str]] = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._total_bytes = 0
+        self._last_scan = 0.0
+        self.stats = {"expired": 0, "evicted": 0, "last_sweep": 0.0}
+
+    def configure(self, quota_mb: int | None = None):
+        if quota_mb is not None and quota_mb > 0:
+            self.quota_bytes = quota_mb * 1024 * 1024
+
+    def register(
+        self,
+        path: str,
+        category: str = "misc",
+        ttl: float | None = None,
+    ) -> str:
+        """登记一个临时文件，返回原路径。重复登记会刷新过期时间。"""
+        if ttl is None:
+            ttl = CATEGORY_TTL.get(category, DEFAULT_TTL)
+        path = os.path.abspath(path)
+        self._add(path, category, time.time() + ttl)
+        return path
+
+    def new_path(
+        self,
+        suffix: str = "",
+        category: str = "misc",
+        ttl: float | None = None,
+        prefix: str = "",
+    ) -> str:
+        """生成一个临时文件路径并登记，文件由调用方写入"""
+        os.makedirs(self.temp_dir, exist_ok=True)
+        name = f"{prefix}{uuid.uuid4().hex}{suffix}"
+        return self.register(os.path.join(self.temp_dir, name), category, ttl)
+
+    def _add(self, path: str, category: str, expire_at: float, size=None):
+        with self._lock:
+            old = self._files.get(path)
+            if old is not None and old.size:
+                self._total_bytes -= old.size
+            self._files[path] = TempFile(category, expire_at, size)
+            if size is None:
+                self._unsized.add(path)
+            else:
+                self._unsized.discard(path)
+                self._total_bytes += size
+            heapq.heappush(self._heap, (expire_at, next(self._seq), path))
+
+    def _pop_entry(self, path: str) -> TempFile | None:
+        """调用方需持有锁"""
+        entry = self._files.pop(path, None)
+        self._unsized.discard(path)
+        if entry is not None and entry.size:
+            self._total_bytes -= entry.size
+        return entry
+
+    def _set_size(self, path: str, size: int):
+        """调用方需持有锁"""
+        entry = self._files.get(path)
+        if entry is None:
+            return
+        if entry.size:
+            self._total_bytes -= entry.size
+        entry.size = size
+        self._total_bytes += size
+        self._unsized.discard(path)
+
+    def _scan(self):
+        """扫描临时目录：登记未登记的文件，校正已登记文件的大小，移除已不存在的文件"""
+        try:
+            it = os.scandir(self.temp_dir)
+        except FileNotFoundError:
+            return
+        temp_dir = os.path.abspath(self.temp_dir)
+        found = []
+        sizes: dict[str, int] = {}
+        with it:
+            for entry in it:
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                path = os.path.abspath(entry.path)
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                if path in self._files:
+                    sizes[path] = st.st_size
+                else:
+                    found.append((path, st.st_mtime + DEFAULT_TTL, st.st_size))
+        with self._lock:
+            for path, entry in list(self._files.items()):
+                if path in sizes:
+                    if entry.size != sizes[path]:
+                        self._set_size(path, sizes[path])
+                elif entry.size is not None and os.path.dirname(path) == temp_dir:
+                    # 已被调用方删除。堆中的记录在弹出时跳过
+                    self._pop_entry(path)
+        for path, expire_at, size in found:
+            self._add(path, "unregistered", expire_at, size)
+        if found:
+            logger.debug(f"发现 {len(found)} 个未登记的临时文件")
+
+    def _fill_sizes(self):
+        """读取登记后已写入的文件的大小，只处理大小未知的文件"""
+        with self._lock:
+            paths = list(self._unsized)
+        sizes: dict[str, int] = {}
+        for path in paths:
+            try:
+                sizes[path] = os.path.getsize(path)
+            except OSError:
+                continue  # 尚未写入
+        with self._lock:
+            for path, size in sizes.items():
+                if path in self._unsized:
+                    self._set_size(path, size)
+
+    @staticmethod
+    def _current_size(path: str) -> int | None:
+        try:
+            return os.path.getsize(path)
+        except FileNotFoundError:
+            return None
+        except OSError:
+            return -1
+
+    def sweep(self) -> int:
+        """删除过期文件，并在超出配额时提前删除最早过期的文件。返回删除的文件数。
+
+        包含文件 I/O，应在线程中调用。
+        """
+        now = time.time()
+        if now - self._last_scan >= self.scan_interval:
+            self._last_scan = now
+            self._scan()
+        self._fill_sizes()
+
+        to_remove: list[str] = []
+        with self._lock:
+            while self._heap:
+                expire_at, _, path = self._heap[0]
+                entry = self._files.get(path)
+                if entry is None or entry.expire_at != expire_at:
+                    heapq.heappop(self._heap)  # 已删除或已重新登记
+                    continue
+                if expire_at <= now:
+                    self.stats["expired"] += 1
+                elif self._total_bytes > self.quota_bytes:
+                    # 只对要提前删除的文件重新读取大小
+                    size = self._current_size(path)
+                    if size is None:
+                        heapq.heappop(self._heap)
+                        self._pop_entry(path)  # 已被调用方删除
+                        continue
+                    if size >= 0 and size != entry.size:
+                        self._set_size(path, size)
+                        continue
+                    self.stats["evicted"] += 1
+                else:
+                    break
+                heapq.heappop(self._heap)
+                self._pop_entry(path)
+                to_remove.append(path)
+            self.stats["last_sweep"] = now
+
+        for path in to_remove:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"删除临时文件 {path} 失败: {e}")
+        return len(to_remove)
+
+    def usage(self) -> dict:
+        """临时文件的用量统计"""
+        with self._lock:
+            by_category: dict[str, dict] = {}
+            for entry in self._files.values():
+                c = by_category.setdefault(entry.category, {"count": 0, "bytes": 0})
+                c["count"] += 1
+                c["bytes"] += entry.size or 0
+            return {
+                "total_bytes": self._total_bytes,
+                "file_count": len(self._files),
+                "quota_bytes": self.quota_bytes,
+                "by_category": by_category,
+                **self.stats,
+            }
+
+    async def run(self):
+        """后台清理循环"""
+        while True:
+            try:
+                removed = await asyncio.to_thread(self.sweep)
+                if removed:
+                    logger.debug(f"已清理 {removed} 个临时文件")
+            except Exception as e:
+                logger.error(f"清理临时文件失败: {e}")
+            await asyncio.sleep(self.sweep_interval)
+
+
+temp_file_manager = TempFileManager()
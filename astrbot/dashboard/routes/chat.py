@@ -15,6 +15,12 @@ from astrbot.core.utils.astrbot_path import get_astrbot_data_path
 
 from .route import Response, Route, RouteContext
 
+DETACHED_IDLE_TIMEOUT = 300
+"""客户端断开后，等待回复中下一条消息的最长时间(秒)"""
+
+STREAM_BUFFER_SIZE = 64
+"""后台任务转发给 SSE 流的消息队列长度，SSE 流读取跟不上时后台任务暂停读取回复"""
+
 
 @asynccontextmanager
 async def track_conversation(convs: dict, conv_id: str):
@@ -56,6 +62,7 @@ class ChatRoute(Route):
         self.conv_mgr = core_lifecycle.conversation_manager
         self.platform_history_mgr = core_lifecycle.platform_message_history_manager
         self.db = db
+        self._background_tasks: set[asyncio.Task] = set()
 
         self.running_convs: dict[str, bool] = {}
 
@@ -112,6 +119,119 @@ class ChatRoute(Route):
 
         return Response().ok(data={"filename": filename}).__dict__
 
+    async def _consume_responses(
+        self,
+        conv_id: str,
+        back_queue: asyncio.Queue,
+        listener: asyncio.Queue,
+        detached: asyncio.Event,
+    ):
+        """读取一次回复的所有消息，转发给 SSE 流，并在结束时把机器人消息写入历史记录。
+
+        SSE 流断开(detached 被设置)后继续读取，直到回复结束或空闲超时。
+        回复结束时向 listener 放入 None。
+        """
+        # 机器人消息在回复结束时批量写入
+        bot_histories: list[dict] = []
+        try:
+            async with track_conversation(self.running_convs, conv_id):
+                while True:
+                    attached = not detached.is_set()
+                    if attached:
+                        result = await back_queue.get()
+                    else:
+                        try:
+                            result = await asyncio.wait_for(
+                                back_queue.get(),
+                                timeout=DETACHED_IDLE_TIMEOUT,
+                            )
+                        except asyncio.TimeoutError:
+                            logger.warning(
+                                f"[WebChat] 会话 {conv_id} 的回复在客户端断开后 {DETACHED_IDLE_TIMEOUT} 秒内未结束，停止读取。",
+                            )
+                            break
+                    if not result:
+                        continue
+                    await self._forward(listener, result, detached)
+
+                    type = result.get("type")
+                    streaming = result.get("streaming", False)
+                    if type == "end":
+                        break
+                    if (
+                        (streaming and type == "complete")
+                        or not streaming
+                        or type == "break"
+                    ):
+                        # 追加机器人消息
+                        new_his = {"type": "bot", "message": result["data"]}
+                        if "reasoning" in result:
+                            new_his["reasoning"] = result["reasoning"]
+                        bot_histories.append(new_his)
+        except Exception as e:
+            logger.exception(f"WebChat response consumer error: {e}", exc_info=True)
+        finally:
+            await self._forward(listener, None, detached)
+            webchat_queue_mgr.release_back_queue(conv_id)
+            webchat_queue_mgr.remove_queues_if_idle(conv_id)
+            if bot_histories:
+                await self.platform_history_mgr.insert_many(
+                    platform_id="webchat",
+                    user_id=conv_id,
+                    contents=bot_histories,
+                    sender_id="bot",
+                    sender_name="bot",
+                )
+
+    @staticmethod
+    async def _forward(
+        listener: asyncio.Queue,
+        item: dict | None,
+        detached: asyncio.Event,
+    ):
+        """转发给 SSE 流。队列已满时等待 SSE 流读取；SSE 流断开或长时间未读取时不再转发。"""
+        if detached.is_set():
+            return
+        try:
+            listener.put_nowait(item)
+            return
+        except asyncio.QueueFull:
+            pass
+        put = asyncio.create_task(listener.put(item))
+        wait_detached = asyncio.create_task(detached.wait())
+        try:
+            done, _ = await asyncio.wait(
+                {put, wait_detached},
+                timeout=DETACHED_IDLE_TIMEOUT,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not done:
+                detached.set()
+        finally:
+            put.cancel()
+            wait_detached.cancel()
+
+    @staticmethod
+    def _coalesce_results(results: list[dict]) -> list[dict]:
+        """合并积压的连续流式文本片段，客户端跟不上时减少 SSE 事件数量"""
+        merged: list[dict] = []
+        for result in results:
+            if not result:
+                continue
+            prev = merged[-1] if merged else None
+            if (
+                prev is not None
+                and result.get("type") == "plain"
+                and result.get("streaming")
+                and prev.get("type") == "plain"
+                and prev.get("streaming")
+                and prev.get("chain_type") == result.get("chain_type")
+            ):
+                merged[-1] = {**prev, "data": prev["data"] + result["data"]}
+            else:
+                merged.append(result)
+        return merged
+
     async def chat(self):
         username = g.get("username", "guest")
 
@@ -146,7 +266,7 @@ class ChatRoute(Route):
         webchat_conv_id = session_id
 
         # 获取会话特定的队列
-        back_queue = webchat_queue_mgr.get_or_create_back_queue(webchat_conv_id)
+        back_queue = webchat_queue_mgr.acquire_back_queue(webchat_conv_id)
 
         new_his = {"type": "user", "message": message}
         if image_url:
@@ -161,66 +281,35 @@ class ChatRoute(Route):
             sender_name=username,
         )
 
-        async def stream():
-            client_disconnected = False
+        # 由后台任务读取回复并写入历史记录，客户端断开后仍会读完整个回复
+        listener: asyncio.Queue = asyncio.Queue(maxsize=STREAM_BUFFER_SIZE)
+        detached = asyncio.Event()
+        consumer = asyncio.create_task(
+            self._consume_responses(webchat_conv_id, back_queue, listener, detached),
+        )
+        self._background_tasks.add(consumer)
+        consumer.add_done_callback(self._background_tasks.discard)
 
+        async def stream():
             try:
-                async with track_conversation(self.running_convs, webchat_conv_id):
-                    while True:
-                        try:
-                            result = await asyncio.wait_for(back_queue.get(), timeout=1)
-                        except asyncio.TimeoutError:
-                            continue
-                        except asyncio.CancelledError:
-                            logger.debug(f"[WebChat] 用户 {username} 断开聊天长连接。")
-                            client_disconnected = True
-                        except Exception as e:
-                            logger.error(f"WebChat stream error: {e}")
-
-                        if not result:
-                            continue
-
-                        result_text = result["data"]
-                        type = result.get("type")
-                        streaming = result.get("streaming", False)
-
-                        try:
-                            if not client_disconnected:
-                                yield f"data: {json.dumps(result, ensure_ascii=False)}\n\n"
-                        except Exception as e:
-                            if not client_disconnected:
-                                logger.debug(
-                                    f"[WebChat] 用户 {username} 断开聊天长连接。 {e}",
-                                )
-                            client_disconnected = True
-
-                        try:
-                            if not client_disconnected:
-                                await asyncio.sleep(0.05)
-                        except asyncio.CancelledError:
-                            logger.debug(f"[WebChat] 用户 {username} 断开聊天长连接。")
-                            client_disconnected = True
-
-                        if type == "end":
-                            break
-                        elif (
-                            (streaming and type == "complete")
-                            or not streaming
-                            or type == "break"
-                        ):
-                            # 追加机器人消息
-                            new_his = {"type": "bot", "message": result_text}
-                            if "reasoning" in result:
-                                new_his["reasoning"] = result["reasoning"]
-                            await self.platform_history_mgr.insert(
-                                platform_id="webchat",
-                                user_id=webchat_conv_id,
-                                content=new_his,
-                                sender_id="bot",
-                                sender_name="bot",
-                            )
-            except BaseException as e:
+                while True:
+                    # 无超时等待下一条消息，随后一次性取出已积压的消息
+                    results = [await listener.get()]
+                    while not listener.empty():
+                        results.append(listener.get_nowait())
+                    finished = None in results
+                    for result in self._coalesce_results(results):
+                        yield f"data: {json.dumps(result, ensure_ascii=False)}\n\n"
+                    if finished:
+                        break
+            except (asyncio.CancelledError, GeneratorExit):
+                logger.debug(f"[WebChat] 用户 {username} 断开聊天长连接。")
+                raise
+            except Exception as e:
                 logger.exception(f"WebChat stream unexpected error: {e}", exc_info=True)
+            finally:
+                # 不再转发给客户端，后台任务继续读取并保存剩余的回复
+                detached.set()
 
         # 将消息放入会话特定的队列
         chat_queue = webchat_queue_mgr.get_or_create_queue(webchat_conv_id)
@@ -351,13 +440,18 @@ class ChatRoute(Route):
         session = await self.db.get_platform_session_by_id(session_id)
         platform_id = session.platform_id if session else "webchat"
 
-        # Get platform message history using session_id
-        history_ls = await self.platform_history_mgr.get(
-            platform_id=platform_id,
-            user_id=session_id,
-            page=1,
-            page_size=1000,
-        )
+        # Get platform message history using session_id.
+        # Older pages are fetched with the returned cursor.
+        page_size = min(max(request.args.get("page_size", 1000, type=int), 1), 1000)
+        try:
+            history_ls, next_cursor = await self.platform_history_mgr.get_page(
+                platform_id=platform_id,
+                user_id=session_id,
+                page_size=page_size,
+                cursor=request.args.get("cursor") or None,
+            )
+        except ValueError as e:
+            return Response().error(str(e)).__dict__
 
         history_res = [history.model_dump() for history in history_ls]
 
@@ -366,6 +460,7 @@ class ChatRoute(Route):
             .ok(
                 data={
                     "history": history_res,
+                    "next_cursor": next_cursor,
                     "is_running": self.running_convs.get(session_id, False),
                 },
             )
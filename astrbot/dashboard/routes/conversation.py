@@ -42,6 +42,8 @@ class ConversationRoute(Route):
             # 获取分页参数
             page = request.args.get("page", 1, type=int)
             page_size = request.args.get("page_size", 20, type=int)
+            # 游标分页, 提供时忽略 page
+            cursor = request.args.get("cursor") or None
 
             # 获取筛选参数
             platforms = request.args.get("platforms", "")
@@ -67,15 +69,19 @@ class ConversationRoute(Route):
                 (
                     conversations,
                     total_count,
-                ) = await self.conv_mgr.get_filtered_conversations(
-                    page=page,
+                    next_cursor,
+                ) = await self.conv_mgr.get_conversation_list(
                     page_size=page_size,
+                    cursor=cursor,
+                    page=page,
                     platforms=platform_list,
                     message_types=message_type_list,
                     search_query=search_query,
                     exclude_ids=exclude_id_list,
                     exclude_platforms=exclude_platform_list,
                 )
+            except ValueError as e:
+                return Response().error(str(e)).__dict__
             except Exception as e:
                 logger.error(f"数据库查询出错: {e!s}\n{traceback.format_exc()}")
                 return Response().error(f"数据库查询出错: {e!s}").__dict__
@@ -92,6 +98,7 @@ class ConversationRoute(Route):
                     "page_size": page_size,
                     "total": total_count,
                     "total_pages": total_pages,
+                    "next_cursor": next_cursor,
                 },
             }
             return Response().ok(result).__dict__
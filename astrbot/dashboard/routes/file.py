@@ -1,4 +1,4 @@
-from quart import abort, send_file
+from quart import abort, request, send_file
 
 from astrbot import logger
 from astrbot.core import file_token_service
@@ -19,8 +19,13 @@ class FileRoute(Route):
 
     async def serve_file(self, file_token: str):
         try:
-            file_path = await file_token_service.handle_file(file_token)
-            return await send_file(file_path)
+            # 分段下载会多次请求同一令牌，令牌在有限次数和时间内可重复使用
+            file_path = await file_token_service.handle_file(
+                file_token,
+                ranged=request.range is not None,
+            )
+            # conditional=True 时支持 Range 请求，文件内容分块流式发送
+            return await send_file(file_path, conditional=True)
         except (FileNotFoundError, KeyError) as e:
             logger.warning(str(e))
             return abort(404)
@@ -54,7 +54,7 @@ class LogRoute(Route):
     async def log_history(self):
         """获取日志历史"""
         try:
-            logs = list(self.log_broker.log_cache)
+            logs = self.log_broker.history()
             return (
                 Response()
                 .ok(
@@ -1,4 +1,4 @@
-import threading
+import asyncio
 import time
 import traceback
 
@@ -11,7 +11,11 @@ from astrbot.core.config import VERSION
 from astrbot.core.core_lifecycle import AstrBotCoreLifecycle
 from astrbot.core.db import BaseDatabase
 from astrbot.core.db.migration.helper import check_migration_needed_v4
+from astrbot.core.db.po import Platform as DeprecatedPlatformStat
+from astrbot.core.log import LogManager
 from astrbot.core.utils.io import get_dashboard_version
+from astrbot.core.utils.runtime_sampler import runtime_sampler
+from astrbot.core.utils.temp_manager import temp_file_manager
 
 from .route import Response, Route, RouteContext
 
@@ -26,6 +30,7 @@ class StatRoute(Route):
         super().__init__(context)
         self.routes = {
             "/stat/get": ("GET", self.get_stat),
+            "/stat/runtime": ("GET", self.get_runtime_samples),
             "/stat/version": ("GET", self.get_version),
             "/stat/start-time": ("GET", self.get_start_time),
             "/stat/restart-core": ("POST", self.restart_core),
@@ -61,6 +66,25 @@ class StatRoute(Route):
             and not DEMO_MODE
         )
 
+    async def get_runtime_samples(self):
+        """最近一段时间的运行时采样(CPU、内存、事件循环延迟)"""
+        since = float(request.args.get("since", 0))
+        return (
+            Response()
+            .ok(
+                {
+                    "interval": runtime_sampler.interval,
+                    "samples": runtime_sampler.history(since),
+                    "temp_files": temp_file_manager.usage(),
+                    "log_dropped": {
+                        "records": LogManager.dropped_records(),
+                        "subscribers": self.core_lifecycle.log_broker.dropped,
+                    },
+                },
+            )
+            .__dict__
+        )
+
     async def get_version(self):
         need_migration = await check_migration_needed_v4(self.core_lifecycle.db)
 
@@ -84,7 +108,11 @@ class StatRoute(Route):
         offset_sec = request.args.get("offset_sec", 86400)
         offset_sec = int(offset_sec)
         try:
-            stat = self.db_helper.get_base_stats(offset_sec)
+            hourly, grouped, message_count = await asyncio.gather(
+                self.db_helper.get_message_count_by_hour(offset_sec),
+                self.db_helper.get_message_count_by_platform(offset_sec),
+                self.db_helper.get_total_message_count_async(),
+            )
             now = int(time.time())
             start_time = now - offset_sec
             message_time_based_stats = []
@@ -93,17 +121,14 @@ class StatRoute(Route):
             for bucket_end in range(start_time, now, 3600):
                 cnt = 0
                 while (
-                    idx < len(stat.platform)
-                    and stat.platform[idx].timestamp < bucket_end
+                    idx < len(hourly) and int(hourly[idx][0].timestamp()) < bucket_end
                 ):
-                    cnt += stat.platform[idx].count
+                    cnt += hourly[idx][1]
                     idx += 1
                 message_time_based_stats.append([bucket_end, cnt])
 
-            stat_dict = stat.__dict__
-
-            cpu_percent = psutil.cpu_percent(interval=0.5)
-            thread_count = threading.active_count()
+            # CPU、内存等由后台采样器定期采集，这里只读取最近一次结果
+            sample = runtime_sampler.latest()
 
             # 获取插件信息
             plugins = self.core_lifecycle.star_context.get_all_stars()
@@ -121,28 +146,33 @@ class StatRoute(Route):
                 int(time.time()) - self.core_lifecycle.start_time,
             )
 
-            stat_dict.update(
-                {
-                    "platform": self.db_helper.get_grouped_base_stats(
-                        offset_sec,
-                    ).platform,
-                    "message_count": self.db_helper.get_total_message_count() or 0,
-                    "platform_count": len(
-                        self.core_lifecycle.platform_manager.get_insts(),
-                    ),
-                    "plugin_count": len(plugins),
-                    "plugins": plugin_info,
-                    "message_time_series": message_time_based_stats,
-                    "running": running_time,  # 现在返回时间组件而不是格式化的字符串
-                    "memory": {
-                        "process": psutil.Process().memory_info().rss >> 20,
-                        "system": psutil.virtual_memory().total >> 20,
-                    },
-                    "cpu_percent": round(cpu_percent, 1),
-                    "thread_count": thread_count,
-                    "start_time": self.core_lifecycle.start_time,
+            stat_dict = {
+                "platform": [
+                    DeprecatedPlatformStat(
+                        name=platform_id,
+                        count=count,
+                        timestamp=start_time,
+                    )
+                    for platform_id, count in grouped
+                ],
+                "message_count": message_count,
+                "platform_count": len(
+                    self.core_lifecycle.platform_manager.get_insts(),
+                ),
+                "plugin_count": len(plugins),
+                "plugins": plugin_info,
+                "message_time_series": message_time_based_stats,
+                "running": running_time,  # 现在返回时间组件而不是格式化的字符串
+                "memory": {
+                    "process": sample.memory_rss_mb,
+                    "system": psutil.virtual_memory().total >> 20,
                 },
-            )
+                "cpu_percent": sample.cpu_percent,
+                "process_cpu_percent": sample.process_cpu_percent,
+                "loop_lag_ms": sample.loop_lag_ms,
+                "thread_count": sample.thread_count,
+                "start_time": self.core_lifecycle.start_time,
+            }
 
             return Response().ok(stat_dict).__dict__
         except Exception as e:
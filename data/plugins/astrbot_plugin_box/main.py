@@ -40,8 +40,8 @@ class Box(Star):
 
         # 获取用户群信息
         try:
-            member_info = await client.get_group_member_info(
-                user_id=int(target_id), group_id=int(group_id)
+            member_info = await self.context.group_roster.get_member(
+                client, group_id, target_id
             )
         except:  # noqa: E722
             member_info = {}
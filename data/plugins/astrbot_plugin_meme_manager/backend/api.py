@@ -15,6 +15,13 @@ api = Blueprint("api", __name__)
 logger = logging.getLogger(__name__)
 
 
+def _get_catalog():
+    """管理后台进程中的表情包索引"""
+    plugin_config = current_app.config.get("PLUGIN_CONFIG", {})
+    category_manager = plugin_config.get("category_manager")
+    return getattr(category_manager, "catalog", None)
+
+
 @api.route("/emoji", methods=["GET"])
 async def get_all_emojis():
     """获取所有表情包（按类别分组）"""
@@ -64,6 +71,9 @@ async def add_emoji():
             # 添加成功后同步配置
             plugin_config = current_app.config.get("PLUGIN_CONFIG", {})
             category_manager = plugin_config.get("category_manager")
+            catalog = _get_catalog()
+            if catalog is not None:
+                catalog.add(category, os.path.basename(result_path))
             if category_manager:
                 category_manager.sync_with_filesystem()
                 
@@ -94,6 +104,9 @@ async def delete_emoji():
         return jsonify({"message": "Category and image file are required"}), 400
 
     if delete_emoji_from_category(category, image_file):
+        catalog = _get_catalog()
+        if catalog is not None:
+            catalog.remove(category, image_file)
         return jsonify({"message": "Emoji deleted successfully", "category": category, "filename": image_file}), 200
     else:
         return jsonify({"message": "Emoji not found"}), 404
@@ -1,15 +1,17 @@
 import os
 import logging
-from typing import Dict, Set, List, Tuple
+from typing import Dict, Set, List, Tuple, Optional
 from ..config import MEMES_DIR, MEMES_DATA_PATH, DEFAULT_CATEGORY_DESCRIPTIONS
 from ..utils import ensure_dir_exists, save_json, load_json
+from ..meme_catalog import MemeCatalog
 
 logger = logging.getLogger(__name__)
 
 class CategoryManager:
-    def __init__(self):
+    def __init__(self, catalog: Optional[MemeCatalog] = None):
         """初始化类别管理器"""
         ensure_dir_exists(MEMES_DIR)
+        self.catalog = catalog
         self._ensure_data_file()
         self.descriptions = self._load_descriptions()
         
@@ -26,6 +28,8 @@ class CategoryManager:
     def get_local_categories(self) -> Set[str]:
         """获取本地文件夹中的类别"""
         try:
+            if self.catalog is not None:
+                return set(self.catalog.categories())
             return {d for d in os.listdir(MEMES_DIR) 
                    if os.path.isdir(os.path.join(MEMES_DIR, d))}
         except Exception as e:
@@ -73,6 +77,8 @@ class CategoryManager:
             new_path = os.path.join(MEMES_DIR, new_name)
             if os.path.exists(old_path):
                 os.rename(old_path, new_path)
+            if self.catalog is not None:
+                self.catalog.invalidate()
             
             # 同步更新内存中的数据
             return save_json(self.descriptions, MEMES_DATA_PATH)
@@ -95,6 +101,8 @@ class CategoryManager:
             if os.path.exists(category_path):
                 import shutil
                 shutil.rmtree(category_path)
+            if self.catalog is not None:
+                self.catalog.invalidate(category)
             
             return True
         except Exception as e:
@@ -1,6 +1,8 @@
 from pathlib import Path
 from typing import List, Dict
 
+from ...meme_catalog import MemeCatalog
+
 
 class FileHandler:
     """文件处理类"""
@@ -12,7 +14,15 @@ class FileHandler:
         self.base_dir.mkdir(parents=True, exist_ok=True)
 
     def scan_local_images(self) -> List[Dict[str, str]]:
-        """扫描本地图片"""
+        """获取本地图片列表
+
+        存在表情包清单时基于清单获取，只重新列出 mtime 有变化的类别目录，否则遍历整个目录树。
+        """
+        catalog = MemeCatalog(self.base_dir)
+        if catalog.manifest_path.exists():
+            catalog.load()
+            return catalog.images()
+
         images = []
         for file_path in self.base_dir.rglob("*"):
             if (
@@ -24,6 +24,7 @@ from .utils import get_public_ip, generate_secret_key, dict_to_string, load_json
 from .image_host.img_sync import ImageSync
 from .config import MEMES_DIR, MEMES_DATA_PATH, DEFAULT_CATEGORY_DESCRIPTIONS
 from .backend.category_manager import CategoryManager
+from .meme_catalog import MemeCatalog
 from .init import init_plugin
 
 
@@ -39,8 +40,12 @@ class MemeSender(Star):
         if not init_plugin():
             raise RuntimeError("插件初始化失败")
 
+        # 建立表情包索引，发送表情时不再遍历目录
+        self.catalog = MemeCatalog(MEMES_DIR)
+        self.catalog.load()
+
         # 初始化类别管理器
-        self.category_manager = CategoryManager()
+        self.category_manager = CategoryManager(self.catalog)
 
         # 初始化图床同步客户端
         self.img_sync = None
@@ -355,6 +360,7 @@ class MemeSender(Star):
                     with open(save_path, "wb") as f:
                         f.write(content)
                     saved_files.append(filename)
+                    self.catalog.add(category, filename)
 
                 except Exception as e:
                     self.logger.error(f"下载图片失败: {str(e)}")
@@ -400,17 +406,13 @@ class MemeSender(Star):
 
         for emotion in self.category_manager.get_descriptions().values():
             emotion_path = os.path.join(MEMES_DIR, emotion)
-            if not os.path.exists(emotion_path):
+            if emotion not in self.catalog.categories():
                 self.logger.error(
                     f"表情分类 {emotion} 对应的目录不存在，请查看: {emotion_path}"
                 )
                 continue
 
-            memes = [
-                f
-                for f in os.listdir(emotion_path)
-                if f.endswith((".jpg", ".png", ".gif"))
-            ]
+            memes = self.catalog.files(emotion)
             if not memes:
                 self.logger.error(f"表情分类 {emotion} 对应的目录为空: {emotion_path}")
             else:
@@ -715,21 +717,10 @@ class MemeSender(Star):
                 if not emotion:
                     continue
 
-                emotion_path = os.path.join(MEMES_DIR, emotion)
-                if not os.path.exists(emotion_path):
-                    continue
-
-                memes = [
-                    f
-                    for f in os.listdir(emotion_path)
-                    if f.endswith((".jpg", ".png", ".gif"))
-                ]
-                if not memes:
+                meme_file = self.catalog.random_file(emotion)
+                if not meme_file:
                     continue
 
-                meme = random.choice(memes)
-                meme_file = os.path.join(emotion_path, meme)
-
                 if random.randint(0, 100) <= self.emotions_probability:
                     if event.get_platform_name() == "gewechat":
                         await event.send(
@@ -844,3 +835,6 @@ class MemeSender(Star):
 
         await self._shutdown()
         await self._cleanup_resources()
+
+        # 写入尚未保存的表情包索引
+        self.catalog.save()
@@ -0,0 +1,239 @@
+import os
+import json
+import random
+import time
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_FORMATS = (".jpg", ".jpeg", ".png", ".gif", ".webp")
+MANIFEST_FILENAME = ".meme_manifest.json"
+SAVE_INTERVAL = 30
+"""两次写入清单之间的最短间隔(秒)"""
+
+
+class MemeCatalog:
+    """表情包目录的内存索引
+
+    启动时建立一次，之后不再遍历目录：
+    - 每个类别记录目录的 mtime，访问类别时只 stat 一次目录，mtime 变化(管理后台或云端同步修改了文件)时才重新列出该类别
+    - 本进程内上传、删除表情时直接更新索引
+    - 索引持久化到 .meme_manifest.json，下次启动时 mtime 未变化的类别无需重新列出，图床同步也基于该清单计算差异
+    - 索引变化后最多每 SAVE_INTERVAL 秒写一次清单，退出时调用 save() 写入剩余的变化。
+      清单落后于目录时只会让对应类别在加载时按 mtime 重新列出，不会读到错误的列表
+    """
+
+    def __init__(self, memes_dir: Union[str, Path]):
+        self.memes_dir = Path(memes_dir)
+        self.manifest_path = self.memes_dir / MANIFEST_FILENAME
+        self._files: Dict[str, List[str]] = {}
+        """类别 -> 文件名列表，用于 O(1) 随机选取"""
+        self._positions: Dict[str, Dict[str, int]] = {}
+        """类别 -> {文件名: 在列表中的位置}，用于 O(1) 删除"""
+        self._mtimes: Dict[str, int] = {}
+        self._root_mtime = 0
+        self._dirty = False
+        self._last_save = 0.0
+
+    @staticmethod
+    def _is_meme(filename: str) -> bool:
+        return filename.lower().endswith(SUPPORTED_FORMATS)
+
+    @staticmethod
+    def _mtime(path: Path) -> Optional[int]:
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _set_files(self, category: str, files: List[str]):
+        self._files[category] = files
+        self._positions[category] = {f: i for i, f in enumerate(files)}
+
+    def _scan_category(self, category: str) -> bool:
+        """重新列出一个类别，返回类别目录是否存在"""
+        path = self.memes_dir / category
+        mtime = self._mtime(path)
+        if mtime is None or not path.is_dir():
+            self._drop_category(category)
+            return False
+        with os.scandir(path) as it:
+            files = sorted(e.name for e in it if e.is_file() and self._is_meme(e.name))
+        self._set_files(category, files)
+        self._mtimes[category] = mtime
+        self._dirty = True
+        return True
+
+    def _drop_category(self, category: str):
+        if self._files.pop(category, None) is not None:
+            self._dirty = True
+        self._positions.pop(category, None)
+        self._mtimes.pop(category, None)
+
+    def _load_manifest(self) -> Dict[str, dict]:
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f).get("categories", {})
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"读取表情包清单失败，将重新扫描: {e}")
+            return {}
+
+    def load(self):
+        """建立索引。清单中 mtime 未变化的类别直接复用，其余类别重新列出。"""
+        self.memes_dir.mkdir(parents=True, exist_ok=True)
+        manifest = self._load_manifest()
+        self._files.clear()
+        self._positions.clear()
+        self._mtimes.clear()
+        self._root_mtime = self._mtime(self.memes_dir) or 0
+        rescanned = 0
+        with os.scandir(self.memes_dir) as it:
+            categories = [e.name for e in it if e.is_dir()]
+        for category in categories:
+            entry = manifest.get(category)
+            mtime = self._mtime(self.memes_dir / category)
+            if entry and mtime is not None and entry.get("mtime") == mtime:
+                self._set_files(category, list(entry.get("files", [])))
+                self._mtimes[category] = mtime
+            else:
+                self._scan_category(category)
+                rescanned += 1
+        self._dirty = self._dirty or set(manifest) != set(categories)
+        self.save()
+        logger.info(
+            f"表情包索引已建立: {len(self._files)} 个类别，{self.count()} 张表情，重新扫描了 {rescanned} 个类别"
+        )
+
+    def save(self):
+        """把索引写入清单文件(有未保存的变化时)"""
+        if not self._dirty:
+            return
+        self._last_save = time.monotonic()
+        data = {
+            "categories": {
+                category: {"mtime": self._mtimes.get(category, 0), "files": files}
+                for category, files in self._files.items()
+            }
+        }
+        tmp_path = self.manifest_path.with_suffix(".tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.manifest_path)
+            self._dirty = False
+        except Exception as e:
+            logger.error(f"保存表情包清单失败: {e}")
+
+    def _save_later(self):
+        """距上次写入超过 SAVE_INTERVAL 秒时才写入清单，合并频繁的增删"""
+        if self._dirty and time.monotonic() - self._last_save >= SAVE_INTERVAL:
+            self.save()
+
+    def _refresh_root(self):
+        mtime = self._mtime(self.memes_dir)
+        if mtime is None or mtime == self._root_mtime:
+            return
+        self._root_mtime = mtime
+        with os.scandir(self.memes_dir) as it:
+            categories = {e.name for e in it if e.is_dir()}
+        for category in set(self._files) - categories:
+            self._drop_category(category)
+        for category in categories - set(self._files):
+            self._scan_category(category)
+        self._save_later()
+
+    def _refresh(self, category: str) -> bool:
+        """类别目录的 mtime 变化时重新列出该类别，返回类别是否存在"""
+        if category not in self._files:
+            self._refresh_root()
+            return category in self._files
+        mtime = self._mtime(self.memes_dir / category)
+        if mtime is not None and mtime == self._mtimes.get(category):
+            self._save_later()
+            return True
+        exists = self._scan_category(category)
+        self._save_later()
+        return exists
+
+    def categories(self) -> List[str]:
+        self._refresh_root()
+        return list(self._files)
+
+    def files(self, category: str) -> List[str]:
+        """类别下的所有表情文件名"""
+        if not self._refresh(category):
+            return []
+        return list(self._files[category])
+
+    def count(self, category: Optional[str] = None) -> int:
+        if category is None:
+            return sum(len(files) for files in self._files.values())
+        return len(self._files.get(category, ()))
+
+    def random_file(self, category: str) -> Optional[str]:
+        """随机选取类别下的一张表情，返回完整路径，类别不存在或为空时返回 None"""
+        if not self._refresh(category):
+            return None
+        files = self._files[category]
+        if not files:
+            return None
+        return str(self.memes_dir / category / random.choice(files))
+
+    def add(self, category: str, filename: str):
+        """记录新保存的表情(上传后调用)"""
+        if not self._is_meme(filename):
+            return
+        if category not in self._files:
+            self._scan_category(category)
+            self._root_mtime = self._mtime(self.memes_dir) or 0
+        elif filename not in self._positions[category]:
+            self._positions[category][filename] = len(self._files[category])
+            self._files[category].append(filename)
+            self._mtimes[category] = self._mtime(self.memes_dir / category) or 0
+            self._dirty = True
+        self._save_later()
+
+    def remove(self, category: str, filename: str):
+        """移除已删除的表情(删除后调用)"""
+        positions = self._positions.get(category)
+        if not positions or filename not in positions:
+            return
+        files = self._files[category]
+        # 与末尾元素交换后删除，保持 O(1)
+        index = positions.pop(filename)
+        last = files.pop()
+        if last != filename:
+            files[index] = last
+            positions[last] = index
+        self._mtimes[category] = self._mtime(self.memes_dir / category) or 0
+        self._dirty = True
+        self._save_later()
+
+    def invalidate(self, category: Optional[str] = None):
+        """丢弃一个类别(或全部类别)的索引，下次访问时重新列出"""
+        if category is None:
+            self._mtimes.clear()
+            self._root_mtime = 0
+        else:
+            self._mtimes.pop(category, None)
+
+    def images(self) -> List[Dict[str, str]]:
+        """所有表情的信息，格式与图床同步的本地文件列表一致"""
+        self._refresh_root()
+        images = []
+        for category in list(self._files):
+            self._refresh(category)
+            for filename in self._files.get(category, ()):
+                images.append(
+                    {
+                        "path": str(self.memes_dir / category / filename),
+                        "id": f"{category}/{filename}",
+                        "filename": filename,
+                        "category": category,
+                    }
+                )
+        return images
@@ -1,5 +1,7 @@
 import asyncio
+import hashlib
 import io
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from typing import Literal
 
@@ -8,9 +10,11 @@ from meme_generator.version import __version__
 
 from astrbot import logger
 from astrbot.core.config.astrbot_config import AstrBotConfig
+from astrbot.core.job_runner import job_runner
 from astrbot.core.platform.astr_message_event import AstrMessageEvent
 
 from .param import ParamsCollector
+from .render import render, render_meme
 
 
 @dataclass
@@ -19,6 +23,52 @@ class MemeProperties:
     labels: list[Literal["new", "hot"]] = field(default_factory=list)
 
 
+class MemeCache:
+    """按总大小淘汰的 LRU 缓存，保存合成好的 meme"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._items: OrderedDict[str, bytes] = OrderedDict()
+
+    @staticmethod
+    def make_key(
+        meme_key: str,
+        images: list[tuple[str, bytes]],
+        texts: list[str],
+        options: dict,
+        compress: bool,
+    ) -> str:
+        h = hashlib.sha256()
+        h.update(meme_key.encode())
+        for name, data in images:
+            h.update(b"\0img" + str(name).encode() + hashlib.sha1(data).digest())
+        for text in texts:
+            h.update(b"\0txt" + text.encode())
+        for k, v in sorted(options.items()):
+            h.update(f"\0opt{k}={v!r}".encode())
+        h.update(b"\0c1" if compress else b"\0c0")
+        return h.hexdigest()
+
+    def get(self, key: str) -> bytes | None:
+        image = self._items.get(key)
+        if image is not None:
+            self._items.move_to_end(key)
+        return image
+
+    def put(self, key: str, image: bytes):
+        if len(image) > self.max_bytes:
+            return
+        old = self._items.pop(key, None)
+        if old is not None:
+            self.total_bytes -= len(old)
+        self._items[key] = image
+        self.total_bytes += len(image)
+        while self.total_bytes > self.max_bytes:
+            _, evicted = self._items.popitem(last=False)
+            self.total_bytes -= len(evicted)
+
+
 class MemeManager:
     is_py_version = tuple(map(int, __version__.split("."))) < (0, 2, 0)
     def __init__(self, config: AstrBotConfig, collect: ParamsCollector):
@@ -44,6 +94,25 @@ class MemeManager:
             for m in self.memes
             for k in (m.keywords if self.is_py_version else m.info.keywords)
         ]
+        self._build_index()
+        self.cache = MemeCache(int(self.conf.get("cache_size_mb", 64)) << 20)
+        self._meme_list_image: bytes | None = None
+
+    def _build_index(self):
+        """建立关键词索引：关键词 -> meme，以及按长度分组的关键词集合(用于模糊匹配)"""
+        self._keyword_to_meme: dict[str, Meme] = {}
+        self._keyword_order: dict[str, int] = {}
+        for meme in self.memes:
+            keywords = meme.keywords if self.is_py_version else meme.info.keywords
+            self._keyword_to_meme.setdefault(meme.key, meme)
+            for k in keywords:
+                self._keyword_to_meme.setdefault(k, meme)
+        for i, k in enumerate(self.meme_keywords):
+            self._keyword_order.setdefault(k, i)
+        self._keywords_by_len: dict[int, set[str]] = {}
+        for k in self._keyword_order:
+            if k:
+                self._keywords_by_len.setdefault(len(k), set()).add(k)
 
     async def check_resources(self):
         if not self.conf["is_check_resources"]:
@@ -55,32 +124,46 @@ class MemeManager:
             asyncio.create_task(asyncio.to_thread(self.check_resources_func))
 
     def find_meme(self, keyword: str) -> Meme | None:
-        for meme in self.memes:
-            keywords = meme.keywords if self.is_py_version else meme.info.keywords
-            if keyword == meme.key or keyword in keywords:
-                return meme
+        return self._keyword_to_meme.get(keyword)
 
     def is_meme_keyword(self, meme_name: str) -> bool:
-        return meme_name in self.meme_keywords
+        return meme_name in self._keyword_order
 
     def match_meme_keyword(self, text: str, fuzzy_match: bool) -> str | None:
         if fuzzy_match:
-            # 模糊匹配：检查关键词是否在消息字符串中
-            keyword = next((k for k in self.meme_keywords if k in text), None)
-        else:
-            # 精确匹配：检查关键词是否等于消息字符串的第一个单词
-            keyword = next(
-                (k for k in self.meme_keywords if k == text.split()[0]), None
-            )
-        return keyword
+            # 模糊匹配：消息中含有关键词即可，多个关键词命中时取 meme 列表中靠前的
+            best = None
+            for length, keywords in self._keywords_by_len.items():
+                for i in range(len(text) - length + 1):
+                    k = text[i : i + length]
+                    if k in keywords and (
+                        best is None
+                        or self._keyword_order[k] < self._keyword_order[best]
+                    ):
+                        best = k
+            return best
+        # 精确匹配：检查关键词是否等于消息字符串的第一个单词
+        words = text.split()
+        if words and words[0] in self._keyword_order:
+            return words[0]
+        return None
 
     async def render_meme_list_image(self) -> bytes | None:
+        # meme 列表在运行期间不会变化，只渲染一次
+        if self._meme_list_image is None:
+            self._meme_list_image = await self._render_meme_list_image()
+        return self._meme_list_image
+
+    async def _render_meme_list_image(self) -> bytes | None:
         if self.is_py_version:
             meme_list = [(m, MemeProperties(labels=[])) for m in self.memes]
-            return self.render_meme_list(
-                meme_list=meme_list,  # type: ignore
-                text_template="{index}.{keywords}",
-                add_category_icon=True,
+            return (
+                await asyncio.to_thread(
+                    self.render_meme_list,
+                    meme_list=meme_list,  # type: ignore
+                    text_template="{index}.{keywords}",
+                    add_category_icon=True,
+                )
             ).getvalue()
         else:
             meme_props = {m.key: MemeProperties() for m in self.memes}
@@ -151,12 +234,26 @@ class MemeManager:
         # 收集参数
         params = meme.params_type if self.is_py_version else meme.info.params
         images, texts, options = await self.collect.collect_params(event, params)
+        compress = bool(self.conf["is_compress_image"])
 
-        if self.is_py_version:
-            meme_images = [i[1] for i in images]
-            return (
-                await self.run_sync(meme)(images=meme_images, texts=texts, args=options)
-            ).getvalue()
-        else:
-            meme_images = [self.MemeImage(name=str(i[0]), data=i[1]) for i in images]
-            return await asyncio.to_thread(meme.generate, meme_images, texts, options)
+        # 相同模板、图片、文本和参数的请求直接返回缓存
+        cache_key = MemeCache.make_key(meme.key, images, texts, options, compress)
+        if cached := self.cache.get(cache_key):
+            return cached
+
+        try:
+            # PIL 合成受 GIL 限制，放到渲染进程中执行，避免占满事件循环的默认线程池
+            image = await job_runner.run_in_process(
+                render_meme, meme.key, images, texts, options, compress
+            )
+        except ValueError:
+            # meme 本身的错误(文字过长、图片数量不符等)，重新合成也不会成功
+            raise
+        except Exception as e:
+            logger.warning(f"meme渲染进程不可用，改为在线程中合成: {e}")
+            image = await asyncio.to_thread(
+                render, meme, images, texts, options, compress
+            )
+        if image:
+            self.cache.put(cache_key, image)
+        return image
@@ -0,0 +1,69 @@
+"""
+在子进程中合成 meme。
+
+本模块会在渲染进程中被单独导入，只能依赖 meme_generator、PIL 和标准库，不要导入 astrbot。
+"""
+
+import io
+
+from meme_generator import get_meme
+from meme_generator.version import __version__
+
+from ..utils import compress_image
+
+try:
+    # 与主进程一样注册自定义 meme
+    from .. import custom_memes  # noqa: F401
+except ImportError:
+    pass
+
+IS_PY_VERSION = tuple(map(int, __version__.split("."))) < (0, 2, 0)
+
+if IS_PY_VERSION:
+    from meme_generator.exception import MemeGeneratorException
+
+
+def render_meme(
+    key: str,
+    images: list[tuple[str, bytes]],
+    texts: list[str],
+    options: dict,
+    compress: bool,
+) -> bytes:
+    """在渲染进程中按 key 查找并合成 meme"""
+    return render(get_meme(key), images, texts, options, compress)
+
+
+def render(
+    meme,
+    images: list[tuple[str, bytes]],
+    texts: list[str],
+    options: dict,
+    compress: bool,
+) -> bytes:
+    """合成 meme，返回(压缩后的)图片 bytes。
+
+    文字过长、图片数量不符等 meme 本身的错误统一以 ValueError 抛出。
+    """
+    if IS_PY_VERSION:
+        try:
+            output = meme(images=[i[1] for i in images], texts=texts, args=options)
+        except MemeGeneratorException as e:
+            # 转为 ValueError，保证能从渲染进程中传回
+            raise ValueError(f"meme生成失败: {e}") from None
+        image = output.getvalue() if isinstance(output, io.BytesIO) else output
+    else:
+        from meme_generator import Image as MemeImage
+
+        meme_images = [MemeImage(name=str(name), data=data) for name, data in images]
+        image = meme.generate(meme_images, texts, options)
+
+    if not isinstance(image, bytes):
+        # 0.2.x 生成失败时返回错误对象
+        raise ValueError(f"meme生成失败: {image}")
+    if compress:
+        try:
+            image = compress_image(image) or image
+        except Exception:
+            pass
+    return image
@@ -11,7 +11,6 @@ from astrbot.core.star.filter.event_message_type import EventMessageType
 from . import custom_memes  # noqa: F401
 from .core.meme import MemeManager
 from .core.param import ParamsCollector
-from .utils import compress_image
 
 
 @register("astrbot_plugin_memelite", "Zhalslar", "...", "...")
@@ -131,12 +130,6 @@ class MemePlugin(Star):
             logger.error(f"meme生成异常: {e}")
             return
 
-        if image and self.conf["is_compress_image"]:
-            try:
-                image = compress_image(image) or image
-            except Exception:
-                pass
-
         if image:
             yield event.chain_result([Comp.Image.fromBytes(image)])  # type: ignore
 
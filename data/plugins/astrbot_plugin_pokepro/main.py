@@ -115,16 +115,14 @@ class PokeproPlugin(Star):
         event.set_extra("is_poke_event", True)
         self.context.get_event_queue().put_nowait(event)
 
-    @staticmethod
-    async def get_nickname(event: AiocqhttpMessageEvent, user_id) -> str:
+    async def get_nickname(self, event: AiocqhttpMessageEvent, user_id) -> str:
         """获取指定群友的群昵称或Q名"""
         client = event.bot
         group_id = event.get_group_id()
         if group_id:
-            member_info = await client.get_group_member_info(
-                group_id=int(group_id), user_id=int(user_id)
+            return await self.context.group_roster.get_display_name(
+                client, group_id, user_id
             )
-            return member_info.get("card") or member_info.get("nickname")
         else:
             stranger_info = await client.get_stranger_info(user_id=int(user_id))
             return stranger_info.get("nickname")
@@ -306,8 +304,8 @@ class PokeproPlugin(Star):
 
         if "全体成员" in event.message_str and event.is_admin():
             try:
-                members_data = await event.bot.get_group_member_list(
-                    group_id=int(event.get_group_id())
+                members_data = await self.context.group_roster.get_member_list(
+                    event.bot, event.get_group_id()
                 )
                 user_ids = [member.get("user_id", "") for member in members_data]
                 # 由于每天戳一戳上限为200个，故只随机取200个
@@ -317,10 +315,19 @@ class PokeproPlugin(Star):
                 return
 
         if not target_ids:
-            result: dict = await event.bot.get_group_msg_history(
-                group_id=int(event.get_group_id())
+            # 最近发言的群友，优先从本地归档读取
+            recent = await self.context.group_message_archive.query(
+                event.get_group_id(),
+                limit=20,
+                platform_id=event.get_platform_id(),
+                newest_first=True,
             )
-            target_ids = [msg["sender"]["user_id"] for msg in result["messages"]]
+            if not recent:
+                result: dict = await event.bot.get_group_msg_history(
+                    group_id=int(event.get_group_id())
+                )
+                recent = result["messages"]
+            target_ids = [msg["sender"]["user_id"] for msg in recent]
 
         if not target_ids:
             return
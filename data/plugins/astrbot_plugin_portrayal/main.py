@@ -49,6 +49,19 @@ class Relationship(Star):
     ) -> tuple[list[dict], int]:
         """持续获取群聊历史消息直到达到要求"""
         group_id = event.get_group_id()
+        # 本地归档的消息足够时不再调用 API 翻页
+        archived = await self.context.group_message_archive.query(
+            group_id,
+            limit=self.conf["max_msg_count"],
+            user_id=target_id,
+            platform_id=event.get_platform_id(),
+            newest_first=True,
+        )
+        archived.reverse()
+        contexts = self._build_user_context(archived, target_id)
+        if len(contexts) >= self.conf["max_msg_count"]:
+            return contexts, 0
+
         query_rounds = 0
         message_seq = 0
         contexts: list[dict] = []
@@ -99,8 +112,11 @@ class Relationship(Star):
         self, event: AiocqhttpMessageEvent, user_id: str | int
     ) -> tuple[str, str]:
         """获取指定群友的昵称和性别"""
-        all_info = await event.bot.get_group_member_info(
-            group_id=int(event.get_group_id()), user_id=int(user_id)
+        all_info = (
+            await self.context.group_roster.get_member(
+                event.bot, event.get_group_id(), user_id
+            )
+            or {}
         )
         nickname = all_info.get("card") or all_info.get("nickname")
         gender = all_info.get("sex")
@@ -18,35 +18,59 @@ from astrbot.core.platform.sources.aiocqhttp.aiocqhttp_message_event import (
 from astrbot.core.platform.sources.aiocqhttp.aiocqhttp_platform_adapter import (
     AiocqhttpAdapter,
 )
+from astrbot.core.plugin_kv import PluginKV
 from astrbot.core.star.context import Context
 
 
 class CurfewStore:
-    """负责宵禁任务数据的统一持久化"""
+    """负责宵禁任务数据的统一持久化，每个群的宵禁时间保存为插件 KV 存储中的一个键"""
 
-    def __init__(self, data_dir: Path):
-        self.path = data_dir / "curfew_data.json"
-        self.path.parent.mkdir(parents=True, exist_ok=True)
-        if not self.path.exists():
-            self.path.write_text("{}", encoding="utf-8")
+    KEY_PREFIX = "curfew:"
+
+    def __init__(self, kv: PluginKV, data_dir: Path):
+        self.kv = kv
+        self.legacy_path = data_dir / "curfew_data.json"
         # {"bot_id": {"group_id": {"start_time", "end_time"}}
         self.data: dict[str, dict[str, dict[str, str]]] = {}
 
-    def load(self) -> dict[str, dict]:
-        if not self.path.exists():
-            return {}
+    def _key(self, bot_id: str, group_id: str) -> str:
+        return f"{self.KEY_PREFIX}{bot_id}:{group_id}"
+
+    async def _migrate_legacy(self):
+        """导入旧版本的 curfew_data.json"""
+        if not self.legacy_path.exists():
+            return
+        try:
+            with self.legacy_path.open("r", encoding="utf-8") as f:
+                legacy = json.load(f)
+            async with self.kv.transaction() as tx:
+                for bot_id, groups in legacy.items():
+                    for group_id, times in groups.items():
+                        tx.put(self._key(bot_id, group_id), times)
+            self.legacy_path.rename(self.legacy_path.with_suffix(".json.migrated"))
+            logger.info("已将宵禁任务数据迁移到插件存储")
+        except Exception as e:
+            logger.error(f"迁移宵禁任务数据失败: {e}", exc_info=True)
+
+    async def load(self) -> dict[str, dict]:
+        await self._migrate_legacy()
         try:
-            with self.path.open("r", encoding="utf-8") as f:
-                self.data = json.load(f)
+            items = await self.kv.items(self.KEY_PREFIX)
         except Exception as e:
             logger.error(f"加载宵禁任务数据失败: {e}", exc_info=True)
-            self.data = {}
+            return self.data
+        for key, times in items.items():
+            bot_id, _, group_id = key.removeprefix(self.KEY_PREFIX).partition(":")
+            self.data.setdefault(bot_id, {})[group_id] = times
         return self.data
 
-    def save(self):
+    async def save_group(self, bot_id: str, group_id: str):
         try:
-            with self.path.open("w", encoding="utf-8") as f:
-                json.dump(self.data, f, ensure_ascii=False, indent=2)
+            times = self.data.get(bot_id, {}).get(group_id)
+            if times:
+                await self.kv.put(self._key(bot_id, group_id), times)
+            else:
+                await self.kv.delete(self._key(bot_id, group_id))
             logger.debug("宵禁任务数据已保存")
         except Exception as e:
             logger.error(f"保存宵禁任务数据失败: {e}", exc_info=True)
@@ -186,24 +210,23 @@ class BotCurfewManager:
             except Exception as e:
                 logger.error(f"恢复群 {group_id} 宵禁失败: {e}")
 
-    def _save(self):
-        self.bot_data.clear()
-        self.bot_data.update(
-            {
-                gid: {"start_time": cw._start_time_str, "end_time": cw._end_time_str}
-                for gid, cw in self.tasks.items()
+    async def _save(self, group_id: str):
+        cw = self.tasks.get(group_id)
+        if cw:
+            self.bot_data[group_id] = {
+                "start_time": cw._start_time_str,
+                "end_time": cw._end_time_str,
             }
-        )
-        self.store.save()
+        else:
+            self.bot_data.pop(group_id, None)
+        await self.store.save_group(self.bot_id, group_id)
 
     async def remove_group_on_error(self, group_id: str):
         """当群无法操作时自动移除"""
         if group_id in self.tasks:
             cw = self.tasks.pop(group_id)
             cw.stop_curfew_task()
-        if group_id in self.bot_data:
-            self.bot_data.pop(group_id)
-        self._save()
+        await self._save(group_id)
         logger.info(f"群 {group_id} 因操作失败已从宵禁任务中移除")
 
     async def enable_curfew(self, group_id: str, start_time: str, end_time: str):
@@ -216,15 +239,14 @@ class BotCurfewManager:
 
         await cw.start_curfew_task()
         self.tasks[group_id] = cw
-        self._save()
+        await self._save(group_id)
 
     async def disable_curfew(self, group_id: str) -> bool:
         """关闭群聊的宵禁任务"""
         cw = self.tasks.pop(group_id, None)
         if cw:
             cw.stop_curfew_task()
-            self.bot_data.pop(group_id, None)
-            self._save()
+            await self._save(group_id)
             return True
         return False
 
@@ -241,8 +263,9 @@ class CurfewHandle:
         self.scheduler = AsyncIOScheduler(timezone=self.timezone)
         self.scheduler.start()
 
-        self.store = CurfewStore(data_dir)
-        self.store.load()
+        self.store = CurfewStore(
+            context.plugin_kv.namespace("astrbot_plugin_qqadmin"), data_dir
+        )
         self.curfew_managers: dict[str, BotCurfewManager] = {}
 
     async def _initialize_aiocqhttp_adapter(self, inst: AiocqhttpAdapter):
@@ -283,6 +306,7 @@ class CurfewHandle:
             logger.error(f"{inst.metadata.id} 宵禁初始化失败: {e}")
 
     async def initialize(self):
+        await self.store.load()
         tasks = [
             self._initialize_aiocqhttp_adapter(inst)
             for inst in self.context.platform_manager.platform_insts
@@ -356,4 +380,3 @@ class CurfewHandle:
             for cw in list(curfew_mgr.tasks.values()):
                 cw.stop_curfew_task()
             curfew_mgr.tasks.clear()
-        self.store.save()
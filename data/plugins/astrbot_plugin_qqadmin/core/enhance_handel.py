@@ -1,7 +1,6 @@
 import asyncio
 import random
 import time
-from collections import defaultdict, deque
 
 from astrbot.api import logger
 from astrbot.core.config.astrbot_config import AstrBotConfig
@@ -10,48 +9,73 @@ from astrbot.core.platform.sources.aiocqhttp.aiocqhttp_message_event import (
 )
 
 from ..utils import get_ats, get_nickname
+from .moderation import SpamTracker, WordMatcher
 
 
 class EnhanceHandle:
     def __init__(self, config: AstrBotConfig):
         self.conf = config
-        self.msg_timestamps: dict[str, dict[str, deque[float]]] = defaultdict(
-            lambda: defaultdict(lambda: deque(maxlen=self.conf["spamming"]["count"]))
-        )
-        self.last_banned_time: dict[str, dict[str, float]] = defaultdict(
-            lambda: defaultdict(float)
-        )
+        # 配置中的列表 -> (列表 id, 长度, 编译结果)，列表被替换或增删时重新编译
+        self._compiled: dict[str, tuple[int, int, object]] = {}
+        self.spam_tracker = SpamTracker()
+        self.stats = {"forbidden_matches": 0, "spamming_bans": 0}
         # 记录投票 {group_id: {"target": target_id, "votes": {user_id: bool}, "expire": timestamp, "threshold": threshold,}}
         self.vote_cache: dict[str, dict] = {}
 
+    def _get_compiled(self, name: str, items: list, build):
+        cached = self._compiled.get(name)
+        if cached is None or cached[0] != id(items) or cached[1] != len(items):
+            cached = (id(items), len(items), build(items))
+            self._compiled[name] = cached
+        return cached[2]
+
+    def _whitelist(self, section: str) -> set[str]:
+        return self._get_compiled(
+            f"{section}.whitelist",
+            self.conf[section]["whitelist"],
+            lambda items: {str(i) for i in items},
+        )
+
+    def _word_matcher(self) -> WordMatcher:
+        return self._get_compiled(
+            "forbidden.words", self.conf["forbidden"]["words"], WordMatcher
+        )
+
+    def get_stats(self) -> dict:
+        """违禁词命中、刷屏禁言次数及刷屏检测状态的淘汰次数"""
+        return {
+            **self.stats,
+            "spam_records": len(self.spam_tracker),
+            **self.spam_tracker.stats,
+        }
+
     async def check_forbidden_words(self, event: AiocqhttpMessageEvent):
         """违禁词禁言"""
         # 群聊白名单
-        if event.get_group_id() not in self.conf["forbidden"]["whitelist"]:
+        if event.get_group_id() not in self._whitelist("forbidden"):
             return
         if not self.conf["forbidden"]["words"] or not event.message_str:
             return
         # 检测违禁词
-        for word in self.conf["forbidden"]["words"]:
-            if word in event.message_str:
-                # 撤回消息
+        if self._word_matcher().search(event.message_str) is not None:
+            self.stats["forbidden_matches"] += 1
+            # 撤回消息
+            try:
+                message_id = event.message_obj.message_id
+                await event.bot.delete_msg(message_id=int(message_id))
+            except Exception:
+                pass
+            # 禁言发送者
+            if self.conf["forbidden"]["ban_time"] > 0:
                 try:
-                    message_id = event.message_obj.message_id
-                    await event.bot.delete_msg(message_id=int(message_id))
+                    await event.bot.set_group_ban(
+                        group_id=int(event.get_group_id()),
+                        user_id=int(event.get_sender_id()),
+                        duration=self.conf["forbidden"]["ban_time"],
+                    )
                 except Exception:
+                    logger.error(f"bot在群{event.get_group_id()}权限不足，禁言失败")
                     pass
-                # 禁言发送者
-                if self.conf["forbidden"]["ban_time"] > 0:
-                    try:
-                        await event.bot.set_group_ban(
-                            group_id=int(event.get_group_id()),
-                            user_id=int(event.get_sender_id()),
-                            duration=self.conf["forbidden"]["ban_time"],
-                        )
-                    except Exception:
-                        logger.error(f"bot在群{event.get_group_id()}权限不足，禁言失败")
-                        pass
-                break
 
     async def spamming_ban(self, event: AiocqhttpMessageEvent):
         """刷屏禁言"""
@@ -63,17 +87,20 @@ class EnhanceHandle:
             or len(event.get_messages()) == 0
         ):
             return
-        if group_id not in self.conf["spamming"]["whitelist"]:
+        if group_id not in self._whitelist("spamming"):
             return
         now = time.time()
+        count = self.conf["spamming"]["count"]
+        ban_time = self.conf["spamming"]["ban_time"]
+        # 超过禁言时长和检测窗口都未发言的成员不再需要记录
+        ttl = max(ban_time, count * self.conf["spamming"]["interval"]) + 60
+        record = self.spam_tracker.get(group_id, sender_id, count, ttl)
 
-        last_time = self.last_banned_time[group_id][sender_id]
-        if now - last_time < self.conf["spamming"]["ban_time"]:
+        if now - record.last_banned < ban_time:
             return
 
-        timestamps = self.msg_timestamps[group_id][sender_id]
+        timestamps = record.timestamps
         timestamps.append(now)
-        count = self.conf["spamming"]["count"]
         if len(timestamps) >= count:
             recent = list(timestamps)[-count:]
             intervals = [recent[i + 1] - recent[i] for i in range(count - 1)]
@@ -85,7 +112,8 @@ class EnhanceHandle:
                 and self.conf["spamming"]["ban_time"]
             ):
                 # 提前写入禁止标记，防止并发重复禁
-                self.last_banned_time[group_id][sender_id] = now
+                record.last_banned = now
+                self.stats["spamming_bans"] += 1
 
                 try:
                     await event.bot.set_group_ban(
@@ -1,12 +1,12 @@
 
 import json
-import os
 from pathlib import Path
 
 from aiocqhttp import CQHttp
 
 from astrbot.api import logger
 from astrbot.core.config.astrbot_config import AstrBotConfig
+from astrbot.core.plugin_kv import PluginKV
 from astrbot.core.platform.sources.aiocqhttp.aiocqhttp_message_event import (
     AiocqhttpMessageEvent,
 )
@@ -15,41 +15,61 @@ from ..utils import get_reply_message_str
 
 
 class GroupJoinData:
-    def __init__(self,path: str = "group_join_data.json"):
-        self.path = path
+    """进群关键词和进群黑名单，保存在插件 KV 存储中，每个群每项一个键"""
+
+    def __init__(self, kv: PluginKV, legacy_path: Path):
+        self.kv = kv
+        self.legacy_path = legacy_path
         self.accept_keywords: dict[str, list[str]] = {}
         self.reject_ids: dict[str, list[str]] = {}
-        self._load()
 
-    def _load(self):
-        if not os.path.exists(self.path):
-            self._save()
+    async def _migrate_legacy(self):
+        """导入旧版本的 group_join_data.json"""
+        if not self.legacy_path.exists():
             return
         try:
-            with open(self.path, encoding="utf-8") as f:
+            with self.legacy_path.open(encoding="utf-8") as f:
                 data = json.load(f)
-            self.accept_keywords = data.get("accept_keywords", {})
-            self.reject_ids = data.get("reject_ids", {})
+            async with self.kv.transaction() as tx:
+                for field in ("accept_keywords", "reject_ids"):
+                    for group_id, values in data.get(field, {}).items():
+                        if values:
+                            tx.put(f"{field}:{group_id}", values)
+            self.legacy_path.rename(self.legacy_path.with_suffix(".json.migrated"))
+            logger.info("已将 group_join_data.json 迁移到插件存储")
         except Exception as e:
-            print(f"加载 group_join_data 失败: {e}")
-            self._save()
-
-    def _save(self):
-        data = {
-            "accept_keywords": self.accept_keywords,
-            "reject_ids": self.reject_ids,
+            logger.error(f"迁移 group_join_data 失败: {e}")
+
+    async def load(self):
+        await self._migrate_legacy()
+        items = await self.kv.items()
+        self.accept_keywords = {
+            key.removeprefix("accept_keywords:"): value
+            for key, value in items.items()
+            if key.startswith("accept_keywords:")
+        }
+        self.reject_ids = {
+            key.removeprefix("reject_ids:"): value
+            for key, value in items.items()
+            if key.startswith("reject_ids:")
         }
-        with open(self.path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-
-    def save(self):
-        self._save()
 
+    async def save(self, group_id: str):
+        """只写入一个群的数据"""
+        async with self.kv.transaction() as tx:
+            for field, data in (
+                ("accept_keywords", self.accept_keywords),
+                ("reject_ids", self.reject_ids),
+            ):
+                if data.get(group_id):
+                    tx.put(f"{field}:{group_id}", data[group_id])
+                else:
+                    tx.delete(f"{field}:{group_id}")
 
 
 class GroupJoinManager:
-    def __init__(self, json_path: str):
-        self.data = GroupJoinData(json_path)
+    def __init__(self, kv: PluginKV, legacy_path: Path):
+        self.data = GroupJoinData(kv, legacy_path)
 
     def should_reject(self, group_id: str, user_id: str) -> bool:
         return (
@@ -64,51 +84,60 @@ class GroupJoinManager:
             kw.lower() in comment.lower() for kw in self.data.accept_keywords[group_id]
         )
 
-    def add_keyword(self, group_id: str, keywords: list[str]):
+    async def add_keyword(self, group_id: str, keywords: list[str]):
         self.data.accept_keywords.setdefault(group_id, []).extend(keywords)
         self.data.accept_keywords[group_id] = list(
             set(self.data.accept_keywords[group_id])
         )
-        self.data.save()
+        await self.data.save(group_id)
 
-    def remove_keyword(self, group_id: str, keywords: list[str]):
+    async def remove_keyword(self, group_id: str, keywords: list[str]):
         if group_id in self.data.accept_keywords:
             for k in keywords:
                 if k in self.data.accept_keywords[group_id]:
                     self.data.accept_keywords[group_id].remove(k)
-            self.data.save()
+            await self.data.save(group_id)
 
     def get_keywords(self, group_id: str) -> list[str]:
         return self.data.accept_keywords.get(group_id, [])
 
-    def add_reject_id(self, group_id: str, ids: list[str]):
+    async def add_reject_id(self, group_id: str, ids: list[str]):
         self.data.reject_ids.setdefault(group_id, []).extend(ids)
         self.data.reject_ids[group_id] = list(set(self.data.reject_ids[group_id]))
-        self.data.save()
+        await self.data.save(group_id)
 
-    def remove_reject_id(self, group_id: str, ids: list[str]):
+    async def remove_reject_id(self, group_id: str, ids: list[str]):
         if group_id in self.data.reject_ids:
             for uid in ids:
                 if uid in self.data.reject_ids[group_id]:
                     self.data.reject_ids[group_id].remove(uid)
-            self.data.save()
+            await self.data.save(group_id)
 
     def get_reject_ids(self, group_id: str) -> list[str]:
         return self.data.reject_ids.get(group_id, [])
 
-    def blacklist_on_leave(self, group_id: str, user_id: str) -> None:
+    async def blacklist_on_leave(self, group_id: str, user_id: str) -> None:
         self.data.reject_ids.setdefault(group_id, []).append(user_id)
-        self.data.save()
+        await self.data.save(group_id)
 
 
 class JoinHandle:
-    def __init__(self, config: AstrBotConfig, data_dir: Path, admins_id: list[str]):
+    def __init__(
+        self,
+        config: AstrBotConfig,
+        data_dir: Path,
+        admins_id: list[str],
+        kv: PluginKV,
+    ):
         self.conf = config
         self.admins_id: list[str] = admins_id
         self.group_join_manager = GroupJoinManager(
-            str(data_dir / "group_join_data.json")
+            kv, data_dir / "group_join_data.json"
         )
 
+    async def initialize(self):
+        await self.group_join_manager.data.load()
+
     async def _send_admin(self, client: CQHttp, message: str):
         """向bot管理员发送私聊消息"""
         for admin_id in self.admins_id:
@@ -123,7 +152,7 @@ class JoinHandle:
     async def add_accept_keyword(self, event: AiocqhttpMessageEvent):
         """添加自动批准进群的关键词"""
         if keywords := event.message_str.removeprefix("添加进群关键词").strip().split():
-            self.group_join_manager.add_keyword(event.get_group_id(), keywords)
+            await self.group_join_manager.add_keyword(event.get_group_id(), keywords)
             await event.send(event.plain_result(f"新增进群关键词：{keywords}"))
         else:
             await event.send(event.plain_result("未输入任何关键词"))
@@ -131,7 +160,7 @@ class JoinHandle:
     async def remove_accept_keyword(self, event: AiocqhttpMessageEvent):
         """删除自动批准进群的关键词"""
         if keywords := event.message_str.removeprefix("删除进群关键词").strip().split():
-            self.group_join_manager.remove_keyword(event.get_group_id(), keywords)
+            await self.group_join_manager.remove_keyword(event.get_group_id(), keywords)
             await event.send(event.plain_result(f"已删进群关键词：{keywords}"))
         else:
             await event.send(event.plain_result("未指定要删除的关键词"))
@@ -151,7 +180,7 @@ class JoinHandle:
             await event.send(event.plain_result("请提供至少一个用户ID"))
             return
         reject_ids = list(set(parts[1:]))
-        self.group_join_manager.add_reject_id(event.get_group_id(), reject_ids)
+        await self.group_join_manager.add_reject_id(event.get_group_id(), reject_ids)
         await event.send(event.plain_result(f"进群黑名单新增ID：{reject_ids}"))
 
     async def remove_reject_ids(self, event: AiocqhttpMessageEvent):
@@ -161,7 +190,7 @@ class JoinHandle:
             await event.send(event.plain_result("请提供至少一个用户ID。"))
             return
         ids = list(set(parts[1:]))
-        self.group_join_manager.remove_reject_id(event.get_group_id(), ids)
+        await self.group_join_manager.remove_reject_id(event.get_group_id(), ids)
         await event.send(event.plain_result(f"已从黑名单中删除：{ids}"))
 
 
@@ -240,7 +269,7 @@ class JoinHandle:
             ] or "未知昵称"
             reply = f"{nickname}({user_id}) 主动退群了"
             if self.conf["auto_black"]:
-                self.group_join_manager.blacklist_on_leave(str(group_id), str(user_id))
+                await self.group_join_manager.blacklist_on_leave(str(group_id), str(user_id))
                 reply += "，已拉进黑名单"
             await event.send(event.plain_result(reply))
 
@@ -24,7 +24,9 @@ class MemberHandle:
         """查看群友信息，人数太多时可能会处理失败"""
         await event.send(event.plain_result("获取中..."))
         group_id = event.get_group_id()
-        members_data = await event.bot.get_group_member_list(group_id=int(group_id))
+        members_data = await self.plugin.context.group_roster.get_member_list(
+            event.bot, group_id
+        )
         info_list = [
             (
                 f"{format_time(member['join_time'])}："
@@ -53,7 +55,10 @@ class MemberHandle:
         sender_id = event.get_sender_id()
 
         try:
-            members_data = await event.bot.get_group_member_list(group_id=int(group_id))
+            # 按最后发言时间筛选，需要最新数据
+            members_data = await self.plugin.context.group_roster.get_member_list(
+                event.bot, group_id, refresh=True
+            )
         except Exception as e:
             await event.send(event.plain_result(f"获取群成员信息失败：{e}"))
             return
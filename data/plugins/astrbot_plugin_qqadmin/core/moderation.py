@@ -0,0 +1,106 @@
+import time
+from collections import OrderedDict, deque
+from collections.abc import Iterable
+
+
+class WordMatcher:
+    """把违禁词编译成 Aho-Corasick 自动机，单次扫描消息即可检测所有违禁词"""
+
+    def __init__(self, words: Iterable[str]):
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[str | None] = [None]
+        self.size = 0
+        for word in words:
+            if word:
+                self._add(word)
+        self._build()
+
+    def _add(self, word: str):
+        node = 0
+        for ch in word:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(None)
+                self._goto[node][ch] = nxt
+            node = nxt
+        if self._out[node] is None:
+            self._out[node] = word
+            self.size += 1
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                if self._out[child] is None:
+                    self._out[child] = self._out[self._fail[child]]
+                queue.append(child)
+
+    def search(self, text: str) -> str | None:
+        """返回消息中最先出现的违禁词，没有则返回 None"""
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node] is not None:
+                return out[node]
+        return None
+
+
+class SpamRecord:
+    __slots__ = ("timestamps", "last_banned", "last_seen")
+
+    def __init__(self, maxlen: int):
+        self.timestamps: deque[float] = deque(maxlen=maxlen)
+        self.last_banned = 0.0
+        self.last_seen = 0.0
+
+
+class SpamTracker:
+    """刷屏检测状态，按 (群号, 用户) 记录最近的发言时间
+
+    超过 ttl 未发言的记录会被清理，记录数超过 max_entries 时淘汰最久未发言的记录。
+    """
+
+    def __init__(self, max_entries: int = 50000):
+        self.max_entries = max_entries
+        self._records: OrderedDict[tuple[str, str], SpamRecord] = OrderedDict()
+        self.stats = {"ttl_evictions": 0, "lru_evictions": 0}
+
+    def __len__(self):
+        return len(self._records)
+
+    def get(self, group_id: str, user_id: str, maxlen: int, ttl: float) -> SpamRecord:
+        now = time.time()
+        # 按最近发言时间排序，过期记录总在队首
+        while self._records:
+            record = next(iter(self._records.values()))
+            if now - record.last_seen < ttl:
+                break
+            self._records.popitem(last=False)
+            self.stats["ttl_evictions"] += 1
+
+        key = (group_id, user_id)
+        record = self._records.get(key)
+        if record is None or record.timestamps.maxlen != maxlen:
+            old = record
+            record = self._records[key] = SpamRecord(maxlen)
+            if old is not None:
+                record.last_banned = old.last_banned
+            while len(self._records) > self.max_entries:
+                self._records.popitem(last=False)
+                self.stats["lru_evictions"] += 1
+        self._records.move_to_end(key)
+        record.last_seen = now
+        return record
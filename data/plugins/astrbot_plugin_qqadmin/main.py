@@ -40,7 +40,13 @@ class QQAdminPlugin(Star):
         self.normal = NormalHandle(self.conf)
         self.notice = NoticeHandle(self, self.plugin_data_dir)
         self.enhance = EnhanceHandle(self.conf)
-        self.join = JoinHandle(self.conf, self.plugin_data_dir, self.admins_id)
+        self.join = JoinHandle(
+            self.conf,
+            self.plugin_data_dir,
+            self.admins_id,
+            self.context.plugin_kv.namespace("astrbot_plugin_qqadmin"),
+        )
+        await self.join.initialize()
         self.member = MemberHandle(self)
         self.file = FileHandle(self, self.plugin_data_dir)
         self.curfew = CurfewHandle(self.context, self.plugin_data_dir)
@@ -197,6 +203,17 @@ class QQAdminPlugin(Star):
         """刷屏检测与禁言"""
         await self.enhance.spamming_ban(event)
 
+    @filter.command("审核统计", desc="查看违禁词和刷屏检测的统计")
+    @perm_required(PermLevel.ADMIN)
+    async def moderation_stats(self, event: AiocqhttpMessageEvent):
+        stats = self.enhance.get_stats()
+        yield event.plain_result(
+            f"违禁词命中：{stats['forbidden_matches']}次\n"
+            f"刷屏禁言：{stats['spamming_bans']}次\n"
+            f"刷屏检测记录：{stats['spam_records']}条\n"
+            f"过期清理：{stats['ttl_evictions']}条，超量淘汰：{stats['lru_evictions']}条"
+        )
+
     @filter.command("投票禁言", desc="投票禁言 <秒数> @群友")
     @perm_required(PermLevel.ADMIN)
     async def start_vote_mute(
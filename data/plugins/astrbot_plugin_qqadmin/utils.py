@@ -4,6 +4,7 @@ from datetime import datetime
 from aiohttp import ClientSession
 
 from astrbot import logger
+from astrbot.core.group_roster import group_roster
 from astrbot.core.message.components import At, BaseMessageComponent, Image, Reply
 from astrbot.core.platform.sources.aiocqhttp.aiocqhttp_message_event import (
     AiocqhttpMessageEvent,
@@ -44,7 +45,8 @@ ADMIN_HELP = (
     "- 投票禁言 <秒数> @人：发起禁言投票\n"
     "- 赞同禁言 / 反对禁言：投票同意或反对\n"
     "- （自动）违禁词检测：检测违禁词自动撤回并禁言\n"
-    "- （自动）刷屏检测：检测刷屏并自动处理\n\n"
+    "- （自动）刷屏检测：检测刷屏并自动处理\n"
+    "- 审核统计：查看违禁词命中和刷屏检测的统计\n\n"
     "## CurfewHandle 宵禁功能\n"
     "- 开启宵禁 HH:MM HH:MM：设置宵禁时间段\n"
     "- 关闭宵禁：关闭宵禁任务\n\n"
@@ -87,12 +89,9 @@ def print_logo():
 
 async def get_nickname(event: AiocqhttpMessageEvent, user_id) -> str:
     """获取指定群友的群昵称或Q名"""
-    client = event.bot
-    group_id = event.get_group_id()
-    all_info = await client.get_group_member_info(
-        group_id=int(group_id), user_id=int(user_id)
+    return await group_roster.get_display_name(
+        event.bot, event.get_group_id(), user_id
     )
-    return all_info.get("card") or all_info.get("nickname")
 
 
 def get_ats(event: AiocqhttpMessageEvent) -> list[str]:
@@ -6,6 +6,7 @@ LLM API请求处理工具模块
 import asyncio
 from typing import Any
 from astrbot.api import logger
+from astrbot.core.job_runner import job_runner
 
 
 def _try_get_provider_by_id(context, provider_id: str, description: str) -> Any | None:
@@ -236,10 +237,12 @@ async def call_provider_with_retry(
                 )
                 return None
 
-            coro = provider.text_chat(
-                prompt=prompt, max_tokens=max_tokens, temperature=temperature
-            )
-            return await asyncio.wait_for(coro, timeout=timeout)
+            # 所有插件共享 LLM 并发名额，避免大量群同时分析时触发速率限制
+            async with job_runner.limit("llm"):
+                coro = provider.text_chat(
+                    prompt=prompt, max_tokens=max_tokens, temperature=temperature
+                )
+                return await asyncio.wait_for(coro, timeout=timeout)
         except asyncio.TimeoutError as e:
             last_exc = e
             logger.warning(f"LLM请求超时: 第{attempt}次, timeout={timeout}s")
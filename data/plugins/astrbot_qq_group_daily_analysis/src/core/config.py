@@ -36,6 +36,10 @@ class ConfigManager:
         """获取是否启用自动分析"""
         return self.config.get("enable_auto_analysis", False)
 
+    def get_auto_analysis_concurrency(self) -> int:
+        """获取自动分析同时处理的群数"""
+        return self.config.get("auto_analysis_concurrency", 5)
+
     def get_output_format(self) -> str:
         """获取输出格式"""
         return self.config.get("output_format", "image")
@@ -6,6 +6,7 @@
 from datetime import datetime, timedelta
 from collections import defaultdict
 from astrbot.api import logger
+from astrbot.core.group_message_archive import group_message_archive
 from ...src.models.data_models import GroupStatistics, TokenUsage, EmojiStatistics
 from ...src.visualization.activity_charts import ActivityVisualizer
 
@@ -77,6 +78,48 @@ class MessageHandler:
                 f"时间范围: {start_time.strftime('%Y-%m-%d %H:%M:%S')} 到 {end_time.strftime('%Y-%m-%d %H:%M:%S')}"
             )
 
+            # 优先读取本地群消息归档，缺失的部分由归档先通过 API 补齐
+            if platform_id and hasattr(bot_instance, "call_action"):
+                try:
+                    archived = await group_message_archive.query(
+                        group_id,
+                        limit=int(max_messages),
+                        since=int(start_time.timestamp()),
+                        until=int(end_time.timestamp()),
+                        platform_id=platform_id,
+                        bot=bot_instance,
+                        newest_first=True,
+                    )
+                    archived.reverse()
+                    # 归档为空或未覆盖整个时间范围(例如补齐失败、超出保留天数)时改用 API
+                    covered = len(archived) >= max_messages
+                    if not covered:
+                        covered = group_message_archive.is_covered(
+                            platform_id, group_id, int(start_time.timestamp())
+                        )
+                    if archived and covered:
+                        messages = [
+                            msg
+                            for msg in archived
+                            if not (
+                                self.bot_manager
+                                and self.bot_manager.should_filter_bot_message(
+                                    str(msg.get("sender", {}).get("user_id", ""))
+                                )
+                            )
+                        ]
+                        logger.info(
+                            f"群 {group_id} 从本地归档读取到 {len(messages)} 条有效消息（时间范围: 近{days}天）"
+                        )
+                        return messages
+                    logger.info(
+                        f"群 {group_id} 本地归档未覆盖所需时间范围（{len(archived)} 条），改为通过 API 获取"
+                    )
+                except Exception as archive_err:
+                    logger.warning(
+                        f"群 {group_id} 读取本地消息归档失败，改为通过 API 获取: {archive_err}"
+                    )
+
             # 单次请求，按配置的 max_messages 作为 count
             try:
                 payloads = {
@@ -8,6 +8,7 @@ import aiohttp
 from datetime import datetime
 from pathlib import Path
 from astrbot.api import logger
+from astrbot.core.job_runner import job_runner
 from .templates import HTMLTemplates
 from ..visualization.activity_charts import ActivityVisualizer
 import asyncio
@@ -48,12 +49,13 @@ class ReportGenerator:
                 "type": "jpeg",  # 使用默认的jpeg格式提高兼容性
                 "quality": 95,  # 设置合理的质量
             }
-            image_url = await html_render_func(
-                html_content,  # 渲染后的HTML内容
-                {},  # 空数据字典，因为数据已包含在HTML中
-                True,  # return_url=True，返回URL而不是下载文件
-                image_options,
-            )
+            async with job_runner.limit("render"):
+                image_url = await html_render_func(
+                    html_content,  # 渲染后的HTML内容
+                    {},  # 空数据字典，因为数据已包含在HTML中
+                    True,  # return_url=True，返回URL而不是下载文件
+                    image_options,
+                )
 
             logger.info(f"图片生成成功: {image_url}")
             return image_url
@@ -68,12 +70,13 @@ class ReportGenerator:
                     "type": "jpeg",
                     "quality": 70,  # 降低质量以提高兼容性
                 }
-                image_url = await html_render_func(
-                    html_content,  # 使用已渲染的HTML
-                    {},  # 空数据字典
-                    True,
-                    simple_options,
-                )
+                async with job_runner.limit("render"):
+                    image_url = await html_render_func(
+                        html_content,  # 使用已渲染的HTML
+                        {},  # 空数据字典
+                        True,
+                        simple_options,
+                    )
                 logger.info(f"使用低质量选项生成成功: {image_url}")
                 return image_url
             except Exception as fallback_e:
@@ -112,8 +115,9 @@ class ReportGenerator:
 
             logger.info(f"HTML 内容生成完成，长度: {len(html_content)} 字符")
 
-            # 转换为 PDF
-            success = await self._html_to_pdf(html_content, str(pdf_path))
+            # 转换为 PDF，每次转换都会启动一个浏览器进程，限制同时转换的数量
+            async with job_runner.limit("render"):
+                success = await self._html_to_pdf(html_content, str(pdf_path))
 
             if success:
                 return str(pdf_path.absolute())
@@ -287,7 +291,7 @@ class ReportGenerator:
         """获取用户头像的base64编码"""
         try:
             avatar_url = f"https://q4.qlogo.cn/headimg_dl?dst_uin={user_id}&spec=640"
-            async with aiohttp.ClientSession() as client:
+            async with job_runner.limit("network"), aiohttp.ClientSession() as client:
                 response = await client.get(avatar_url)
                 response.raise_for_status()
                 avatar_data = await response.read()
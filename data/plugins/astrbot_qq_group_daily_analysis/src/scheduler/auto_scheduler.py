@@ -6,6 +6,9 @@
 import asyncio
 from datetime import datetime, timedelta
 from astrbot.api import logger
+from astrbot.core.job_runner import job_runner
+
+JOB_STATE_KEY = "astrbot_qq_group_daily_analysis:auto_analysis"
 
 
 class AutoScheduler:
@@ -136,8 +139,32 @@ class AutoScheduler:
         if self.config_manager.get_enable_auto_analysis():
             await self.start_scheduler()
 
+    async def _catch_up_missed_run(self):
+        """重启后补执行错过的（或执行到一半中断的）当天分析"""
+        if not self.config_manager.get_enable_auto_analysis():
+            return
+        now = datetime.now()
+        target_time = datetime.strptime(
+            self.config_manager.get_auto_analysis_time(), "%H:%M"
+        ).replace(year=now.year, month=now.month, day=now.day)
+        if now < target_time:
+            return
+        state = await job_runner.get_state(JOB_STATE_KEY)
+        today = now.date().isoformat()
+        # 从未执行过（如刚安装）时不补执行
+        if not state or (state.get("run_id") == today and "finished_at" in state):
+            return
+        logger.info(f"检测到 {today} 的定时分析未完成，开始补执行")
+        await self._run_auto_analysis()
+        self.last_execution_date = now.date()
+
     async def _scheduler_loop(self):
         """调度器主循环"""
+        try:
+            await self._catch_up_missed_run()
+        except Exception as e:
+            logger.error(f"补执行定时分析失败: {e}")
+
         while True:
             try:
                 now = datetime.now()
@@ -185,62 +212,50 @@ class AutoScheduler:
                 await asyncio.sleep(300)
 
     async def _run_auto_analysis(self):
-        """执行自动分析 - 并发处理所有群聊"""
+        """执行自动分析 - 有限并发处理所有群聊"""
         try:
-            logger.info("开始执行自动群聊分析（并发模式）")
-
             enabled_groups = self.config_manager.get_enabled_groups()
             if not enabled_groups:
                 logger.info("没有启用的群聊需要分析")
                 return
 
+            concurrency = self.config_manager.get_auto_analysis_concurrency()
             logger.info(
-                f"将为 {len(enabled_groups)} 个群聊并发执行分析: {enabled_groups}"
+                f"将为 {len(enabled_groups)} 个群聊执行分析（同时处理 {concurrency} 个）: {enabled_groups}"
             )
 
-            # 创建并发任务 - 为每个群聊创建独立的分析任务
-            analysis_tasks = []
-            for group_id in enabled_groups:
-                task = asyncio.create_task(
-                    self._perform_auto_analysis_for_group_with_timeout(group_id),
-                    name=f"analysis_group_{group_id}",
-                )
-                analysis_tasks.append(task)
-
-            # 并发执行所有分析任务，使用 return_exceptions=True 确保单个任务失败不影响其他任务
-            results = await asyncio.gather(*analysis_tasks, return_exceptions=True)
+            # 每个群独立超时（20分钟），启动时间随机错开；执行进度会持久化，重启后只分析剩余的群
+            results = await job_runner.run_batch(
+                enabled_groups,
+                self._perform_auto_analysis_for_group,
+                state_key=JOB_STATE_KEY,
+                run_id=datetime.now().date().isoformat(),
+                concurrency=concurrency,
+                timeout=1200,
+                jitter=30,
+            )
 
             # 统计执行结果
             success_count = 0
             error_count = 0
 
-            for i, result in enumerate(results):
-                group_id = enabled_groups[i]
-                if isinstance(result, Exception):
+            for group_id, result in results.items():
+                if isinstance(result, asyncio.TimeoutError):
+                    logger.error(f"群 {group_id} 分析超时（20分钟），跳过该群分析")
+                    error_count += 1
+                elif isinstance(result, Exception):
                     logger.error(f"群 {group_id} 分析任务异常: {result}")
                     error_count += 1
                 else:
                     success_count += 1
 
             logger.info(
-                f"并发分析完成 - 成功: {success_count}, 失败: {error_count}, 总计: {len(enabled_groups)}"
+                f"分析完成 - 成功: {success_count}, 失败: {error_count}, 总计: {len(results)}"
             )
 
         except Exception as e:
             logger.error(f"自动分析执行失败: {e}", exc_info=True)
 
-    async def _perform_auto_analysis_for_group_with_timeout(self, group_id: str):
-        """为指定群执行自动分析（带超时控制）"""
-        try:
-            # 为每个群聊设置独立的超时时间（20分钟）- 使用 asyncio.wait_for 兼容所有 Python 版本
-            await asyncio.wait_for(
-                self._perform_auto_analysis_for_group(group_id), timeout=1200
-            )
-        except asyncio.TimeoutError:
-            logger.error(f"群 {group_id} 分析超时（20分钟），跳过该群分析")
-        except Exception as e:
-            logger.error(f"群 {group_id} 分析任务执行失败: {e}")
-
     async def _perform_auto_analysis_for_group(self, group_id: str):
         """为指定群执行自动分析（核心逻辑）"""
         # 为每个群聊使用独立的锁，避免全局锁导致串行化
@@ -91,6 +91,10 @@ if __name__ == "__main__":
     # 启动日志代理
     log_broker = LogBroker()
     LogManager.set_queue_handler(logger, log_broker)
+    LogManager.set_file_handler(
+        logger,
+        os.path.join(get_astrbot_data_path(), "logs", "astrbot.log"),
+    )
 
     # 检查仪表板文件
     webui_dir = asyncio.run(check_dashboard_files(args.webui_dir))
@@ -47,11 +47,8 @@ class ProcessLLMRequest:
         # tools select
         tmgr = self.ctx.get_llm_tool_manager()
         if (persona and persona.get("tools") is None) or not persona:
-            # select all
-            toolset = tmgr.get_full_tool_set()
-            for tool in toolset:
-                if not tool.active:
-                    toolset.remove_tool(tool.name)
+            # select all. 工具集在请求之间共享，需要修改时使用 with_changes()
+            toolset = tmgr.get_active_tool_set()
         else:
             toolset = ToolSet()
             if persona["tools"]:
@@ -1,21 +1,33 @@
+import asyncio
 import datetime
 import json
 import os
+import time
 import uuid
 import zoneinfo
 
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.cron import CronTrigger
 
 from astrbot.api import llm_tool, logger, star
 from astrbot.api.event import AstrMessageEvent, MessageEventResult, filter
+from astrbot.core.db.po import Reminder
 from astrbot.core.utils.astrbot_path import get_astrbot_data_path
 
+DATETIME_FORMAT = "%Y-%m-%d %H:%M"
+
+WHEEL_WINDOW = 60
+"""时间轮每次从数据库加载未来多少秒内到期的提醒"""
+
+MISFIRE_GRACE_TIME = 60
+"""错过提醒时间多少秒内仍然发送"""
+
 
 class Main(star.Star):
     """使用 LLM 待办提醒。只需对 LLM 说想要提醒的事情和时间即可。比如：`之后每天这个时候都提醒我做多邻国`"""
 
     def __init__(self, context: star.Context) -> None:
         self.context = context
+        self.db = context.get_db()
         self.timezone = self.context.get_config().get("timezone")
         if not self.timezone:
             self.timezone = None
@@ -24,68 +36,91 @@ class Main(star.Star):
         except Exception as e:
             logger.error(f"时区设置错误: {e}, 使用本地时区")
             self.timezone = None
-        self.scheduler = AsyncIOScheduler(timezone=self.timezone)
 
-        # set and load config
+        # 时间轮：只保存 WHEEL_WINDOW 内到期的提醒，按到期的秒数分槽
+        self._wheel: dict[int, list[str]] = {}
+        self._entries: dict[str, Reminder] = {}
+        self._loaded_until = 0
+        self._wakeup = asyncio.Event()
+        self._dispatcher: asyncio.Task | None = None
+        self._cron_triggers: dict[str, CronTrigger] = {}
+
+    async def initialize(self):
+        await self._migrate_legacy_file()
+        self._dispatcher = asyncio.create_task(self._run_dispatcher())
+
+    @staticmethod
+    def _read_json(path: str):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    async def _migrate_legacy_file(self):
+        """导入旧版本保存在 astrbot-reminder.json 中的提醒"""
         reminder_file = os.path.join(get_astrbot_data_path(), "astrbot-reminder.json")
-        if not os.path.exists(reminder_file):
-            with open(reminder_file, "w", encoding="utf-8") as f:
-                f.write("{}")
-        with open(reminder_file, encoding="utf-8") as f:
-            self.reminder_data = json.load(f)
-
-        self._init_scheduler()
-        self.scheduler.start()
-
-    def _init_scheduler(self):
-        """Initialize the scheduler."""
-        for group in self.reminder_data:
-            for reminder in self.reminder_data[group]:
-                if "id" not in reminder:
-                    id_ = str(uuid.uuid4())
-                    reminder["id"] = id_
-                else:
-                    id_ = reminder["id"]
-
-                if "datetime" in reminder:
-                    if self.check_is_outdated(reminder):
-                        continue
-                    self.scheduler.add_job(
-                        self._reminder_callback,
-                        id=id_,
-                        trigger="date",
-                        args=[group, reminder],
-                        run_date=datetime.datetime.strptime(
-                            reminder["datetime"],
-                            "%Y-%m-%d %H:%M",
-                        ),
-                        misfire_grace_time=60,
-                    )
-                elif "cron" in reminder:
-                    self.scheduler.add_job(
-                        self._reminder_callback,
-                        trigger="cron",
-                        id=id_,
-                        args=[group, reminder],
-                        misfire_grace_time=60,
-                        **self._parse_cron_expr(reminder["cron"]),
+        if not await asyncio.to_thread(os.path.exists, reminder_file):
+            return
+        try:
+            reminder_data = await asyncio.to_thread(self._read_json, reminder_file)
+            now = time.time()
+            rows = []
+            for umo, reminders in reminder_data.items():
+                for reminder in reminders:
+                    row = {
+                        "reminder_id": reminder.get("id") or str(uuid.uuid4()),
+                        "umo": umo,
+                        "text": reminder.get("text", ""),
+                        "run_at": reminder.get("datetime"),
+                        "cron": reminder.get("cron"),
+                        "cron_h": reminder.get("cron_h"),
+                    }
+                    row["next_run_at"] = self._compute_next_run(
+                        row["run_at"],
+                        row["cron"],
+                        now,
                     )
+                    if row["next_run_at"] is not None and row["next_run_at"] >= now:
+                        rows.append(row)
+            await self.db.insert_reminders(rows)
+            await asyncio.to_thread(
+                os.replace,
+                reminder_file,
+                reminder_file + ".migrated",
+            )
+            logger.info(f"已将 {len(rows)} 个待办提醒迁移到数据库")
+        except Exception as e:
+            logger.error(f"迁移待办提醒失败: {e}")
 
-    def check_is_outdated(self, reminder: dict):
-        """Check if the reminder is outdated."""
-        if "datetime" in reminder:
-            reminder_time = datetime.datetime.strptime(
-                reminder["datetime"],
-                "%Y-%m-%d %H:%M",
-            ).replace(tzinfo=self.timezone)
-            return reminder_time < datetime.datetime.now(self.timezone)
-        return False
-
-    async def _save_data(self):
-        """Save the reminder data."""
-        reminder_file = os.path.join(get_astrbot_data_path(), "astrbot-reminder.json")
-        with open(reminder_file, "w", encoding="utf-8") as f:
-            json.dump(self.reminder_data, f, ensure_ascii=False)
+    def _parse_datetime(self, datetime_str: str) -> datetime.datetime:
+        return datetime.datetime.strptime(datetime_str, DATETIME_FORMAT).replace(
+            tzinfo=self.timezone,
+        )
+
+    def _cron_trigger(self, cron_expr: str) -> CronTrigger:
+        trigger = self._cron_triggers.get(cron_expr)
+        if trigger is None:
+            trigger = CronTrigger(
+                **self._parse_cron_expr(cron_expr),
+                timezone=self.timezone,
+            )
+            self._cron_triggers[cron_expr] = trigger
+        return trigger
+
+    def _compute_next_run(
+        self,
+        run_at: str | None,
+        cron: str | None,
+        after: float,
+    ) -> int | None:
+        """计算下一次提醒的时间戳。cron 提醒只计算严格晚于 after 的下一次。"""
+        if run_at:
+            return int(self._parse_datetime(run_at).timestamp())
+        if cron:
+            start = datetime.datetime.fromtimestamp(int(after) + 1).astimezone(
+                self.timezone,
+            )
+            next_time = self._cron_trigger(cron).get_next_fire_time(None, start)
+            return int(next_time.timestamp()) if next_time else None
+        return None
 
     def _parse_cron_expr(self, cron_expr: str):
         fields = cron_expr.split(" ")
@@ -97,6 +132,84 @@ class Main(star.Star):
             "day_of_week": fields[4],
         }
 
+    def _schedule(self, reminder: Reminder):
+        if reminder.reminder_id in self._entries or reminder.next_run_at is None:
+            return
+        self._entries[reminder.reminder_id] = reminder
+        self._wheel.setdefault(reminder.next_run_at, []).append(reminder.reminder_id)
+
+    def _unschedule(self, reminder_id: str):
+        reminder = self._entries.pop(reminder_id, None)
+        if reminder is None:
+            return
+        slot = self._wheel.get(reminder.next_run_at)  # type: ignore
+        if slot and reminder_id in slot:
+            slot.remove(reminder_id)
+            if not slot:
+                del self._wheel[reminder.next_run_at]  # type: ignore
+
+    async def _refill(self, now: float):
+        """从数据库加载下一个时间窗口内到期的提醒"""
+        window_end = int(now) + WHEEL_WINDOW
+        reminders = await self.db.get_due_reminders(before=window_end)
+        for reminder in reminders:
+            self._schedule(reminder)
+        if len(reminders) >= 1000:
+            # 同一窗口内的提醒过多，先处理已加载的部分
+            window_end = reminders[-1].next_run_at or window_end
+        self._loaded_until = window_end
+
+    async def _run_dispatcher(self):
+        while True:
+            try:
+                # 先清除唤醒标记，处理期间新增的提醒会让下一次等待立即返回
+                self._wakeup.clear()
+                now = time.time()
+                if now >= self._loaded_until:
+                    await self._refill(now)
+                for slot in sorted(s for s in self._wheel if s <= now):
+                    for reminder_id in self._wheel.pop(slot):
+                        reminder = self._entries.pop(reminder_id, None)
+                        if reminder is not None:
+                            await self._fire(reminder, now)
+                next_slot = min(self._wheel, default=self._loaded_until)
+                timeout = max(0.0, min(next_slot, self._loaded_until) - time.time())
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"待办提醒调度出错: {e}")
+                await asyncio.sleep(5)
+
+    async def _fire(self, reminder: Reminder, now: float):
+        assert reminder.next_run_at is not None
+        if now - reminder.next_run_at <= MISFIRE_GRACE_TIME:
+            try:
+                await self._reminder_callback(reminder)
+            except Exception as e:
+                logger.error(f"发送待办提醒失败: {e}")
+        if reminder.cron:
+            next_run_at = self._compute_next_run(
+                None,
+                reminder.cron,
+                max(now, reminder.next_run_at),
+            )
+            exists = await self.db.update_reminder_next_run(
+                reminder.reminder_id,
+                next_run_at,
+            )
+            if not exists:
+                # 提醒在发送期间已被删除
+                return
+            reminder.next_run_at = next_run_at
+            if next_run_at is not None and next_run_at < self._loaded_until:
+                self._schedule(reminder)
+        else:
+            await self.db.delete_reminders([reminder.reminder_id])
+
     @llm_tool("reminder")
     async def reminder_tool(
         self,
@@ -119,9 +232,6 @@ class Main(star.Star):
             yield event.plain_result("reminder 暂不支持 QQ 官方机器人。")
             return
 
-        if event.unified_msg_origin not in self.reminder_data:
-            self.reminder_data[event.unified_msg_origin] = []
-
         if not cron_expression and not datetime_str:
             raise ValueError(
                 "The cron_expression and datetime_str cannot be both None.",
@@ -131,41 +241,32 @@ class Main(star.Star):
         if not text:
             text = "未命名待办事项"
 
+        row = {
+            "reminder_id": str(uuid.uuid4()),
+            "umo": event.unified_msg_origin,
+            "text": text,
+        }
         if cron_expression:
-            d = {
-                "text": text,
-                "cron": cron_expression,
-                "cron_h": human_readable_cron,
-                "id": str(uuid.uuid4()),
-            }
-            self.reminder_data[event.unified_msg_origin].append(d)
-            self.scheduler.add_job(
-                self._reminder_callback,
-                "cron",
-                id=d["id"],
-                misfire_grace_time=60,
-                **self._parse_cron_expr(cron_expression),
-                args=[event.unified_msg_origin, d],
-            )
+            row["cron"] = cron_expression
+            row["cron_h"] = human_readable_cron
             if human_readable_cron:
                 reminder_time = f"{human_readable_cron}(Cron: {cron_expression})"
         else:
-            d = {"text": text, "datetime": datetime_str, "id": str(uuid.uuid4())}
-            self.reminder_data[event.unified_msg_origin].append(d)
-            datetime_scheduled = datetime.datetime.strptime(
-                datetime_str,
-                "%Y-%m-%d %H:%M",
-            )
-            self.scheduler.add_job(
-                self._reminder_callback,
-                "date",
-                id=d["id"],
-                args=[event.unified_msg_origin, d],
-                run_date=datetime_scheduled,
-                misfire_grace_time=60,
-            )
+            row["run_at"] = datetime_str
             reminder_time = datetime_str
-        await self._save_data()
+        row["next_run_at"] = self._compute_next_run(
+            row.get("run_at"),
+            row.get("cron"),
+            time.time(),
+        )
+        await self.db.insert_reminders([row])
+        if (
+            row["next_run_at"] is not None
+            and row["next_run_at"] < time.time() + WHEEL_WINDOW
+        ):
+            self._schedule(Reminder(**row))
+            self._wakeup.set()
+
         yield event.plain_result(
             "成功设置待办事项。\n内容: "
             + text
@@ -178,23 +279,9 @@ class Main(star.Star):
     def reminder(self):
         """The command group of the reminder."""
 
-    async def get_upcoming_reminders(self, unified_msg_origin: str):
+    async def get_upcoming_reminders(self, unified_msg_origin: str) -> list[Reminder]:
         """Get upcoming reminders."""
-        reminders = self.reminder_data.get(unified_msg_origin, [])
-        if not reminders:
-            return []
-        now = datetime.datetime.now(self.timezone)
-        upcoming_reminders = [
-            reminder
-            for reminder in reminders
-            if "datetime" not in reminder
-            or datetime.datetime.strptime(
-                reminder["datetime"],
-                "%Y-%m-%d %H:%M",
-            ).replace(tzinfo=self.timezone)
-            >= now
-        ]
-        return upcoming_reminders
+        return await self.db.get_reminders(unified_msg_origin)
 
     @reminder.command("ls")
     async def reminder_ls(self, event: AstrMessageEvent):
@@ -205,11 +292,10 @@ class Main(star.Star):
         else:
             parts = ["正在进行的待办事项：\n"]
             for i, reminder in enumerate(reminders):
-                time_ = reminder.get("datetime", "")
+                time_ = reminder.run_at or ""
                 if not time_:
-                    cron_expr = reminder.get("cron", "")
-                    time_ = reminder.get("cron_h", "") + f"(Cron: {cron_expr})"
-                parts.append(f"{i + 1}. {reminder['text']} - {time_}\n")
+                    time_ = (reminder.cron_h or "") + f"(Cron: {reminder.cron})"
+                parts.append(f"{i + 1}. {reminder.text} - {time_}\n")
             parts.append("\n使用 /reminder rm <id> 删除待办事项。\n")
             reminder_str = "".join(parts)
             yield event.plain_result(reminder_str)
@@ -224,40 +310,27 @@ class Main(star.Star):
         elif index < 1 or index > len(reminders):
             yield event.plain_result("索引越界。")
         else:
-            reminder = reminders.pop(index - 1)
-            job_id = reminder.get("id")
-
-            # self.reminder_data[event.unified_msg_origin] = reminder
-            users_reminders = self.reminder_data.get(event.unified_msg_origin, [])
-            for i, r in enumerate(users_reminders):
-                if r.get("id") == job_id:
-                    users_reminders.pop(i)
+            reminder = reminders[index - 1]
+            await self.db.delete_reminders([reminder.reminder_id])
+            self._unschedule(reminder.reminder_id)
+            yield event.plain_result("成功删除待办事项：\n" + reminder.text)
 
-            try:
-                self.scheduler.remove_job(job_id)
-            except Exception as e:
-                logger.error(f"Remove job error: {e}")
-                yield event.plain_result(
-                    f"成功移除对应的待办事项。删除定时任务失败: {e!s} 可能需要重启 AstrBot 以取消该提醒任务。",
-                )
-            await self._save_data()
-            yield event.plain_result("成功删除待办事项：\n" + reminder["text"])
-
-    async def _reminder_callback(self, unified_msg_origin: str, d: dict):
+    async def _reminder_callback(self, reminder: Reminder):
         """The callback function of the reminder."""
-        logger.info(f"Reminder Activated: {d['text']}, created by {unified_msg_origin}")
+        logger.info(f"Reminder Activated: {reminder.text}, created by {reminder.umo}")
         await self.context.send_message(
-            unified_msg_origin,
+            reminder.umo,
             MessageEventResult().message(
                 "待办提醒: \n\n"
-                + d["text"]
+                + reminder.text
                 + "\n时间: "
-                + d.get("datetime", "")
-                + d.get("cron_h", ""),
+                + (reminder.run_at or "")
+                + (reminder.cron_h or ""),
             ),
         )
 
     async def terminate(self):
-        self.scheduler.shutdown()
-        await self._save_data()
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            self._dispatcher = None
         logger.info("Reminder plugin terminated.")
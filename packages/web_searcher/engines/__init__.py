@@ -1,10 +1,12 @@
+import asyncio
 import random
 import urllib.parse
 from dataclasses import dataclass
 
-from aiohttp import ClientSession
 from bs4 import BeautifulSoup
 
+from ..fetcher import PageFetcher
+
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 6.1; rv:84.0) Gecko/20100101 Firefox/84.0",
     "Accept": "*/*",
@@ -40,10 +42,11 @@ class SearchResult:
 class SearchEngine:
     """搜索引擎爬虫基类"""
 
-    def __init__(self) -> None:
+    def __init__(self, fetcher: PageFetcher | None = None) -> None:
         self.TIMEOUT = 10
         self.page = 1
-        self.headers = HEADERS
+        self.headers = dict(HEADERS)
+        self.fetcher = fetcher or PageFetcher()
 
     def _set_selector(self, selector: str) -> None:
         raise NotImplementedError
@@ -52,53 +55,37 @@ class SearchEngine:
         raise NotImplementedError
 
     async def _get_html(self, url: str, data: dict = None) -> str:
-        headers = self.headers
+        headers = dict(self.headers)
         headers["Referer"] = url
         headers["User-Agent"] = random.choice(USER_AGENTS)
-        if data:
-            async with (
-                ClientSession() as session,
-                session.post(
-                    url,
-                    headers=headers,
-                    data=data,
-                    timeout=self.TIMEOUT,
-                ) as resp,
-            ):
-                ret = await resp.text(encoding="utf-8")
-                return ret
-        else:
-            async with (
-                ClientSession() as session,
-                session.get(
-                    url,
-                    headers=headers,
-                    timeout=self.TIMEOUT,
-                ) as resp,
-            ):
-                ret = await resp.text(encoding="utf-8")
-                return ret
+        return await self.fetcher.fetch(
+            url,
+            headers=headers,
+            data=data,
+            timeout=self.TIMEOUT,
+        )
 
     def tidy_text(self, text: str) -> str:
         """清理文本，去除空格、换行符等"""
         return text.strip().replace("\n", " ").replace("\r", " ").replace("  ", " ")
 
+    def _parse_results(self, html: str, num_results: int) -> list[SearchResult]:
+        soup = BeautifulSoup(html, "html.parser")
+        links = soup.select(self._set_selector("links"))
+        results = []
+        for link in links:
+            title = self.tidy_text(
+                link.select_one(self._set_selector("title")).text,
+            )
+            url = link.select_one(self._set_selector("url"))
+            snippet = ""
+            if title and url:
+                results.append(SearchResult(title=title, url=url, snippet=snippet))
+        return results[:num_results] if len(results) > num_results else results
+
     async def search(self, query: str, num_results: int) -> list[SearchResult]:
         query = urllib.parse.quote(query)
 
-        try:
-            resp = await self._get_next_page(query)
-            soup = BeautifulSoup(resp, "html.parser")
-            links = soup.select(self._set_selector("links"))
-            results = []
-            for link in links:
-                title = self.tidy_text(
-                    link.select_one(self._set_selector("title")).text,
-                )
-                url = link.select_one(self._set_selector("url"))
-                snippet = ""
-                if title and url:
-                    results.append(SearchResult(title=title, url=url, snippet=snippet))
-            return results[:num_results] if len(results) > num_results else results
-        except Exception as e:
-            raise e
+        resp = await self._get_next_page(query)
+        # 解析搜索结果页比较耗时，放到线程池中执行
+        return await asyncio.to_thread(self._parse_results, resp, num_results)
@@ -1,9 +1,10 @@
+from ..fetcher import PageFetcher
 from . import USER_AGENT_BING, SearchEngine, SearchResult
 
 
 class Bing(SearchEngine):
-    def __init__(self) -> None:
-        super().__init__()
+    def __init__(self, fetcher: PageFetcher | None = None) -> None:
+        super().__init__(fetcher)
         self.base_urls = ["https://cn.bing.com", "https://www.bing.com"]
         self.headers.update({"User-Agent": USER_AGENT_BING})
 
@@ -3,12 +3,13 @@ import re
 
 from bs4 import BeautifulSoup
 
+from ..fetcher import PageFetcher
 from . import USER_AGENTS, SearchEngine, SearchResult
 
 
 class Sogo(SearchEngine):
-    def __init__(self) -> None:
-        super().__init__()
+    def __init__(self, fetcher: PageFetcher | None = None) -> None:
+        super().__init__(fetcher)
         self.base_url = "https://www.sogou.com"
         self.headers["User-Agent"] = random.choice(USER_AGENTS)
 
@@ -0,0 +1,149 @@
+"""网页抓取与缓存。
+
+- 所有请求共用一个连接池，限制总并发连接数和单个站点的并发连接数。
+- 网页只读取前 max_bytes 字节，避免超大页面占满内存。
+- 搜索结果按查询词缓存一段时间，网页正文按规范化后的 URL 做 LRU 缓存。
+"""
+
+import asyncio
+import time
+import urllib.parse
+from collections import OrderedDict
+from typing import Any
+
+import aiohttp
+
+MAX_CONNECTIONS = 16
+"""连接池的总并发连接数"""
+
+MAX_CONNECTIONS_PER_HOST = 4
+"""单个站点的并发连接数"""
+
+MAX_PAGE_BYTES = 2 * 1024 * 1024
+"""每个网页最多读取的字节数"""
+
+TRACKING_PARAMS = {"spm", "fbclid", "gclid", "msclkid", "yclid"}
+"""规范化 URL 时去掉的跟踪参数(另外还有所有 utm_ 开头的参数)。
+
+只包含不影响页面内容的点击跟踪参数。from、ref 等参数在部分站点上表示时间范围或分页，需要保留在缓存键中。
+"""
+
+
+class LRUCache:
+    """按最近使用淘汰的缓存，ttl 不为 None 时条目在 ttl 秒后过期"""
+
+    def __init__(self, maxsize: int, ttl: float | None = None) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        item = self._data.get(key)
+        if item is None:
+            return default
+        expires_at, value = item
+        if expires_at and expires_at < time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        expires_at = time.monotonic() + self.ttl if self.ttl else 0.0
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+
+def normalize_url(url: str) -> str:
+    """规范化 URL 作为缓存键：协议和域名小写，去掉默认端口、锚点和常见的跟踪参数"""
+    try:
+        parts = urllib.parse.urlsplit(url.strip())
+    except ValueError:
+        return url
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if (scheme, netloc.rsplit(":", 1)[-1]) in (("http", "80"), ("https", "443")):
+        netloc = netloc.rsplit(":", 1)[0]
+    query = urllib.parse.urlencode(
+        sorted(
+            (k, v)
+            for k, v in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+            if not (k.lower().startswith("utm_") or k.lower() in TRACKING_PARAMS)
+        ),
+    )
+    return urllib.parse.urlunsplit((scheme, netloc, parts.path or "/", query, ""))
+
+
+def normalize_query(query: str) -> str:
+    """规范化查询词：忽略大小写和多余的空白"""
+    return " ".join(query.lower().split())
+
+
+class PageFetcher:
+    """共用连接池的网页抓取器"""
+
+    def __init__(
+        self,
+        max_connections: int = MAX_CONNECTIONS,
+        max_connections_per_host: int = MAX_CONNECTIONS_PER_HOST,
+    ) -> None:
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self._session: aiohttp.ClientSession | None = None
+
+    def get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections_per_host,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                trust_env=True,
+            )
+        return self._session
+
+    async def fetch(
+        self,
+        url: str,
+        headers: dict | None = None,
+        data: dict | None = None,
+        timeout: float = 10,
+        max_bytes: int = MAX_PAGE_BYTES,
+    ) -> str:
+        """请求网页并返回文本，超过 max_bytes 的部分被截断"""
+        session = self.get_session()
+        method = "POST" if data else "GET"
+        async with session.request(
+            method,
+            url,
+            headers=headers,
+            data=data,
+            timeout=aiohttp.ClientTimeout(total=timeout),
+        ) as resp:
+            body = bytearray()
+            async for chunk in resp.content.iter_chunked(64 * 1024):
+                body += chunk
+                if len(body) >= max_bytes:
+                    del body[max_bytes:]
+                    break
+            encoding = resp.charset or "utf-8"
+            try:
+                return body.decode(encoding, errors="replace")
+            except LookupError:
+                return body.decode("utf-8", errors="replace")
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            # 等待连接器关闭底层连接
+            await asyncio.sleep(0)
+        self._session = None
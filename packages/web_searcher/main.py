@@ -1,4 +1,5 @@
 import asyncio
+import json
 import random
 
 import aiohttp
@@ -13,6 +14,16 @@ from astrbot.core.provider.func_tool_manager import FunctionToolManager
 from .engines import HEADERS, USER_AGENTS, SearchResult
 from .engines.bing import Bing
 from .engines.sogo import Sogo
+from .fetcher import LRUCache, PageFetcher, normalize_query, normalize_url
+
+QUERY_CACHE_TTL = 600
+"""搜索结果的缓存时间(秒)。LLM 在同一轮对话中经常重复搜索相同的内容。"""
+
+PAGE_CACHE_TTL = 3600
+"""网页正文的缓存时间(秒)"""
+
+PAGE_FETCH_TIMEOUT = 6
+"""抓取单个网页的超时时间(秒)"""
 
 
 class Main(star.Star):
@@ -43,26 +54,53 @@ class Main(star.Star):
                     provider_settings["websearch_tavily_key"] = []
                 cfg.save_config()
 
-        self.bing_search = Bing()
-        self.sogo_search = Sogo()
+        self.fetcher = PageFetcher()
+        self.bing_search = Bing(self.fetcher)
+        self.sogo_search = Sogo(self.fetcher)
+        self.query_cache = LRUCache(maxsize=256, ttl=QUERY_CACHE_TTL)
+        self.page_cache = LRUCache(maxsize=512, ttl=PAGE_CACHE_TTL)
+        self._page_inflight: dict[str, asyncio.Future] = {}
         self.baidu_initialized = False
 
-    async def _tidy_text(self, text: str) -> str:
+    def _tidy_text(self, text: str) -> str:
         """清理文本，去除空格、换行符等"""
         return text.strip().replace("\n", " ").replace("\r", " ").replace("  ", " ")
 
+    def _extract_text(self, html: str) -> str:
+        """提取网页正文。在线程池中执行。"""
+        doc = Document(html)
+        ret = doc.summary(html_partial=True)
+        soup = BeautifulSoup(ret, "html.parser")
+        return self._tidy_text(soup.get_text())
+
+    async def _fetch_page_text(self, url: str) -> str:
+        header = dict(HEADERS)
+        header.update({"User-Agent": random.choice(USER_AGENTS)})
+        html = await self.fetcher.fetch(
+            url,
+            headers=header,
+            timeout=PAGE_FETCH_TIMEOUT,
+        )
+        return await asyncio.to_thread(self._extract_text, html)
+
     async def _get_from_url(self, url: str) -> str:
         """获取网页内容"""
-        header = HEADERS
-        header.update({"User-Agent": random.choice(USER_AGENTS)})
-        async with aiohttp.ClientSession(trust_env=True) as session:
-            async with session.get(url, headers=header, timeout=6) as response:
-                html = await response.text(encoding="utf-8")
-                doc = Document(html)
-                ret = doc.summary(html_partial=True)
-                soup = BeautifulSoup(ret, "html.parser")
-                ret = await self._tidy_text(soup.get_text())
-                return ret
+        key = normalize_url(url)
+        text = self.page_cache.get(key)
+        if text is not None:
+            return text
+        # 同一网页正在被抓取时，等待同一个结果
+        fut = self._page_inflight.get(key)
+        if fut is None:
+            fut = asyncio.ensure_future(self._fetch_page_text(url))
+            self._page_inflight[key] = fut
+            fut.add_done_callback(lambda f: self._on_page_fetched(key, f))
+        return await asyncio.shield(fut)
+
+    def _on_page_fetched(self, key: str, fut: asyncio.Future):
+        self._page_inflight.pop(key, None)
+        if not fut.cancelled() and fut.exception() is None:
+            self.page_cache.put(key, fut.result())
 
     async def _process_search_result(
         self,
@@ -92,6 +130,11 @@ class Main(star.Star):
         query,
         num_results: int = 5,
     ) -> list[SearchResult]:
+        cache_key = ("default", normalize_query(query), num_results)
+        results = self.query_cache.get(cache_key)
+        if results is not None:
+            logger.debug(f"web_searcher - hit query cache: {query}")
+            return results
         results = []
         try:
             results = await self.bing_search.search(query, num_results)
@@ -107,6 +150,7 @@ class Main(star.Star):
             logger.debug("search sogo failed")
             return []
 
+        self.query_cache.put(cache_key, results)
         return results
 
     async def _get_tavily_key(self, cfg: AstrBotConfig) -> str:
@@ -126,34 +170,46 @@ class Main(star.Star):
         payload: dict,
     ) -> list[SearchResult]:
         """使用 Tavily 搜索引擎进行搜索"""
+        cache_key = (
+            "tavily",
+            json.dumps(
+                {**payload, "query": normalize_query(payload["query"])},
+                sort_keys=True,
+            ),
+        )
+        results = self.query_cache.get(cache_key)
+        if results is not None:
+            logger.debug(f"web_searcher - hit query cache: {payload['query']}")
+            return results
         tavily_key = await self._get_tavily_key(cfg)
         url = "https://api.tavily.com/search"
         header = {
             "Authorization": f"Bearer {tavily_key}",
             "Content-Type": "application/json",
         }
-        async with aiohttp.ClientSession(trust_env=True) as session:
-            async with session.post(
-                url,
-                json=payload,
-                headers=header,
-                timeout=6,
-            ) as response:
-                if response.status != 200:
-                    reason = await response.text()
-                    raise Exception(
-                        f"Tavily web search failed: {reason}, status: {response.status}",
-                    )
-                data = await response.json()
-                results = []
-                for item in data.get("results", []):
-                    result = SearchResult(
-                        title=item.get("title"),
-                        url=item.get("url"),
-                        snippet=item.get("content"),
-                    )
-                    results.append(result)
-                return results
+        async with self.fetcher.get_session().post(
+            url,
+            json=payload,
+            headers=header,
+            timeout=aiohttp.ClientTimeout(total=6),
+        ) as response:
+            if response.status != 200:
+                reason = await response.text()
+                raise Exception(
+                    f"Tavily web search failed: {reason}, status: {response.status}",
+                )
+            data = await response.json()
+            results = []
+            for item in data.get("results", []):
+                result = SearchResult(
+                    title=item.get("title"),
+                    url=item.get("url"),
+                    snippet=item.get("content"),
+                )
+                results.append(result)
+        if results:
+            self.query_cache.put(cache_key, results)
+        return results
 
     async def _extract_tavily(self, cfg: AstrBotConfig, payload: dict) -> list[dict]:
         """使用 Tavily 提取网页内容"""
@@ -163,25 +219,24 @@ class Main(star.Star):
             "Authorization": f"Bearer {tavily_key}",
             "Content-Type": "application/json",
         }
-        async with aiohttp.ClientSession(trust_env=True) as session:
-            async with session.post(
-                url,
-                json=payload,
-                headers=header,
-                timeout=6,
-            ) as response:
-                if response.status != 200:
-                    reason = await response.text()
-                    raise Exception(
-                        f"Tavily web search failed: {reason}, status: {response.status}",
-                    )
-                data = await response.json()
-                results: list[dict] = data.get("results", [])
-                if not results:
-                    raise ValueError(
-                        "Error: Tavily web searcher does not return any results.",
-                    )
-                return results
+        async with self.fetcher.get_session().post(
+            url,
+            json=payload,
+            headers=header,
+            timeout=aiohttp.ClientTimeout(total=6),
+        ) as response:
+            if response.status != 200:
+                reason = await response.text()
+                raise Exception(
+                    f"Tavily web search failed: {reason}, status: {response.status}",
+                )
+            data = await response.json()
+            results: list[dict] = data.get("results", [])
+            if not results:
+                raise ValueError(
+                    "Error: Tavily web searcher does not return any results.",
+                )
+            return results
 
     @filter.command("websearch")
     async def websearch(self, event: AstrMessageEvent, oper: str | None = None):
@@ -393,43 +448,44 @@ class Main(star.Star):
         if not tool_set:
             return
 
+        # 工具集可能在请求之间共享，只在需要增删工具时复制
         if not websearch_enable:
             # pop tools
-            for tool_name in self.TOOLS:
-                tool_set.remove_tool(tool_name)
+            req.func_tool = tool_set.with_changes(remove=self.TOOLS)
             return
 
         func_tool_mgr = self.context.get_llm_tool_manager()
         if provider == "default":
             web_search_t = func_tool_mgr.get_func("web_search")
             fetch_url_t = func_tool_mgr.get_func("fetch_url")
-            if web_search_t:
-                tool_set.add_tool(web_search_t)
-            if fetch_url_t:
-                tool_set.add_tool(fetch_url_t)
-            tool_set.remove_tool("web_search_tavily")
-            tool_set.remove_tool("tavily_extract_web_page")
-            tool_set.remove_tool("AIsearch")
+            req.func_tool = tool_set.with_changes(
+                add=[t for t in (web_search_t, fetch_url_t) if t],
+                remove=["web_search_tavily", "tavily_extract_web_page", "AIsearch"],
+            )
         elif provider == "tavily":
             web_search_tavily = func_tool_mgr.get_func("web_search_tavily")
             tavily_extract_web_page = func_tool_mgr.get_func("tavily_extract_web_page")
-            if web_search_tavily:
-                tool_set.add_tool(web_search_tavily)
-            if tavily_extract_web_page:
-                tool_set.add_tool(tavily_extract_web_page)
-            tool_set.remove_tool("web_search")
-            tool_set.remove_tool("fetch_url")
-            tool_set.remove_tool("AIsearch")
+            req.func_tool = tool_set.with_changes(
+                add=[t for t in (web_search_tavily, tavily_extract_web_page) if t],
+                remove=["web_search", "fetch_url", "AIsearch"],
+            )
         elif provider == "baidu_ai_search":
             try:
                 await self.ensure_baidu_ai_search_mcp(event.unified_msg_origin)
                 aisearch_tool = func_tool_mgr.get_func("AIsearch")
                 if not aisearch_tool:
                     raise ValueError("Cannot get Baidu AI Search MCP tool.")
-                tool_set.add_tool(aisearch_tool)
-                tool_set.remove_tool("web_search")
-                tool_set.remove_tool("fetch_url")
-                tool_set.remove_tool("web_search_tavily")
-                tool_set.remove_tool("tavily_extract_web_page")
+                req.func_tool = tool_set.with_changes(
+                    add=[aisearch_tool],
+                    remove=[
+                        "web_search",
+                        "fetch_url",
+                        "web_search_tavily",
+                        "tavily_extract_web_page",
+                    ],
+                )
             except Exception as e:
                 logger.error(f"Cannot Initialize Baidu AI Search MCP Server: {e}")
+
+    async def terminate(self):
+        await self.fetcher.close()
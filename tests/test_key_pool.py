@@ -0,0 +1,184 @@
+import time
+
+import pytest
+
+from astrbot.core.provider.key_pool import (
+    MAX_COOLDOWN,
+    APIKeyPool,
+    KeyErrorKind,
+    classify_api_error,
+)
+
+
+class FakeResponse:
+    def __init__(self, headers: dict | None = None) -> None:
+        self.headers = headers or {}
+
+
+class FakeAPIError(Exception):
+    def __init__(self, status_code=None, code=None, headers=None, body=None):
+        super().__init__(f"status={status_code} code={code}")
+        self.status_code = status_code
+        self.code = code
+        self.response = FakeResponse(headers)
+        self.body = body
+
+
+class FakeClient:
+    def __init__(self, key: str) -> None:
+        self.key = key
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def make_pool(keys: list[str]) -> APIKeyPool[FakeClient]:
+    return APIKeyPool(keys, FakeClient, name="test")
+
+
+def test_classify_status_codes():
+    assert classify_api_error(FakeAPIError(429))[0] is KeyErrorKind.RATE_LIMITED
+    assert classify_api_error(FakeAPIError(401))[0] is KeyErrorKind.AUTH
+    assert classify_api_error(FakeAPIError(503))[0] is KeyErrorKind.SERVER
+    assert classify_api_error(FakeAPIError(400))[0] is KeyErrorKind.REQUEST
+    assert classify_api_error(TimeoutError())[0] is KeyErrorKind.NETWORK
+
+
+def test_classify_quota_code_and_retry_after():
+    kind, retry_after = classify_api_error(
+        FakeAPIError(429, code="insufficient_quota", headers={"retry-after": "7"}),
+    )
+    assert kind is KeyErrorKind.QUOTA_EXHAUSTED
+    assert retry_after == 7
+
+    _, retry_after = classify_api_error(
+        FakeAPIError(429, headers={"retry-after-ms": "1500"}),
+    )
+    assert retry_after == 1.5
+
+
+def test_set_keys_deduplicates_and_closes_removed_clients():
+    pool = make_pool(["a", "b", "a"])
+    assert pool.keys == ["a", "b"]
+    client_a = pool.client("a")
+    client_b = pool.client("b")
+    pool.pin("b")
+
+    pool.set_keys(["a", "c"])
+    assert pool.keys == ["a", "c"]
+    assert pool.client("a") is client_a
+    assert client_b.closed
+    assert not client_a.closed
+    # 被移除的 Key 不再保持优先
+    assert pool._pinned is None
+
+
+def test_empty_key_list_keeps_a_placeholder():
+    pool = make_pool([])
+    assert pool.keys == [""]
+
+
+def test_select_prefers_fewest_in_flight():
+    pool = make_pool(["a", "b"])
+    pool._stats["a"].in_flight = 2
+    assert pool.select() == "b"
+    assert pool.select(exclude=["b"]) == "a"
+
+
+def test_select_rotates_between_idle_keys():
+    pool = make_pool(["a", "b", "c"])
+    assert {pool.select() for _ in range(6)} == {"a", "b", "c"}
+
+
+def test_select_avoids_slow_keys_but_rotates_among_fast_ones():
+    pool = make_pool(["a", "b", "c"])
+    pool._stats["a"].latency_ewma = 1.0
+    pool._stats["b"].latency_ewma = 1.5
+    pool._stats["c"].latency_ewma = 5.0
+    assert {pool.select() for _ in range(6)} == {"a", "b"}
+
+    # 慢 Key 仍然优先于并发更多的 Key
+    pool._stats["a"].in_flight = 1
+    pool._stats["b"].in_flight = 1
+    assert pool.select() == "c"
+
+
+def test_pin_falls_back_while_cooling_down():
+    pool = make_pool(["a", "b"])
+    pool.pin("b")
+    assert pool.select() == "b"
+    pool._stats["b"].cooldown_until = time.monotonic() + 60
+    assert pool.select() == "a"
+
+    with pytest.raises(ValueError):
+        pool.pin("missing")
+
+
+def test_select_returns_earliest_cooldown_when_all_cooling():
+    pool = make_pool(["a", "b"])
+    now = time.monotonic()
+    pool._stats["a"].cooldown_until = now + 60
+    pool._stats["b"].cooldown_until = now + 30
+    assert not pool.has_available()
+    assert pool.select() == "b"
+
+
+def test_report_failure_applies_cooldown_with_backoff():
+    pool = make_pool(["a"])
+    stats = pool._stats["a"]
+
+    assert pool.report_failure("a", FakeAPIError(429)) is KeyErrorKind.RATE_LIMITED
+    first = stats.cooldown_until - time.monotonic()
+    assert 9 < first <= 10
+
+    pool.report_failure("a", FakeAPIError(429))
+    second = stats.cooldown_until - time.monotonic()
+    assert 19 < second <= 20
+    assert stats.consecutive_failures == 2
+    assert stats.errors_by_kind == {"rate_limited": 2}
+
+
+def test_report_failure_honours_retry_after_and_cap():
+    pool = make_pool(["a", "b"])
+    pool.report_failure("a", FakeAPIError(429, headers={"retry-after": "3"}))
+    assert pool._stats["a"].cooldown_until - time.monotonic() <= 3
+
+    pool.report_failure("b", FakeAPIError(429, headers={"retry-after": "99999"}))
+    assert pool._stats["b"].cooldown_until - time.monotonic() <= MAX_COOLDOWN
+
+
+def test_request_errors_do_not_cool_down():
+    pool = make_pool(["a"])
+    assert pool.report_failure("a", FakeAPIError(400)) is KeyErrorKind.REQUEST
+    stats = pool._stats["a"]
+    assert stats.failures == 1
+    assert stats.consecutive_failures == 0
+    assert not stats.cooling_down()
+
+
+@pytest.mark.asyncio
+async def test_acquire_records_success_and_failure():
+    pool = make_pool(["a"])
+    stats = pool._stats["a"]
+
+    async with pool.acquire() as lease:
+        assert lease.key == "a"
+        assert lease.client.key == "a"
+        assert stats.in_flight == 1
+    assert stats.in_flight == 0
+    assert stats.successes == 1
+
+    with pytest.raises(FakeAPIError):
+        async with pool.acquire():
+            raise FakeAPIError(500)
+    assert stats.in_flight == 0
+    assert stats.requests == 2
+    assert stats.failures == 1
+    assert stats.cooling_down()
+
+    # 成功后连续失败计数清零
+    stats.cooldown_until = 0
+    async with pool.acquire():
+        pass
+    assert stats.consecutive_failures == 0
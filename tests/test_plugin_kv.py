@@ -0,0 +1,153 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+
+from astrbot.core import plugin_kv as plugin_kv_module
+from astrbot.core.db.sqlite import SQLiteDatabase
+from astrbot.core.plugin_kv import KVTransaction, PluginKV
+
+
+@pytest_asyncio.fixture
+async def db(tmp_path, monkeypatch):
+    db = SQLiteDatabase(str(tmp_path / "data_v4.db"))
+    await db.initialize()
+    monkeypatch.setattr(plugin_kv_module, "db_helper", db)
+    yield db
+    await db.engine.dispose()
+
+
+def test_transaction_merges_writes():
+    tx = KVTransaction()
+    tx.put("a", 1)
+    tx.incr("a", 2)
+    tx.delete("b")
+    tx.incr("b")
+    tx.incr("c", 3)
+    tx.delete("c")
+    assert tx.puts == {"a": 1, "b": 0}
+    assert tx.increments == {"a": 2, "b": 1}
+    assert tx.removes == {"c"}
+
+    tx.put("a", "x")
+    assert tx.puts["a"] == "x"
+    assert "a" not in tx.increments
+
+
+@pytest.mark.asyncio
+async def test_put_get_delete_items(db):
+    kv = PluginKV("plugin_a")
+    other = PluginKV("plugin_b")
+    await kv.put("group:1", {"enabled": True})
+    await kv.put("group:2", {"enabled": False})
+    await kv.put("user:1", 1)
+    await other.put("group:1", "other")
+
+    assert await kv.get("group:1") == {"enabled": True}
+    assert await kv.get("missing", "default") == "default"
+    assert set(await kv.items("group:")) == {"group:1", "group:2"}
+
+    await kv.delete("group:1")
+    assert await kv.get("group:1") is None
+    assert await other.get("group:1") == "other"
+
+
+@pytest.mark.asyncio
+async def test_value_changes_after_put_are_not_stored(db):
+    kv = PluginKV("plugin_a")
+    value = {"list": [1]}
+    await kv.put("k", value)
+    value["list"].append(2)
+    assert await kv.get("k") == {"list": [1]}
+
+
+@pytest.mark.asyncio
+async def test_transaction_is_discarded_on_error(db):
+    kv = PluginKV("plugin_a")
+    with pytest.raises(RuntimeError):
+        async with kv.transaction() as tx:
+            tx.put("k", 1)
+            raise RuntimeError
+    assert await kv.get("k") is None
+
+
+@pytest.mark.asyncio
+async def test_pending_increments_are_merged_on_read_and_flush(db):
+    kv = PluginKV("plugin_a")
+    await kv.put("count", 10)
+    kv.incr("count")
+    kv.incr("count", 2)
+    kv.incr("new")
+    assert await kv.get("count") == 13
+    assert await kv.items() == {"count": 13, "new": 1}
+
+    await kv.flush()
+    assert kv._pending_incr == {}
+    assert await kv.get("count") == 13
+    assert await kv.get("new") == 1
+
+
+@pytest.mark.asyncio
+async def test_flush_keeps_increments_on_failure(db, monkeypatch):
+    kv = PluginKV("plugin_a")
+    kv.incr("count", 2)
+
+    async def fail(*args, **kwargs):
+        raise RuntimeError("db down")
+
+    monkeypatch.setattr(db, "apply_preference_changes", fail)
+    with pytest.raises(RuntimeError):
+        await kv.flush()
+    assert kv._pending_incr == {"count": 2}
+
+
+@pytest.mark.asyncio
+async def test_put_discards_stale_increments(db):
+    kv = PluginKV("plugin_a")
+    kv.incr("count", 5)
+    await kv.put("count", 0)
+    assert kv._pending_incr == {}
+    assert await kv.get("count") == 0
+
+    kv.incr("gone", 5)
+    await kv.delete("gone")
+    await kv.flush()
+    assert await kv.get("gone") is None
+
+
+@pytest.mark.asyncio
+async def test_increments_added_during_commit_are_kept(db, monkeypatch):
+    kv = PluginKV("plugin_a")
+    kv.incr("count", 5)
+    apply = db.apply_preference_changes
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def slow_apply(*args, **kwargs):
+        started.set()
+        await release.wait()
+        return await apply(*args, **kwargs)
+
+    monkeypatch.setattr(db, "apply_preference_changes", slow_apply)
+    task = asyncio.create_task(kv.put("count", 100))
+    await started.wait()
+    kv.incr("count", 1)
+    release.set()
+    await task
+
+    assert kv._pending_incr == {"count": 1}
+    assert await kv.get("count") == 101
+
+
+@pytest.mark.asyncio
+async def test_failed_commit_keeps_increments(db, monkeypatch):
+    kv = PluginKV("plugin_a")
+    kv.incr("count", 5)
+
+    async def fail(*args, **kwargs):
+        raise RuntimeError("db down")
+
+    monkeypatch.setattr(db, "apply_preference_changes", fail)
+    with pytest.raises(RuntimeError):
+        await kv.put("count", 0)
+    assert kv._pending_incr == {"count": 5}
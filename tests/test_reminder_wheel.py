@@ -0,0 +1,132 @@
+import pytest
+
+from astrbot.core.db.po import Reminder
+from packages.reminder.main import WHEEL_WINDOW, Main
+
+
+class FakeDB:
+    def __init__(self, reminders: list[Reminder] | None = None) -> None:
+        self.rows = {r.reminder_id: r for r in reminders or []}
+        self.deleted: list[str] = []
+
+    async def get_due_reminders(self, before: int):
+        return sorted(
+            (r for r in self.rows.values() if r.next_run_at < before),
+            key=lambda r: r.next_run_at,
+        )
+
+    async def update_reminder_next_run(self, reminder_id, next_run_at) -> bool:
+        if reminder_id not in self.rows:
+            return False
+        self.rows[reminder_id].next_run_at = next_run_at
+        return True
+
+    async def delete_reminders(self, reminder_ids):
+        for reminder_id in reminder_ids:
+            self.rows.pop(reminder_id, None)
+            self.deleted.append(reminder_id)
+
+
+class FakeContext:
+    def __init__(self, db: FakeDB) -> None:
+        self.db = db
+        self.sent: list[str] = []
+
+    def get_db(self):
+        return self.db
+
+    def get_config(self):
+        return {"timezone": "UTC"}
+
+    async def send_message(self, umo, result):
+        self.sent.append(umo)
+
+
+def make_reminder(reminder_id: str, next_run_at: int, cron: str | None = None):
+    return Reminder(
+        reminder_id=reminder_id,
+        umo=f"umo-{reminder_id}",
+        text="text",
+        cron=cron,
+        next_run_at=next_run_at,
+    )
+
+
+def make_plugin(reminders: list[Reminder] | None = None) -> Main:
+    return Main(FakeContext(FakeDB(reminders)))  # type: ignore
+
+
+def test_schedule_and_unschedule():
+    plugin = make_plugin()
+    a = make_reminder("a", 100)
+    b = make_reminder("b", 100)
+    plugin._schedule(a)
+    plugin._schedule(b)
+    plugin._schedule(a)
+    assert plugin._wheel == {100: ["a", "b"]}
+
+    plugin._unschedule("a")
+    assert plugin._wheel == {100: ["b"]}
+    plugin._unschedule("b")
+    assert plugin._wheel == {}
+    assert plugin._entries == {}
+    plugin._unschedule("missing")
+
+
+@pytest.mark.asyncio
+async def test_refill_loads_only_the_next_window():
+    now = 1_000_000
+    plugin = make_plugin(
+        [make_reminder("soon", now + 10), make_reminder("later", now + 10_000)],
+    )
+    await plugin._refill(now)
+    assert set(plugin._entries) == {"soon"}
+    assert plugin._loaded_until == now + WHEEL_WINDOW
+
+
+@pytest.mark.asyncio
+async def test_fire_one_shot_deletes_reminder():
+    now = 1_000_000
+    reminder = make_reminder("a", now)
+    plugin = make_plugin([reminder])
+    await plugin._fire(reminder, now)
+    assert plugin.context.sent == ["umo-a"]
+    assert plugin.db.deleted == ["a"]
+
+
+@pytest.mark.asyncio
+async def test_fire_skips_sending_after_misfire_grace():
+    now = 1_000_000
+    reminder = make_reminder("a", now - 3600)
+    plugin = make_plugin([reminder])
+    await plugin._fire(reminder, now)
+    assert plugin.context.sent == []
+    assert plugin.db.deleted == ["a"]
+
+
+@pytest.mark.asyncio
+async def test_fire_cron_reschedules_within_window():
+    now = 1_000_030
+    reminder = make_reminder("a", now - 30, cron="* * * * *")
+    plugin = make_plugin([reminder])
+    plugin._loaded_until = now + WHEEL_WINDOW  # 下一分钟仍在已加载的窗口内
+    await plugin._fire(reminder, now)
+
+    assert plugin.context.sent == ["umo-a"]
+    assert reminder.next_run_at is not None
+    assert now < reminder.next_run_at <= now + 60
+    assert plugin.db.rows["a"].next_run_at == reminder.next_run_at
+    assert plugin._wheel == {reminder.next_run_at: ["a"]}
+
+
+@pytest.mark.asyncio
+async def test_fire_does_not_reschedule_deleted_cron_reminder():
+    now = 1_000_020
+    reminder = make_reminder("a", now - 20, cron="* * * * *")
+    plugin = make_plugin()  # 发送期间已从数据库中删除
+    plugin._loaded_until = now + WHEEL_WINDOW
+    await plugin._fire(reminder, now)
+
+    assert plugin.context.sent == ["umo-a"]
+    assert plugin._wheel == {}
+    assert plugin._entries == {}
@@ -0,0 +1,120 @@
+import os
+
+from astrbot.core.utils.temp_manager import TempFileManager
+
+
+def make_manager(tmp_path, quota_bytes: int = 1024) -> TempFileManager:
+    manager = TempFileManager(temp_dir=str(tmp_path), quota_bytes=quota_bytes)
+    # 跳过目录扫描，只处理显式登记的文件
+    manager._last_scan = float("inf")
+    return manager
+
+
+def write_file(path: str, size: int):
+    with open(path, "wb") as f:
+        f.write(b"\0" * size)
+
+
+def test_sweep_removes_expired_files(tmp_path):
+    manager = make_manager(tmp_path)
+    expired = manager.new_path(suffix=".txt", ttl=-1)
+    alive = manager.new_path(suffix=".txt", ttl=3600)
+    write_file(expired, 10)
+    write_file(alive, 10)
+
+    assert manager.sweep() == 1
+    assert not os.path.exists(expired)
+    assert os.path.exists(alive)
+    assert manager.stats["expired"] == 1
+    assert manager.usage()["total_bytes"] == 10
+
+
+def test_sweep_evicts_earliest_expiring_over_quota(tmp_path):
+    manager = make_manager(tmp_path, quota_bytes=250)
+    paths = [manager.new_path(ttl=100 * (i + 1)) for i in range(3)]
+    for path in paths:
+        write_file(path, 100)
+
+    assert manager.sweep() == 1
+    assert not os.path.exists(paths[0])
+    assert os.path.exists(paths[1])
+    assert os.path.exists(paths[2])
+    assert manager.stats["evicted"] == 1
+    assert manager.usage()["total_bytes"] == 200
+
+
+def test_sizes_are_read_once_after_write(tmp_path):
+    manager = make_manager(tmp_path)
+    path = manager.new_path(category="tts")
+    manager.sweep()
+    assert manager.usage()["file_count"] == 1
+    assert manager.usage()["total_bytes"] == 0
+
+    write_file(path, 100)
+    manager.sweep()
+    assert manager.usage()["total_bytes"] == 100
+    assert manager._unsized == set()
+
+    # 已知大小的文件在清理时不会重新读取
+    write_file(path, 30)
+    manager.sweep()
+    assert manager.usage()["total_bytes"] == 100
+
+
+def test_scan_corrects_sizes_and_drops_deleted_files(tmp_path):
+    manager = make_manager(tmp_path)
+    a = manager.new_path(category="tts")
+    b = manager.new_path(category="tts")
+    write_file(a, 100)
+    write_file(b, 50)
+    manager.sweep()
+    assert manager.usage()["total_bytes"] == 150
+
+    write_file(a, 30)
+    os.remove(b)
+    manager._scan()
+    usage = manager.usage()
+    assert usage["total_bytes"] == 30
+    assert usage["file_count"] == 1
+    assert usage["by_category"] == {"tts": {"count": 1, "bytes": 30}}
+
+
+def test_eviction_restats_candidates(tmp_path):
+    manager = make_manager(tmp_path, quota_bytes=350)
+    paths = [manager.new_path(ttl=100 * (i + 1)) for i in range(3)]
+    for path in paths:
+        write_file(path, 100)
+    manager.sweep()
+    assert manager.usage()["total_bytes"] == 300
+
+    # 调用方删除了最早过期的文件：超出配额时该文件被移出登记，不会误删其他文件
+    os.remove(paths[0])
+    write_file(manager.new_path(ttl=1000), 100)
+    assert manager.sweep() == 0
+    assert manager.stats["evicted"] == 0
+    assert manager.usage()["total_bytes"] == 300
+
+    # 调用方改小了下一个候选文件：重新读取大小后不再超出配额
+    write_file(paths[1], 10)
+    write_file(manager.new_path(ttl=1000), 100)
+    assert manager.sweep() == 0
+    assert os.path.exists(paths[1])
+    assert manager.usage()["total_bytes"] == 310
+
+
+def test_reregister_refreshes_expiry(tmp_path):
+    manager = make_manager(tmp_path)
+    path = manager.new_path(ttl=-1)
+    write_file(path, 10)
+    manager.register(path, ttl=3600)
+
+    assert manager.sweep() == 0
+    assert os.path.exists(path)
+
+
+def test_scan_registers_unknown_files(tmp_path):
+    manager = TempFileManager(temp_dir=str(tmp_path), scan_interval=0)
+    write_file(os.path.join(tmp_path, "leftover.bin"), 10)
+    manager.sweep()
+    usage = manager.usage()
+    assert usage["by_category"] == {"unregistered": {"count": 1, "bytes": 10}}
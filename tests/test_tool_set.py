@@ -0,0 +1,52 @@
+from astrbot.core.agent.tool import FunctionTool, ToolSet
+
+
+def make_tool(name: str) -> FunctionTool:
+    return FunctionTool(
+        name=name,
+        description=f"{name} tool",
+        parameters={"type": "object", "properties": {}},
+    )
+
+
+def cached_schema(tool_set: ToolSet) -> list[dict]:
+    """Return the memoized openai schema list (openai_schema() returns a copy)."""
+    tool_set.openai_schema()
+    return tool_set._schema_cache["openai"][1]
+
+
+def test_with_changes_returns_same_set_when_nothing_changes():
+    a, b = make_tool("a"), make_tool("b")
+    tool_set = ToolSet([a, b])
+    schema = cached_schema(tool_set)
+    version = tool_set.version
+
+    assert tool_set.with_changes(add=[a], remove=["missing"]) is tool_set
+    assert tool_set.version == version
+    assert cached_schema(tool_set) is schema
+
+
+def test_with_changes_leaves_shared_set_untouched():
+    a, b, c = make_tool("a"), make_tool("b"), make_tool("c")
+    shared = ToolSet([a, b])
+    schema = cached_schema(shared)
+
+    changed = shared.with_changes(add=[c], remove=["a"])
+
+    assert changed is not shared
+    assert changed.names() == ["b", "c"]
+    assert shared.names() == ["a", "b"]
+    assert cached_schema(shared) is schema
+    assert [s["function"]["name"] for s in changed.openai_schema()] == ["b", "c"]
+
+
+def test_copy_keeps_valid_schema_cache():
+    tool_set = ToolSet([make_tool("a")])
+    schema = cached_schema(tool_set)
+
+    copied = tool_set.copy()
+    assert cached_schema(copied) is schema
+
+    copied.add_tool(make_tool("b"))
+    assert cached_schema(copied) is not schema
+    assert cached_schema(tool_set) is schema
@@ -0,0 +1,85 @@
+import os
+
+import pytest
+
+from astrbot.core.provider.tts_service import TTSAudioCache, normalize_tts_text
+
+
+def write_audio(path, size: int) -> str:
+    with open(path, "wb") as f:
+        f.write(b"\0" * size)
+    return str(path)
+
+
+def test_make_key_normalizes_text():
+    a = TTSAudioCache.make_key("p", "v", "你好  世界")
+    b = TTSAudioCache.make_key("p", "v", " 你好 世界 ")
+    assert a == b
+    assert a != TTSAudioCache.make_key("p", "other", "你好 世界")
+    assert normalize_tts_text("ＡＢＣ\n x") == "ABC x"
+
+
+@pytest.mark.asyncio
+async def test_put_then_get(tmp_path):
+    cache = TTSAudioCache(str(tmp_path / "cache"), max_bytes=1024)
+    src = write_audio(tmp_path / "a.wav", 100)
+
+    assert await cache.get("k1") is None
+    path = await cache.put("k1", src)
+    assert path.endswith("k1.wav")
+    assert await cache.get("k1") == path
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache._total_bytes == 100
+
+
+@pytest.mark.asyncio
+async def test_evicts_least_recently_used(tmp_path):
+    cache = TTSAudioCache(str(tmp_path / "cache"), max_bytes=250)
+    src = write_audio(tmp_path / "a.wav", 100)
+
+    p1 = await cache.put("k1", src)
+    p2 = await cache.put("k2", src)
+    assert await cache.get("k1") == p1
+    p3 = await cache.put("k3", src)
+
+    assert await cache.get("k2") is None
+    assert os.path.basename(p2) not in os.listdir(cache.cache_dir)
+    assert await cache.get("k1") == p1
+    assert await cache.get("k3") == p3
+    assert cache._total_bytes == 200
+
+
+@pytest.mark.asyncio
+async def test_keeps_single_oversized_entry(tmp_path):
+    cache = TTSAudioCache(str(tmp_path / "cache"), max_bytes=10)
+    src = write_audio(tmp_path / "a.wav", 100)
+    path = await cache.put("k1", src)
+    assert await cache.get("k1") == path
+
+
+@pytest.mark.asyncio
+async def test_replacing_entry_updates_size(tmp_path):
+    cache = TTSAudioCache(str(tmp_path / "cache"), max_bytes=1024)
+    await cache.put("k1", write_audio(tmp_path / "a.wav", 100))
+    await cache.put("k1", write_audio(tmp_path / "b.wav", 40))
+    assert cache._total_bytes == 40
+
+
+@pytest.mark.asyncio
+async def test_missing_file_is_a_miss(tmp_path):
+    cache = TTSAudioCache(str(tmp_path / "cache"), max_bytes=1024)
+    path = await cache.put("k1", write_audio(tmp_path / "a.wav", 100))
+    os.remove(path)
+    assert await cache.get("k1") is None
+    assert cache._total_bytes == 0
+
+
+@pytest.mark.asyncio
+async def test_index_is_rebuilt_from_disk(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    cache = TTSAudioCache(cache_dir, max_bytes=1024)
+    path = await cache.put("k1", write_audio(tmp_path / "a.wav", 100))
+
+    reloaded = TTSAudioCache(cache_dir, max_bytes=1024)
+    assert await reloaded.get("k1") == path
+    assert reloaded._total_bytes == 100
@@ -0,0 +1,120 @@
+import asyncio
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from astrbot.core.provider import tts_service as tts_service_module
+from astrbot.core.provider.tts_service import TTSService
+from astrbot.core.utils.temp_manager import TempFileManager
+
+
+class FakeTTSProvider:
+    def __init__(self, out_dir, delays: dict[str, float] | None = None) -> None:
+        self.out_dir = out_dir
+        self.delays = delays or {}
+        self.provider_config = {"id": "fake", "voice": "v1"}
+        self.calls: list[str] = []
+        self.active = 0
+        self.max_active = 0
+
+    def meta(self):
+        return SimpleNamespace(id="fake")
+
+    async def get_audio(self, text: str) -> str:
+        self.calls.append(text)
+        index = len(self.calls)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delays.get(text, 0.01))
+            path = os.path.join(self.out_dir, f"{index}.wav")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+            return path
+        finally:
+            self.active -= 1
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    # 返回给调用方的副本写入测试目录，而不是 data/temp
+    monkeypatch.setattr(
+        tts_service_module,
+        "temp_file_manager",
+        TempFileManager(temp_dir=str(tmp_path / "temp")),
+    )
+    return TTSService(cache_dir=str(tmp_path / "cache"))
+
+
+def read(path: str) -> str:
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.mark.asyncio
+async def test_synthesize_many_keeps_order(service, tmp_path):
+    texts = ["first", "second", "third"]
+    provider = FakeTTSProvider(tmp_path, {"first": 0.1, "second": 0.05})
+    tasks = service.synthesize_many(provider, texts, use_cache=False)
+    paths = [await task for task in tasks]
+    assert [read(p) for p in paths] == texts
+    # 后面的段先合成完成，结果仍然按原顺序返回
+    assert provider.max_active == 3
+
+
+@pytest.mark.asyncio
+async def test_synthesize_many_respects_max_concurrency(service, tmp_path):
+    provider = FakeTTSProvider(tmp_path)
+    texts = [str(i) for i in range(6)]
+    tasks = service.synthesize_many(provider, texts, max_concurrency=2)
+    paths = await asyncio.gather(*tasks)
+    assert [read(p) for p in paths] == texts
+    assert provider.max_active == 2
+
+
+@pytest.mark.asyncio
+async def test_duplicate_inflight_requests_are_merged(service, tmp_path):
+    provider = FakeTTSProvider(tmp_path, {"hello": 0.05})
+    paths = await asyncio.gather(
+        *service.synthesize_many(provider, ["hello", "hello ", "hello"]),
+    )
+    assert provider.calls == ["hello"]
+    assert [read(p) for p in paths] == ["hello"] * 3
+    # 每个调用方拿到各自的文件
+    assert len(set(paths)) == 3
+
+
+@pytest.mark.asyncio
+async def test_cached_result_is_reused(service, tmp_path):
+    provider = FakeTTSProvider(tmp_path)
+    first = await service.synthesize(provider, "hello")
+    second = await service.synthesize(provider, "hello")
+    assert provider.calls == ["hello"]
+    assert read(second) == read(first) == "hello"
+    assert first != second
+
+    provider.provider_config["voice"] = "v2"
+    await service.synthesize(provider, "hello")
+    assert provider.calls == ["hello", "hello"]
+
+
+@pytest.mark.asyncio
+async def test_failed_request_is_shared_then_retried(service, tmp_path):
+    provider = FakeTTSProvider(tmp_path)
+    calls = 0
+
+    async def fail(text):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise RuntimeError("tts down")
+
+    provider.get_audio = fail
+    results = await asyncio.gather(
+        *service.synthesize_many(provider, ["a", "a"]),
+        return_exceptions=True,
+    )
+    assert calls == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert service._inflight == {}
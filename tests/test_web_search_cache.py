@@ -0,0 +1,74 @@
+from packages.web_searcher import fetcher
+from packages.web_searcher.fetcher import LRUCache, normalize_query, normalize_url
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_lru_put_existing_key_refreshes_it():
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.put("a", 10)
+    cache.put("c", 3)
+    assert cache.get("a") == 10
+    assert cache.get("b", "missing") == "missing"
+
+
+def test_lru_ttl_expiry(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(fetcher.time, "monotonic", clock)
+    cache = LRUCache(maxsize=4, ttl=60)
+    cache.put("a", 1)
+    clock.now += 59
+    assert cache.get("a") == 1
+    clock.now += 2
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_lru_without_ttl_never_expires(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(fetcher.time, "monotonic", clock)
+    cache = LRUCache(maxsize=4)
+    cache.put("a", 1)
+    clock.now += 10**9
+    assert cache.get("a") == 1
+
+
+def test_normalize_url_strips_tracking_params():
+    assert (
+        normalize_url("HTTPS://Example.COM:443/p?b=2&utm_source=x&a=1&fbclid=y#top")
+        == "https://example.com/p?a=1&b=2"
+    )
+    assert normalize_url("http://example.com:80") == "http://example.com/"
+    assert normalize_url("http://example.com:8080/") == "http://example.com:8080/"
+
+
+def test_normalize_url_keeps_from_and_ref():
+    a = normalize_url("https://example.com/list?from=2024-01-01&ref=main")
+    b = normalize_url("https://example.com/list?from=2024-02-01&ref=main")
+    assert a != b
+    assert "from=2024-01-01" in a
+    assert "ref=main" in a
+
+
+def test_normalize_query():
+    assert normalize_query("  Hello   World ") == "hello world"